@@ -106,6 +106,9 @@ def init_shared_variables(config):
     redis_client.set(RedisVars.RedisVar_ParticipantStaticTokenAPIKey, TeraServerSettings.get_server_setting_value(
                                       TeraServerSettings.ServerParticipantTokenKey))
 
+    # Notify processes that keep the keys in memory
+    redis_client.publish(RedisVars.RedisVar_TokenKeysTopic, 'changed')
+
     # Set versions
     versions = TeraVersions()
 
@@ -148,6 +151,8 @@ def init_services(config: ConfigManager):
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='OpenTera Server')
     parser.add_argument('--enable_tests', help='Test mode for server.', default=False)
+    parser.add_argument('--rebuild_sessions_summaries', help='Compute the participants sessions summaries again, then '
+                                                             'exit.', action='store_true')
     args = parser.parse_args()
 
     config_man = ConfigManager()
@@ -208,6 +213,12 @@ if __name__ == '__main__':
         print("Unable to connect to database - please check settings in config file!", e)
         quit()
 
+    if args.rebuild_sessions_summaries:
+        from opentera.db.models.TeraParticipantSessionsSummary import TeraParticipantSessionsSummary
+        print('Rebuilding participants sessions summaries...')
+        print('Done -', TeraParticipantSessionsSummary.rebuild(), 'summaries')
+        quit()
+
     # Other modules are imported here so globals are initialized first (this is ugly)
     from modules.LoginModule.LoginModule import LoginModule
     from modules.FlaskModule.FlaskModule import FlaskModule
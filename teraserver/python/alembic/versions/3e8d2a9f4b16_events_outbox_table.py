@@ -0,0 +1,34 @@
+"""events outbox table
+
+Revision ID: 3e8d2a9f4b16
+Revises: 9a4c1f6b2d83
+Create Date: 2022-12-05 10:41:26.304917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import time
+
+
+# revision identifiers, used by Alembic.
+revision = '3e8d2a9f4b16'
+down_revision = '9a4c1f6b2d83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('t_events_outbox',
+                    sa.Column('version_id', sa.BigInteger, nullable=False, default=time.time() * 1000),
+                    sa.Column('id_event_outbox', sa.Integer, sa.Sequence('id_event_outbox_sequence'),
+                              primary_key=True, autoincrement=True),
+                    sa.Column('event_outbox_topic', sa.String, nullable=False),
+                    sa.Column('event_outbox_message', sa.LargeBinary, nullable=False),
+                    sa.Column('event_outbox_datetime', sa.TIMESTAMP(timezone=True), nullable=False)
+                    )
+    op.create_index('ix_t_events_outbox_event_outbox_datetime', 't_events_outbox', ['event_outbox_datetime'])
+
+
+def downgrade():
+    op.drop_index('ix_t_events_outbox_event_outbox_datetime', table_name='t_events_outbox')
+    op.drop_table('t_events_outbox')
@@ -0,0 +1,57 @@
+"""participants sessions summaries table
+
+Revision ID: 5d3b8e1a7c42
+Revises: f4b9e7081b18
+Create Date: 2022-11-21 09:12:44.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import time
+
+
+# revision identifiers, used by Alembic.
+revision = '5d3b8e1a7c42'
+down_revision = 'f4b9e7081b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('t_participants_sessions_summaries',
+                    sa.Column('version_id', sa.BigInteger, nullable=False, default=time.time() * 1000),
+                    sa.Column('id_participant', sa.Integer,
+                              sa.ForeignKey('t_participants.id_participant', ondelete='cascade'), primary_key=True,
+                              autoincrement=False),
+                    sa.Column('summary_sessions_count', sa.Integer, nullable=False, default=0),
+                    sa.Column('summary_sessions_duration', sa.BigInteger, nullable=False, default=0),
+                    sa.Column('summary_first_session_datetime', sa.TIMESTAMP(timezone=True), nullable=True),
+                    sa.Column('summary_last_session_datetime', sa.TIMESTAMP(timezone=True), nullable=True),
+                    sa.Column('summary_sessions_notstarted_count', sa.Integer, nullable=False, default=0),
+                    sa.Column('summary_sessions_inprogress_count', sa.Integer, nullable=False, default=0),
+                    sa.Column('summary_sessions_completed_count', sa.Integer, nullable=False, default=0),
+                    sa.Column('summary_sessions_cancelled_count', sa.Integer, nullable=False, default=0),
+                    sa.Column('summary_sessions_terminated_count', sa.Integer, nullable=False, default=0)
+                    )
+
+    # Summaries of the existing sessions (status: 0 = not started, 1 = in progress, 2 = completed, 3 = cancelled,
+    # 4 = terminated)
+    op.execute('INSERT INTO t_participants_sessions_summaries (version_id, id_participant, summary_sessions_count, '
+               'summary_sessions_duration, summary_first_session_datetime, summary_last_session_datetime, '
+               'summary_sessions_notstarted_count, summary_sessions_inprogress_count, '
+               'summary_sessions_completed_count, summary_sessions_cancelled_count, '
+               'summary_sessions_terminated_count) '
+               'SELECT ' + str(int(time.time() * 1000)) + ', sp.id_participant, COUNT(s.id_session), '
+               'COALESCE(SUM(s.session_duration), 0), MIN(s.session_start_datetime), '
+               'MAX(CASE WHEN s.session_status IN (2, 4) THEN s.session_start_datetime END), '
+               'COUNT(CASE WHEN s.session_status = 0 THEN s.id_session END), '
+               'COUNT(CASE WHEN s.session_status = 1 THEN s.id_session END), '
+               'COUNT(CASE WHEN s.session_status = 2 THEN s.id_session END), '
+               'COUNT(CASE WHEN s.session_status = 3 THEN s.id_session END), '
+               'COUNT(CASE WHEN s.session_status = 4 THEN s.id_session END) '
+               'FROM t_sessions_participants sp JOIN t_sessions s ON s.id_session = sp.id_session '
+               'WHERE sp.id_participant IS NOT NULL GROUP BY sp.id_participant')
+
+
+def downgrade():
+    op.drop_table('t_participants_sessions_summaries')
@@ -0,0 +1,54 @@
+"""sessions, assets and participants indexes
+
+Revision ID: 9a4c1f6b2d83
+Revises: 5d3b8e1a7c42
+Create Date: 2022-11-28 14:03:17.527641
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4c1f6b2d83'
+down_revision = '5d3b8e1a7c42'
+branch_labels = None
+depends_on = None
+
+# (table, columns) - Names are the same as the ones of the indexes declared in the models
+indexes = [('t_sessions', ['id_session_type']),
+           ('t_sessions', ['id_creator_user']),
+           ('t_sessions', ['id_creator_device']),
+           ('t_sessions', ['id_creator_participant']),
+           ('t_sessions', ['id_creator_service']),
+           ('t_sessions', ['session_start_datetime']),
+           ('t_sessions', ['session_status', 'session_start_datetime']),
+           ('t_sessions_participants', ['id_participant', 'id_session']),
+           ('t_sessions_participants', ['id_session']),
+           ('t_sessions_users', ['id_user', 'id_session']),
+           ('t_sessions_users', ['id_session']),
+           ('t_sessions_devices', ['id_device', 'id_session']),
+           ('t_sessions_devices', ['id_session']),
+           ('t_sessions_events', ['id_session']),
+           ('t_participants', ['id_project']),
+           ('t_participants', ['id_participant_group']),
+           ('t_assets', ['id_session']),
+           ('t_assets', ['id_device']),
+           ('t_assets', ['id_participant']),
+           ('t_assets', ['id_user']),
+           ('t_assets', ['id_service']),
+           ('t_assets', ['asset_service_uuid']),
+           ('t_tests', ['id_session'])]
+
+
+def get_index_name(table: str, columns: list) -> str:
+    return 'ix_' + table + '_' + '_'.join(columns)
+
+
+def upgrade():
+    for table, columns in indexes:
+        op.create_index(get_index_name(table, columns), table, columns)
+
+
+def downgrade():
+    for table, columns in indexes:
+        op.drop_index(get_index_name(table, columns), table_name=table)
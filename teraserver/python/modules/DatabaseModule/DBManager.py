@@ -53,6 +53,8 @@ from modules.DatabaseModule.DBManagerTeraUserAccess import DBManagerTeraUserAcce
 from modules.DatabaseModule.DBManagerTeraDeviceAccess import DBManagerTeraDeviceAccess
 from modules.DatabaseModule.DBManagerTeraParticipantAccess import DBManagerTeraParticipantAccess
 from modules.DatabaseModule.DBManagerTeraServiceAccess import DBManagerTeraServiceAccess
+from modules.DatabaseModule.DBManagerAccessCache import DBManagerAccessCache
+from modules.DatabaseModule.DBManagerEvents import DBManagerEvents
 
 # Alembic
 from alembic.config import Config
@@ -78,6 +80,9 @@ class DBManager (BaseModule):
         # Database cleanup task set to run at next midnight
         self.cleanup_database_task = self.start_cleanup_task()
 
+        # Events outbox relay task, started with the events if the outbox is enabled
+        self.outbox_relay_task = task.LoopingCall(self.relay_outbox_events)
+
     def start_cleanup_task(self) -> task:
         # Compute time till next midnight
         current_datetime = datetime.datetime.now()
@@ -88,65 +93,25 @@ class DBManager (BaseModule):
         # return task.deferLater(reactor, 5, self.cleanup_database)
 
     def setup_events_for_class(self, cls, event_name):
-        import json
-
+        # Events are only collected here: they are published once the transaction is committed (see DBManagerEvents)
         @event.listens_for(cls, 'after_update')
         def base_model_updated(mapper, connection, target):
             # print(mapper, connection, target, event_name)
-            json_update_event = target.to_json_update_event()
-            if json_update_event:
-                database_event = messages.DatabaseEvent()
-                database_event.type = messages.DatabaseEvent.DB_UPDATE
-                database_event.object_type = str(target.get_model_name())
-                database_event.object_value = json.dumps(json_update_event)
-
-                event_message = self.create_event_message(
-                    create_module_event_topic_from_name(ModuleNames.DATABASE_MODULE_NAME, event_name))
-
-                any_message = messages.Any()
-                any_message.Pack(database_event)
-                event_message.events.append(any_message)
-                # Specific topic for each class
-                self.publish(event_message.header.topic, event_message.SerializeToString())
-
-        # Send the event before we delete so we can trace it...
+            DBManagerAccessCache.target_changed(target, updated=True)
+            DBManagerEvents.target_changed(target, event_name, messages.DatabaseEvent.DB_UPDATE)
+
+        # Deleted objects are serialized right away so we can trace them...
         @event.listens_for(cls, 'after_delete')
         def base_model_deleted(mapper, connection, target):
             # print(mapper, connection, target, event_name)
-            json_delete_event = target.to_json_delete_event()
-            if json_delete_event:
-                database_event = messages.DatabaseEvent()
-                database_event.type = messages.DatabaseEvent.DB_DELETE
-                database_event.object_type = str(target.get_model_name())
-                database_event.object_value = json.dumps(json_delete_event)
-
-                event_message = self.create_event_message(
-                    create_module_event_topic_from_name(ModuleNames.DATABASE_MODULE_NAME, event_name))
-
-                any_message = messages.Any()
-                any_message.Pack(database_event)
-                event_message.events.append(any_message)
-                # Specific topic for each class
-                self.publish(event_message.header.topic, event_message.SerializeToString())
+            DBManagerAccessCache.target_changed(target)
+            DBManagerEvents.target_changed(target, event_name, messages.DatabaseEvent.DB_DELETE)
 
         @event.listens_for(cls, 'after_insert')
         def base_model_inserted(mapper, connection, target):
             # print(mapper, connection, target, event_name)
-            json_create_event = target.to_json_create_event()
-            if json_create_event:
-                database_event = messages.DatabaseEvent()
-                database_event.type = messages.DatabaseEvent.DB_CREATE
-                database_event.object_type = str(target.get_model_name())
-                database_event.object_value = json.dumps(json_create_event)
-
-                event_message = self.create_event_message(
-                    create_module_event_topic_from_name(ModuleNames.DATABASE_MODULE_NAME, event_name))
-
-                any_message = messages.Any()
-                any_message.Pack(database_event)
-                event_message.events.append(any_message)
-                # Specific topic for each class
-                self.publish(event_message.header.topic, event_message.SerializeToString())
+            DBManagerAccessCache.target_changed(target)
+            DBManagerEvents.target_changed(target, event_name, messages.DatabaseEvent.DB_CREATE)
 
     @staticmethod
     def userAccess(user: TeraUser):
@@ -271,6 +236,20 @@ class DBManager (BaseModule):
         for name in EventNameClassMap:
             self.setup_events_for_class(EventNameClassMap[name], name)
 
+        # Other models only need to invalidate the access cache, they don't send any event
+        for cls in DBManagerAccessCache.access_models + DBManagerAccessCache.sessions_models:
+            if cls not in EventNameClassMap.values():
+                self.setup_events_for_class(cls, cls.get_model_name())
+
+        # Access sets are now properly invalidated, share them
+        DBManagerAccessCache.redis = self.redis
+
+        # Events can now be published after commit
+        DBManagerEvents.publisher = self
+        DBManagerEvents.outbox_enabled = self.config.server_config.get('database_events_outbox', False)
+        if DBManagerEvents.outbox_enabled and not self.outbox_relay_task.running:
+            self.outbox_relay_task.start(DBManagerEvents.outbox_relay_delay, now=False)
+
     def open(self, echo=False):
         self.db_uri = 'postgresql://%(username)s:%(password)s@%(url)s:%(port)s/%(name)s' % self.config.db_config
 
@@ -394,6 +373,15 @@ class DBManager (BaseModule):
         # Reschedule cleanup task
         self.cleanup_database_task = self.start_cleanup_task()
 
+    def relay_outbox_events(self):
+        try:
+            count = DBManagerEvents.relay_outbox()
+            if count:
+                print('Database events - ' + str(count) + ' outbox message(s) published again')
+        except Exception as e:
+            db.session.rollback()
+            print('Database events - unable to relay outbox messages: ' + str(e))
+
 
 # Fix foreign_keys on sqlite
 @event.listens_for(Engine, "connect")
@@ -0,0 +1,142 @@
+from opentera.redis.RedisVars import RedisVars
+
+from opentera.db.models.TeraDevice import TeraDevice
+from opentera.db.models.TeraDeviceParticipant import TeraDeviceParticipant
+from opentera.db.models.TeraDeviceProject import TeraDeviceProject
+from opentera.db.models.TeraDeviceSite import TeraDeviceSite
+from opentera.db.models.TeraParticipant import TeraParticipant
+from opentera.db.models.TeraParticipantGroup import TeraParticipantGroup
+from opentera.db.models.TeraProject import TeraProject
+from opentera.db.models.TeraService import TeraService
+from opentera.db.models.TeraServiceAccess import TeraServiceAccess
+from opentera.db.models.TeraServiceProject import TeraServiceProject
+from opentera.db.models.TeraServiceRole import TeraServiceRole
+from opentera.db.models.TeraServiceSite import TeraServiceSite
+from opentera.db.models.TeraSession import TeraSession
+from opentera.db.models.TeraSessionDevices import TeraSessionDevices
+from opentera.db.models.TeraSessionParticipants import TeraSessionParticipants
+from opentera.db.models.TeraSessionType import TeraSessionType
+from opentera.db.models.TeraSessionTypeProject import TeraSessionTypeProject
+from opentera.db.models.TeraSessionTypeSite import TeraSessionTypeSite
+from opentera.db.models.TeraSessionUsers import TeraSessionUsers
+from opentera.db.models.TeraSite import TeraSite
+from opentera.db.models.TeraTestType import TeraTestType
+from opentera.db.models.TeraTestTypeProject import TeraTestTypeProject
+from opentera.db.models.TeraTestTypeSite import TeraTestTypeSite
+from opentera.db.models.TeraUser import TeraUser
+from opentera.db.models.TeraUserGroup import TeraUserGroup
+from opentera.db.models.TeraUserUserGroup import TeraUserUserGroup
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+import json
+
+
+class DBManagerAccessCache:
+    """
+        Cache of the resolved access sets (ids lists) of users, devices and services, shared in Redis between all the
+        server processes and threads.
+
+        Each entry is stored with the generation it was computed with. Generations are incremented once a transaction
+        changing an object that access sets depends on is committed, which invalidates all entries at once. Sessions
+        lists have their own generation, since sessions change a lot more often than the rest.
+    """
+    # Redis client (synchronous), set when events are ready. Cache is disabled if not set.
+    redis = None
+
+    # Maximum time to live of an entry, in seconds
+    entry_ttl = 600
+
+    # Models which changes invalidate the access sets
+    access_models = [TeraDevice, TeraDeviceParticipant, TeraDeviceProject, TeraDeviceSite, TeraParticipant,
+                     TeraParticipantGroup, TeraProject, TeraService, TeraServiceAccess, TeraServiceProject,
+                     TeraServiceRole, TeraServiceSite, TeraSessionType, TeraSessionTypeProject, TeraSessionTypeSite,
+                     TeraSite, TeraTestType, TeraTestTypeProject, TeraTestTypeSite, TeraUser, TeraUserGroup,
+                     TeraUserUserGroup]
+
+    # Models which changes invalidate the sessions lists only
+    sessions_models = [TeraSession, TeraSessionDevices, TeraSessionParticipants, TeraSessionUsers]
+
+    # Columns, other than the foreign keys, that change the access sets on update
+    access_columns = ['user_superadmin', 'service_role_name', 'session_type_category']
+
+    @classmethod
+    def get(cls, owner: str, name: str, compute, sessions: bool = False) -> list:
+        if not cls.redis:
+            return compute()
+
+        key = RedisVars.RedisVar_AccessCachePrefixKey + owner + '.' + name
+        generation_key = RedisVars.RedisVar_AccessCacheSessionsGenerationKey if sessions \
+            else RedisVars.RedisVar_AccessCacheGenerationKey
+
+        # Only one round trip to get the current generation and the entry
+        generation, entry = cls.redis.mget(generation_key, key)
+        generation = int(generation) if generation else 0
+        if entry:
+            entry = json.loads(entry)
+            if entry['generation'] == generation:
+                return entry['values']
+
+        values = compute()
+        cls.redis.set(key, json.dumps({'generation': generation, 'values': values}), ex=cls.entry_ttl)
+        return values
+
+    @classmethod
+    def invalidate(cls, sessions_only: bool = False):
+        if not cls.redis:
+            return
+        pipe = cls.redis.pipeline()
+        pipe.incr(RedisVars.RedisVar_AccessCacheSessionsGenerationKey)
+        if not sessions_only:
+            pipe.incr(RedisVars.RedisVar_AccessCacheGenerationKey)
+        pipe.execute()
+
+    @classmethod
+    def target_changed(cls, target, updated: bool = False):
+        # Called by the database events listeners (flush). Entries are only invalidated after commit, otherwise they
+        # could be computed again by another process with the uncommitted state.
+        if type(target) in cls.access_models:
+            flag = 'access_cache_changed'
+        elif type(target) in cls.sessions_models:
+            flag = 'access_cache_sessions_changed'
+        else:
+            return
+
+        if updated and not cls.access_attributes_changed(target):
+            return
+
+        session = object_session(target)
+        if session:
+            session.info[flag] = True
+
+    @classmethod
+    def access_attributes_changed(cls, target) -> bool:
+        state = inspect(target)
+        for column_attr in state.mapper.column_attrs:
+            column = column_attr.columns[0]
+            if column.foreign_keys or column_attr.key in cls.access_columns:
+                if state.attrs[column_attr.key].history.has_changes():
+                    return True
+
+        # Many-to-many associations (users groups, devices projects, sessions participants, ...) are written in their
+        # table by the relationship, their own model listeners are never called
+        for relationship in state.mapper.relationships:
+            if relationship.secondary is not None:
+                if state.attrs[relationship.key].history.has_changes():
+                    return True
+        return False
+
+
+@event.listens_for(Session, 'after_commit')
+def access_cache_session_committed(session):
+    access_changed = session.info.pop('access_cache_changed', False)
+    sessions_changed = session.info.pop('access_cache_sessions_changed', False)
+    if access_changed or sessions_changed:
+        DBManagerAccessCache.invalidate(sessions_only=not access_changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def access_cache_session_rollbacked(session):
+    session.info.pop('access_cache_changed', None)
+    session.info.pop('access_cache_sessions_changed', None)
@@ -0,0 +1,170 @@
+from opentera.db.Base import db
+from opentera.db.models.TeraEventOutbox import TeraEventOutbox
+from opentera.modules.BaseModule import ModuleNames, create_module_event_topic_from_name
+import opentera.messages.python as messages
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+import datetime
+import json
+
+
+class DBManagerEvents:
+    """
+        Database events (objects created, updated or deleted) of a transaction, published in Redis once the transaction
+        is committed, so that nothing is published while the transaction is opened and holds rows locks. Events of a
+        rollbacked transaction are never published.
+
+        Changed objects are collected by the database events listeners and serialized after each flush, all objects of
+        the same class at once. Just before commit, events are packed in one TeraEvent message per event name (topic)
+        for the whole transaction.
+
+        If the outbox is enabled, messages are also written in the events outbox table in the transaction, and deleted
+        once published. Messages left in the outbox (Redis error, server stopped during commit) are published again by
+        relay_outbox(): events are then delivered at least once.
+    """
+    # Module publishing the events (DBManager), set when events are ready. Events are not collected if not set.
+    publisher = None
+
+    # Write messages in the outbox table
+    outbox_enabled = False
+
+    # Age, in seconds, of the outbox messages considered as not published
+    outbox_relay_delay = 60
+
+    @classmethod
+    def target_changed(cls, target, event_name: str, event_type: int):
+        # Called by the database events listeners (flush)
+        if not cls.publisher:
+            return
+
+        session = object_session(target)
+        if not session:
+            return
+
+        # Deleted objects are serialized right away, other objects once the flush is done. Objects are only added once
+        # per flush, even if more than one listener is registered for their class.
+        delete_event = target.to_json_delete_event() if event_type == messages.DatabaseEvent.DB_DELETE else None
+        session.info.setdefault('database_events_targets', dict())[(event_name, event_type, id(target))] = \
+            (target, delete_event)
+
+    @classmethod
+    def serialize_events(cls, session: Session, targets: dict):
+        # Create and update events of the objects of the same class are serialized at once
+        classes_targets = dict()
+        for (_, event_type, _), (target, _) in targets.items():
+            if event_type != messages.DatabaseEvent.DB_DELETE:
+                classes_targets.setdefault((type(target), event_type), []).append(target)
+
+        json_events = dict()
+        for (model_class, event_type), class_targets in classes_targets.items():
+            if event_type == messages.DatabaseEvent.DB_CREATE:
+                class_events = model_class.to_json_create_events(class_targets)
+            else:
+                class_events = model_class.to_json_update_events(class_targets)
+            for target, json_event in zip(class_targets, class_events):
+                json_events[(event_type, id(target))] = json_event
+
+        events = session.info.setdefault('database_events', [])
+        for (event_name, event_type, target_id), (target, json_event) in targets.items():
+            if event_type != messages.DatabaseEvent.DB_DELETE:
+                json_event = json_events[(event_type, target_id)]
+            if json_event:
+                database_event = messages.DatabaseEvent()
+                database_event.type = event_type
+                database_event.object_type = str(target.get_model_name())
+                database_event.object_value = json.dumps(json_event)
+                events.append((event_name, database_event))
+
+    @classmethod
+    def create_messages(cls, session: Session, events: list) -> list:
+        # One message per topic, with all the events of the transaction in their order. Returns a list of (topic,
+        # serialized message, outbox message id).
+        event_messages = dict()
+        for event_name, database_event in events:
+            if event_name not in event_messages:
+                event_messages[event_name] = cls.publisher.create_event_message(
+                    create_module_event_topic_from_name(ModuleNames.DATABASE_MODULE_NAME, event_name))
+            any_message = messages.Any()
+            any_message.Pack(database_event)
+            event_messages[event_name].events.append(any_message)
+
+        rval = []
+        for event_message in event_messages.values():
+            topic = event_message.header.topic
+            message = event_message.SerializeToString()
+            id_outbox = None
+            if cls.outbox_enabled:
+                id_outbox = TeraEventOutbox.add_message(session, topic, message, datetime.datetime.now())
+            rval.append((topic, message, id_outbox))
+        return rval
+
+    @classmethod
+    def publish_messages(cls, event_messages: list, engine):
+        # Messages which can't be published stay in the outbox, if enabled. Published messages are deleted with the
+        # engine of the committed transaction.
+        published_ids = []
+        for topic, message, id_outbox in event_messages:
+            try:
+                cls.publisher.publish(topic, message)
+            except Exception as e:
+                print('Database events - unable to publish on ' + topic + ': ' + str(e))
+                continue
+            if id_outbox is not None:
+                published_ids.append(id_outbox)
+
+        if published_ids:
+            with engine.begin() as connection:
+                TeraEventOutbox.delete_messages(connection, published_ids)
+
+    @classmethod
+    def relay_outbox(cls) -> int:
+        # Publish the outbox messages which were not published after their commit. Returns the number of messages.
+        if not cls.publisher:
+            return 0
+
+        max_datetime = datetime.datetime.now() - datetime.timedelta(seconds=cls.outbox_relay_delay)
+        count = 0
+        for outbox_message in TeraEventOutbox.get_messages_before(max_datetime):
+            cls.publisher.publish(outbox_message.event_outbox_topic, outbox_message.event_outbox_message)
+            db.session.delete(outbox_message)
+            count += 1
+        db.session.commit()
+        return count
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def database_events_session_flushed(session, flush_context):
+    targets = session.info.pop('database_events_targets', None)
+    if targets:
+        DBManagerEvents.serialize_events(session, targets)
+
+
+@event.listens_for(Session, 'before_commit')
+def database_events_before_commit(session):
+    if not DBManagerEvents.publisher:
+        return
+    # Pending changes are flushed first, so their events are collected
+    session.flush()
+    events = session.info.pop('database_events', None)
+    if events:
+        session.info.setdefault('database_events_messages', []).extend(
+            DBManagerEvents.create_messages(session, events))
+        session.info['database_events_engine'] = session.connection().engine
+
+
+@event.listens_for(Session, 'after_commit')
+def database_events_session_committed(session):
+    event_messages = session.info.pop('database_events_messages', None)
+    engine = session.info.pop('database_events_engine', None)
+    if event_messages:
+        DBManagerEvents.publish_messages(event_messages, engine)
+
+
+@event.listens_for(Session, 'after_rollback')
+def database_events_session_rollbacked(session):
+    session.info.pop('database_events_targets', None)
+    session.info.pop('database_events', None)
+    session.info.pop('database_events_messages', None)
+    session.info.pop('database_events_engine', None)
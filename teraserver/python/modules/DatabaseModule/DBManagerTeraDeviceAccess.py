@@ -2,6 +2,7 @@ from opentera.db.models.TeraProject import TeraProject
 from opentera.db.models.TeraSessionType import TeraSessionType
 from opentera.db.models.TeraDevice import TeraDevice
 from opentera.db.models.TeraSession import TeraSession
+from modules.DatabaseModule.DBManagerAccessCache import DBManagerAccessCache
 
 from sqlalchemy import func
 
@@ -12,6 +13,10 @@ class DBManagerTeraDeviceAccess:
     def __init__(self, device: TeraDevice):
         self.device = device
 
+    def _cached_ids(self, name: str, compute, sessions: bool = False) -> list:
+        return DBManagerAccessCache.get(owner='device.' + self.device.device_uuid, name=name, compute=compute,
+                                        sessions=sessions)
+
     def query_session(self, session_id: int):
         sessions = []
         for part in self.device.device_participants:
@@ -40,19 +45,15 @@ class DBManagerTeraDeviceAccess:
         return query.all()
 
     def get_accessible_sessions_ids(self):
-        sessions = self.get_accessible_sessions()
-        return [session.id_session for session in sessions]
+        return self._cached_ids('sessions_ids', lambda: [session.id_session for session in
+                                                         self.get_accessible_sessions()], sessions=True)
 
     def get_accessible_participants(self, admin_only=False):
         return self.device.device_participants
 
     def get_accessible_participants_ids(self, admin_only=False):
-        parts = []
-
-        for part in self.get_accessible_participants(admin_only=admin_only):
-            parts.append(part.id_participant)
-
-        return parts
+        return self._cached_ids('participants_ids', lambda: [part.id_participant for part in
+                                                             self.get_accessible_participants()])
 
     def get_accessible_session_types(self):
 
@@ -69,10 +70,8 @@ class DBManagerTeraDeviceAccess:
         return session_types
 
     def get_accessible_session_types_ids(self):
-        types = []
-        for my_type in self.get_accessible_session_types():
-            types.append(my_type.id_session_type)
-        return types
+        return self._cached_ids('session_types_ids', lambda: [my_type.id_session_type for my_type in
+                                                              self.get_accessible_session_types()])
 
     def get_accessible_assets(self, id_asset: int = None, uuid_asset: str = None):
         from opentera.db.models.TeraAsset import TeraAsset
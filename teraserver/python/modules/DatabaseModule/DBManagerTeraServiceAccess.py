@@ -1,5 +1,7 @@
 from opentera.db.models.TeraService import TeraService
+from opentera.db.KeysetPagination import KeysetPagination
 from opentera.db.models import TeraUser
+from modules.DatabaseModule.DBManagerAccessCache import DBManagerAccessCache
 
 from sqlalchemy import or_, not_
 
@@ -8,6 +10,10 @@ class DBManagerTeraServiceAccess:
     def __init__(self, service: TeraService):
         self.service = service
 
+    def _cached_ids(self, name: str, compute, sessions: bool = False) -> list:
+        return DBManagerAccessCache.get(owner='service.' + self.service.service_uuid, name=name, compute=compute,
+                                        sessions=sessions)
+
     def get_accessible_devices(self, admin_only=False):
         from opentera.db.models.TeraDevice import TeraDevice
         from opentera.db.models.TeraDeviceProject import TeraDeviceProject
@@ -19,12 +25,9 @@ class DBManagerTeraServiceAccess:
         return query.all()
 
     def get_accessible_devices_ids(self, admin_only=False):
-        devices = []
-
-        for device in self.get_accessible_devices(admin_only=admin_only):
-            devices.append(device.id_device)
-
-        return devices
+        return self._cached_ids('devices_ids.' + str(admin_only),
+                                lambda: [device.id_device for device in
+                                         self.get_accessible_devices(admin_only=admin_only)])
 
     def get_accessible_projects(self, admin_only=False):
         project_list = []
@@ -39,12 +42,9 @@ class DBManagerTeraServiceAccess:
         return project_list
 
     def get_accessible_projects_ids(self, admin_only=False):
-        projects = []
-
-        for project in self.get_accessible_projects(admin_only=admin_only):
-            projects.append(project.id_project)
-
-        return projects
+        return self._cached_ids('projects_ids.' + str(admin_only),
+                                lambda: [project.id_project for project in
+                                         self.get_accessible_projects(admin_only=admin_only)])
 
     def get_accessible_sessions(self, admin_only=False):
         from opentera.db.models.TeraSession import TeraSession
@@ -89,12 +89,9 @@ class DBManagerTeraServiceAccess:
         #     filter(TeraParticipant.id_participant.in_(part_ids)).all()
 
     def get_accessible_sessions_ids(self, admin_only=False):
-        ses_ids = []
-
-        for ses in self.get_accessible_sessions(admin_only=admin_only):
-            ses_ids.append(ses.id_session)
-
-        return ses_ids
+        return self._cached_ids('sessions_ids.' + str(admin_only),
+                                lambda: [ses.id_session for ses in self.get_accessible_sessions(admin_only=admin_only)],
+                                sessions=True)
 
     def get_accessibles_sites(self):
         # projects = self.get_accessible_projects()
@@ -111,7 +108,7 @@ class DBManagerTeraServiceAccess:
         return site_list
 
     def get_accessibles_sites_ids(self):
-        return [site.id_site for site in self.get_accessibles_sites()]
+        return self._cached_ids('sites_ids', lambda: [site.id_site for site in self.get_accessibles_sites()])
 
     def get_accessible_participants(self, admin_only=False):
         project_id_list = self.get_accessible_projects_ids(admin_only=admin_only)
@@ -123,12 +120,17 @@ class DBManagerTeraServiceAccess:
         return participant_list
 
     def get_accessible_participants_ids(self, admin_only=False):
-        parts = []
+        return self._cached_ids('participants_ids.' + str(admin_only),
+                                lambda: [part.id_participant for part in
+                                         self.get_accessible_participants(admin_only=admin_only)])
 
-        for part in self.get_accessible_participants(admin_only=admin_only):
-            parts.append(part.id_participant)
-
-        return parts
+    def query_participants_for_project(self, project_id: int, pagination: KeysetPagination = None):
+        from opentera.db.models.TeraParticipant import TeraParticipant
+        if project_id not in self.get_accessible_projects_ids():
+            return []
+        query = TeraParticipant.query.filter(TeraParticipant.id_project == project_id)\
+            .order_by(TeraParticipant.participant_name.asc())
+        return KeysetPagination.query_all(query, pagination)
 
     def get_accessible_users(self, admin_only=False):
         projects = self.get_accessible_projects(admin_only=admin_only)
@@ -142,7 +144,8 @@ class DBManagerTeraServiceAccess:
         return sorted(users, key=lambda suser: suser.user_firstname)
 
     def get_accessible_users_ids(self, admin_only=False):
-        return [user.id_user for user in self.get_accessible_users(admin_only=admin_only)]
+        return self._cached_ids('users_ids.' + str(admin_only),
+                                lambda: [user.id_user for user in self.get_accessible_users(admin_only=admin_only)])
 
     def get_accessible_sessions_types(self):
         from opentera.db.models.TeraSessionType import TeraSessionType
@@ -153,7 +156,8 @@ class DBManagerTeraServiceAccess:
         return query.all()
 
     def get_accessible_sessions_types_ids(self):
-        return [st.id_session_type for st in self.get_accessible_sessions_types()]
+        return self._cached_ids('sessions_types_ids',
+                                lambda: [st.id_session_type for st in self.get_accessible_sessions_types()])
 
     def get_accessible_tests_types(self):
         from opentera.db.models.TeraTestType import TeraTestType
@@ -164,7 +168,8 @@ class DBManagerTeraServiceAccess:
         return query.all()
 
     def get_accessible_tests_types_ids(self):
-        return [tt.id_test_type for tt in self.get_accessible_tests_types()]
+        return self._cached_ids('tests_types_ids',
+                                lambda: [tt.id_test_type for tt in self.get_accessible_tests_types()])
 
     def get_site_role(self, site_id: int, uuid_user: str):
         user = self.get_user_with_uuid(uuid_user)
@@ -1,6 +1,9 @@
-from sqlalchemy import true
+from sqlalchemy import true, event
+from sqlalchemy.orm import Session
 from typing import List
 
+from opentera.db.Base import db
+from opentera.db.KeysetPagination import KeysetPagination
 from opentera.db.models.TeraUser import TeraUser
 from opentera.db.models.TeraUserGroup import TeraUserGroup
 from opentera.db.models.TeraSite import TeraSite
@@ -19,81 +22,190 @@ from opentera.db.models.TeraSessionTypeSite import TeraSessionTypeSite
 from opentera.db.models.TeraTestType import TeraTestType
 from opentera.db.models.TeraTestTypeSite import TeraTestTypeSite
 from opentera.db.models.TeraTestTypeProject import TeraTestTypeProject
+from opentera.db.models.TeraServiceAccess import TeraServiceAccess
+from opentera.db.models.TeraServiceRole import TeraServiceRole
+
+from modules.DatabaseModule.DBManagerAccessCache import DBManagerAccessCache
 
 from sqlalchemy import or_, and_, not_
 
 
+# Incremented on each commit. Memoized access lists are only valid until the next commit, since any commit can change
+# the roles or the items they contain.
+db_commit_generation = 0
+
+
+@event.listens_for(Session, 'after_commit')
+def db_session_committed(session):
+    global db_commit_generation
+    db_commit_generation += 1
+
+
 class DBManagerTeraUserAccess:
     def __init__(self, user: TeraUser):
         self.user = user
+        # Memoized access graph (roles and accessible items), resolved once and reused by all accessors
+        self._cache = {}
+        self._cache_generation = db_commit_generation
+
+    def _memoize(self, key, compute):
+        if self._cache_generation != db_commit_generation:
+            self.clear_cache()
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def clear_cache(self):
+        self._cache = {}
+        self._cache_generation = db_commit_generation
+
+    def _memoize_ids(self, name: str, compute, sessions: bool = False) -> list:
+        # Ids lists are also shared with the other processes through the access cache
+        return list(self._memoize(name, lambda: DBManagerAccessCache.get(owner='user.' + self.user.user_uuid, name=name,
+                                                                         compute=compute, sessions=sessions)))
+
+    def _resolve_roles(self) -> tuple:
+        # Resolve the sites and projects roles of the user with a few set-based queries instead of walking each user
+        # group relationships. Same content as TeraUser.get_sites_roles and TeraUser.get_projects_roles.
+        if self.user.user_superadmin:
+            # Super admin - admin role in all sites and projects
+            sites_roles = {site: {'site_role': 'admin', 'inherited': True} for site in TeraSite.query.all()}
+            projects_roles = {project: {'project_role': 'admin', 'inherited': True}
+                              for project in TeraProject.query.all()}
+            return sites_roles, projects_roles
+
+        roles = db.session.query(TeraServiceAccess.id_user_group, TeraServiceRole.id_site, TeraServiceRole.id_project,
+                                 TeraServiceRole.service_role_name) \
+            .join(TeraServiceRole, TeraServiceRole.id_service_role == TeraServiceAccess.id_service_role) \
+            .join(TeraUserUserGroup, TeraUserUserGroup.id_user_group == TeraServiceAccess.id_user_group) \
+            .filter(TeraUserUserGroup.id_user == self.user.id_user) \
+            .filter(or_(TeraServiceRole.id_site.isnot(None), TeraServiceRole.id_project.isnot(None))) \
+            .order_by(TeraUserUserGroup.id_user_user_group.asc(), TeraServiceAccess.id_service_access.asc()).all()
+
+        if not roles:
+            return {}, {}
+
+        # Projects with a direct role or in a site where the user is admin
+        admin_sites_ids = set([role.id_site for role in roles if role.id_site and role.service_role_name == 'admin'])
+        projects_ids = set([role.id_project for role in roles if role.id_project])
+        projects = TeraProject.query.filter(or_(TeraProject.id_project.in_(projects_ids),
+                                                TeraProject.id_site.in_(admin_sites_ids))).all()
+        projects_by_id = {project.id_project: project for project in projects}
+        sites_projects = {}
+        for project in projects:
+            sites_projects.setdefault(project.id_site, []).append(project)
+
+        # Sites with a direct role or with a project with a direct role
+        sites_ids = set([role.id_site for role in roles if role.id_site])
+        sites_ids.update([projects_by_id[project_id].id_site for project_id in projects_ids])
+        sites_by_id = {site.id_site: site for site in TeraSite.query.filter(TeraSite.id_site.in_(sites_ids)).all()}
+
+        groups_roles = {}
+        for role in roles:
+            groups_roles.setdefault(role.id_user_group, []).append(role)
+
+        sites_roles = {}
+        projects_roles = {}
+        for group_roles in groups_roles.values():
+            group_sites_roles = {}
+            group_projects_roles = {}
+            for role in group_roles:
+                if role.id_site:
+                    group_sites_roles[role.id_site] = {'site_role': role.service_role_name, 'inherited': False}
+                if role.id_project:
+                    group_projects_roles[role.id_project] = {'project_role': role.service_role_name,
+                                                             'inherited': False}
+            for role in group_roles:
+                # Each project's site also provides a "user" access for that site
+                if role.id_project:
+                    project_site_id = projects_by_id[role.id_project].id_site
+                    if project_site_id not in group_sites_roles:
+                        group_sites_roles[project_site_id] = {'site_role': 'user', 'inherited': True}
+                # If we are admin in a site, we are automatically admin in all its project
+                if role.id_site and role.service_role_name == 'admin':
+                    for project in sites_projects.get(role.id_site, []):
+                        group_projects_roles[project.id_project] = {'project_role': 'admin', 'inherited': True}
+
+            # Merge with other groups roles - an "admin" role overwrites an "user" role
+            for site_id, site_role in group_sites_roles.items():
+                site = sites_by_id[site_id]
+                if site not in sites_roles or site_role['site_role'] == 'admin':
+                    sites_roles[site] = site_role
+            for project_id, project_role in group_projects_roles.items():
+                project = projects_by_id[project_id]
+                if project not in projects_roles or project_role['project_role'] == 'admin':
+                    projects_roles[project] = project_role
+
+        return sites_roles, projects_roles
+
+    def get_sites_roles(self) -> dict:
+        return dict(self._memoize('roles', self._resolve_roles)[0])
+
+    def get_projects_roles(self) -> dict:
+        return dict(self._memoize('roles', self._resolve_roles)[1])
 
     def get_accessible_users_ids(self, admin_only=False):
-        users = self.get_accessible_users(admin_only=admin_only)
-        users_ids = []
-        for user in users:
-            if user.id_user not in users_ids:
-                users_ids.append(user.id_user)
-        return users_ids
+        return self._memoize_ids('users_ids.' + str(admin_only),
+                                 lambda: [user.id_user for user in self.get_accessible_users(admin_only=admin_only)])
 
     def get_accessible_users(self, admin_only=False):
+        return list(self._memoize(('users', admin_only), lambda: self._query_accessible_users(admin_only)))
+
+    def _query_accessible_users(self, admin_only=False):
         if self.user.user_superadmin:
             users = TeraUser.query.order_by(TeraUser.user_firstname.asc()).all()
         else:
-            projects = self.get_accessible_projects(admin_only=admin_only)
-            users = []
-            for project in projects:
-                project_users = project.get_users_in_project()
-                for user in project_users:
-                    if user not in users:
-                        users.append(user)
+            import modules.Globals as Globals
+            # Users with a role in the accessible projects
+            projects_ids = self.get_accessible_projects_ids(admin_only=admin_only)
+            users_ids = db.session.query(TeraUserUserGroup.id_user) \
+                .join(TeraServiceAccess, TeraServiceAccess.id_user_group == TeraUserUserGroup.id_user_group) \
+                .join(TeraServiceRole, TeraServiceRole.id_service_role == TeraServiceAccess.id_service_role) \
+                .filter(TeraServiceRole.id_service == Globals.opentera_service_id) \
+                .filter(TeraServiceRole.id_project.in_(projects_ids))
             # You are always available to yourself!
-            if self.user not in users:
-                users.append(self.user)
+            users = TeraUser.query.filter(or_(TeraUser.id_user.in_(users_ids),
+                                              TeraUser.id_user == self.user.id_user)).all()
 
         # Sort by user first name
         return sorted(users, key=lambda suser: suser.user_firstname)
 
     def get_accessible_users_groups_ids(self, admin_only=False, by_sites=False):
-        users_groups = self.get_accessible_users_groups(admin_only=admin_only, by_sites=by_sites)
-        users_groups_ids = [ug.id_user_group for ug in users_groups]
-        return users_groups_ids
+        return self._memoize_ids('users_groups_ids.' + str(admin_only) + '.' + str(by_sites),
+                                 lambda: [ug.id_user_group for ug in
+                                          self.get_accessible_users_groups(admin_only=admin_only, by_sites=by_sites)])
 
     def get_accessible_users_groups(self, admin_only=False, by_sites=False):
-        users_groups = []
-        all_users_groups = TeraUserGroup.query.order_by(TeraUserGroup.user_group_name.asc()).all()
-        if self.user.user_superadmin:
-            users_groups = all_users_groups
-        else:
-            if not by_sites:
-                # Gets user group that have access to projects we have access. We only consider projects because of the
-                # hierarchy between sites and projects
-                projects_access = self.user.get_projects_roles()
-
-                if admin_only:
-                    # Remove not admin roles
-                    projects_access = {key: value for key, value in projects_access.items()
-                                       if value['project_role'] == 'admin'}
-
-                for user_group in all_users_groups:
-                    group_project_access = user_group.get_projects_roles()
-                    if set(group_project_access).intersection(projects_access):
-                        # We have a project both in the user accessible list and in the user_group access list
-                        users_groups.append(user_group)
-            else:
-                # Check access by sites instead of projects
-                sites_access = self.user.get_sites_roles()
-
-                if admin_only:
-                    # Remove not admin roles
-                    sites_access = {key: value for key, value in sites_access.items() if value['site_role'] == 'admin'}
+        return list(self._memoize(('users_groups', admin_only, by_sites),
+                                  lambda: self._query_accessible_users_groups(admin_only, by_sites)))
 
-                for user_group in all_users_groups:
-                    group_site_access = user_group.get_sites_roles()
-                    if set(group_site_access).intersection(sites_access):
-                        # We have a project both in the user accessible list and in the user_group access list
-                        users_groups.append(user_group)
+    def _query_accessible_users_groups(self, admin_only=False, by_sites=False):
+        query = TeraUserGroup.query.order_by(TeraUserGroup.user_group_name.asc())
+        if self.user.user_superadmin:
+            return query.all()
 
-        return users_groups
+        if not by_sites:
+            # Gets user group that have access to projects we have access. We only consider projects because of the
+            # hierarchy between sites and projects. A user group has access to a project with a role in that project
+            # or an admin role in its site.
+            projects = self.get_accessible_projects(admin_only=admin_only)
+            projects_ids = [project.id_project for project in projects]
+            sites_ids = set([project.id_site for project in projects])
+            roles_filter = or_(TeraServiceRole.id_project.in_(projects_ids),
+                               and_(TeraServiceRole.id_site.in_(sites_ids),
+                                    TeraServiceRole.service_role_name == 'admin'))
+        else:
+            # Check access by sites instead of projects. A user group has access to a site with a role in that site or
+            # a role in one of its projects.
+            sites_ids = self.get_accessible_sites_ids(admin_only=admin_only)
+            sites_projects_ids = db.session.query(TeraProject.id_project).filter(TeraProject.id_site.in_(sites_ids))
+            roles_filter = or_(TeraServiceRole.id_site.in_(sites_ids),
+                               TeraServiceRole.id_project.in_(sites_projects_ids))
+
+        users_groups_ids = db.session.query(TeraServiceAccess.id_user_group) \
+            .join(TeraServiceRole, TeraServiceRole.id_service_role == TeraServiceAccess.id_service_role) \
+            .filter(TeraServiceAccess.id_user_group.isnot(None)).filter(roles_filter)
+        return query.filter(TeraUserGroup.id_user_group.in_(users_groups_ids)).all()
 
     def get_accessible_users_uuids(self, admin_only=False):
         users = self.get_accessible_users(admin_only=admin_only)
@@ -104,7 +216,7 @@ class DBManagerTeraUserAccess:
         return users_ids
 
     def get_project_role(self, project_id: int):
-        projects_roles = self.user.get_projects_roles()
+        projects_roles = self.get_projects_roles()
         role = [role for project, role in projects_roles.items() if project.id_project == int(project_id)]
         if len(role) == 1:
             return role[0]['project_role']
@@ -121,27 +233,23 @@ class DBManagerTeraUserAccess:
 
     def get_accessible_projects(self, admin_only=False):
         project_list = []
-        if self.user.user_superadmin:
-            # Is superadmin - admin on all projects
-            project_list = TeraProject.query.all()
-        else:
-            # Build project list
-            project_roles = self.user.get_projects_roles()
-            for project in project_roles:
-                if not admin_only or (admin_only and project_roles[project]['project_role'] == 'admin'):
-                    project_list.append(project)
+        # Build project list - super admin is admin on all projects
+        project_roles = self.get_projects_roles()
+        for project in project_roles:
+            if not admin_only or (admin_only and project_roles[project]['project_role'] == 'admin'):
+                project_list.append(project)
 
         return project_list
 
     def get_accessible_projects_ids(self, admin_only=False):
-        projects = []
-
-        for project in self.get_accessible_projects(admin_only=admin_only):
-            projects.append(project.id_project)
-
-        return projects
+        return self._memoize_ids('projects_ids.' + str(admin_only),
+                                 lambda: [project.id_project for project in
+                                          self.get_accessible_projects(admin_only=admin_only)])
 
     def get_accessible_devices(self, admin_only=False):
+        return list(self._memoize(('devices', admin_only), lambda: self._query_accessible_devices(admin_only)))
+
+    def _query_accessible_devices(self, admin_only=False):
         if self.user.user_superadmin:
             return TeraDevice.query.all()
 
@@ -159,12 +267,9 @@ class DBManagerTeraUserAccess:
         return devices
 
     def get_accessible_devices_ids(self, admin_only=False):
-        devices = []
-
-        for device in self.get_accessible_devices(admin_only=admin_only):
-            devices.append(device.id_device)
-
-        return devices
+        return self._memoize_ids('devices_ids.' + str(admin_only),
+                                 lambda: [device.id_device for device in
+                                          self.get_accessible_devices(admin_only=admin_only)])
 
     def get_accessible_devices_types(self, admin_only=False):
         # if self.user.user_superadmin:
@@ -214,6 +319,10 @@ class DBManagerTeraUserAccess:
         return device_subtypes_ids
 
     def get_accessible_participants(self, admin_only=False):
+        return list(self._memoize(('participants', admin_only),
+                                  lambda: self._query_accessible_participants(admin_only)))
+
+    def _query_accessible_participants(self, admin_only=False):
         project_id_list = self.get_accessible_projects_ids(admin_only=admin_only)
         # groups = TeraParticipantGroup.query.filter(TeraParticipantGroup.id_project.in_(project_id_list)).all()
         participant_list = []
@@ -232,31 +341,31 @@ class DBManagerTeraUserAccess:
         return uuids
 
     def get_accessible_participants_ids(self, admin_only=False):
-        parts = []
-
-        for part in self.get_accessible_participants(admin_only=admin_only):
-            parts.append(part.id_participant)
-
-        return parts
+        return self._memoize_ids('participants_ids.' + str(admin_only),
+                                 lambda: [part.id_participant for part in
+                                          self.get_accessible_participants(admin_only=admin_only)])
 
     def get_accessible_groups(self, admin_only=False):
+        return list(self._memoize(('groups', admin_only), lambda: self._query_accessible_groups(admin_only)))
+
+    def _query_accessible_groups(self, admin_only=False):
         project_id_list = self.get_accessible_projects_ids(admin_only=admin_only)
         return TeraParticipantGroup.query.filter(TeraParticipantGroup.id_project.in_(project_id_list)).all()
 
     def get_accessible_groups_ids(self, admin_only=False):
-        groups = []
-
-        for group in self.get_accessible_groups(admin_only=admin_only):
-            groups.append(group.id_participant_group)
-
-        return groups
+        return self._memoize_ids('groups_ids.' + str(admin_only),
+                                 lambda: [group.id_participant_group for group in
+                                          self.get_accessible_groups(admin_only=admin_only)])
 
     def get_accessible_sites(self, admin_only=False):
+        return list(self._memoize(('sites', admin_only), lambda: self._query_accessible_sites(admin_only)))
+
+    def _query_accessible_sites(self, admin_only=False):
         if self.user.user_superadmin:
             site_list = TeraSite.query.order_by(TeraSite.site_name.asc()).all()
         else:
             site_list = []
-            site_roles = self.user.get_sites_roles()
+            site_roles = self.get_sites_roles()
             for site in site_roles:
                 if not admin_only or (admin_only and site_roles[site]['site_role'] == 'admin'):
                     site_list.append(site)
@@ -264,12 +373,8 @@ class DBManagerTeraUserAccess:
         return site_list
 
     def get_accessible_sites_ids(self, admin_only=False):
-        sites_ids = []
-
-        for site in self.get_accessible_sites(admin_only=admin_only):
-            sites_ids.append(site.id_site)
-
-        return sites_ids
+        return self._memoize_ids('sites_ids.' + str(admin_only),
+                                 lambda: [site.id_site for site in self.get_accessible_sites(admin_only=admin_only)])
 
     def get_accessible_session_types(self, admin_only=False):
         # from opentera.db.models.TeraSessionTypeProject import TeraSessionTypeProject
@@ -280,6 +385,10 @@ class DBManagerTeraUserAccess:
         # # return TeraSessionType.query.filter(TeraProject.id_project.in_(project_id_list)).all()
         # return TeraSessionType.query.join(TeraSessionTypeProject) \
         #     .filter(TeraSessionTypeProject.id_project.in_(project_id_list)).all()
+        return list(self._memoize(('session_types', admin_only),
+                                  lambda: self._query_accessible_session_types(admin_only)))
+
+    def _query_accessible_session_types(self, admin_only=False):
         if self.user.user_superadmin:
             return TeraSessionType.query.all()
 
@@ -289,12 +398,9 @@ class DBManagerTeraUserAccess:
         return query.all()
 
     def get_accessible_session_types_ids(self, admin_only=False):
-        st_ids = []
-
-        for st in self.get_accessible_session_types(admin_only=admin_only):
-            st_ids.append(st.id_session_type)
-
-        return st_ids
+        return self._memoize_ids('session_types_ids.' + str(admin_only),
+                                 lambda: [st.id_session_type for st in
+                                          self.get_accessible_session_types(admin_only=admin_only)])
 
     def get_accessible_test_types(self, admin_only=False):
         if self.user.user_superadmin:
@@ -307,12 +413,9 @@ class DBManagerTeraUserAccess:
         return query.all()
 
     def get_accessible_test_types_ids(self, admin_only=False):
-        tt_ids = []
-
-        for tt in self.get_accessible_test_types(admin_only=admin_only):
-            tt_ids.append(tt.id_test_type)
-
-        return tt_ids
+        return self._memoize_ids('test_types_ids.' + str(admin_only),
+                                 lambda: [tt.id_test_type for tt in
+                                          self.get_accessible_test_types(admin_only=admin_only)])
 
     def get_accessible_sessions(self, admin_only=False):
         from opentera.db.models.TeraSession import TeraSession
@@ -358,15 +461,14 @@ class DBManagerTeraUserAccess:
         return sessions
 
     def get_accessible_sessions_ids(self, admin_only=False):
-        sessions = self.get_accessible_sessions(admin_only=admin_only)
-        ses_ids = [ses.id_session for ses in sessions]
-
-        # for ses in self.get_accessible_sessions(admin_only=admin_only):
-        #     ses_ids.append(ses.id_session)
-
-        return ses_ids
+        return self._memoize_ids('sessions_ids.' + str(admin_only),
+                                 lambda: [ses.id_session for ses in
+                                          self.get_accessible_sessions(admin_only=admin_only)], sessions=True)
 
     def get_accessible_services(self, admin_only=False):
+        return list(self._memoize(('services', admin_only), lambda: self._query_accessible_services(admin_only)))
+
+    def _query_accessible_services(self, admin_only=False):
         from opentera.db.models.TeraService import TeraService
         from opentera.db.models.TeraServiceRole import TeraServiceRole
         from opentera.db.models.TeraServiceProject import TeraServiceProject
@@ -394,15 +496,12 @@ class DBManagerTeraUserAccess:
         return query.all()
 
     def get_accessible_services_ids(self, admin_only=False):
-        services_ids = []
-
-        for service in self.get_accessible_services(admin_only=admin_only):
-            services_ids.append(service.id_service)
-
-        return services_ids
+        return self._memoize_ids('services_ids.' + str(admin_only),
+                                 lambda: [service.id_service for service in
+                                          self.get_accessible_services(admin_only=admin_only)])
 
     def get_site_role(self, site_id: int):
-        sites_roles = self.user.get_sites_roles()
+        sites_roles = self.get_sites_roles()
         role = [role for site, role in sites_roles.items() if site.id_site == int(site_id)]
         if len(role) == 1:
             return role[0]['site_role']
@@ -615,42 +714,42 @@ class DBManagerTeraUserAccess:
         # Sort by project id
         return sorted(tt_projects, key=lambda tp: tp.test_type_project_project.project_name)
 
-    def query_all_participants_for_site(self, site_id: int):
+    def query_all_participants_for_site(self, site_id: int, pagination: KeysetPagination = None):
         part_ids = self.get_accessible_participants_ids()
-        participants = TeraParticipant.query.join(TeraProject) \
+        query = TeraParticipant.query.join(TeraProject) \
             .filter(TeraProject.id_site == site_id, TeraParticipant.id_participant.in_(part_ids)) \
-            .order_by(TeraParticipant.participant_name.asc()).all()
-        return participants
+            .order_by(TeraParticipant.participant_name.asc())
+        return KeysetPagination.query_all(query, pagination)
 
-    def query_enabled_participants_for_site(self, site_id: int):
+    def query_enabled_participants_for_site(self, site_id: int, pagination: KeysetPagination = None):
         part_ids = self.get_accessible_participants_ids()
-        participants = TeraParticipant.query.join(TeraProject) \
+        query = TeraParticipant.query.join(TeraProject) \
             .filter(TeraProject.id_site == site_id, TeraParticipant.id_participant.in_(part_ids)) \
             .filter(TeraParticipant.participant_enabled == true()) \
-            .order_by(TeraParticipant.participant_name.asc()).all()
-        return participants
+            .order_by(TeraParticipant.participant_name.asc())
+        return KeysetPagination.query_all(query, pagination)
 
-    def query_all_participants_for_project(self, project_id: int):
+    def query_all_participants_for_project(self, project_id: int, pagination: KeysetPagination = None):
         part_ids = self.get_accessible_participants_ids()
-        participants = TeraParticipant.query.filter(TeraParticipant.id_project == project_id,
-                                                    TeraParticipant.id_participant.in_(part_ids)) \
-            .order_by(TeraParticipant.participant_name.asc()).all()
-        return participants
+        query = TeraParticipant.query.filter(TeraParticipant.id_project == project_id,
+                                             TeraParticipant.id_participant.in_(part_ids)) \
+            .order_by(TeraParticipant.participant_name.asc())
+        return KeysetPagination.query_all(query, pagination)
 
-    def query_enabled_participants_for_project(self, project_id: int):
+    def query_enabled_participants_for_project(self, project_id: int, pagination: KeysetPagination = None):
         part_ids = self.get_accessible_participants_ids()
-        participants = TeraParticipant.query.filter(TeraParticipant.id_project == project_id,
-                                                    TeraParticipant.id_participant.in_(part_ids)) \
+        query = TeraParticipant.query.filter(TeraParticipant.id_project == project_id,
+                                             TeraParticipant.id_participant.in_(part_ids)) \
             .filter(TeraParticipant.participant_enabled == true()) \
-            .order_by(TeraParticipant.participant_name.asc()).all()
-        return participants
+            .order_by(TeraParticipant.participant_name.asc())
+        return KeysetPagination.query_all(query, pagination)
 
-    def query_participants_for_group(self, group_id: int):
+    def query_participants_for_group(self, group_id: int, pagination: KeysetPagination = None):
         part_ids = self.get_accessible_participants_ids()
-        participants = TeraParticipant.query.filter(TeraParticipant.id_participant_group == group_id,
-                                                    TeraParticipant.id_participant.in_(part_ids)) \
-            .order_by(TeraParticipant.participant_name.asc()).all()
-        return participants
+        query = TeraParticipant.query.filter(TeraParticipant.id_participant_group == group_id,
+                                             TeraParticipant.id_participant.in_(part_ids)) \
+            .order_by(TeraParticipant.participant_name.asc())
+        return KeysetPagination.query_all(query, pagination)
 
     # def query_users_access_for_site(self, site_id: int, admin_only=False):
     #     users = self.get_accessible_users()
@@ -900,7 +999,7 @@ class DBManagerTeraUserAccess:
         # Sort by name
         return sorted(test_types, key=lambda s: s.test_type_project_test_type.test_type_name)
 
-    def query_assets_associated_to_service(self, uuid_service: str):
+    def query_assets_associated_to_service(self, uuid_service: str, pagination: KeysetPagination = None):
         from opentera.db.models.TeraAsset import TeraAsset
         from sqlalchemy import or_
 
@@ -911,10 +1010,10 @@ class DBManagerTeraUserAccess:
         # user_ids = self.get_accessible_users_ids()
         service_ids = self.get_accessible_services_ids()
 
-        return TeraAsset.query.filter(TeraAsset.id_session.in_(session_ids))\
+        query = TeraAsset.query.filter(TeraAsset.id_session.in_(session_ids))\
             .filter(TeraAsset.asset_service_uuid == uuid_service) \
-            .filter(or_(TeraAsset.id_service.in_(service_ids), TeraAsset.id_service == None)) \
-            .all()
+            .filter(or_(TeraAsset.id_service.in_(service_ids), TeraAsset.id_service == None))
+        return KeysetPagination.query_all(query, pagination)
         # .filter(or_(TeraAsset.id_device.in_(device_ids), TeraAsset.id_device == None)) \
         # .filter(or_(TeraAsset.id_participant.in_(participant_ids), TeraAsset.id_participant == None)) \
         # .filter(or_(TeraAsset.id_user.in_(user_ids), TeraAsset.id_user == None)) \
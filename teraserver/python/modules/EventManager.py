@@ -3,6 +3,16 @@ import opentera.messages.python as messages
 
 
 class EventManager:
+    # Filter method name for each event type
+    event_filters = {messages.DeviceEvent: 'filter_device_event',
+                     messages.JoinSessionEvent: 'filter_join_session_event',
+                     messages.ParticipantEvent: 'filter_participant_event',
+                     messages.StopSessionEvent: 'filter_stop_session_event',
+                     messages.LeaveSessionEvent: 'filter_leave_session_event',
+                     messages.UserEvent: 'filter_user_event',
+                     messages.DatabaseEvent: 'filter_database_event',
+                     messages.JoinSessionReplyEvent: 'filter_join_session_reply_event'}
+
     def __init__(self):
         self.registered_events = set()  # Collection of unique elements
 
@@ -44,6 +54,24 @@ class EventManager:
         # Default = no access
         return False
 
+    @staticmethod
+    def unpack_event(any_msg: messages.Any):
+        # Unpack an event from its Any container, returns None if the event type is unknown
+        for event_type in EventManager.event_filters:
+            if any_msg.Is(event_type.DESCRIPTOR):
+                event = event_type()
+                any_msg.Unpack(event)
+                return event
+        return None
+
+    def filter_event(self, event) -> bool:
+        # Call the adequate filter method for an unpacked event
+        filter_name = self.event_filters.get(type(event))
+        if filter_name:
+            return getattr(self, filter_name)(event)
+        print('Unknown event: ', event)
+        return False
+
     def filter_events(self, message: messages.TeraEvent) -> messages.TeraEvent:
         # Will receive message containing events
         # Let's try to unpack the messages first and call the adequate method
@@ -52,59 +80,10 @@ class EventManager:
         filtered_message = messages.TeraEvent()
         filtered_message.CopyFrom(message)
 
-        for any_msg in filtered_message.events:
-
-            # Test for DeviceEvent
-            device_event = messages.DeviceEvent()
-            # Test for JoinSessionEvent
-            join_session_event = messages.JoinSessionEvent()
-            # Test for ParticipantEvent
-            participant_event = messages.ParticipantEvent()
-            # Test for StopSessionEvent
-            stop_session_event = messages.StopSessionEvent()
-            # Test for UserEvent
-            user_event = messages.UserEvent()
-            # Test for DatabaseEvent
-            database_event = messages.DatabaseEvent()
-            # Test for LeaveSessionEvent
-            leave_session_event = messages.LeaveSessionEvent()
-            # Test for JoinSessionReply
-            join_session_reply = messages.JoinSessionReplyEvent()
-
-            if any_msg.Unpack(device_event):
-                if not self.filter_device_event(device_event):
-                    print('removing:', device_event)
-                    filtered_message.events.remove(any_msg)
-            elif any_msg.Unpack(join_session_event):
-                if not self.filter_join_session_event(join_session_event):
-                    print('removing:', join_session_event)
-                    filtered_message.events.remove(any_msg)
-            elif any_msg.Unpack(participant_event):
-                if not self.filter_participant_event(participant_event):
-                    print('removing:', participant_event)
-                    filtered_message.events.remove(any_msg)
-            elif any_msg.Unpack(stop_session_event):
-                if not self.filter_stop_session_event(stop_session_event):
-                    print('removing:', stop_session_event)
-                    filtered_message.events.remove(any_msg)
-            elif any_msg.Unpack(leave_session_event):
-                if not self.filter_leave_session_event(leave_session_event):
-                    print('removing:', leave_session_event)
-                    filtered_message.events.remove(any_msg)
-            elif any_msg.Unpack(user_event):
-                if not self.filter_user_event(user_event):
-                    print('removing:', user_event)
-                    filtered_message.events.remove(any_msg)
-            elif any_msg.Unpack(database_event):
-                if not self.filter_database_event(database_event):
-                    print('removing', database_event)
-                    filtered_message.events.remove(any_msg)
-            elif any_msg.Unpack(join_session_reply):
-                if not self.filter_join_session_reply_event(join_session_reply):
-                    print('removing', join_session_reply)
-                    filtered_message.events.remove(any_msg)
-            else:
-                print('Unknown event, removing: ', any_msg)
+        for any_msg in message.events:
+            event = self.unpack_event(any_msg)
+            if event is None or not self.filter_event(event):
+                print('removing: ', event if event is not None else any_msg)
                 filtered_message.events.remove(any_msg)
 
         # Return filtered message
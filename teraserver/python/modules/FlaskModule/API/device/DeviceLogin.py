@@ -69,7 +69,7 @@ class DeviceLogin(Resource):
         if current_device.device_onlineable:
             if not self.test:
                 # Verify if device already logged in
-                rpc = RedisRPCClient(self.module.config.redis_config)
+                rpc = RedisRPCClient.get_instance(self.module.config.redis_config)
                 online_devices = rpc.call(ModuleNames.USER_MANAGER_MODULE_NAME.value, 'online_devices')
 
                 if online_devices is None:
@@ -3,6 +3,7 @@ from flask_restx import Resource, inputs
 from modules.LoginModule.LoginModule import LoginModule
 from modules.DatabaseModule.DBManager import DBManager
 from modules.FlaskModule.FlaskModule import device_api_ns as api
+from modules.FlaskModule.AssetsReply import AssetsReply
 from opentera.db.models.TeraDevice import TeraDevice
 from opentera.db.models.TeraAsset import TeraAsset
 
@@ -15,6 +16,11 @@ get_parser.add_argument('id_asset', type=int, help='Asset ID to query', default=
 get_parser.add_argument('with_urls', type=inputs.boolean, help='Also include assets infos and download-upload url')
 get_parser.add_argument('with_only_token', type=inputs.boolean, help='Only includes the access token. '
                                                                      'Will ignore with_urls if specified.')
+get_parser.add_argument('with_services_tokens', type=inputs.boolean,
+                        help='Include one access token for each service, covering all its assets, instead of one '
+                             'token for each asset. Reply is then {"access_tokens": {service_uuid: token}, '
+                             '"assets": [...]}.')
+get_parser.add_argument('stream', type=inputs.boolean, help='Stream the assets list, for large lists.')
 
 post_parser = api.parser()
 
@@ -42,63 +48,24 @@ class DeviceQueryAssets(Resource):
         # Create response
         servername = self.module.config.server_config['hostname']
         port = self.module.config.server_config['port']
-        access_token = None
         if 'X_EXTERNALSERVER' in request.headers:
             servername = request.headers['X_EXTERNALSERVER']
 
         if 'X_EXTERNALPORT' in request.headers:
             port = request.headers['X_EXTERNALPORT']
         services_infos = []
-        if (args['with_urls'] or args['with_only_token']) and assets:
+        token_key = None
+        if (args['with_urls'] or args['with_only_token'] or args['with_services_tokens']) and assets:
             services_infos = {service.service_uuid: service.service_clientendpoint
                               for service in device_access.get_accessible_services()}
+            # Access tokens
+            token_key = self.module.redisGet(RedisVars.RedisVar_ServiceTokenAPIKey)
 
-            # Access token
-            # from opentera.redis.RedisVars import RedisVars
-            # token_key = self.module.redisGet(RedisVars.RedisVar_ServiceTokenAPIKey)
-            # access_token = TeraAsset.get_access_token(asset_uuids=[asset.asset_uuid for asset in assets],
-            #                                           token_key=token_key, requester_uuid=device.device_uuid,
-            #                                           expiration=1800)
-            # if args['with_only_token']:
-            #     return {'access_token': access_token}
+        reply = AssetsReply(assets, args, requester_uuid=device.device_uuid, token_key=token_key,
+                             services_infos=services_infos, servername=servername, port=port)
 
-        assets_json = []
-        for asset in assets:
-            if args['with_only_token']:
-                asset_json = {'asset_uuid': asset.asset_uuid}
-            else:
-                asset_json = asset.to_json()
+        if args['stream']:
+            return reply.to_stream()
 
-            # Access token
-            if args['with_urls'] or args['with_only_token']:
-                # Access token
-                token_key = self.module.redisGet(RedisVars.RedisVar_ServiceTokenAPIKey)
-                access_token = TeraAsset.get_access_token(asset_uuids=asset.asset_uuid,
-                                                          token_key=token_key,
-                                                          requester_uuid=device.device_uuid,
-                                                          expiration=1800)
-                asset_json['access_token'] = access_token
-
-            if args['with_urls']:
-                # We have previously verified that the service is available to the user
-                if asset.asset_service_uuid in services_infos:
-                    asset_json['asset_infos_url'] = 'https://' + servername + ':' + str(port) \
-                                                    + services_infos[asset.asset_service_uuid] \
-                                                    + '/api/assets/infos'  # ?asset_uuid=' + asset.asset_uuid
-                    asset_json['asset_url'] = 'https://' + servername + ':' + str(port) \
-                                              + services_infos[asset.asset_service_uuid] \
-                                              + '/api/assets'  # ?asset_uuid=' + asset.asset_uuid
-
-                    # if not assets_json:
-                    #     # Append access token to first item only
-                    #     asset_json['access_token'] = access_token
-
-                else:
-                    # Service not found or unavaiable for current user
-                    asset_json['asset_infos_url'] = None
-                    asset_json['asset_url'] = None
-
-            assets_json.append(asset_json)
-
-        return assets_json
+        return reply.to_json()
 
@@ -51,7 +51,7 @@ class DeviceQueryStatus(Resource):
         # Call UserManagerModule RPC interface to update status
         # This will generate a DeviceEvent of type DEVICE_STATUS_CHANGED for everybody
         # subscribed to UserManagerModule events.
-        rpc = RedisRPCClient(self.module.config.redis_config)
+        rpc = RedisRPCClient.get_instance(self.module.config.redis_config)
 
         ret = rpc.call(ModuleNames.USER_MANAGER_MODULE_NAME.value, 'update_device_status',
                        current_device.device_uuid, json.dumps(request.json['status']), request.json['timestamp'])
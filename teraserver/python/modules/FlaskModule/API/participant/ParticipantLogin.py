@@ -56,7 +56,7 @@ class ParticipantLogin(Resource):
                 port = request.headers['X_EXTERNALPORT']
 
             # Verify if participant already logged in
-            rpc = RedisRPCClient(self.module.config.redis_config)
+            rpc = RedisRPCClient.get_instance(self.module.config.redis_config)
             online_participants = rpc.call(ModuleNames.USER_MANAGER_MODULE_NAME.value, 'online_participants')
             websocket_url = None
             if current_participant.participant_uuid not in online_participants:
@@ -5,6 +5,7 @@ from modules.LoginModule.LoginModule import participant_multi_auth
 from modules.FlaskModule.FlaskModule import participant_api_ns as api
 from opentera.db.models.TeraParticipant import TeraParticipant
 from opentera.db.models.TeraSession import TeraSession
+from opentera.db.KeysetPagination import KeysetPagination
 from modules.DatabaseModule.DBManager import DBManager
 
 # Parser definition(s)
@@ -18,6 +19,11 @@ get_parser.add_argument('list', type=inputs.boolean, help='Flag that limits the
 get_parser.add_argument('status', type=int, help='Limit to specific session status')
 get_parser.add_argument('start_date', type=inputs.date, help='Start date, sessions before that date will be ignored')
 get_parser.add_argument('end_date', type=inputs.date, help='End date, sessions after that date will be ignored')
+get_parser.add_argument('page_size', type=int, help='Paginates the returned data (replaces limit and offset): '
+                                                     'maximum number of items in the page. Reply is then {"items": '
+                                                     '[...], "next": cursor}, with a null "next" cursor on the last '
+                                                     'page.')
+get_parser.add_argument('cursor', type=str, help='Cursor ("next") of the previous page, to get the next page')
 
 post_parser = api.parser()
 
@@ -43,6 +49,14 @@ class ParticipantQuerySessions(Resource):
 
         args = get_parser.parse_args(strict=True)
 
+        try:
+            pagination = KeysetPagination.from_args(TeraSession.get_pagination_sort_keys(), args)
+        except ValueError:
+            return gettext('Invalid pagination parameters'), 400
+        if pagination:
+            args['limit'] = None
+            args['offset'] = None
+
         minimal = False
         if args['list']:
             minimal = True
@@ -57,10 +71,13 @@ class ParticipantQuerySessions(Resource):
         # List comprehension, get all sessions with filter
         sessions_list = [data.to_json(minimal=minimal) for data in TeraSession.get_sessions_for_participant(
             part_id=current_participant.id_participant, status=args['status'], limit=args['limit'],
-            offset=args['offset'], start_date=args['start_date'], end_date=args['end_date'], filters=filters)]
+            offset=args['offset'], start_date=args['start_date'], end_date=args['end_date'], filters=filters,
+            pagination=pagination)]
         #  participant_access.query_session(filters=filters, limit=args['limit'], offset=args['offset'],
         #                                  start_date=args['start_date'], end_date=args['end_date'])]
 
+        if pagination:
+            return pagination.to_json(sessions_list)
         return sessions_list
 
     @participant_multi_auth.login_required(role='full')
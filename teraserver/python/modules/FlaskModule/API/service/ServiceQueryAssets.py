@@ -3,6 +3,7 @@ from flask_restx import Resource, reqparse, inputs
 from flask_babel import gettext
 from modules.LoginModule.LoginModule import LoginModule, current_service
 from modules.FlaskModule.FlaskModule import service_api_ns as api
+from modules.FlaskModule.AssetsReply import AssetsReply
 from opentera.db.models.TeraAsset import TeraAsset
 from opentera.db.models.TeraService import TeraService
 from opentera.redis.RedisVars import RedisVars
@@ -28,6 +29,11 @@ get_parser.add_argument('id_creator_device', type=int, help='ID of the device fr
 get_parser.add_argument('with_urls', type=inputs.boolean, help='Also include assets infos and download-upload url')
 get_parser.add_argument('with_only_token', type=inputs.boolean, help='Only includes the access token. '
                                                                      'Will ignore with_urls if specified.')
+get_parser.add_argument('with_services_tokens', type=inputs.boolean,
+                        help='Include one access token for each service, covering all its assets, instead of one '
+                             'token for each asset. Reply is then {"access_tokens": {service_uuid: token}, '
+                             '"assets": [...]}.')
+get_parser.add_argument('stream', type=inputs.boolean, help='Stream the assets list, for large lists.')
 
 post_parser = api.parser()
 
@@ -96,8 +102,6 @@ class ServiceQueryAssets(Resource):
         else:
             return gettext('Missing argument'), 400
 
-        assets_list = []
-        access_token = None
         servername = self.module.config.server_config['hostname']
         port = self.module.config.server_config['port']
         if 'X_EXTERNALSERVER' in request.headers:
@@ -106,45 +110,20 @@ class ServiceQueryAssets(Resource):
         if 'X_EXTERNALPORT' in request.headers:
             port = request.headers['X_EXTERNALPORT']
         services_infos = []
-        if (args['with_urls'] or args['with_only_token']) and assets:
+        token_key = None
+        if (args['with_urls'] or args['with_only_token'] or args['with_services_tokens']) and assets:
             services_infos = {service.service_uuid: service.service_clientendpoint
                               for service in TeraService.query.filter(TeraService.service_enabled == True).all()}
+            # Access tokens
+            token_key = self.module.redisGet(RedisVars.RedisVar_ServiceTokenAPIKey)
 
-        for asset in assets:
-            if args['with_only_token']:
-                asset_json = {'asset_uuid': asset.asset_uuid}
-            else:
-                asset_json = asset.to_json()
-
-                # Access token
-            if args['with_urls'] or args['with_only_token']:
-                # Access token
-                token_key = self.module.redisGet(RedisVars.RedisVar_ServiceTokenAPIKey)
-                access_token = TeraAsset.get_access_token(asset_uuids=asset.asset_uuid,
-                                                          token_key=token_key,
-                                                          requester_uuid=current_service.service_uuid,
-                                                          expiration=1800)
-                asset_json['access_token'] = access_token
-            if args['with_urls']:
-                if asset.asset_service_uuid in services_infos:
-                    asset_json['asset_infos_url'] = 'https://' + servername + ':' + str(port) \
-                                                    + services_infos[asset.asset_service_uuid] \
-                                                    + '/api/assets/infos'  # ?asset_uuid=' + asset.asset_uuid
-                    asset_json['asset_url'] = 'https://' + servername + ':' + str(port) \
-                                              + services_infos[asset.asset_service_uuid] \
-                                              + '/api/assets'  # ?asset_uuid=' + asset.asset_uuid
-
-                else:
-                    # Service not found or unavaiable for current user
-                    asset_json['asset_infos_url'] = None
-                    asset_json['asset_url'] = None
-
-            assets_list.append(asset_json)
-
-        # if access_token:
-        #     return {'access_token': access_token, 'assets': assets_list}
-        # else:
-        return assets_list
+        reply = AssetsReply(assets, args, requester_uuid=current_service.service_uuid, token_key=token_key,
+                             services_infos=services_infos, servername=servername, port=port)
+
+        if args['stream']:
+            return reply.to_stream()
+
+        return reply.to_json()
 
     @LoginModule.service_token_or_certificate_required
     # @api.expect(post_parser)
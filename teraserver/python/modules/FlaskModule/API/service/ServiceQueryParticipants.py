@@ -1,16 +1,22 @@
 from flask import request
 from flask_restx import Resource
 from flask_babel import gettext
-from modules.LoginModule.LoginModule import LoginModule
+from modules.LoginModule.LoginModule import LoginModule, current_service
 from modules.FlaskModule.FlaskModule import service_api_ns as api
 from opentera.db.models.TeraParticipant import TeraParticipant
-from modules.DatabaseModule.DBManager import db
+from opentera.db.KeysetPagination import KeysetPagination
+from modules.DatabaseModule.DBManager import DBManager, db
 import uuid
 from datetime import datetime
 
 # Parser definition(s)
 get_parser = api.parser()
 get_parser.add_argument('participant_uuid', type=str, help='Participant uuid of the participant to query')
+get_parser.add_argument('id_project', type=int, help='ID of the project from which to get all participants')
+get_parser.add_argument('page_size', type=int, help='Paginates the participants of a project: maximum number of '
+                                                     'participants in the page. Reply is then {"items": [...], "next": '
+                                                     'cursor}, with a null "next" cursor on the last page.')
+get_parser.add_argument('cursor', type=str, help='Cursor ("next") of the previous page, to get the next page')
 
 post_parser = api.parser()
 
@@ -52,7 +58,7 @@ class ServiceQueryParticipants(Resource):
 
     @LoginModule.service_token_or_certificate_required
     @api.expect(get_parser)
-    @api.doc(description='Return participant information.',
+    @api.doc(description='Return participant information, or the participants of a project.',
              responses={200: 'Success',
                         500: 'Required parameter is missing',
                         501: 'Not implemented.',
@@ -66,6 +72,19 @@ class ServiceQueryParticipants(Resource):
             participant = TeraParticipant.get_participant_by_uuid(args['participant_uuid'])
             if participant:
                 return participant.to_json()
+        elif args['id_project']:
+            service_access = DBManager.serviceAccess(current_service)
+            if args['id_project'] not in service_access.get_accessible_projects_ids():
+                return gettext('Forbidden'), 403
+            try:
+                pagination = KeysetPagination.from_args(TeraParticipant.get_pagination_sort_keys(), args)
+            except ValueError:
+                return gettext('Invalid pagination parameters'), 400
+            participants = service_access.query_participants_for_project(args['id_project'], pagination=pagination)
+            participants_list = [participant.to_json() for participant in participants]
+            if pagination:
+                return pagination.to_json(participants_list)
+            return participants_list
 
         return gettext('Missing arguments'), 400
 
@@ -13,6 +13,7 @@ from opentera.db.models.TeraSession import TeraSession, TeraSessionStatus
 from opentera.db.models.TeraSessionType import TeraSessionType
 from opentera.db.models.TeraUser import TeraUser
 from opentera.db.models.TeraDevice import TeraDevice
+from opentera.db.KeysetPagination import KeysetPagination
 
 # Parser definition(s)
 get_parser = api.parser()
@@ -29,6 +30,11 @@ get_parser.add_argument('limit', type=int, help='Maximum number of results to re
 get_parser.add_argument('offset', type=int, help='Number of items to ignore in results, offset from 0-index')
 get_parser.add_argument('start_date', type=inputs.date, help='Start date, sessions before that date will be ignored')
 get_parser.add_argument('end_date', type=inputs.date, help='End date, sessions after that date will be ignored')
+get_parser.add_argument('page_size', type=int, help='Paginates the returned data (replaces limit and offset): '
+                                                     'maximum number of items in the page. Reply is then {"items": '
+                                                     '[...], "next": cursor}, with a null "next" cursor on the last '
+                                                     'page.')
+get_parser.add_argument('cursor', type=str, help='Cursor ("next") of the previous page, to get the next page')
 
 post_parser = api.parser()
 post_schema = api.schema_model('user_session', {'properties': TeraSession.get_json_schema(),
@@ -60,6 +66,14 @@ class ServiceQuerySessions(Resource):
 
         service_access = DBManager.serviceAccess(current_service)
 
+        try:
+            pagination = KeysetPagination.from_args(TeraSession.get_pagination_sort_keys(), args)
+        except ValueError:
+            return gettext('Invalid pagination parameters'), 400
+        if pagination:
+            args['limit'] = None
+            args['offset'] = None
+
         sessions = []
         if args['id_session']:
             if args['id_session'] not in service_access.get_accessible_sessions_ids():
@@ -77,42 +91,47 @@ class ServiceQuerySessions(Resource):
             sessions = TeraSession.get_sessions_for_participant(part_id=args['id_participant'],
                                                                 status=args['status'], limit=args['limit'],
                                                                 offset=args['offset'], start_date=args['start_date'],
-                                                                end_date=args['end_date'])
+                                                                end_date=args['end_date'], pagination=pagination)
         elif args['id_user']:
             accessibles_users_ids = service_access.get_accessible_users_ids()
             if args['id_user'] not in accessibles_users_ids:
                 return gettext('Forbidden'), 403
             sessions = TeraSession.get_sessions_for_user(user_id=args['id_user'], status=args['status'],
                                                          limit=args['limit'], offset=args['offset'],
-                                                         start_date=args['start_date'], end_date=args['end_date'])
+                                                         start_date=args['start_date'], end_date=args['end_date'],
+                                                         pagination=pagination)
         elif args['id_device']:
             if args['id_device'] not in service_access.get_accessible_devices_ids():
                 return gettext('Forbidden'), 403
             sessions = TeraSession.get_sessions_for_device(device_id=args['id_device'], status=args['status'],
                                                            limit=args['limit'], offset=args['offset'],
-                                                           start_date=args['start_date'], end_date=args['end_date'])
+                                                           start_date=args['start_date'], end_date=args['end_date'],
+                                                           pagination=pagination)
         else:
             return gettext('Missing arguments: at least one id is required'), 400
 
         try:
-            sessions_list = []
-            for ses in sessions:
-                session_json = ses.to_json(minimal=args['list'])
+            sessions = [ses for ses in sessions if ses is not None]
+            sessions_list = TeraSession.to_json_list(sessions, minimal=args['list'])
+
+            sessions_events = {}
+            if args['with_events']:
+                # Get events for all sessions
+                from opentera.db.models.TeraSessionEvent import TeraSessionEvent
+                sessions_events = TeraSessionEvent.get_events_for_sessions([ses.id_session for ses in sessions])
 
+            for ses, session_json in zip(sessions, sessions_list):
                 if args['with_session_type']:
-                    session_type = TeraSessionType.get_session_type_by_id(ses.id_session_type)
-                    session_json['session_type'] = session_type.to_json()
+                    session_json['session_type'] = ses.session_session_type.to_json()
 
                 if args['with_events']:
-                    # Get events for session
-                    from opentera.db.models.TeraSessionEvent import TeraSessionEvent
-                    session_events = TeraSessionEvent.get_events_for_session(ses.id_session)
                     session_events_json = []
-                    for event in session_events:
+                    for event in sessions_events[ses.id_session]:
                         session_events_json.append(event.to_json(args['list']))
                     session_json['session_events'] = session_events_json
-                sessions_list.append(session_json)
 
+            if pagination:
+                return pagination.to_json(sessions_list)
             return sessions_list
 
         except InvalidRequestError as e:
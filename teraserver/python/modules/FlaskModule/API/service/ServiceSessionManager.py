@@ -200,7 +200,7 @@ class ServiceSessionManager(Resource):
             if not service:
                 return gettext('Service not found'), 400
             if not self.test:
-                rpc = RedisRPCClient(self.module.config.redis_config)
+                rpc = RedisRPCClient.get_instance(self.module.config.redis_config)
                 answer = rpc.call_service(service.service_key, 'session_manage', json.dumps(request.json))
             else:
                 answer = json_session_manager
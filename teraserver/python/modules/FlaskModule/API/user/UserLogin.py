@@ -53,7 +53,7 @@ class UserLogin(Resource):
         current_user = TeraUser.get_user_by_uuid(session['_user_id'])
 
         # Verify if user already logged in
-        rpc = RedisRPCClient(self.module.config.redis_config)
+        rpc = RedisRPCClient.get_instance(self.module.config.redis_config)
         online_users = rpc.call(ModuleNames.USER_MANAGER_MODULE_NAME.value, 'online_users')
         if current_user.user_uuid not in online_users:
             websocket_url = "wss://" + servername + ":" + str(port) + "/wss/user?id=" + session['_id']
@@ -3,9 +3,11 @@ from flask_restx import Resource, inputs
 from flask_babel import gettext
 from modules.LoginModule.LoginModule import user_multi_auth
 from modules.FlaskModule.FlaskModule import user_api_ns as api
+from modules.FlaskModule.AssetsReply import AssetsReply
 from opentera.db.models.TeraUser import TeraUser
 from opentera.db.models.TeraAsset import TeraAsset
 from opentera.db.models.TeraService import TeraService
+from opentera.db.KeysetPagination import KeysetPagination
 
 from modules.DatabaseModule.DBManager import DBManager
 from opentera.redis.RedisVars import RedisVars
@@ -31,8 +33,18 @@ get_parser.add_argument('id_creator_device', type=int, help='ID of the device fr
 get_parser.add_argument('with_urls', type=inputs.boolean, help='Also include assets infos and download-upload url')
 get_parser.add_argument('with_only_token', type=inputs.boolean, help='Only includes the access token. '
                                                                      'Will ignore with_urls if specified.')
+get_parser.add_argument('with_services_tokens', type=inputs.boolean,
+                        help='Include one access token for each service, covering all its assets, instead of one '
+                             'token for each asset. Reply is then {"access_tokens": {service_uuid: token}, '
+                             '"assets": [...]}.')
+get_parser.add_argument('stream', type=inputs.boolean, help='Stream the assets list, for large lists.')
 get_parser.add_argument('full', type=inputs.boolean, help='Also include names of sessions, users, services, ... in the '
                                                           'reply')
+get_parser.add_argument('page_size', type=int, help='Paginates the returned data: maximum number of assets in the '
+                                                     'page. Reply is then {"items": [...], "next": cursor}, with a '
+                                                     'null "next" cursor on the last page, and "access_tokens" if '
+                                                     'with_services_tokens is set. Ignores stream.')
+get_parser.add_argument('cursor', type=str, help='Cursor ("next") of the previous page, to get the next page')
 
 
 class UserQueryAssets(Resource):
@@ -54,55 +66,63 @@ class UserQueryAssets(Resource):
 
         args = get_parser.parse_args()
 
+        try:
+            pagination = KeysetPagination.from_args(TeraAsset.get_pagination_sort_keys(), args)
+        except ValueError:
+            return gettext('Invalid pagination parameters'), 400
+
         # At least one argument required
         if not any(args.values()):
             return gettext('No arguments specified'), 400
         elif args['id_device']:
             if args['id_device'] not in user_access.get_accessible_devices_ids():
                 return gettext('Device access denied'), 403
-            assets = TeraAsset.get_assets_for_device(device_id=args['id_device'])
+            assets = TeraAsset.get_assets_for_device(device_id=args['id_device'], pagination=pagination)
         elif args['id_session']:
             if not user_access.query_session(session_id=args['id_session']):
                 return gettext('Session access denied'), 403
-            assets = TeraAsset.get_assets_for_session(session_id=args['id_session'])
+            assets = TeraAsset.get_assets_for_session(session_id=args['id_session'], pagination=pagination)
         elif args['id_participant']:
             if args['id_participant'] not in user_access.get_accessible_participants_ids():
                 return gettext('Participant access denied'), 403
-            assets = TeraAsset.get_assets_for_participant(part_id=args['id_participant'])
+            assets = TeraAsset.get_assets_for_participant(part_id=args['id_participant'], pagination=pagination)
         elif args['id_user']:
             if args['id_user'] not in user_access.get_accessible_users_ids():
                 return gettext("User access denied"), 403
-            assets = TeraAsset.get_assets_for_user(user_id=args['id_user'])
+            assets = TeraAsset.get_assets_for_user(user_id=args['id_user'], pagination=pagination)
         elif args['id_creator_service']:
             if args['id_creator_service'] not in user_access.get_accessible_services_ids():
                 return gettext("Service access denied"), 403
-            assets = TeraAsset.get_assets_created_by_service(service_id=args['id_creator_service'])
+            assets = TeraAsset.get_assets_created_by_service(service_id=args['id_creator_service'],
+                                                             pagination=pagination)
         elif args['id_creator_user']:
             if args['id_creator_user'] not in user_access.get_accessible_users_ids():
                 return gettext("User access denied"), 403
-            assets = TeraAsset.get_assets_created_by_user(user_id=args['id_creator_user'])
+            assets = TeraAsset.get_assets_created_by_user(user_id=args['id_creator_user'], pagination=pagination)
         elif args['id_creator_participant']:
             if args['id_creator_participant'] not in user_access.get_accessible_participants_ids():
                 return gettext("Participant access denied"), 403
-            assets = TeraAsset.get_assets_created_by_participant(participant_id=args['id_creator_participant'])
+            assets = TeraAsset.get_assets_created_by_participant(participant_id=args['id_creator_participant'],
+                                                                 pagination=pagination)
         elif args['id_creator_device']:
             if args['id_creator_device'] not in user_access.get_accessible_devices_ids():
                 return gettext("Device access denied"), 403
-            assets = TeraAsset.get_assets_created_by_device(device_id=args['id_creator_device'])
+            assets = TeraAsset.get_assets_created_by_device(device_id=args['id_creator_device'], pagination=pagination)
         elif args['id_asset']:
             assets = user_access.query_asset(asset_id=args['id_asset'])
         elif args['asset_uuid']:
             assets = user_access.query_asset(asset_uuid=args['asset_uuid'])
         elif args['service_uuid']:
-            assets = user_access.query_assets_associated_to_service(args['service_uuid'])
+            assets = user_access.query_assets_associated_to_service(args['service_uuid'], pagination=pagination)
         else:
             return gettext('Missing argument'), 400
           
-        if not assets:
-            return []
+        if pagination and not pagination.fetched:
+            assets = pagination.paginate(assets or [])
+
+        if not assets and not pagination:
+            return {'access_tokens': {}, 'assets': []} if args['with_services_tokens'] else []
 
-        assets_list = []
-        access_token = None
         servername = self.module.config.server_config['hostname']
         port = self.module.config.server_config['port']
         if 'X_EXTERNALSERVER' in request.headers:
@@ -111,59 +131,28 @@ class UserQueryAssets(Resource):
         if 'X_EXTERNALPORT' in request.headers:
             port = request.headers['X_EXTERNALPORT']
         services_infos = []
-        if (args['with_urls'] or args['with_only_token']) and assets:
-            # services_infos = {service.service_uuid: service.service_clientendpoint
-            #                   for service in user_access.get_accessible_services()}
+        token_key = None
+        if (args['with_urls'] or args['with_only_token'] or args['with_services_tokens']) and assets:
             # Load all enabled services
             services_infos = {service.service_uuid: service.service_clientendpoint
                               for service in TeraService.query_with_filters({'service_enabled': True})}
+            # Access tokens
+            token_key = self.module.redisGet(RedisVars.RedisVar_ServiceTokenAPIKey)
 
-            # # Access token
-            # from opentera.redis.RedisVars import RedisVars
-            # token_key = self.module.redisGet(RedisVars.RedisVar_ServiceTokenAPIKey)
-            # access_token = TeraAsset.get_access_token(asset_uuids=[asset.asset_uuid for asset in assets],
-            #                                           token_key=token_key, requester_uuid=current_user.user_uuid,
-            #                                           expiration=1800)
-            # if args['with_only_token']:
-            #     return {'access_token': access_token}
-
-        for asset in assets:
-            if args['with_only_token']:
-                asset_json = {'asset_uuid': asset.asset_uuid}
-            else:
-                asset_json = asset.to_json(minimal=not args['full'])
-
-            # Access token
-            if args['with_urls'] or args['with_only_token']:
-                # Access token
-                token_key = self.module.redisGet(RedisVars.RedisVar_ServiceTokenAPIKey)
-                access_token = TeraAsset.get_access_token(asset_uuids=asset.asset_uuid,
-                                                          token_key=token_key,
-                                                          requester_uuid=current_user.user_uuid,
-                                                          expiration=1800)
-                asset_json['access_token'] = access_token
-
-            if args['with_urls']:
-                # We have previously verified that the service is available to the user
-                if asset.asset_service_uuid in services_infos:
-                    asset_json['asset_infos_url'] = 'https://' + servername + ':' + str(port) \
-                                                    + services_infos[asset.asset_service_uuid] \
-                                                    + '/api/assets/infos'  # ?asset_uuid=' + asset.asset_uuid
-                    asset_json['asset_url'] = 'https://' + servername + ':' + str(port) \
-                                              + services_infos[asset.asset_service_uuid] \
-                                              + '/api/assets'  # ?asset_uuid=' + asset.asset_uuid
+        reply = AssetsReply(assets, args, requester_uuid=current_user.user_uuid, token_key=token_key,
+                             services_infos=services_infos, servername=servername, port=port,
+                             minimal=not args['full'])
 
-                else:
-                    # Service not found or unavaiable for current user
-                    asset_json['asset_infos_url'] = None
-                    asset_json['asset_url'] = None
+        if pagination:
+            reply_json = pagination.to_json([reply.asset_to_json(asset) for asset in assets])
+            if reply.services_tokens is not None:
+                reply_json['access_tokens'] = reply.services_tokens
+            return reply_json
 
-            assets_list.append(asset_json)
+        if args['stream']:
+            return reply.to_stream()
 
-        # if access_token:
-        #     return {'access_token': access_token, 'assets': assets_list}
-        # else:
-        return assets_list
+        return reply.to_json()
 
     @user_multi_auth.login_required
     @api.doc(description='Delete asset.',
@@ -6,6 +6,7 @@ from opentera.db.models.TeraUser import TeraUser
 from opentera.db.models.TeraDevice import TeraDevice
 from opentera.db.models.TeraProject import TeraProject
 from opentera.db.models.TeraSite import TeraSite
+from opentera.db.KeysetPagination import KeysetPagination
 from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy import exc
 from modules.DatabaseModule.DBManager import DBManager, TeraDeviceProject
@@ -39,6 +40,10 @@ get_parser.add_argument('with_sites', type=inputs.boolean, help='Flag that indic
                                                                 'should be included in the returned device list')
 get_parser.add_argument('with_status', type=inputs.boolean, help='Include status information - offline, online, busy '
                                                                  'for each device')
+get_parser.add_argument('page_size', type=int, help='Paginates the returned data: maximum number of devices in the '
+                                                     'page. Reply is then {"items": [...], "next": cursor}, with a '
+                                                     'null "next" cursor on the last page.')
+get_parser.add_argument('cursor', type=str, help='Cursor ("next") of the previous page, to get the next page')
 
 # post_parser = reqparse.RequestParser()
 # post_parser.add_argument('device', type=str, location='json', help='Device to create / update', required=True)
@@ -93,6 +98,12 @@ class UserQueryDevices(Resource):
         has_with_status = args.pop('with_status')
         id_device_type = args.pop('id_device_type')
 
+        try:
+            pagination = KeysetPagination.from_args([(TeraDevice.id_device, False)],
+                                                    {'page_size': args.pop('page_size'), 'cursor': args.pop('cursor')})
+        except ValueError:
+            return gettext('Invalid pagination parameters'), 400
+
         devices = []
         # If we have no arguments, return all accessible devices
         if self._value_counter(args=args) == 0:
@@ -135,12 +146,17 @@ class UserQueryDevices(Resource):
         #     else:
         #         devices = TeraDevice.get_unavailable_devices()
 
+        if pagination:
+            # Filtered before paginating, so that pages are full
+            devices = pagination.paginate([device for device in devices if device is not None and
+                                           (not has_enabled or device.device_enabled == has_enabled)])
+
         try:
             device_list = []
 
             if has_with_status:
                 # Query status
-                rpc = RedisRPCClient(self.module.config.redis_config)
+                rpc = RedisRPCClient.get_instance(self.module.config.redis_config)
                 status_devices = rpc.call(ModuleNames.USER_MANAGER_MODULE_NAME.value, 'status_devices')
 
             for device in devices:
@@ -221,6 +237,8 @@ class UserQueryDevices(Resource):
                             device_json['device_status'] = None
 
                     device_list.append(device_json)
+            if pagination:
+                return jsonify(pagination.to_json(device_list))
             return jsonify(device_list)
 
         except InvalidRequestError as e:
@@ -31,7 +31,7 @@ class UserQueryOnlineDevices(Resource):
 
         try:
             accessible_devices = user_access.get_accessible_devices_uuids()
-            rpc = RedisRPCClient(self.flaskModule.config.redis_config)
+            rpc = RedisRPCClient.get_instance(self.flaskModule.config.redis_config)
             status_devices = rpc.call(ModuleNames.USER_MANAGER_MODULE_NAME.value, 'status_devices')
 
             devices_uuids = [device_uuid for device_uuid in status_devices]
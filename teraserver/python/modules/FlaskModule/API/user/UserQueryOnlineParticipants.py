@@ -31,7 +31,7 @@ class UserQueryOnlineParticipants(Resource):
 
         try:
             accessible_participants = user_access.get_accessible_participants_uuids()
-            rpc = RedisRPCClient(self.flaskModule.config.redis_config)
+            rpc = RedisRPCClient.get_instance(self.flaskModule.config.redis_config)
             status_participants = rpc.call(ModuleNames.USER_MANAGER_MODULE_NAME.value, 'status_participants')
 
             participants_uuids = [participant_uuid for participant_uuid in status_participants]
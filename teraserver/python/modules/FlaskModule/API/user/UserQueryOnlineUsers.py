@@ -30,7 +30,7 @@ class UserQueryOnlineUsers(Resource):
 
         try:
             accessible_users = user_access.get_accessible_users_uuids()
-            rpc = RedisRPCClient(self.flaskModule.config.redis_config)
+            rpc = RedisRPCClient.get_instance(self.flaskModule.config.redis_config)
             status_users = rpc.call(ModuleNames.USER_MANAGER_MODULE_NAME.value, 'status_users')
 
             users_uuids = [user_uuid for user_uuid in status_users]
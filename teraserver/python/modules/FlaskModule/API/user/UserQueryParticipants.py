@@ -5,6 +5,7 @@ from modules.LoginModule.LoginModule import user_multi_auth
 from opentera.db.models.TeraUser import TeraUser
 from opentera.db.models.TeraParticipant import TeraParticipant
 from opentera.db.models.TeraSession import TeraSession
+from opentera.db.KeysetPagination import KeysetPagination
 from modules.DatabaseModule.DBManager import DBManager
 from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy import exc
@@ -33,6 +34,10 @@ get_parser.add_argument('full', type=inputs.boolean, help='Flag that expands the
 get_parser.add_argument('orderby_recents', type=inputs.boolean, help='Returns participants ordered by most recently '
                                                                      'updated')
 get_parser.add_argument('limit', type=int, help='Returns at most "limit" participants')
+get_parser.add_argument('page_size', type=int, help='Paginates the returned data (replaces limit): maximum number of '
+                                                     'participants in the page. Reply is then {"items": [...], "next": '
+                                                     'cursor}, with a null "next" cursor on the last page.')
+get_parser.add_argument('cursor', type=str, help='Cursor ("next") of the previous page, to get the next page')
 
 get_parser.add_argument('no_group', type=inputs.boolean,
                         help='Flag that limits the returned data with only participants without a group')
@@ -75,6 +80,17 @@ class UserQueryParticipants(Resource):
         if args['uuid']:
             args['participant_uuid'] = args['uuid']
 
+        if args['orderby_recents']:
+            sort_keys = [(TeraParticipant.version_id, True), (TeraParticipant.id_participant, True)]
+        else:
+            sort_keys = TeraParticipant.get_pagination_sort_keys()
+        try:
+            pagination = KeysetPagination.from_args(sort_keys, args)
+        except ValueError:
+            return gettext('Invalid pagination parameters'), 400
+        # Lists queried in pages from the database, unless filtered afterward
+        query_pagination = pagination if args['no_group'] is None else None
+
         # If we have no arguments, return nothing
         if not any(args.values()):
             return gettext('Missing arguments'), 400
@@ -90,16 +106,20 @@ class UserQueryParticipants(Resource):
                     participants = [participant]
         elif args['id_site']:
             if args['enabled'] is not None:
-                participants = user_access.query_enabled_participants_for_site(args['id_site'])
+                participants = user_access.query_enabled_participants_for_site(args['id_site'],
+                                                                               pagination=query_pagination)
             else:
-                participants = user_access.query_all_participants_for_site(args['id_site'])
+                participants = user_access.query_all_participants_for_site(args['id_site'],
+                                                                           pagination=query_pagination)
         elif args['id_project']:
             if args['enabled'] is not None:
-                participants = user_access.query_enabled_participants_for_project(args['id_project'])
+                participants = user_access.query_enabled_participants_for_project(args['id_project'],
+                                                                                  pagination=query_pagination)
             else:
-                participants = user_access.query_all_participants_for_project(args['id_project'])
+                participants = user_access.query_all_participants_for_project(args['id_project'],
+                                                                              pagination=query_pagination)
         elif args['id_group']:
-            participants = user_access.query_participants_for_group(args['id_group'])
+            participants = user_access.query_participants_for_group(args['id_group'], pagination=query_pagination)
         elif args['id_device']:
             participants = user_access.query_participants_for_device(args['id_device'])
         elif args['id_session']:
@@ -118,22 +138,30 @@ class UserQueryParticipants(Resource):
                 if participant.id_participant not in user_access.get_accessible_participants_ids():
                     participants = []
 
-        # Sort by recently modified, if needed
-        if args['orderby_recents']:
-            participants = sorted(participants, key=lambda sort_part: sort_part.version_id, reverse=True)
+        if pagination:
+            # Filtered before paginating, so that pages are full
+            participants = [participant for participant in participants if participant is not None and
+                            (args['enabled'] is None or participant.participant_enabled == args['enabled']) and
+                            (args['no_group'] is None or participant.id_participant_group is None)]
+            if not pagination.fetched:
+                participants = pagination.paginate(participants)
+        else:
+            # Sort by recently modified, if needed
+            if args['orderby_recents']:
+                participants = sorted(participants, key=lambda sort_part: sort_part.version_id, reverse=True)
 
-        # Apply limit to number of returned participants
-        if args['limit']:
-            if len(participants) > args['limit']:
-                participants = participants[0:args['limit']]
+            # Apply limit to number of returned participants
+            if args['limit']:
+                if len(participants) > args['limit']:
+                    participants = participants[0:args['limit']]
 
         try:
-            if participants:
+            if participants or pagination:
                 participant_list = []
                 status_participants = {}
 
                 # Query status
-                rpc = RedisRPCClient(self.module.config.redis_config)
+                rpc = RedisRPCClient.get_instance(self.module.config.redis_config)
                 status_participants = rpc.call(ModuleNames.USER_MANAGER_MODULE_NAME.value, 'status_participants')
 
                 for participant in participants:
@@ -158,7 +186,7 @@ class UserQueryParticipants(Resource):
                             if args['id_group'] or args['id_participant']:
                                 # Adds last session information to participant
                                 participant_sessions = TeraSession.get_sessions_for_participant(
-                                    part_id=participant.id_participant)
+                                    part_id=participant.id_participant, limit=1)
                                 if participant_sessions:
                                     participant_json['participant_lastsession'] = \
                                         participant_sessions[0].session_start_datetime.isoformat()
@@ -174,10 +202,10 @@ class UserQueryParticipants(Resource):
                                     devices.append(device.to_json())
                                 participant_json['participant_devices'] = devices
                                 participant_json['participant_project'] = participant.participant_project.to_json()
-                                last_session = participant.get_last_session()
-                                if last_session:
+                                summary = participant.get_sessions_summary()
+                                if summary and summary.summary_last_session_datetime:
                                     participant_json['participant_lastsession'] = \
-                                        last_session.session_start_datetime.isoformat()
+                                        summary.summary_last_session_datetime.isoformat()
                                 else:
                                     participant_json['participant_lastsession'] = None
 
@@ -193,6 +221,8 @@ class UserQueryParticipants(Resource):
 
                         participant_list.append(participant_json)
 
+                if pagination:
+                    return jsonify(pagination.to_json(participant_list))
                 return jsonify(participant_list)
 
         except InvalidRequestError as e:
@@ -312,7 +342,7 @@ class UserQueryParticipants(Resource):
         update_participant_json = update_participant.to_json()
 
         # Query status
-        rpc = RedisRPCClient(self.module.config.redis_config)
+        rpc = RedisRPCClient.get_instance(self.module.config.redis_config)
         status_participants = rpc.call(ModuleNames.USER_MANAGER_MODULE_NAME.value, 'status_participants')
         if update_participant.participant_uuid in status_participants:
             update_participant_json['participant_busy'] = \
@@ -5,6 +5,7 @@ from modules.FlaskModule.FlaskModule import user_api_ns as api
 from opentera.db.models.TeraUser import TeraUser
 from opentera.db.models.TeraSession import TeraSession
 from opentera.db.models.TeraParticipant import TeraParticipant
+from opentera.db.KeysetPagination import KeysetPagination
 from modules.DatabaseModule.DBManager import DBManager
 from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy import exc
@@ -24,6 +25,11 @@ get_parser.add_argument('list', type=inputs.boolean, help='Flag that limits the
 get_parser.add_argument('start_date', type=inputs.date, help='Start date, sessions before that date will be ignored')
 get_parser.add_argument('end_date', type=inputs.date, help='End date, sessions after that date will be ignored')
 get_parser.add_argument('with_session_type', type=inputs.boolean, help='Include session type informations')
+get_parser.add_argument('page_size', type=int, help='Paginates the returned data (replaces limit and offset): '
+                                                     'maximum number of items in the page. Reply is then {"items": '
+                                                     '[...], "next": cursor}, with a null "next" cursor on the last '
+                                                     'page.')
+get_parser.add_argument('cursor', type=str, help='Cursor ("next") of the previous page, to get the next page')
 
 # post_parser = reqparse.RequestParser()
 # post_parser.add_argument('session', type=str, location='json', help='Session to create / update', required=True)
@@ -55,6 +61,14 @@ class UserQuerySessions(Resource):
 
         args = parser.parse_args()
 
+        try:
+            pagination = KeysetPagination.from_args(TeraSession.get_pagination_sort_keys(), args)
+        except ValueError:
+            return gettext('Invalid pagination parameters'), 400
+        if pagination:
+            args['limit'] = None
+            args['offset'] = None
+
         sessions = []
         # Can't query sessions, unless we have a parameter!
         if not any(args.values()):
@@ -66,36 +80,37 @@ class UserQuerySessions(Resource):
                                                                     status=args['status'], limit=args['limit'],
                                                                     offset=args['offset'],
                                                                     start_date=args['start_date'],
-                                                                    end_date=args['end_date'])
+                                                                    end_date=args['end_date'], pagination=pagination)
         elif args['id_session']:
             sessions = [user_access.query_session(args['id_session'])]
         elif args['id_user']:
             if args['id_user'] in user_access.get_accessible_users_ids():
                 sessions = TeraSession.get_sessions_for_user(user_id=args['id_user'], status=args['status'],
                                                              limit=args['limit'], offset=args['offset'],
-                                                             start_date=args['start_date'], end_date=args['end_date'])
+                                                             start_date=args['start_date'], end_date=args['end_date'],
+                                                             pagination=pagination)
         elif args['id_device']:
             if args['id_device'] in user_access.get_accessible_devices_ids():
                 sessions = TeraSession.get_sessions_for_device(device_id=args['id_device'], status=args['status'],
                                                                limit=args['limit'], offset=args['offset'],
-                                                               start_date=args['start_date'], end_date=args['end_date'])
+                                                               start_date=args['start_date'], end_date=args['end_date'],
+                                                               pagination=pagination)
         elif args['session_uuid']:
             session_info = TeraSession.get_session_by_uuid(args['session_uuid'])
             if session_info:
                 sessions = [user_access.query_session(session_info.id_session)]
 
         try:
-            sessions_list = []
-            for ses in sessions:
-                if ses is not None:  # Could be none if no access to specified session
-                    session_json = ses.to_json(minimal=args['list'])
-
-                    if args['with_session_type']:
-                        session_json['session_type_name'] = ses.session_session_type.session_type_name
-                        session_json['session_type_color'] = ses.session_session_type.session_type_color
-
-                    sessions_list.append(session_json)
-
+            # Could be none if no access to specified session
+            sessions = [ses for ses in sessions if ses is not None]
+            sessions_list = TeraSession.to_json_list(sessions, minimal=args['list'])
+            if args['with_session_type']:
+                for ses, session_json in zip(sessions, sessions_list):
+                    session_json['session_type_name'] = ses.session_session_type.session_type_name
+                    session_json['session_type_color'] = ses.session_session_type.session_type_color
+
+            if pagination:
+                return jsonify(pagination.to_json(sessions_list))
             return jsonify(sessions_list)
 
         except InvalidRequestError as e:
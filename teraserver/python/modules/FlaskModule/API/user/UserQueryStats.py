@@ -1,10 +1,15 @@
 from flask_restx import Resource, inputs
 from modules.LoginModule.LoginModule import user_multi_auth, current_user
 from modules.FlaskModule.FlaskModule import user_api_ns as api
+from opentera.db.Base import db
 from opentera.db.models.TeraParticipant import TeraParticipant
+from opentera.db.models.TeraParticipantSessionsSummary import TeraParticipantSessionsSummary
+from opentera.db.models.TeraSession import TeraSession, TeraSessionStatus
 from flask_babel import gettext
 from modules.DatabaseModule.DBManager import DBManager, DBManagerTeraUserAccess
 
+from sqlalchemy import true
+
 import datetime
 
 
@@ -110,18 +115,25 @@ class UserQueryUserStats(Resource):
     @staticmethod
     def get_user_stats(user_access: DBManagerTeraUserAccess, item_id: int) -> dict:
         from opentera.db.models.TeraSession import TeraSession
+        from opentera.db.models.TeraSessionUsers import TeraSessionUsers
+        from opentera.db.models.TeraSessionParticipants import TeraSessionParticipants
+        from opentera.db.models.TeraParticipant import TeraParticipant
         total_created_sessions = TeraSession.count_with_filters({'id_creator_user': item_id})
-        user_sessions = TeraSession.get_sessions_for_user(item_id)
-        sessions_participants = set()
-        for ses in user_sessions:
-            sessions_participants = sessions_participants.union(
-                set([participant for participant in ses.session_participants]))
-        enabled_participants = [participant for participant in sessions_participants if participant.participant_enabled]
+        sessions_total = TeraSessionUsers.count_with_filters({'id_user': item_id})
+
+        # Distinct participants of the user sessions, and how many of them are enabled
+        user_sessions_ids = db.session.query(TeraSessionUsers.id_session).filter(TeraSessionUsers.id_user == item_id)
+        participants_total, participants_enabled = db.session.query(
+            db.func.count(db.distinct(TeraParticipant.id_participant)),
+            db.func.count(db.distinct(db.case((TeraParticipant.participant_enabled == true(),
+                                               TeraParticipant.id_participant))))) \
+            .join(TeraSessionParticipants, TeraSessionParticipants.id_participant == TeraParticipant.id_participant) \
+            .filter(TeraSessionParticipants.id_session.in_(user_sessions_ids)).one()
 
         stats = {'sessions_created_total_count': total_created_sessions,
-                 'sessions_total_count': len(user_sessions),
-                 'participants_total_count': len(sessions_participants),
-                 'participants_enabled_count': len(enabled_participants)
+                 'sessions_total_count': sessions_total,
+                 'participants_total_count': participants_total,
+                 'participants_enabled_count': participants_enabled
                  }
         return stats
 
@@ -133,62 +145,59 @@ class UserQueryUserStats(Resource):
         from opentera.db.models.TeraParticipant import TeraParticipant
         from opentera.db.models.TeraDeviceSite import TeraDeviceSite
         site_projects = user_access.query_projects_for_site(item_id)
+        site_projects_ids = [project.id_project for project in site_projects]
         site_users = user_access.query_users_for_site(site_id=item_id)
         site_users_enabled = [user for user in site_users if user.user_enabled]
         # site_users_enabled = user_access.query_users_for_site(site_id=item_id, enabled_only=True)
-        site_groups_total = 0
-        participants_total = 0
-        participants_enabled = 0
-        sessions_total = 0
-        # devices = []
-        for project in site_projects:
-            site_groups_total += TeraParticipantGroup.count_with_filters({'id_project': project.id_project})
-            participants_total += TeraParticipant.count_with_filters({'id_project': project.id_project})
-            participants_enabled += TeraParticipant.count_with_filters({'id_project': project.id_project,
-                                                                        'participant_enabled': True})
-
-            for part in project.project_participants:
-                sessions_total += TeraSessionParticipants.get_session_count_for_participant(
-                    id_participant=part.id_participant)
-
-        # devices = set(devices)  # Remove duplicates
+        participants_total, participants_enabled = UserQueryUserStats.count_participants(
+            TeraParticipant.id_project.in_(site_projects_ids))
+        sessions_total = TeraSessionParticipants.query.join(TeraParticipant) \
+            .filter(TeraParticipant.id_project.in_(site_projects_ids)).count()
+
         stats = {'users_total_count': len(site_users),
                  'users_enabled_count': len(site_users_enabled),
                  'projects_count': len(site_projects),
-                 'participants_groups_count': site_groups_total,
+                 'participants_groups_count': TeraParticipantGroup.query.filter(
+                     TeraParticipantGroup.id_project.in_(site_projects_ids)).count(),
                  'participants_total_count': participants_total,
                  'participants_enabled_count': participants_enabled,
                  'sessions_total_count': sessions_total,
                  'devices_total_count': TeraDeviceSite.count_with_filters({'id_site': item_id})
                  }
-        # Add participants information?
+
         participants = []
-        if with_parts:
+        summaries = dict()
+        if with_parts or with_warnings:
             participants = user_access.query_all_participants_for_site(item_id)
-            part_stats = [UserQueryUserStats.get_participant_list_stats(part) for part in participants]
+            summaries = TeraParticipantSessionsSummary.get_summaries_for_participants([part.id_participant
+                                                                                       for part in participants])
+
+        # Add participants information?
+        if with_parts:
+            part_stats = [UserQueryUserStats.get_participant_list_stats(part, summaries.get(part.id_participant))
+                          for part in participants]
             stats['participants'] = part_stats
 
         # Add warnings information?
         if with_warnings:
             today = datetime.datetime.now().date()
 
-            # Participants
-            if len(participants) == 0:
-                participants = user_access.query_all_participants_for_site(item_id)
             # Keep only enabled participants and with last session within the last 6 months
             participants = [part for part in participants if part.participant_enabled]
 
             warning_parts = []
             no_session_parts = []
             for part in participants:
-                last_session = part.get_last_session()
-                if last_session:
-                    diff_month = UserQueryUserStats.diff_month(today, last_session.session_start_datetime)
+                last_session_datetime = None
+                if part.id_participant in summaries:
+                    last_session_datetime = summaries[part.id_participant].summary_last_session_datetime
+                if last_session_datetime:
+                    diff_month = UserQueryUserStats.diff_month(today, last_session_datetime)
                     if diff_month >= 6:
                         warning_parts.append({'id_participant': part.id_participant,
                                               'participant_name': part.participant_name,
                                               'project_name': part.participant_project.project_name,
-                                              'last_session': last_session.session_start_datetime.isoformat(),
+                                              'last_session': last_session_datetime.isoformat(),
                                               'months': diff_month})
                 else:
                     updated_date = datetime.datetime.fromtimestamp(part.version_id/1000)
@@ -206,7 +215,7 @@ class UserQueryUserStats(Resource):
             stats['warning_nosession_participants'] = no_session_parts
 
             # Users
-            users = user_access.query_users_for_site(item_id)
+            users = site_users
             # Keep only enabled users
             users = [user for user in users if user.user_enabled and not user.user_superadmin]
 
@@ -240,21 +249,18 @@ class UserQueryUserStats(Resource):
     @staticmethod
     def get_project_stats(user_access: DBManagerTeraUserAccess, item_id: int, with_parts: bool) -> dict:
         from opentera.db.models.TeraSessionParticipants import TeraSessionParticipants
-        from opentera.db.models.TeraProject import TeraProject
+        from opentera.db.models.TeraParticipantGroup import TeraParticipantGroup
+        from opentera.db.models.TeraParticipant import TeraParticipant
         project_users = user_access.query_users_for_project(project_id=item_id)
-        project_users_enabled = user_access.query_users_for_project(project_id=item_id, enabled_only=True)
-        project = TeraProject.get_project_by_id(item_id)
-        project_groups_total = len(project.project_participants_groups)
-        participants_total = len(project.project_participants)
-        participants_enabled = len([part for part in project.project_participants if part.participant_enabled])
-        sessions_total = 0
-        for part in project.project_participants:
-            sessions_total += TeraSessionParticipants.get_session_count_for_participant(
-                    id_participant=part.id_participant)
+        project_users_enabled = [user for user in project_users if user.user_enabled]
+        participants_total, participants_enabled = UserQueryUserStats.count_participants(
+            TeraParticipant.id_project == item_id)
+        sessions_total = TeraSessionParticipants.query.join(TeraParticipant) \
+            .filter(TeraParticipant.id_project == item_id).count()
 
         stats = {'users_total_count': len(project_users),
                  'users_enabled_count': len(project_users_enabled),
-                 'participants_groups_count': project_groups_total,
+                 'participants_groups_count': TeraParticipantGroup.count_with_filters({'id_project': item_id}),
                  'participants_total_count': participants_total,
                  'participants_enabled_count': participants_enabled,
                  'sessions_total_count': sessions_total
@@ -263,25 +269,19 @@ class UserQueryUserStats(Resource):
         # Add participants information?
         if with_parts:
             participants = user_access.query_all_participants_for_project(item_id)
-            part_stats = [UserQueryUserStats.get_participant_list_stats(part) for part in participants]
-            stats['participants'] = part_stats
+            stats['participants'] = UserQueryUserStats.get_participants_list_stats(participants)
 
         return stats
 
     @staticmethod
     def get_participant_group_stats(user_access: DBManagerTeraUserAccess, item_id: int, with_parts: bool) -> dict:
-        # from opentera.db.models.TeraParticipantGroup import TeraParticipantGroup
         from opentera.db.models.TeraSessionParticipants import TeraSessionParticipants
-        # group = TeraParticipantGroup.get_participant_group_by_id(item_id)
         participants = user_access.query_participants_for_group(item_id)
         participants_total = len(participants)
 
         participants_enabled = len([part for part in participants if part.participant_enabled])
-        sessions_total = 0
-        for part in participants:
-            sessions_total += TeraSessionParticipants.get_session_count_for_participant(
-                    id_participant=part.id_participant)
-            # len(TeraSession.get_sessions_for_participant(part.id_participant))
+        sessions_total = TeraSessionParticipants.get_session_count_for_participants([part.id_participant
+                                                                                     for part in participants])
 
         stats = {'participants_total_count': participants_total,
                  'participants_enabled_count': participants_enabled,
@@ -290,81 +290,91 @@ class UserQueryUserStats(Resource):
 
         # Add participants information?
         if with_parts:
-            part_stats = [UserQueryUserStats.get_participant_list_stats(part) for part in participants]
-            stats['participants'] = part_stats
+            stats['participants'] = UserQueryUserStats.get_participants_list_stats(participants)
 
         return stats
 
     @staticmethod
     def get_session_stats(user_access: DBManagerTeraUserAccess, item_id: int) -> dict:
-        from opentera.db.models.TeraSession import TeraSession
-        ses = TeraSession.get_session_by_id(item_id)
-
-        stats = {'users_total_count': len(ses.session_users),
-                 'participants_total_count': len(ses.session_participants),
-                 'devices_total_count': len(ses.session_devices),
-                 'assets_total_count': len(ses.session_assets),
-                 'events_total_count': len(ses.session_events),
-                 'tests_total_count': len(ses.session_tests)
+        from opentera.db.models.TeraSessionUsers import TeraSessionUsers
+        from opentera.db.models.TeraSessionParticipants import TeraSessionParticipants
+        from opentera.db.models.TeraSessionDevices import TeraSessionDevices
+        from opentera.db.models.TeraSessionEvent import TeraSessionEvent
+        assets_count, tests_count = TeraSession.get_sessions_stats([item_id])
+
+        stats = {'users_total_count': TeraSessionUsers.count_with_filters({'id_session': item_id}),
+                 'participants_total_count': TeraSessionParticipants.count_with_filters({'id_session': item_id}),
+                 'devices_total_count': TeraSessionDevices.count_with_filters({'id_session': item_id}),
+                 'assets_total_count': assets_count.get(item_id, 0),
+                 'events_total_count': TeraSessionEvent.count_with_filters({'id_session': item_id}),
+                 'tests_total_count': tests_count.get(item_id, 0)
                  }
         return stats
 
     @staticmethod
     def get_participant_stats(user_access: DBManagerTeraUserAccess, item_id: int) -> dict:
-        from opentera.db.models.TeraParticipant import TeraParticipant
-        from opentera.db.models.TeraSession import TeraSessionStatus
         from opentera.db.models.TeraAsset import TeraAsset
-        participant = TeraParticipant.get_participant_by_id(item_id)
-        sessions_total_time = sum([ses.session_duration for ses in participant.participant_sessions])
-        if len(participant.participant_sessions) > 0:
-            sessions_mean_time = sessions_total_time / len(participant.participant_sessions)
+        summary = TeraParticipantSessionsSummary.get_summary_for_participant(item_id)
+        status_count = dict()
+        if summary:
+            sessions_total = summary.summary_sessions_count
+            sessions_total_time = summary.summary_sessions_duration
+            sessions_mean_time = sessions_total_time / sessions_total
+            status_count = {status.value: summary.get_status_count(status.value) for status in TeraSessionStatus}
         else:
-            sessions_mean_time = 0
-        sessions_assets_total = len(TeraAsset.get_assets_for_participant(item_id))
-        # sum([len(ses.session_assets) for ses in participant.participant_sessions])
-        # users_involved = set()
-        # for ses in participant.participant_sessions:
-        #     users_involved = users_involved.union(set([user for user in ses.session_users]))
-
-        stats = {'sessions_total_count': len(participant.participant_sessions),
+            sessions_total = sessions_total_time = sessions_mean_time = 0
+        sessions_assets_total = TeraAsset.get_assets_count_for_participant(item_id)
+
+        stats = {'sessions_total_count': sessions_total,
                  'sessions_total_time': sessions_total_time,
                  'sessions_mean_time': sessions_mean_time,
-                 'sessions_planned_count': len([ses.id_session for ses in participant.participant_sessions
-                                                if ses.session_status == TeraSessionStatus.STATUS_NOTSTARTED.value]),
-                 'sessions_completed_count': len([ses.id_session for ses in participant.participant_sessions
-                                                  if ses.session_status == TeraSessionStatus.STATUS_COMPLETED.value]),
-                 'sessions_inprogress_count': len([ses.id_session for ses in participant.participant_sessions
-                                                   if ses.session_status == TeraSessionStatus.STATUS_INPROGRESS.value]),
-                 'sessions_cancelled_count': len([ses.id_session for ses in participant.participant_sessions
-                                                  if ses.session_status == TeraSessionStatus.STATUS_CANCELLED.value]),
-                 'sessions_terminated_count': len([ses.id_session for ses in participant.participant_sessions
-                                                  if ses.session_status == TeraSessionStatus.STATUS_TERMINATED.value]),
-                 # 'users_total_count': len(users_involved),
+                 'sessions_planned_count': status_count.get(TeraSessionStatus.STATUS_NOTSTARTED.value, 0),
+                 'sessions_completed_count': status_count.get(TeraSessionStatus.STATUS_COMPLETED.value, 0),
+                 'sessions_inprogress_count': status_count.get(TeraSessionStatus.STATUS_INPROGRESS.value, 0),
+                 'sessions_cancelled_count': status_count.get(TeraSessionStatus.STATUS_CANCELLED.value, 0),
+                 'sessions_terminated_count': status_count.get(TeraSessionStatus.STATUS_TERMINATED.value, 0),
                  'assets_total_count': sessions_assets_total,
                  'tests_total_count': 0}
         return stats
 
     @staticmethod
     def get_device_stats(user_access: DBManagerTeraUserAccess, item_id: int) -> dict:
-        from opentera.db.models.TeraDevice import TeraDevice
-        device = TeraDevice.get_device_by_id(item_id)
-        stats = {'assets_total_count': len(device.device_assets),
-                 'projects_total_count': len(device.device_projects),
-                 'participants_total_count': len(device.device_participants),
+        from opentera.db.models.TeraAsset import TeraAsset
+        from opentera.db.models.TeraDeviceProject import TeraDeviceProject
+        from opentera.db.models.TeraDeviceParticipant import TeraDeviceParticipant
+        stats = {'assets_total_count': TeraAsset.count_with_filters({'id_device': item_id}),
+                 'projects_total_count': TeraDeviceProject.count_with_filters({'id_device': item_id}),
+                 'participants_total_count': TeraDeviceParticipant.count_with_filters({'id_device': item_id}),
                  }
         return stats
 
     @staticmethod
-    def get_participant_list_stats(participant: TeraParticipant):
-        first_session = participant.get_first_session()
-        first_session_date = None
-        if first_session:
-            first_session_date = first_session.session_start_datetime.isoformat()
+    def count_participants(criterion) -> tuple:
+        # Total and enabled counts of the participants matching the criterion, with one query
+        return db.session.query(db.func.count(TeraParticipant.id_participant),
+                                db.func.count(db.case((TeraParticipant.participant_enabled == true(),
+                                                       TeraParticipant.id_participant))))\
+            .filter(criterion).one()
+
+    @staticmethod
+    def get_participants_list_stats(participants: list) -> list:
+        summaries = TeraParticipantSessionsSummary.get_summaries_for_participants([part.id_participant
+                                                                                   for part in participants])
+        return [UserQueryUserStats.get_participant_list_stats(part, summaries.get(part.id_participant))
+                for part in participants]
 
-        last_session = participant.get_last_session()
+    @staticmethod
+    def get_participant_list_stats(participant: TeraParticipant, summary: TeraParticipantSessionsSummary = None):
+        # Summary is None if the participant has no session
+        first_session_date = None
         last_session_date = None
-        if last_session:
-            last_session_date = last_session.session_start_datetime.isoformat()
+        sessions_count = 0
+        if summary:
+            sessions_count = summary.summary_sessions_count
+            if summary.summary_first_session_datetime:
+                first_session_date = summary.summary_first_session_datetime.isoformat()
+            if summary.summary_last_session_datetime:
+                last_session_date = summary.summary_last_session_datetime.isoformat()
 
         last_online = participant.participant_lastonline
         last_online_date = None
@@ -374,7 +384,7 @@ class UserQueryUserStats(Resource):
         stats = {'id_participant': participant.id_participant,
                  'participant_name': participant.participant_name,
                  'participant_enabled': participant.participant_enabled,
-                 'participant_sessions_count': len(participant.participant_sessions),
+                 'participant_sessions_count': sessions_count,
                  'participant_first_session': first_session_date,
                  'participant_last_session': last_session_date,
                  'participant_last_online': last_online_date
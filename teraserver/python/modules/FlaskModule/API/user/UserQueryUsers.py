@@ -5,6 +5,7 @@ from modules.LoginModule.LoginModule import user_multi_auth
 from modules.FlaskModule.FlaskModule import user_api_ns as api
 from opentera.db.models.TeraUser import TeraUser
 from opentera.db.models.TeraUserGroup import TeraUserGroup
+from opentera.db.KeysetPagination import KeysetPagination
 from flask_babel import gettext
 from modules.DatabaseModule.DBManager import DBManager
 from opentera.redis.RedisRPCClient import RedisRPCClient
@@ -26,6 +27,10 @@ get_parser.add_argument('list', type=inputs.boolean, help='Flag that limits the
 get_parser.add_argument('with_usergroups', type=inputs.boolean, help='Include usergroups information for each user.')
 get_parser.add_argument('with_status', type=inputs.boolean, help='Include status information - offline, online, busy '
                                                                  'for each user')
+get_parser.add_argument('page_size', type=int, help='Paginates the returned data: maximum number of users in the '
+                                                     'page. Reply is then {"items": [...], "next": cursor}, with a '
+                                                     'null "next" cursor on the last page.')
+get_parser.add_argument('cursor', type=str, help='Cursor ("next") of the previous page, to get the next page')
 
 post_parser = reqparse.RequestParser()
 # post_parser.add_argument('user', type=str, location='json', help='User to create / update. If structure has a field '
@@ -59,6 +64,11 @@ class UserQueryUsers(Resource):
 
         user_access = DBManager.userAccess(current_user)
 
+        try:
+            pagination = KeysetPagination.from_args([(TeraUser.id_user, False)], args)
+        except ValueError:
+            return gettext('Invalid pagination parameters'), 400
+
         users = []
 
         if args['uuid']:
@@ -91,11 +101,16 @@ class UserQueryUsers(Resource):
             # If we have no arguments, return all accessible users
             users = user_access.get_accessible_users()
 
-        if users:
+        if pagination:
+            # Filtered before paginating, so that pages are full
+            users = pagination.paginate([user for user in users if user is not None and
+                                         (args['enabled'] is None or user.user_enabled == args['enabled'])])
+
+        if users or pagination:
             users_list = []
             if args['with_status']:
                 # Query users status
-                rpc = RedisRPCClient(self.module.config.redis_config)
+                rpc = RedisRPCClient.get_instance(self.module.config.redis_config)
                 status_users = rpc.call(ModuleNames.USER_MANAGER_MODULE_NAME.value, 'status_users')
 
             for user in users:
@@ -144,6 +159,8 @@ class UserQueryUsers(Resource):
                             user_json['user_online'] = False
 
                     users_list.append(user_json)
+            if pagination:
+                return jsonify(pagination.to_json(users_list))
             return jsonify(users_list)
 
         return [], 200
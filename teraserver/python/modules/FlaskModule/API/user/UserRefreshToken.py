@@ -52,7 +52,7 @@ class UserRefreshToken(Resource):
                 port = request.headers['X_EXTERNALPORT']
 
             # Verify if user already logged in with a websocket
-            rpc = RedisRPCClient(self.module.config.redis_config)
+            rpc = RedisRPCClient.get_instance(self.module.config.redis_config)
             online_users = rpc.call(ModuleNames.USER_MANAGER_MODULE_NAME.value, 'online_users')
             if current_user.user_uuid not in online_users:
                 # User is online and a websocket is required
@@ -192,7 +192,7 @@ class UserSessionManager(Resource):
             service = TeraService.get_service_by_id(json_session_manager['id_service'])
             if not service:
                 return gettext('Service not found'), 400
-            rpc = RedisRPCClient(self.module.config.redis_config)
+            rpc = RedisRPCClient.get_instance(self.module.config.redis_config)
             answer = rpc.call_service(service.service_key, 'session_manage', json.dumps(request.json))
         else:
             # TODO: Manage other session types
@@ -0,0 +1,78 @@
+import json
+
+from flask import Response, stream_with_context
+
+from opentera.db.models.TeraAsset import TeraAsset
+
+
+class AssetsReply:
+    """
+        Reply of the assets queries (user, participant, device and service API): assets json with, if requested, their
+        access tokens (one for each asset or one for each service) and their services urls. The reply is a list of
+        assets, or {"access_tokens": {service_uuid: token}, "assets": [...]} with the services tokens.
+    """
+    # Access tokens expiration, in seconds
+    token_expiration = 1800
+
+    def __init__(self, assets: list, args: dict, requester_uuid: str, token_key, services_infos: dict,
+                 servername: str, port, minimal: bool = False):
+        self.assets = assets
+        self.with_only_token = args['with_only_token']
+        self.with_urls = args['with_urls']
+        self.requester_uuid = requester_uuid
+        self.token_key = token_key
+        self.services_infos = services_infos
+        self.base_url = 'https://' + servername + ':' + str(port)
+        self.minimal = minimal
+
+        self.services_tokens = None
+        if args['with_services_tokens']:
+            # One access token for each service, covering all the assets of that service
+            self.services_tokens = TeraAsset.get_services_access_tokens(assets, token_key=token_key,
+                                                                        requester_uuid=requester_uuid,
+                                                                        expiration=self.token_expiration)
+
+    def asset_to_json(self, asset: TeraAsset) -> dict:
+        if self.with_only_token:
+            asset_json = {'asset_uuid': asset.asset_uuid}
+        else:
+            asset_json = asset.to_json(minimal=self.minimal)
+
+        # Access token
+        if self.token_key and self.services_tokens is None:
+            asset_json['access_token'] = TeraAsset.get_access_token(asset_uuids=asset.asset_uuid,
+                                                                    token_key=self.token_key,
+                                                                    requester_uuid=self.requester_uuid,
+                                                                    expiration=self.token_expiration)
+
+        if self.with_urls:
+            # We have previously verified that the service is available to the requester
+            if asset.asset_service_uuid in self.services_infos:
+                service_url = self.base_url + self.services_infos[asset.asset_service_uuid]
+                asset_json['asset_infos_url'] = service_url + '/api/assets/infos'  # ?asset_uuid=' + asset.asset_uuid
+                asset_json['asset_url'] = service_url + '/api/assets'  # ?asset_uuid=' + asset.asset_uuid
+            else:
+                # Service not found or unavaiable for current requester
+                asset_json['asset_infos_url'] = None
+                asset_json['asset_url'] = None
+
+        return asset_json
+
+    def to_json(self):
+        assets_json = [self.asset_to_json(asset) for asset in self.assets]
+        if self.services_tokens is not None:
+            return {'access_tokens': self.services_tokens, 'assets': assets_json}
+        return assets_json
+
+    def to_stream(self) -> Response:
+        # Assets are converted and sent one at a time, for large lists
+        def generate_reply():
+            if self.services_tokens is not None:
+                yield '{"access_tokens": ' + json.dumps(self.services_tokens) + ', "assets": ['
+            else:
+                yield '['
+            for index, asset in enumerate(self.assets):
+                yield (', ' if index else '') + json.dumps(self.asset_to_json(asset))
+            yield ']}' if self.services_tokens is not None else ']'
+
+        return Response(stream_with_context(generate_reply()), mimetype='application/json')
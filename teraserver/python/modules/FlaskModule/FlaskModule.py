@@ -5,6 +5,7 @@ from opentera.config.ConfigManager import ConfigManager
 from flask_babel import Babel
 from opentera.modules.BaseModule import BaseModule, ModuleNames
 from opentera.db.models.TeraServerSettings import TeraServerSettings
+from opentera.db.KeysetPagination import KeysetPagination
 from opentera.OpenTeraServerVersion import opentera_server_version_string
 import redis
 from modules.Globals import opentera_doc_url
@@ -84,6 +85,10 @@ class FlaskModule(BaseModule):
         # Use debug mode flag
         flask_app.debug = config.server_config['debug_mode']
 
+        # Page sizes of the paginated lists
+        KeysetPagination.default_page_size = config.server_config['pagination_default_page_size']
+        KeysetPagination.max_page_size = config.server_config['pagination_max_page_size']
+
         # Change secret key to use server UUID
         # This is used for session encryption
         flask_app.secret_key = TeraServerSettings.get_server_setting_value(TeraServerSettings.ServerUUID)
@@ -0,0 +1,86 @@
+from opentera.db.Base import db
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+import threading
+import time
+
+
+class IdentityCache:
+    """
+        Authenticated identities (users, participants, devices) of this process, for a short time, so that token
+        authenticated requests don't need to load them from the database.
+
+        Only the columns values are kept. Identities are rebuilt in the request database session without any query,
+        their relationships (user groups, ...) are still loaded from the database when used. Entries of an identity are
+        removed when it is updated or deleted (database events).
+    """
+    # Time to live of an entry, in seconds
+    entry_ttl = 60
+
+    # Maximum number of entries
+    max_entries = 10000
+
+    def __init__(self):
+        # Entries by key: (expiration, uuid, model class, columns values, authenticated)
+        self.entries = dict()
+        # Keys by identity uuid
+        self.uuids_keys = dict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        expiration, uuid, cls, values, authenticated = entry
+        if expiration < time.monotonic():
+            return None
+
+        identity = inspect(cls).class_manager.new_instance()
+        for name, value in values.items():
+            set_committed_value(identity, name, value)
+        make_transient_to_detached(identity)
+        identity = db.session.merge(identity, load=False)
+        identity.authenticated = authenticated
+        return identity
+
+    def has(self, key: str) -> bool:
+        entry = self.entries.get(key)
+        return entry is not None and entry[0] >= time.monotonic()
+
+    def set(self, key: str, uuid: str, identity):
+        values = {column_attr.key: getattr(identity, column_attr.key)
+                  for column_attr in inspect(type(identity)).column_attrs}
+        with self.lock:
+            if len(self.entries) >= self.max_entries:
+                self.remove_expired()
+            self.entries[key] = (time.monotonic() + self.entry_ttl, uuid, type(identity), values,
+                                 identity.authenticated)
+            self.uuids_keys.setdefault(uuid, set()).add(key)
+
+    def invalidate(self, uuid: str):
+        with self.lock:
+            for key in self.uuids_keys.pop(uuid, set()):
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.uuids_keys.clear()
+
+    def remove_expired(self):
+        now = time.monotonic()
+        for key, entry in list(self.entries.items()):
+            if entry[0] < now:
+                del self.entries[key]
+                keys = self.uuids_keys.get(entry[1])
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.uuids_keys[entry[1]]
+        if len(self.entries) >= self.max_entries:
+            self.entries.clear()
+            self.uuids_keys.clear()
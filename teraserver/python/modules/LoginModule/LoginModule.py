@@ -2,8 +2,10 @@
 from flask_login import LoginManager, login_user
 
 from modules.FlaskModule.FlaskModule import flask_app
-from opentera.modules.BaseModule import BaseModule, ModuleNames
+from opentera.modules.BaseModule import BaseModule, ModuleNames, create_module_event_topic_from_name
 from opentera.redis.RedisVars import RedisVars
+from opentera.utils.BloomFilter import BloomFilter
+from modules.LoginModule.IdentityCache import IdentityCache
 
 from opentera.db.models.TeraUser import TeraUser
 from opentera.db.models.TeraParticipant import TeraParticipant
@@ -11,7 +13,14 @@ from opentera.db.models.TeraDevice import TeraDevice
 from opentera.db.models.TeraService import TeraService
 
 from opentera.config.ConfigManager import ConfigManager
+import opentera.messages.python as messages
+from google.protobuf.message import DecodeError
 import datetime
+import hashlib
+import hmac
+import json
+import secrets
+import time
 import redis
 
 from flask import request, _request_ctx_stack
@@ -22,8 +31,6 @@ from functools import wraps
 
 from flask_httpauth import HTTPBasicAuth, HTTPTokenAuth, MultiAuth
 
-from twisted.internet import task
-
 # Current participant identity, stacked
 current_participant = LocalProxy(lambda: getattr(_request_ctx_stack.top, 'current_participant', None))
 
@@ -48,47 +55,87 @@ participant_multi_auth = MultiAuth(participant_http_auth, participant_token_auth
 
 
 class DisabledTokenStorage:
-    def __init__(self):
-        self.disabled_tokens = []
+    """
+        Disabled (revoked) tokens, shared by all the server processes. Each token is stored in redis by its jti, with a
+        time to live equal to the token remaining lifetime, and published to the other processes. A local bloom filter
+        of the disabled jti answers most checks (token not disabled) without any redis round trip.
+    """
+    # Number of jti in the filter before it is rebuilt from redis (expired tokens are removed from redis only)
+    filter_capacity = 100000
+
+    def __init__(self, name: str):
+        self.name = name
+        self.redis = None
+        self.filter = BloomFilter(self.filter_capacity)
+        # Until the filter is loaded from redis, every check is done in redis
+        self.filter_loaded = False
+
+    def get_key(self, jti) -> str:
+        return RedisVars.RedisVar_DisabledTokenPrefixKey + self.name + '.' + str(jti)
 
-    def push_disabled_token(self, token):
-        if token not in self.disabled_tokens:
-            self.disabled_tokens.append(token)
+    @staticmethod
+    def get_token_claims(token):
+        import jwt
+        try:
+            # Only used to find the jti, signature was verified (or will be) by the caller
+            return jwt.decode(token, options={'verify_signature': False})
+        except jwt.exceptions.PyJWTError:
+            return {}
 
-    def get_disabled_tokens(self):
-        return self.disabled_tokens
+    def push_disabled_token(self, token):
+        claims = self.get_token_claims(token)
+        if 'jti' not in claims:
+            return
+
+        time_to_live = None
+        if 'exp' in claims:
+            time_to_live = int(claims['exp'] - time.time())
+            if time_to_live <= 0:
+                # Already expired
+                return
+
+        self.filter.add(str(claims['jti']))
+        pipe = self.redis.pipeline()
+        pipe.set(self.get_key(claims['jti']), 1, ex=time_to_live)
+        pipe.publish(RedisVars.RedisVar_DisabledTokenTopic, self.name + '.' + str(claims['jti']))
+        pipe.execute()
 
     def is_disabled_token(self, token):
-        return token in self.disabled_tokens
+        return self.is_disabled_jti(self.get_token_claims(token).get('jti'))
 
-    def clear_all_disabled_tokens(self):
-        self.disabled_tokens.clear()
+    def is_disabled_jti(self, jti):
+        if jti is None:
+            return False
+        if self.filter_loaded and str(jti) not in self.filter:
+            return False
+        return self.redis.exists(self.get_key(jti)) > 0
 
     def remove_disabled_token(self, token):
-        if token in self.disabled_tokens:
-            self.disabled_tokens.remove(token)
-
-    def remove_all_expired_tokens(self, key):
-        to_be_removed = []
-        for token in self.disabled_tokens:
-            import jwt
-            try:
-                token_dict = jwt.decode(token, key, algorithms='HS256')
-                # Expired tokens will throw exception.
-                # If we continue here, tokens have a valid expiration time.
-                # We should stop looking for expired tokens since they are added chronologically
-                break
-            except jwt.exceptions.ExpiredSignatureError as e:
-                to_be_removed.append(token)
-            except jwt.exceptions.PyJWTError as e:
-                print(e)
-                continue
+        # jti stays in the filter until rebuilt, which only costs a redis check for that token
+        jti = self.get_token_claims(token).get('jti')
+        if jti is not None:
+            self.redis.delete(self.get_key(jti))
 
-        # Remove expired tokens
-        for expired_token in to_be_removed:
-            self.disabled_tokens.remove(expired_token)
-
-        return to_be_removed
+    def clear_all_disabled_tokens(self):
+        keys = list(self.redis.scan_iter(match=self.get_key('*'), count=1000))
+        if keys:
+            self.redis.delete(*keys)
+        self.load_filter()
+
+    def disabled_token_notified(self, jti: str):
+        # Token disabled by any process
+        self.filter.add(jti)
+        if self.filter.is_full():
+            self.load_filter()
+
+    def load_filter(self):
+        # (Re)build the filter with the disabled tokens still in redis
+        disabled_filter = BloomFilter(self.filter_capacity)
+        prefix_length = len(self.get_key(''))
+        for key in self.redis.scan_iter(match=self.get_key('*'), count=1000):
+            disabled_filter.add(key.decode('utf-8')[prefix_length:])
+        self.filter = disabled_filter
+        self.filter_loaded = True
 
 
 class LoginModule(BaseModule):
@@ -97,8 +144,23 @@ class LoginModule(BaseModule):
     redis_client = None
 
     # Only user & participant tokens expire (for now)
-    __user_disabled_token_storage = DisabledTokenStorage()
-    __participant_disabled_token_storage = DisabledTokenStorage()
+    __user_disabled_token_storage = DisabledTokenStorage('user')
+    __participant_disabled_token_storage = DisabledTokenStorage('participant')
+
+    # Tokens keys, loaded from redis and reloaded when changed
+    token_keys_names = [RedisVars.RedisVar_UserTokenAPIKey, RedisVars.RedisVar_DeviceTokenAPIKey,
+                        RedisVars.RedisVar_DeviceStaticTokenAPIKey, RedisVars.RedisVar_ParticipantTokenAPIKey,
+                        RedisVars.RedisVar_ParticipantStaticTokenAPIKey, RedisVars.RedisVar_ServiceTokenAPIKey]
+    token_keys = dict()
+
+    # Authenticated users, participants and devices
+    identity_cache = IdentityCache()
+
+    # Key of the credentials verifications hashes, only known to this process
+    verification_secret = secrets.token_bytes(32)
+
+    # Models which events invalidate the identity cache, with their uuid field
+    identity_models = {TeraUser: 'user_uuid', TeraParticipant: 'participant_uuid', TeraDevice: 'device_uuid'}
 
     def __init__(self, config: ConfigManager):
 
@@ -109,6 +171,10 @@ class LoginModule(BaseModule):
                                                password=config.redis_config['password'],
                                                db=config.redis_config['db'])
 
+        LoginModule.__user_disabled_token_storage.redis = LoginModule.redis_client
+        LoginModule.__participant_disabled_token_storage.redis = LoginModule.redis_client
+        LoginModule.load_token_keys()
+
         BaseModule.__init__(self, ModuleNames.LOGIN_MODULE_NAME.value, config)
 
         self.login_manager = LoginManager()
@@ -116,26 +182,94 @@ class LoginModule(BaseModule):
         # Setup login manager
         self.setup_login_manager()
 
-        # Setup cleanup task for disabled tokens
-        self.cleanup_disabled_tokens_loop_task = task.LoopingCall(self.cleanup_disabled_tokens)
-
-    def cleanup_disabled_tokens(self):
-        print('LoginModule.cleanup_disabled_tokens task')
-        # Remove expired tokens from user tokens disabled storage
-        LoginModule.__user_disabled_token_storage.remove_all_expired_tokens(
-            self.redisGet(RedisVars.RedisVar_UserTokenAPIKey)
-        )
-        # Remove expired tokens from participant tokens disabled storage
-        LoginModule.__participant_disabled_token_storage.remove_all_expired_tokens(
-            self.redisGet(RedisVars.RedisVar_ParticipantTokenAPIKey)
-        )
-
     def setup_module_pubsub(self):
         # Additional subscribe here
 
-        # We wait until we are connected to redis
-        # Every 30 minutes?
-        loopDeferred = self.cleanup_disabled_tokens_loop_task.start(60.0 * 30)
+        # Tokens disabled by any process, filters are loaded once subscribed to not miss any of them
+        ret = self.subscribe_pattern_with_callback(RedisVars.RedisVar_DisabledTokenTopic,
+                                                   self.disabled_token_received)
+        ret.addCallback(self.load_disabled_tokens)
+
+        # Tokens keys changes
+        ret = self.subscribe_pattern_with_callback(RedisVars.RedisVar_TokenKeysTopic, self.token_keys_changed)
+        ret.addCallback(LoginModule.load_token_keys)
+
+        # Identities changes
+        for cls in LoginModule.identity_models:
+            self.subscribe_pattern_with_callback(create_module_event_topic_from_name(
+                ModuleNames.DATABASE_MODULE_NAME, cls.get_model_name()), self.identity_event_received)
+
+    @staticmethod
+    def load_token_keys(*args):
+        LoginModule.token_keys = dict(zip(LoginModule.token_keys_names,
+                                          LoginModule.redis_client.mget(LoginModule.token_keys_names)))
+
+    @staticmethod
+    def get_token_key(name: str):
+        key = LoginModule.token_keys.get(name)
+        if key is None:
+            # Not loaded yet (or not set when loaded)
+            key = LoginModule.redis_client.get(name)
+        return key
+
+    @staticmethod
+    def get_identity(key: str, load):
+        # Cached identity, or loaded from the database
+        identity = LoginModule.identity_cache.get(key)
+        if identity is None:
+            identity = load()
+            if identity:
+                LoginModule.identity_cache.set(key, getattr(identity, LoginModule.identity_models[type(identity)]),
+                                               identity)
+        return identity
+
+    @staticmethod
+    def get_verification_key(realm: str, username: str, password: str, password_hash: str) -> str:
+        # Identity cache key of a successful password verification. The password hash is part of the key, so a
+        # verification is never reused once the password has changed.
+        message = '\0'.join([realm, username, password, password_hash]).encode('utf-8')
+        return realm + '_password.' + hmac.new(LoginModule.verification_secret, message, hashlib.sha256).hexdigest()
+
+    def token_keys_changed(self, pattern, channel, message):
+        LoginModule.load_token_keys()
+        # Identities were only validated with the previous keys
+        LoginModule.identity_cache.clear()
+
+    def identity_event_received(self, pattern, channel, message):
+        try:
+            event_message = messages.TeraEvent()
+            if isinstance(message, str):
+                message = message.encode('utf-8')
+            event_message.ParseFromString(message)
+        except DecodeError as d:
+            print('LoginModule - DecodeError ', pattern, channel, message, d)
+            return
+
+        for any_msg in event_message.events:
+            database_event = messages.DatabaseEvent()
+            if not any_msg.Unpack(database_event) or database_event.type == messages.DatabaseEvent.DB_CREATE:
+                continue
+
+            uuid = None
+            for cls, uuid_field in LoginModule.identity_models.items():
+                if database_event.object_type == cls.get_model_name():
+                    uuid = json.loads(database_event.object_value).get(uuid_field)
+            if uuid:
+                LoginModule.identity_cache.invalidate(uuid)
+            else:
+                LoginModule.identity_cache.clear()
+
+    def load_disabled_tokens(self, *args):
+        LoginModule.__user_disabled_token_storage.load_filter()
+        LoginModule.__participant_disabled_token_storage.load_filter()
+
+    def disabled_token_received(self, pattern, channel, message):
+        if isinstance(message, bytes):
+            message = message.decode('utf-8')
+        name, jti = message.split('.', 1)
+        for storage in [LoginModule.__user_disabled_token_storage, LoginModule.__participant_disabled_token_storage]:
+            if storage.name == name:
+                storage.disabled_token_notified(jti)
 
     def notify_module_messages(self, pattern, channel, message):
         """
@@ -197,7 +331,8 @@ class LoginModule(BaseModule):
 
     def user_verify_password(self, username, password):
         # print('LoginModule - user_verify_password ', username)
-        tentative_user = TeraUser.get_user_by_username(username)
+        tentative_user = LoginModule.get_identity('user_username.' + username,
+                                                  lambda: TeraUser.get_user_by_username(username))
         if not tentative_user:
             self.logger.log_warning(self.module_name, 'Invalid username', username)
             return False
@@ -213,9 +348,18 @@ class LoginModule(BaseModule):
         if current_attempts >= 5:
             return False  # Too many attempts in a short period of time will result in temporary disabling (see below)
 
+        # Same credentials recently verified (bcrypt verification is slow by design)
+        verification_key = LoginModule.get_verification_key('user', username, password, tentative_user.user_password)
+        if tentative_user.user_enabled and LoginModule.identity_cache.has(verification_key):
+            tentative_user.authenticated = True
+            _request_ctx_stack.top.current_user = tentative_user
+            login_user(current_user, remember=True)
+            return True
+
         logged_user = TeraUser.verify_password(username=username, password=password, user=tentative_user)
 
         if logged_user:
+            LoginModule.identity_cache.set(verification_key, logged_user.user_uuid, logged_user)
             _request_ctx_stack.top.current_user = logged_user
 
             # print('user_verify_password, found user: ', current_user)
@@ -248,19 +392,19 @@ class LoginModule(BaseModule):
         """
         Tokens key is dynamic and stored in a redis variable for users.
         """
-        # Disabled tokens should never be used
-        if LoginModule.is_user_token_disabled(token_value):
-            return False
-
         import jwt
         try:
-            token_dict = jwt.decode(token_value, self.redisGet(RedisVars.RedisVar_UserTokenAPIKey),
+            token_dict = jwt.decode(token_value, LoginModule.get_token_key(RedisVars.RedisVar_UserTokenAPIKey),
                                     algorithms='HS256')
         except jwt.exceptions.PyJWTError as e:
             print(e)
             self.logger.log_error(self.module_name, 'User Token exception occurred')
             return False
 
+        # Disabled tokens should never be used
+        if LoginModule.__user_disabled_token_storage.is_disabled_jti(token_dict.get('jti')):
+            return False
+
         if token_dict['user_uuid'] and token_dict['exp']:
             # First verify expiration date
             expiration_date = datetime.datetime.fromtimestamp(token_dict['exp'])
@@ -270,7 +414,8 @@ class LoginModule(BaseModule):
                 self.logger.log_warning(self.module_name, 'Token expired for user', token_dict['user_uuid'])
                 return False
 
-            _request_ctx_stack.top.current_user = TeraUser.get_user_by_uuid(token_dict['user_uuid'])
+            _request_ctx_stack.top.current_user = LoginModule.get_identity(
+                'user.' + token_dict['user_uuid'], lambda: TeraUser.get_user_by_uuid(token_dict['user_uuid']))
             # TODO: Validate if user is also online?
             if current_user:
                 # current_user.update_last_online()
@@ -282,7 +427,8 @@ class LoginModule(BaseModule):
     def participant_verify_password(self, username, password):
         # print('LoginModule - participant_verify_password for ', username)
 
-        tentative_participant = TeraParticipant.get_participant_by_username(username)
+        tentative_participant = LoginModule.get_identity(
+            'participant_username.' + username, lambda: TeraParticipant.get_participant_by_username(username))
         if not tentative_participant:
             self.logger.log_warning(self.module_name, 'Invalid username', username)
             return False
@@ -298,11 +444,23 @@ class LoginModule(BaseModule):
         if current_attempts >= 5:
             return False  # Too many attempts in a short period of time will result in temporary disabling (see below)
 
+        # Same credentials recently verified (bcrypt verification is slow by design)
+        verification_key = LoginModule.get_verification_key('participant', username, password,
+                                                            tentative_participant.participant_password)
+        if tentative_participant.participant_enabled and tentative_participant.participant_login_enabled and \
+                LoginModule.identity_cache.has(verification_key):
+            tentative_participant.authenticated = True
+            _request_ctx_stack.top.current_participant = tentative_participant
+            login_user(current_participant, remember=True)
+            # Flag that participant has full API access
+            current_participant.fullAccess = True
+            return True
+
         logged_participant = TeraParticipant.verify_password(username=username, password=password,
                                                              participant=tentative_participant)
         if logged_participant:
-
-            _request_ctx_stack.top.current_participant = TeraParticipant.get_participant_by_username(username)
+            LoginModule.identity_cache.set(verification_key, logged_participant.participant_uuid, logged_participant)
+            _request_ctx_stack.top.current_participant = logged_participant
 
             # print('participant_verify_password, found participant: ', current_participant)
             # current_participant.update_last_online()
@@ -340,8 +498,11 @@ class LoginModule(BaseModule):
         """
         # print('LoginModule - participant_verify_token for ', token_value, self)
 
-        # TeraParticipant verifies if the participant is active and login is enabled
-        _request_ctx_stack.top.current_participant = TeraParticipant.get_participant_by_token(token_value)
+        # Only static tokens (without expiration) are stored in the DB
+        if 'exp' not in DisabledTokenStorage.get_token_claims(token_value):
+            # TeraParticipant verifies if the participant is active and login is enabled
+            _request_ctx_stack.top.current_participant = LoginModule.get_identity(
+                'participant_token.' + token_value, lambda: TeraParticipant.get_participant_by_token(token_value))
 
         if current_participant:
             # current_participant.update_last_online()
@@ -350,22 +511,23 @@ class LoginModule(BaseModule):
 
         # Second attempt, validate dynamic token
 
-        # Disabled tokens should never be used
-        if LoginModule.is_participant_token_disabled(token_value):
-            return False
-
         """
             Tokens key is dynamic and stored in a redis variable for participants.
         """
         import jwt
         try:
-            token_dict = jwt.decode(token_value, self.redisGet(RedisVars.RedisVar_ParticipantTokenAPIKey),
+            token_dict = jwt.decode(token_value,
+                                    LoginModule.get_token_key(RedisVars.RedisVar_ParticipantTokenAPIKey),
                                     algorithms='HS256')
         except jwt.exceptions.PyJWTError as e:
             print(e)
             self.logger.log_error(self.module_name, 'Participant Token exception occurred')
             return False
 
+        # Disabled tokens should never be used
+        if LoginModule.__participant_disabled_token_storage.is_disabled_jti(token_dict.get('jti')):
+            return False
+
         if token_dict['participant_uuid'] and token_dict['exp']:
 
             # First verify expiration date
@@ -377,8 +539,9 @@ class LoginModule(BaseModule):
                                         token_dict['participant_uuid'])
                 return False
 
-            _request_ctx_stack.top.current_participant = \
-                TeraParticipant.get_participant_by_uuid(token_dict['participant_uuid'])
+            _request_ctx_stack.top.current_participant = LoginModule.get_identity(
+                'participant.' + token_dict['participant_uuid'],
+                lambda: TeraParticipant.get_participant_by_uuid(token_dict['participant_uuid']))
 
         if current_participant:
             # Flag that participant has full API access
@@ -430,8 +593,9 @@ class LoginModule(BaseModule):
             # We are interested in the content of two fields : X-Device-Uuid, X-Participant-Uuid
             if request.headers.__contains__('X-Device-Uuid'):
                 # Load device from DB
-                _request_ctx_stack.top.current_device = TeraDevice.get_device_by_uuid(
-                    request.headers['X-Device-Uuid'])
+                _request_ctx_stack.top.current_device = LoginModule.get_identity(
+                    'device.' + request.headers['X-Device-Uuid'],
+                    lambda: TeraDevice.get_device_by_uuid(request.headers['X-Device-Uuid']))
 
                 # Device must be found and enabled
                 if current_device and current_device.device_enabled:
@@ -451,7 +615,8 @@ class LoginModule(BaseModule):
                 # Verify scheme and token
                 if scheme == 'OpenTera':
                     # Load device from DB
-                    _request_ctx_stack.top.current_device = TeraDevice.get_device_by_token(token)
+                    _request_ctx_stack.top.current_device = LoginModule.get_identity(
+                        'device_token.' + token, lambda: TeraDevice.get_device_by_token(token))
 
                     # Device must be found and enabled
                     if current_device and current_device.device_enabled:
@@ -465,9 +630,10 @@ class LoginModule(BaseModule):
             token_args = parser.parse_args(strict=False)
 
             # Verify token in params
-            if 'token' in token_args:
+            if token_args['token']:
                 # Load device from DB
-                _request_ctx_stack.top.current_device = TeraDevice.get_device_by_token(token_args['token'])
+                _request_ctx_stack.top.current_device = LoginModule.get_identity(
+                    'device_token.' + token_args['token'], lambda: TeraDevice.get_device_by_token(token_args['token']))
 
                 # Device must be found and enabled
                 if current_device and current_device.device_enabled:
@@ -512,7 +678,7 @@ class LoginModule(BaseModule):
 
                     try:
                         token_dict = jwt.decode(token,
-                                                LoginModule.redis_client.get(
+                                                LoginModule.get_token_key(
                                                     RedisVars.RedisVar_ServiceTokenAPIKey),
                                                 algorithms='HS256')
                         if 'service_uuid' in token_dict:
@@ -530,7 +696,7 @@ class LoginModule(BaseModule):
                 if token_args['token']:
                     try:
                         token_dict = jwt.decode(token_args['token'],
-                                                LoginModule.redis_client.get(
+                                                LoginModule.get_token_key(
                                                     RedisVars.RedisVar_ServiceTokenAPIKey),
                                                 algorithms='HS256')
                         if 'service_uuid' in token_dict:
@@ -549,34 +715,3 @@ class LoginModule(BaseModule):
             return gettext('Unauthorized'), 401
 
         return decorated
-
-
-# if __name__ == '__main__':
-#     storage = DisabledTokenStorage()
-#     import uuid
-#
-#     def create_user():
-#         new_user = TeraUser()
-#         new_user.user_enabled = True
-#         new_user.user_firstname = "No Access"
-#         new_user.user_lastname = "User!"
-#         new_user.user_profile = ""
-#         new_user.user_password = TeraUser.encrypt_password("user4")
-#         new_user.user_superadmin = False
-#         new_user.user_username = "test_user"
-#         new_user.user_uuid = str(uuid.uuid4())
-#         return new_user
-#
-#     key = 'testkey'
-#     user = create_user()
-#     token1 = user.get_token(key, expiration=1)
-#     token2 = user.get_token(key, expiration=3600)
-#
-#     storage.push_disabled_token(token1)
-#     storage.push_disabled_token(token2)
-#     disabled = storage.is_disabled_token(token1)
-#     disabled = storage.is_disabled_token(token2)
-#
-#     storage.remove_expired_tokens(key)
-#     print(storage)
-
@@ -17,6 +17,7 @@ from modules.DeviceEventManager import DeviceEventManager
 
 # Base class
 from modules.TwistedModule.TeraWebSocketServerProtocol import TeraWebSocketServerProtocol
+from modules.TwistedModule.TwistedModuleEventDispatcher import TwistedModuleEventDispatcher
 
 
 class TeraWebSocketServerDeviceProtocol(TeraWebSocketServerProtocol):
@@ -25,28 +26,18 @@ class TeraWebSocketServerDeviceProtocol(TeraWebSocketServerProtocol):
         TeraWebSocketServerProtocol.__init__(self, config=config)
         self.device = None
 
-    @defer.inlineCallbacks
-    def redisConnectionMade(self):
-        print('TeraWebSocketServerDeviceProtocol - redisConnectionMade (redis)', self)
+    def onOpen(self):
+        print('TeraWebSocketServerDeviceProtocol - onOpen', self)
 
         # This will wait until subscribe result is available...
         # ret = yield self.subscribe_pattern_with_callback(self.answer_topic(), self.redis_tera_message_received)
         # print(ret)
 
         if self.device:
-            # This will wait until subscribe result is available...
-            # Register only once to events from modules, will be filtered after
-            ret1 = yield self.subscribe_pattern_with_callback(create_module_event_topic_from_name(
-                ModuleNames.USER_MANAGER_MODULE_NAME), self.redis_event_message_received)
-
-            ret2 = yield self.subscribe_pattern_with_callback(create_module_event_topic_from_name(
-                ModuleNames.DATABASE_MODULE_NAME), self.redis_event_message_received)
+            # Register to events, will be filtered by the event manager
+            self.factory.event_dispatcher.register(TwistedModuleEventDispatcher.DEVICE, self.device.device_uuid, self)
 
-            # Direct events
-            ret3 = yield self.subscribe_pattern_with_callback(self.event_topic(), self.redis_event_message_received)
-
-            print(ret1, ret2, ret3)
-            # MAKE SURE TO SUBSCRIBE TO EVENTS BEFORE SENDING ONLINE MESSAGE
+            # MAKE SURE TO REGISTER TO EVENTS BEFORE SENDING ONLINE MESSAGE
             tera_message = self.create_tera_message(
                 create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME))
             device_connected = messages.DeviceEvent()
@@ -59,12 +50,13 @@ class TeraWebSocketServerDeviceProtocol(TeraWebSocketServerProtocol):
             tera_message.data.extend([any_message])
 
             # Publish to login module (bytes)
-            self.publish(create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
-                         tera_message.SerializeToString())
+            self.publishAsync(create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
+                              tera_message.SerializeToString())
         else:
             print(type(self).__name__, ' - closing - unauthorized.')
             super().onClose(False, None, None)
 
+    @defer.inlineCallbacks
     def onConnect(self, request):
         """
         Cannot send message at this stage, needs to verify connection here.
@@ -76,7 +68,7 @@ class TeraWebSocketServerDeviceProtocol(TeraWebSocketServerProtocol):
             my_id = request.params['id']
             print('TeraWebSocketServerDeviceProtocol - testing id: ', my_id, self)
 
-            value = self.redisGet(my_id[0])
+            value = yield self.redisGetAsync(my_id[0])
 
             if value is not None:
                 # Needs to be converted from bytes to string to work
@@ -88,7 +80,7 @@ class TeraWebSocketServerDeviceProtocol(TeraWebSocketServerProtocol):
                 if self.device is not None:
                     # Remove key
                     print('TeraWebSocketServerDeviceProtocol - OK! removing key', self)
-                    self.redisDelete(my_id[0])
+                    self.redisDeleteAsync(my_id[0])
 
                     # Create event manager
                     self.event_manager = DeviceEventManager(self.device)
@@ -104,7 +96,6 @@ class TeraWebSocketServerDeviceProtocol(TeraWebSocketServerProtocol):
         raise ConnectionDeny(ConnectionDeny.FORBIDDEN,
                              "TeraWebSocketServerDeviceProtocol - Websocket authentication failed (key, uuid).")
 
-    @defer.inlineCallbacks
     def onClose(self, wasClean, code, reason):
         print('TeraWebSocketServerDeviceProtocol - onClose', self, wasClean, code, reason)
         if self.device:
@@ -122,26 +113,16 @@ class TeraWebSocketServerDeviceProtocol(TeraWebSocketServerProtocol):
             tera_message.data.extend([any_message])
 
             # Publish to login module (bytes)
-            self.publish(create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
-                         tera_message.SerializeToString())
-
-            # Unsubscribe to events
-            ret1 = yield self.unsubscribe_pattern_with_callback(
-                create_module_event_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
-                self.redis_event_message_received)
+            self.publishAsync(create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
+                              tera_message.SerializeToString())
 
-            ret2 = yield self.unsubscribe_pattern_with_callback(
-                create_module_event_topic_from_name(ModuleNames.DATABASE_MODULE_NAME),
-                self.redis_event_message_received)
-
-            ret3 = yield self.unsubscribe_pattern_with_callback(self.event_topic(), self.redis_event_message_received)
+            # Unregister from events
+            self.factory.event_dispatcher.unregister(TwistedModuleEventDispatcher.DEVICE, self.device.device_uuid, self)
 
             # log information
             self.logger.log_info(self, "Device websocket disconnected",
                                  self.device.device_name, self.device.device_uuid)
 
-            print(ret1, ret2, ret3)
-
         # Unsubscribe to messages
         # ret = yield self.unsubscribe_pattern_with_callback(self.answer_topic(), self.redis_tera_message_received)
         # print(ret)
@@ -17,6 +17,7 @@ from twisted.internet import defer
 from modules.ParticipantEventManager import ParticipantEventManager
 
 from modules.TwistedModule.TeraWebSocketServerProtocol import TeraWebSocketServerProtocol
+from modules.TwistedModule.TwistedModuleEventDispatcher import TwistedModuleEventDispatcher
 
 
 class TeraWebSocketServerParticipantProtocol(TeraWebSocketServerProtocol):
@@ -25,30 +26,19 @@ class TeraWebSocketServerParticipantProtocol(TeraWebSocketServerProtocol):
         TeraWebSocketServerProtocol.__init__(self, config=config)
         self.participant = None
 
-    @defer.inlineCallbacks
-    def redisConnectionMade(self):
-        print('TeraWebSocketServerParticipantProtocol - redisConnectionMade (redis)', self)
+    def onOpen(self):
+        print('TeraWebSocketServerParticipantProtocol - onOpen', self)
 
         # This will wait until subscribe result is available...
         # ret = yield self.subscribe_pattern_with_callback(self.answer_topic(), self.redis_tera_message_received)
         # print(ret)
 
         if self.participant:
-            # This will wait until subscribe result is available...
-            # Register only once to events from modules, will be filtered after
-            # ret = yield self.subscribe(create_module_event_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME))
-            ret1 = yield self.subscribe_pattern_with_callback(create_module_event_topic_from_name(
-                ModuleNames.USER_MANAGER_MODULE_NAME), self.redis_event_message_received)
-
-            ret2 = yield self.subscribe_pattern_with_callback(create_module_event_topic_from_name(
-                ModuleNames.DATABASE_MODULE_NAME), self.redis_event_message_received)
-
-            # Direct events
-            ret3 = yield self.subscribe_pattern_with_callback(self.event_topic(), self.redis_event_message_received)
+            # Register to events, will be filtered by the event manager
+            self.factory.event_dispatcher.register(TwistedModuleEventDispatcher.PARTICIPANT,
+                                                   self.participant.participant_uuid, self)
 
-            print(ret1, ret2, ret3)
-
-            # MAKE SURE TO SUBSCRIBE TO EVENTS BEFORE SENDING ONLINE MESSAGE
+            # MAKE SURE TO REGISTER TO EVENTS BEFORE SENDING ONLINE MESSAGE
             tera_message = self.create_tera_message(
                 create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME))
             participant_connected = messages.ParticipantEvent()
@@ -63,13 +53,14 @@ class TeraWebSocketServerParticipantProtocol(TeraWebSocketServerProtocol):
             tera_message.data.extend([any_message])
 
             # Publish to login module (bytes)
-            self.publish(create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
-                         tera_message.SerializeToString())
+            self.publishAsync(create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
+                              tera_message.SerializeToString())
         else:
             print(type(self).__name__, ' - closing - unauthorized.')
             super().onClose(False, None, None)
 
 
+    @defer.inlineCallbacks
     def onConnect(self, request):
         """
         Cannot send message at this stage, needs to verify connection here.
@@ -81,7 +72,7 @@ class TeraWebSocketServerParticipantProtocol(TeraWebSocketServerProtocol):
             my_id = request.params['id']
             print('TeraWebSocketServerParticipantProtocol - testing id: ', my_id, self)
 
-            value = self.redisGet(my_id[0])
+            value = yield self.redisGetAsync(my_id[0])
 
             if value is not None:
                 # Needs to be converted from bytes to string to work
@@ -93,7 +84,7 @@ class TeraWebSocketServerParticipantProtocol(TeraWebSocketServerProtocol):
                 if self.participant is not None:
                     # Remove key
                     print('TeraWebSocketServerParticipantProtocol - OK! removing key', self)
-                    self.redisDelete(my_id[0])
+                    self.redisDeleteAsync(my_id[0])
 
                     # Set event manager
                     self.event_manager = ParticipantEventManager(self.participant)
@@ -109,7 +100,6 @@ class TeraWebSocketServerParticipantProtocol(TeraWebSocketServerProtocol):
         raise ConnectionDeny(ConnectionDeny.FORBIDDEN,
                              "TeraWebSocketServerParticipantProtocol - Websocket authentication failed (key, uuid).")
 
-    @defer.inlineCallbacks
     def onClose(self, wasClean, code, reason):
         print('TeraWebSocketServerParticipantProtocol - onClose', self, wasClean, code, reason)
         if self.participant:
@@ -129,27 +119,17 @@ class TeraWebSocketServerParticipantProtocol(TeraWebSocketServerProtocol):
             tera_message.data.extend([any_message])
 
             # Publish to login module (bytes)
-            self.publish(create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
-                         tera_message.SerializeToString())
-
-            # Unsubscribe to events
-            # ret = yield self.unsubscribe(create_module_event_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME))
-            ret1 = yield self.unsubscribe_pattern_with_callback(
-                create_module_event_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
-                self.redis_event_message_received)
+            self.publishAsync(create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
+                              tera_message.SerializeToString())
 
-            ret2 = yield self.unsubscribe_pattern_with_callback(
-                create_module_event_topic_from_name(ModuleNames.DATABASE_MODULE_NAME),
-                self.redis_event_message_received)
-
-            ret3 = yield self.unsubscribe_pattern_with_callback(self.event_topic(), self.redis_event_message_received)
+            # Unregister from events
+            self.factory.event_dispatcher.unregister(TwistedModuleEventDispatcher.PARTICIPANT,
+                                                     self.participant.participant_uuid, self)
 
             # log information
             self.logger.log_info(self, "Participant websocket disconnected",
                                  self.participant.participant_name, self.participant.participant_uuid)
 
-            print(ret1, ret2, ret3)
-
         # Unsubscribe to messages
         # ret = yield self.unsubscribe(self.answer_topic())
         # ret = yield self.unsubscribe_pattern_with_callback(self.answer_topic(), self.redis_tera_message_received)
@@ -3,10 +3,6 @@ from autobahn.twisted.websocket import WebSocketServerProtocol
 from autobahn.exception import Disconnected
 from autobahn.websocket.types import ConnectionDeny
 
-# OpenTera
-from opentera.redis.RedisClient import RedisClient
-from opentera.logging.LoggingClient import LoggingClient
-
 # Messages
 import opentera.messages.python as messages
 import datetime
@@ -18,27 +14,47 @@ from google.protobuf.message import DecodeError
 from twisted.internet import defer
 
 
-class TeraWebSocketServerProtocol(WebSocketServerProtocol, RedisClient):
+class TeraWebSocketServerProtocol(WebSocketServerProtocol):
+    """
+        Websocket connection. Redis clients and logger are shared by all connections and owned by the TwistedModule
+        (through the factory), events are received from the factory event dispatcher.
+    """
     def __init__(self, config):
-        RedisClient.__init__(self, config=config)
         WebSocketServerProtocol.__init__(self)
 
-        self.logger = LoggingClient(config, 'LoggingClient_' + self.__class__.__name__)
+        self.config = config
         self.event_manager = None
         self.registered_events = set()  # Collection of unique elements
 
     # def __del__(self):
     #     print("****- Deleting TeraWebSocketServerProtocol")
 
+    @property
+    def logger(self):
+        return self.factory.logger
+
+    # Redis calls are async (non-blocking), since the protocols run in the reactor thread
+    def publishAsync(self, topic, message):
+        d = self.factory.redis.publishAsync(topic, message)
+        d.addErrback(self.redis_error, 'publishAsync', topic)
+        return d
+
+    def redisGetAsync(self, key):
+        return self.factory.redis.redisGetAsync(key)
+
+    def redisDeleteAsync(self, key):
+        d = self.factory.redis.redisDeleteAsync(key)
+        d.addErrback(self.redis_error, 'redisDeleteAsync', key)
+        return d
+
+    def redis_error(self, failure, command, key):
+        print(type(self).__name__, 'TeraWebSocketServerProtocol - Redis error', command, key, failure)
+
     def onOpen(self):
         print(type(self).__name__, 'TeraWebSocketServerProtocol - onOpen')
-        # Moved handling code in redisConnectionMade...
-        # because it always occurs after onOpen...
 
     def onClose(self, wasClean, code, reason):
         print(type(self).__name__, 'TeraWebSocketServerProtocol - onClose')
-        self.redisClose()
-        self.logger.close()
 
     def onPong(self, payload):
         # print('onPong', payload)
@@ -86,38 +102,6 @@ class TeraWebSocketServerProtocol(WebSocketServerProtocol, RedisClient):
         # except ParseError as e:
         #     print('TeraWebSocketServerProtocol - Failure in redisMessageReceived', e)
 
-    def redis_event_message_received(self, pattern, channel, message):
-        print('TeraWebSocketServerProtocol - redis_event_message_received', pattern, channel, message)
-        # Forward as JSON to websocket
-        try:
-            event_message = messages.TeraEvent()
-            if isinstance(message, str):
-                ret = event_message.ParseFromString(message.encode('utf-8'))
-            elif isinstance(message, bytes):
-                ret = event_message.ParseFromString(message)
-
-            if self.event_manager:
-                # Filter events
-                filtered_event_message = self.event_manager.filter_events(event_message)
-
-                # Send if we still have events to send
-                if filtered_event_message.events:
-                    tera_message = messages.TeraMessage()
-                    tera_message.message.Pack(filtered_event_message)
-
-                    # Test message to JSON string
-                    json = MessageToJson(tera_message, including_default_value_fields=True)
-
-                    # Send to websocket (not in binary form)
-                    self.sendMessage(json.encode('utf-8'), False)
-
-        except DecodeError as d:
-            print('TeraWebSocketServerProtocol - DecodeError ', pattern, channel, message, d)
-        except ParseError as e:
-            print('TeraWebSocketServerProtocol - Failure in redisMessageReceived', e)
-        except Disconnected as e:
-            print('TeraWebSocketServerProtocol - Sending message on closed socket.', e)
-
     def create_tera_message(self, dest='', seq=0):
         tera_message = messages.TeraModuleMessage()
         tera_message.head.version = 1
@@ -138,7 +122,7 @@ class TeraWebSocketServerProtocol(WebSocketServerProtocol, RedisClient):
         any_message = messages.Any()
         any_message.Pack(event)
         message.events.extend([any_message])
-        self.publish(message.header.topic, message.SerializeToString())
+        self.publishAsync(message.header.topic, message.SerializeToString())
 
     def create_event_message(self, topic):
         event_message = messages.TeraEvent()
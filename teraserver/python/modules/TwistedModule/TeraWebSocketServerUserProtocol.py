@@ -17,6 +17,7 @@ from twisted.internet import defer
 from modules.UserEventManager import UserEventManager
 
 from modules.TwistedModule.TeraWebSocketServerProtocol import TeraWebSocketServerProtocol
+from modules.TwistedModule.TwistedModuleEventDispatcher import TwistedModuleEventDispatcher
 
 
 class TeraWebSocketServerUserProtocol(TeraWebSocketServerProtocol):
@@ -28,9 +29,8 @@ class TeraWebSocketServerUserProtocol(TeraWebSocketServerProtocol):
     # def __del__(self):
     #     print("****- Deleting TeraWebSocketServerUserProtocol")
 
-    @defer.inlineCallbacks
-    def redisConnectionMade(self):
-        print('TeraWebSocketServerUserProtocol - redisConnectionMade (redis)', self)
+    def onOpen(self):
+        print('TeraWebSocketServerUserProtocol - onOpen', self)
 
         # This will wait until subscribe result is available...
         # Subscribe to messages to the websocket
@@ -38,26 +38,10 @@ class TeraWebSocketServerUserProtocol(TeraWebSocketServerProtocol):
         # print(ret)
 
         if self.user:
-            # This will wait until subscribe result is available...
-            # Register only once to events from modules, will be filtered after
-
-            # Events from UserManagerModule
-            ret = yield self.subscribe_pattern_with_callback(create_module_event_topic_from_name(
-                ModuleNames.USER_MANAGER_MODULE_NAME), self.redis_event_message_received)
-
-            # Specific events from DatabaseModule
-            # We are specific otherwise we receive every database event
-            from opentera.db.models import EventNameClassMap
-
-            for name in EventNameClassMap:
-                ret = yield self.subscribe_pattern_with_callback(
-                    create_module_event_topic_from_name(ModuleNames.DATABASE_MODULE_NAME, name),
-                    self.redis_event_message_received)
-
-            # Direct events
-            ret = yield self.subscribe_pattern_with_callback(self.event_topic(), self.redis_event_message_received)
+            # Register to events, will be filtered by the event manager
+            self.factory.event_dispatcher.register(TwistedModuleEventDispatcher.USER, self.user.user_uuid, self)
 
-            # MAKE SURE TO SUBSCRIBE TO EVENTS BEFORE SENDING ONLINE MESSAGE
+            # MAKE SURE TO REGISTER TO EVENTS BEFORE SENDING ONLINE MESSAGE
             # Advertise that we have a new user
             tera_message = self.create_tera_message(
                 create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME))
@@ -71,12 +55,13 @@ class TeraWebSocketServerUserProtocol(TeraWebSocketServerProtocol):
             tera_message.data.extend([any_message])
 
             # Publish to UserManager module (bytes)
-            self.publish(create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
-                         tera_message.SerializeToString())
+            self.publishAsync(create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
+                              tera_message.SerializeToString())
         else:
             print(type(self).__name__, ' - closing - unauthorized.')
             super().onClose(False, None, None)
 
+    @defer.inlineCallbacks
     def onConnect(self, request):
         """
         Cannot send message at this stage, needs to verify connection here.
@@ -89,7 +74,7 @@ class TeraWebSocketServerUserProtocol(TeraWebSocketServerProtocol):
             my_id = request.params['id']
             print('TeraWebSocketServerUserProtocol - testing id: ', my_id, self)
 
-            value = self.redisGet(my_id[0])
+            value = yield self.redisGetAsync(my_id[0])
 
             if value is not None:
                 # Needs to be converted from bytes to string to work
@@ -101,7 +86,7 @@ class TeraWebSocketServerUserProtocol(TeraWebSocketServerProtocol):
                 if self.user is not None:
                     # Remove key
                     print('TeraWebSocketServerUserProtocol - OK! removing key', self)
-                    self.redisDelete(my_id[0])
+                    self.redisDeleteAsync(my_id[0])
 
                     # Create event manager
                     self.event_manager = UserEventManager(self.user)
@@ -116,7 +101,6 @@ class TeraWebSocketServerUserProtocol(TeraWebSocketServerProtocol):
         raise ConnectionDeny(ConnectionDeny.FORBIDDEN,
                              "TeraWebSocketServerUserProtocol Websocket authentication failed (key, uuid).")
 
-    @defer.inlineCallbacks
     def onClose(self, wasClean, code, reason):
         print('TeraWebSocketServerUserProtocol - onClose', self, wasClean, code, reason)
         if self.user:
@@ -134,24 +118,11 @@ class TeraWebSocketServerUserProtocol(TeraWebSocketServerProtocol):
             tera_message.data.extend([any_message])
 
             # Publish to login module (bytes)
-            self.publish(create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
-                         tera_message.SerializeToString())
-
-            # Unsubscribe to events
-            ret = yield self.unsubscribe_pattern_with_callback(
-                create_module_event_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
-                self.redis_event_message_received)
-
-            # Specific events from DatabaseModule
-            # We are specific otherwise we receive every database event
-            from opentera.db.models import EventNameClassMap
-
-            for name in EventNameClassMap:
-                ret = yield self.unsubscribe_pattern_with_callback(
-                    create_module_event_topic_from_name(ModuleNames.DATABASE_MODULE_NAME, name),
-                    self.redis_event_message_received)
+            self.publishAsync(create_module_message_topic_from_name(ModuleNames.USER_MANAGER_MODULE_NAME),
+                              tera_message.SerializeToString())
 
-            ret = yield self.unsubscribe_pattern_with_callback(self.event_topic(), self.redis_event_message_received)
+            # Unregister from events
+            self.factory.event_dispatcher.unregister(TwistedModuleEventDispatcher.USER, self.user.user_uuid, self)
 
             # log information
             self.logger.log_info(self, "User websocket disconnected", self.user.user_username, self.user.user_uuid)
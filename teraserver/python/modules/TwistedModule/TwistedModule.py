@@ -5,6 +5,7 @@ from opentera.config.ConfigManager import ConfigManager
 
 # Same directory
 from .TwistedModuleWebSocketServerFactory import TwistedModuleWebSocketServerFactory
+from .TwistedModuleEventDispatcher import TwistedModuleEventDispatcher
 from .TeraWebSocketServerUserProtocol import TeraWebSocketServerUserProtocol
 from .TeraWebSocketServerParticipantProtocol import TeraWebSocketServerParticipantProtocol
 from .TeraWebSocketServerDeviceProtocol import TeraWebSocketServerDeviceProtocol
@@ -82,17 +83,25 @@ class MySite(Site):
 
 class TwistedModule(BaseModule):
 
+    # Async redis connections pool is shared by all websockets
+    async_pool_size = 10
+
     def __init__(self, config: ConfigManager):
 
         BaseModule.__init__(self, ModuleNames.TWISTED_MODULE_NAME.value, config)
 
+        # Events are subscribed once for all websockets
+        self.event_dispatcher = TwistedModuleEventDispatcher()
+
         # create a Twisted Web resource for our WebSocket server
         # Use IP stored in config
 
         # USERS
         wss_user_factory = TwistedModuleWebSocketServerFactory(u"wss://%s:%d" % (self.config.server_config['hostname'],
                                                                                  self.config.server_config['port']),
-                                                               redis_config=self.config.redis_config)
+                                                               redis_config=self.config.redis_config,
+                                                               event_dispatcher=self.event_dispatcher,
+                                                               redis=self, logger=self.logger)
 
         wss_user_factory.protocol = TeraWebSocketServerUserProtocol
         wss_user_resource = WebSocketResource(wss_user_factory)
@@ -101,7 +110,9 @@ class TwistedModule(BaseModule):
         wss_participant_factory = TwistedModuleWebSocketServerFactory(u"wss://%s:%d" %
                                                                       (self.config.server_config['hostname'],
                                                                        self.config.server_config['port']),
-                                                                      redis_config=self.config.redis_config)
+                                                                      redis_config=self.config.redis_config,
+                                                                      event_dispatcher=self.event_dispatcher,
+                                                                      redis=self, logger=self.logger)
 
         wss_participant_factory.protocol = TeraWebSocketServerParticipantProtocol
         wss_participant_resource = WebSocketResource(wss_participant_factory)
@@ -110,7 +121,9 @@ class TwistedModule(BaseModule):
         wss_device_factory = TwistedModuleWebSocketServerFactory(u"wss://%s:%d" %
                                                                  (self.config.server_config['hostname'],
                                                                   self.config.server_config['port']),
-                                                                 redis_config=self.config.redis_config)
+                                                                 redis_config=self.config.redis_config,
+                                                                 event_dispatcher=self.event_dispatcher,
+                                                                 redis=self, logger=self.logger)
 
         wss_device_factory.protocol = TeraWebSocketServerDeviceProtocol
         wss_device_resource = WebSocketResource(wss_device_factory)
@@ -188,7 +201,7 @@ class TwistedModule(BaseModule):
 
     def setup_module_pubsub(self):
         # Additional subscribe
-        pass
+        self.event_dispatcher.setup_pubsub(self)
 
     def notify_module_messages(self, pattern, channel, message):
         """
@@ -0,0 +1,170 @@
+from opentera.modules.BaseModule import ModuleNames, create_module_event_topic_from_name
+from opentera.db.models.TeraDevice import TeraDevice
+from opentera.db.models.TeraParticipant import TeraParticipant
+from opentera.db.models.TeraSession import TeraSession
+
+from modules.EventManager import EventManager
+
+# Messages
+import opentera.messages.python as messages
+from google.protobuf.json_format import MessageToJson
+from google.protobuf.message import DecodeError
+
+# WebSockets
+from autobahn.exception import Disconnected
+
+
+class TwistedModuleEventDispatcher:
+    """
+        Dispatch the events to the websockets connections of this process.
+
+        Events are subscribed only once (on the TwistedModule redis connection) and decoded only once, then sent to the
+        connections that can be interested in each event. Connections are indexed by their kind (user, participant,
+        device) and uuid. Each connection event manager still has the final word on what is sent.
+    """
+    USER = 'user'
+    PARTICIPANT = 'participant'
+    DEVICE = 'device'
+
+    def __init__(self):
+        # Connections (websocket protocols) by kind and uuid
+        self.connections = {self.USER: dict(), self.PARTICIPANT: dict(), self.DEVICE: dict()}
+
+    def setup_pubsub(self, module):
+        # Events from UserManagerModule
+        module.subscribe_pattern_with_callback(create_module_event_topic_from_name(
+            ModuleNames.USER_MANAGER_MODULE_NAME), self.redis_event_message_received)
+
+        # Events from DatabaseModule (one topic for each class)
+        module.subscribe_pattern_with_callback(create_module_event_topic_from_name(
+            ModuleNames.DATABASE_MODULE_NAME, '*'), self.redis_event_message_received)
+
+        # Direct events (websocket.<kind>.<uuid>.events)
+        module.subscribe_pattern_with_callback('websocket.*.events', self.redis_event_message_received)
+
+    def register(self, kind: str, uuid: str, protocol):
+        self.connections[kind].setdefault(uuid, set()).add(protocol)
+
+    def unregister(self, kind: str, uuid: str, protocol):
+        protocols = self.connections[kind].get(uuid)
+        if protocols is not None:
+            protocols.discard(protocol)
+            if not protocols:
+                del self.connections[kind][uuid]
+
+    def get_connections(self, kind: str, uuids=None) -> set:
+        # All connections of that kind, or only those of the uuids
+        if uuids is None:
+            return set().union(*self.connections[kind].values())
+        protocols = set()
+        for uuid in uuids:
+            protocols.update(self.connections[kind].get(uuid, set()))
+        return protocols
+
+    def get_session_connections(self, session_uuid: str) -> set:
+        session = TeraSession.get_session_by_uuid(session_uuid)
+        if not session:
+            return set()
+        return self.get_connections(self.USER, [user.user_uuid for user in session.session_users]) | \
+            self.get_connections(self.PARTICIPANT, [participant.participant_uuid
+                                                    for participant in session.session_participants]) | \
+            self.get_connections(self.DEVICE, [device.device_uuid for device in session.session_devices])
+
+    def get_event_connections(self, event) -> set:
+        # Connections that can be interested by the event
+        if isinstance(event, messages.DeviceEvent):
+            protocols = self.get_connections(self.DEVICE, [event.device_uuid]) | self.get_connections(self.USER)
+            if self.connections[self.PARTICIPANT]:
+                device = TeraDevice.get_device_by_uuid(event.device_uuid)
+                if device:
+                    protocols |= self.get_connections(self.PARTICIPANT, [participant.participant_uuid
+                                                                         for participant in device.device_participants])
+            return protocols
+
+        if isinstance(event, messages.ParticipantEvent):
+            protocols = self.get_connections(self.PARTICIPANT, [event.participant_uuid]) | \
+                self.get_connections(self.USER)
+            if self.connections[self.DEVICE]:
+                participant = TeraParticipant.get_participant_by_uuid(event.participant_uuid)
+                if participant:
+                    protocols |= self.get_connections(self.DEVICE, [device.device_uuid
+                                                                    for device in participant.participant_devices])
+            return protocols
+
+        if isinstance(event, messages.UserEvent) or isinstance(event, messages.DatabaseEvent):
+            return self.get_connections(self.USER)
+
+        if isinstance(event, messages.JoinSessionEvent):
+            return self.get_connections(self.USER, event.session_users) | \
+                self.get_connections(self.PARTICIPANT, event.session_participants) | \
+                self.get_connections(self.DEVICE, event.session_devices)
+
+        if isinstance(event, messages.LeaveSessionEvent) or isinstance(event, messages.JoinSessionReplyEvent):
+            return self.get_session_connections(event.session_uuid)
+
+        if isinstance(event, messages.StopSessionEvent):
+            return self.get_connections(self.USER) | self.get_connections(self.PARTICIPANT) | \
+                self.get_connections(self.DEVICE)
+
+        return set()
+
+    def get_topic_connections(self, channel: str) -> set:
+        # Connections of a direct events topic: websocket.<kind>.<uuid>.events
+        topic = channel.split('.')
+        if len(topic) == 4 and topic[1] in self.connections:
+            return self.get_connections(topic[1], [topic[2]])
+        return set()
+
+    def redis_event_message_received(self, pattern, channel, message):
+        if not any(self.connections.values()):
+            return
+
+        try:
+            event_message = messages.TeraEvent()
+            if isinstance(message, str):
+                message = message.encode('utf-8')
+            event_message.ParseFromString(message)
+        except DecodeError as d:
+            print('TwistedModuleEventDispatcher - DecodeError ', pattern, channel, message, d)
+            return
+
+        if isinstance(channel, bytes):
+            channel = channel.decode('utf-8')
+        direct_protocols = None
+        if channel.startswith('websocket.'):
+            direct_protocols = self.get_topic_connections(channel)
+            if not direct_protocols:
+                return
+
+        # Events (indexes) to send to each connection
+        protocols_events = dict()
+        for index, any_msg in enumerate(event_message.events):
+            event = EventManager.unpack_event(any_msg)
+            if event is None:
+                print('TwistedModuleEventDispatcher - Unknown event, removing: ', any_msg)
+                continue
+
+            protocols = direct_protocols if direct_protocols is not None else self.get_event_connections(event)
+            for protocol in protocols:
+                if protocol.event_manager and protocol.event_manager.filter_event(event):
+                    protocols_events.setdefault(protocol, []).append(index)
+
+        # Same filtered message is converted to json only once
+        json_messages = dict()
+        for protocol, events_indexes in protocols_events.items():
+            events_indexes = tuple(events_indexes)
+            if events_indexes not in json_messages:
+                filtered_event_message = messages.TeraEvent()
+                filtered_event_message.header.CopyFrom(event_message.header)
+                filtered_event_message.events.extend([event_message.events[index] for index in events_indexes])
+
+                tera_message = messages.TeraMessage()
+                tera_message.message.Pack(filtered_event_message)
+                json_messages[events_indexes] = MessageToJson(tera_message, including_default_value_fields=True)\
+                    .encode('utf-8')
+
+            try:
+                # Send to websocket (not in binary form)
+                protocol.sendMessage(json_messages[events_indexes], False)
+            except Disconnected as e:
+                print('TwistedModuleEventDispatcher - Sending message on closed socket.', e)
@@ -6,6 +6,10 @@ class TwistedModuleWebSocketServerFactory(WebSocketServerFactory):
     def __init__(self, *args, **kwargs):
         # Get the argument for this class, then continue with init on base class
         self.config = kwargs.pop('redis_config', None)
+        self.event_dispatcher = kwargs.pop('event_dispatcher', None)
+        # Shared by all protocols (connections)
+        self.redis = kwargs.pop('redis', None)
+        self.logger = kwargs.pop('logger', None)
         WebSocketServerFactory.__init__(self, *args, **kwargs)
 
         # Manage automatic ping/pong to make sure connection persists though proxy
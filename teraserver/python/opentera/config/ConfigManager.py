@@ -45,6 +45,9 @@ class ConfigManager:
         self.server_config['hostname'] = '127.0.0.1'
         self.server_config['port'] = 4040
         self.server_config['enable_docs'] = True
+        self.server_config['pagination_default_page_size'] = 100
+        self.server_config['pagination_max_page_size'] = 1000
+        self.server_config['database_events_outbox'] = False
 
         # Database fake config
         database_required_fields = ['name', 'port', 'url', 'username', 'password']
@@ -82,6 +85,17 @@ class ConfigManager:
         if 'enable_docs' not in config:
             config['enable_docs'] = False
 
+        # Add optional pagination page sizes
+        if 'pagination_default_page_size' not in config:
+            config['pagination_default_page_size'] = 100
+
+        if 'pagination_max_page_size' not in config:
+            config['pagination_max_page_size'] = 1000
+
+        # Add optional database events outbox (at least once delivery)
+        if 'database_events_outbox' not in config:
+            config['database_events_outbox'] = False
+
         return rval
 
     @staticmethod
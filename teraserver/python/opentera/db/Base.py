@@ -8,6 +8,72 @@ from flask_sqlalchemy import SQLAlchemy
 db = SQLAlchemy()
 
 
+def datetime_to_json(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def timedelta_to_json(value):
+    if isinstance(value, datetime.timedelta):
+        # Strip too many zeros at the end
+        value_times = str(value).split(".")
+        if len(value_times) > 1:
+            value_times[1] = value_times[1][0:3]
+            return value_times[0] + '.' + value_times[1]
+        return value_times[0]
+    return value
+
+
+def value_to_json(value):
+    return timedelta_to_json(datetime_to_json(value))
+
+
+class ModelSerializer:
+    """
+        Properties of a model class, compiled once from its mapper, used to serialize the model to json, clean values
+        and build the json schema without browsing all attributes of the class each time.
+    """
+    def __init__(self, model_class):
+        from sqlalchemy import inspect as sqlalchemy_inspect
+        mapper = sqlalchemy_inspect(model_class)
+        relationships = set(mapper.relationships.keys())
+        columns = {column_attr.key: column_attr.columns[0] for column_attr in mapper.column_attrs}
+        model_name = model_class.get_model_name()
+
+        # All properties names of the class, in the same (sorted) order as dir()
+        self.properties = set()
+        # List of (name, converter) to serialize, relationships excluded
+        self.json_fields = []
+        # List of (name, column) used in the json schema
+        self.schema_columns = []
+
+        for name in dir(model_class):
+            if not model_class.is_valid_property_name(name):
+                continue
+            value = getattr(model_class, name)
+            if not model_class.is_valid_property_value(value):
+                continue
+            self.properties.add(name)
+
+            if name in columns:
+                column = columns[name]
+                self.json_fields.append((name, ModelSerializer.column_converter(column)))
+                if name.startswith(model_name) or name.startswith('id'):
+                    self.schema_columns.append((name, column))
+            elif name not in relationships:
+                # Other class attributes (constants, flags, ...)
+                self.json_fields.append((name, value_to_json))
+
+    @staticmethod
+    def column_converter(column):
+        if isinstance(column.type, sqlalchemy.sql.sqltypes.DateTime):
+            return datetime_to_json
+        if isinstance(column.type, sqlalchemy.sql.sqltypes.Interval):
+            return timedelta_to_json
+        return None
+
+
 class BaseModel:
 
     version_id = db.Column(db.BigInteger, nullable=False, default=time.time()*1000)
@@ -22,24 +88,23 @@ class BaseModel:
     def to_json(self, ignore_fields=None):
         if ignore_fields is None:
             ignore_fields = []
+        ignore_fields = set(ignore_fields)
         pr = {}
-        for name in dir(self):
-            if self.is_valid_property_name(name) and name not in ignore_fields:
+        for name, converter in self.get_serializer().json_fields:
+            if name not in ignore_fields:
                 value = getattr(self, name)
-                if self.is_valid_property_value(value):
-                    if isinstance(value, datetime.datetime):
-                        value = value.isoformat()
-                    if isinstance(value, datetime.timedelta):
-                        # Strip too many zeros at the end
-                        value_times = str(value).split(".")
-                        if len(value_times) > 1:
-                            value_times[1] = value_times[1][0:3]
-                            value = value_times[0] + '.' + value_times[1]
-                        else:
-                            value = value_times[0]
-                    pr[name] = value
+                pr[name] = converter(value) if converter else value
         return pr
 
+    @classmethod
+    def get_serializer(cls) -> ModelSerializer:
+        # Compiled once per model class, when first needed (all mappers must be configured)
+        serializer = cls.__dict__.get('_model_serializer')
+        if serializer is None:
+            serializer = ModelSerializer(cls)
+            cls._model_serializer = serializer
+        return serializer
+
     def from_json(self, json, ignore_fields=None):
         if ignore_fields is None:
             ignore_fields = []
@@ -68,6 +133,16 @@ class BaseModel:
         # Default is None, will not be sent
         return None
 
+    @classmethod
+    def to_json_create_events(cls, targets: list) -> list:
+        # Create events of objects created in the same flush, None items will not be sent
+        return [target.to_json_create_event() for target in targets]
+
+    @classmethod
+    def to_json_update_events(cls, targets: list) -> list:
+        # Update events of objects updated in the same flush, None items will not be sent
+        return [target.to_json_update_event() for target in targets]
+
     @staticmethod
     def is_valid_property_name(name: str) -> bool:
         return not name.startswith('__') and not name.startswith('_') and not name.startswith('query') and \
@@ -80,21 +155,8 @@ class BaseModel:
     @classmethod
     def clean_values(cls, values: dict):
         # This method is used to remove item from the values dict that are not properties of the object
-        obj_properties = list()
-
-        # Build available properties
-        for name in dir(cls):
-            value = getattr(cls, name)
-            if cls.is_valid_property_name(name) and cls.is_valid_property_value(value):
-                obj_properties.append(name)
-
-        # Remove any property not in the available list
-        clean_values = values.copy()
-        for value in values:
-            if value not in obj_properties:
-                del clean_values[value]
-
-        return clean_values
+        obj_properties = cls.get_serializer().properties
+        return {name: value for name, value in values.items() if name in obj_properties}
 
     @classmethod
     def get_count(cls, filters: dict = None) -> int:
@@ -173,36 +235,30 @@ class BaseModel:
         # Get model prefix (name)
         model_name = cls.get_model_name()
 
-        # Browse each
         pr_dict = dict()
-        for name in dir(cls):
-            value = getattr(cls, name)
-            if cls.is_valid_property_name(name) and cls.is_valid_property_value(value) and \
-                    (name.startswith(model_name) or name.startswith('id')):
-                # Ok so far, do we have a column and not a relationship or something else?
-                if 'ColumnProperty' in str(type(value.prop)):
-                    # Get correct data type
-                    data_type = 'object'
-                    data_format = None
-                    column_type = str(value.prop.columns[0].type).lower()
-                    default_value = value.prop.columns[0].default
-                    if 'string' in column_type or 'timestamp' in column_type or 'varchar' in column_type:
-                        data_type = 'string'
-                        if 'uuid' in name:
-                            data_format = 'uuid'
-                        if 'timestamp' in column_type:
-                            data_format = 'date-time'
-                    if 'integer' in column_type:
-                        data_type = 'integer'
-                    if 'boolean' in column_type:
-                        data_type = 'boolean'
-
-                    pr_dict[name] = {'type': data_type, 'required': not value.prop.columns[0].nullable}
-                    if data_format:
-                        pr_dict[name]['format'] = data_format
-                    if default_value:
-                        if hasattr(default_value, 'arg'):
-                            pr_dict[name]['default'] = default_value.arg
+        for name, column in cls.get_serializer().schema_columns:
+            # Get correct data type
+            data_type = 'object'
+            data_format = None
+            column_type = str(column.type).lower()
+            default_value = column.default
+            if 'string' in column_type or 'timestamp' in column_type or 'varchar' in column_type:
+                data_type = 'string'
+                if 'uuid' in name:
+                    data_format = 'uuid'
+                if 'timestamp' in column_type:
+                    data_format = 'date-time'
+            if 'integer' in column_type:
+                data_type = 'integer'
+            if 'boolean' in column_type:
+                data_type = 'boolean'
+
+            pr_dict[name] = {'type': data_type, 'required': not column.nullable}
+            if data_format:
+                pr_dict[name]['format'] = data_format
+            if default_value:
+                if hasattr(default_value, 'arg'):
+                    pr_dict[name]['default'] = default_value.arg
 
         schema = {model_name: {'properties': pr_dict, 'type': 'object'}}
 
@@ -213,19 +269,5 @@ class BaseModel:
         if not ignore_fields:
             ignore_fields = []
 
-        # Get model prefix (name)
-        model_name = cls.get_model_name()
-        missing_fields = []
-
-        # Browse each
-        pr_dict = dict()
-        for name in dir(cls):
-            value = getattr(cls, name)
-            if cls.is_valid_property_name(name) and cls.is_valid_property_value(value) and \
-                    (name.startswith(model_name) or name.startswith('id')):
-                # Ok so far, check if column is required or not
-                if 'ColumnProperty' in str(type(value.prop)):
-                    if not value.prop.columns[0].nullable and name not in json_data and name not in ignore_fields:
-                        missing_fields.append(name)
-
-        return missing_fields
+        return [name for name, column in cls.get_serializer().schema_columns
+                if not column.nullable and name not in json_data and name not in ignore_fields]
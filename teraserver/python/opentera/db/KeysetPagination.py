@@ -0,0 +1,124 @@
+import base64
+import binascii
+import datetime
+import json
+
+from sqlalchemy import and_, or_
+
+
+class KeysetPagination:
+    """
+        Keyset (cursor) pagination of a list, sorted on stable sort keys ending with a unique column. The cursor is an
+        opaque string holding the sort keys values of the last item of a page: the next page starts after that item, so
+        that a deep page is read as fast as the first one (no offset) and is not shifted by items added meanwhile.
+
+        Sort keys are (column, descending) tuples, for example [(TeraSession.session_start_datetime, True),
+        (TeraSession.id_session, True)]. Sort keys columns can't be null.
+
+        A database query is paginated with apply(), then its result with get_page() (or both with fetch()). A list that
+        was already built is paginated with paginate().
+    """
+    # Page size when not specified, and maximum page size. Set from the server configuration.
+    default_page_size = 100
+    max_page_size = 1000
+
+    def __init__(self, sort_keys: list, page_size: int = None, cursor: str = None):
+        if page_size is None:
+            page_size = KeysetPagination.default_page_size
+        if page_size < 1:
+            raise ValueError('Invalid page size')
+        self.sort_keys = sort_keys
+        self.page_size = min(page_size, KeysetPagination.max_page_size)
+        self.after = self.decode_cursor(cursor) if cursor else None
+        # Cursor of the next page, None if the page is the last one
+        self.next_cursor = None
+        self.fetched = False
+
+    @staticmethod
+    def from_args(sort_keys: list, args: dict):
+        # Pagination requested in the query arguments (page_size and cursor), None if not requested. Raises ValueError
+        # if the page size or the cursor is invalid.
+        if args.get('page_size') is None and not args.get('cursor'):
+            return None
+        return KeysetPagination(sort_keys, page_size=args.get('page_size'), cursor=args.get('cursor'))
+
+    @staticmethod
+    def query_all(query, pagination=None) -> list:
+        # Query result, or its current page if paginated
+        if pagination:
+            return pagination.fetch(query)
+        return query.all()
+
+    def get_signature(self) -> str:
+        return ','.join([column.key + ('-' if descending else '+') for column, descending in self.sort_keys])
+
+    def encode_cursor(self, item) -> str:
+        values = []
+        for column, _ in self.sort_keys:
+            value = getattr(item, column.key)
+            if isinstance(value, datetime.datetime):
+                value = {'datetime': value.isoformat()}
+            values.append(value)
+        cursor = json.dumps({'keys': self.get_signature(), 'values': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(cursor.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> list:
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8'))
+            if cursor['keys'] != self.get_signature() or len(cursor['values']) != len(self.sort_keys):
+                raise ValueError('Cursor of another list')
+            return [datetime.datetime.fromisoformat(value['datetime']) if isinstance(value, dict) else value
+                    for value in cursor['values']]
+        except (binascii.Error, UnicodeDecodeError, TypeError, KeyError, ValueError):
+            raise ValueError('Invalid cursor')
+
+    def apply(self, query):
+        # Items after the cursor, in the sort keys order, with one more item to know if there is a next page
+        if self.after is not None:
+            conditions = []
+            for index, (column, descending) in enumerate(self.sort_keys):
+                previous_keys = [previous_column == self.after[previous_index]
+                                 for previous_index, (previous_column, _) in enumerate(self.sort_keys[:index])]
+                after_key = column < self.after[index] if descending else column > self.after[index]
+                conditions.append(and_(*previous_keys, after_key))
+            # Redundant bound on the first sort key, so that its index gives the start of the page
+            first_column, first_descending = self.sort_keys[0]
+            query = query.filter(first_column <= self.after[0] if first_descending else first_column >= self.after[0],
+                                 or_(*conditions))
+
+        query = query.order_by(None).order_by(*[column.desc() if descending else column.asc()
+                                                for column, descending in self.sort_keys])
+        return query.limit(self.page_size + 1)
+
+    def get_page(self, items: list) -> list:
+        # Items of a query returned by apply()
+        self.fetched = True
+        self.next_cursor = None
+        if len(items) > self.page_size:
+            items = items[:self.page_size]
+            self.next_cursor = self.encode_cursor(items[-1])
+        return items
+
+    def fetch(self, query) -> list:
+        return self.get_page(self.apply(query).all())
+
+    def is_after_cursor(self, item) -> bool:
+        if self.after is None:
+            return True
+        for (column, descending), after_value in zip(self.sort_keys, self.after):
+            value = getattr(item, column.key)
+            if value != after_value:
+                return value < after_value if descending else value > after_value
+        return False
+
+    def paginate(self, items: list) -> list:
+        # Page of a list that was already built (missing items are ignored)
+        items = [item for item in items if item is not None and self.is_after_cursor(item)]
+        # Stable sorts, from the last sort key to the first one
+        for column, descending in reversed(self.sort_keys):
+            items.sort(key=lambda sort_item: getattr(sort_item, column.key), reverse=descending)
+        return self.get_page(items[:self.page_size + 1])
+
+    def to_json(self, items: list) -> dict:
+        # Reply of a paginated list
+        return {'items': items, 'next': self.next_cursor}
@@ -1,4 +1,5 @@
 from opentera.db.Base import db, BaseModel
+from opentera.db.KeysetPagination import KeysetPagination
 import uuid
 # from enum import Enum, unique
 from sqlalchemy import or_
@@ -19,19 +20,20 @@ from sqlalchemy import or_
 class TeraAsset(db.Model, BaseModel):
     __tablename__ = 't_assets'
     id_asset = db.Column(db.Integer, db.Sequence('id_asset_sequence'), primary_key=True, autoincrement=True)
-    id_session = db.Column(db.Integer, db.ForeignKey("t_sessions.id_session", ondelete='cascade'), nullable=False)
+    id_session = db.Column(db.Integer, db.ForeignKey("t_sessions.id_session", ondelete='cascade'), nullable=False,
+                           index=True)
     # Creator of that asset - multiple could be used to indicate, for example, an asset created by a device for a
     # specific participant in a session
-    id_device = db.Column(db.Integer, db.ForeignKey("t_devices.id_device"), nullable=True)
-    id_participant = db.Column(db.Integer, db.ForeignKey("t_participants.id_participant"), nullable=True)
-    id_user = db.Column(db.Integer, db.ForeignKey("t_users.id_user"), nullable=True)
-    id_service = db.Column(db.Integer, db.ForeignKey("t_services.id_service"), nullable=True)
+    id_device = db.Column(db.Integer, db.ForeignKey("t_devices.id_device"), nullable=True, index=True)
+    id_participant = db.Column(db.Integer, db.ForeignKey("t_participants.id_participant"), nullable=True, index=True)
+    id_user = db.Column(db.Integer, db.ForeignKey("t_users.id_user"), nullable=True, index=True)
+    id_service = db.Column(db.Integer, db.ForeignKey("t_services.id_service"), nullable=True, index=True)
     # Put a description of the asset here
     asset_name = db.Column(db.String, nullable=False)
 
     asset_uuid = db.Column(db.String(36), nullable=False, unique=True)
     asset_service_uuid = db.Column(db.String(36), db.ForeignKey("t_services.service_uuid", ondelete='cascade'),
-                                   nullable=False)
+                                   nullable=False, index=True)
     asset_type = db.Column(db.String, nullable=False)  # MIME Type
     asset_datetime = db.Column(db.TIMESTAMP(timezone=True), nullable=True)
 
@@ -129,47 +131,58 @@ class TeraAsset(db.Model, BaseModel):
         return TeraAsset.query.filter_by(asset_uuid=asset_uuid).first()
 
     @staticmethod
-    def get_assets_for_device(device_id: int):
+    def get_pagination_sort_keys() -> list:
+        return [(TeraAsset.id_asset, False)]
+
+    @staticmethod
+    def get_assets_for_device(device_id: int, pagination: KeysetPagination = None):
         # return TeraAsset.query.filter_by(id_device=device_id).all()
         from opentera.db.models.TeraSession import TeraSession
-        return TeraAsset.query.join(TeraSession).filter(or_(TeraSession.session_devices.any(
-            id_device=device_id), TeraAsset.id_device == device_id)).all()
+        return KeysetPagination.query_all(TeraAsset.query.join(TeraSession).filter(or_(
+            TeraSession.session_devices.any(id_device=device_id), TeraAsset.id_device == device_id)), pagination)
 
     @staticmethod
-    def get_assets_for_user(user_id: int):
+    def get_assets_for_user(user_id: int, pagination: KeysetPagination = None):
         from opentera.db.models.TeraSession import TeraSession
-        return TeraAsset.query.join(TeraSession).filter(or_(TeraSession.session_users.any(
-            id_user=user_id), TeraAsset.id_user == user_id)).all()
+        return KeysetPagination.query_all(TeraAsset.query.join(TeraSession).filter(or_(
+            TeraSession.session_users.any(id_user=user_id), TeraAsset.id_user == user_id)), pagination)
 
     @staticmethod
-    def get_assets_for_session(session_id: int):
-        return TeraAsset.query.filter_by(id_session=session_id).all()
+    def get_assets_for_session(session_id: int, pagination: KeysetPagination = None):
+        return KeysetPagination.query_all(TeraAsset.query.filter_by(id_session=session_id), pagination)
 
     @staticmethod
-    def get_assets_for_participant(part_id: int):
+    def get_assets_for_participant(part_id: int, pagination: KeysetPagination = None):
+        from opentera.db.models.TeraSession import TeraSession
+        return KeysetPagination.query_all(TeraAsset.query.join(TeraSession).filter(or_(
+            TeraSession.session_participants.any(id_participant=part_id), TeraAsset.id_participant == part_id)),
+            pagination)
+
+    @staticmethod
+    def get_assets_count_for_participant(part_id: int) -> int:
         from opentera.db.models.TeraSession import TeraSession
         return TeraAsset.query.join(TeraSession).filter(or_(TeraSession.session_participants.any(
-            id_participant=part_id), TeraAsset.id_participant == part_id)).all()
+            id_participant=part_id), TeraAsset.id_participant == part_id)).count()
 
     @staticmethod
     def get_assets_owned_by_service(service_uuid: str):
         return TeraAsset.query.filter_by(asset_service_uuid=service_uuid).all()
 
     @staticmethod
-    def get_assets_created_by_service(service_id: int):
-        return TeraAsset.query.filter_by(id_service=service_id).all()
+    def get_assets_created_by_service(service_id: int, pagination: KeysetPagination = None):
+        return KeysetPagination.query_all(TeraAsset.query.filter_by(id_service=service_id), pagination)
 
     @staticmethod
-    def get_assets_created_by_user(user_id: int):
-        return TeraAsset.query.filter_by(id_user=user_id).all()
+    def get_assets_created_by_user(user_id: int, pagination: KeysetPagination = None):
+        return KeysetPagination.query_all(TeraAsset.query.filter_by(id_user=user_id), pagination)
 
     @staticmethod
-    def get_assets_created_by_participant(participant_id: int):
-        return TeraAsset.query.filter_by(id_participant=participant_id).all()
+    def get_assets_created_by_participant(participant_id: int, pagination: KeysetPagination = None):
+        return KeysetPagination.query_all(TeraAsset.query.filter_by(id_participant=participant_id), pagination)
 
     @staticmethod
-    def get_assets_created_by_device(device_id: int):
-        return TeraAsset.query.filter_by(id_device=device_id).all()
+    def get_assets_created_by_device(device_id: int, pagination: KeysetPagination = None):
+        return KeysetPagination.query_all(TeraAsset.query.filter_by(id_device=device_id), pagination)
 
     @staticmethod
     def get_access_token(asset_uuids: list, token_key: str, requester_uuid: str, expiration=3600):
@@ -188,6 +201,17 @@ class TeraAsset(db.Model, BaseModel):
 
         return jwt.encode(payload, token_key, algorithm='HS256')
 
+    @staticmethod
+    def get_services_access_tokens(assets: list, token_key: str, requester_uuid: str, expiration=3600) -> dict:
+        # One access token for each service, covering all the assets of that service
+        services_assets_uuids = dict()
+        for asset in assets:
+            services_assets_uuids.setdefault(asset.asset_service_uuid, []).append(asset.asset_uuid)
+
+        return {service_uuid: TeraAsset.get_access_token(asset_uuids=asset_uuids, token_key=token_key,
+                                                         requester_uuid=requester_uuid, expiration=expiration)
+                for service_uuid, asset_uuids in services_assets_uuids.items()}
+
     @classmethod
     def insert(cls, asset):
         # Generate UUID
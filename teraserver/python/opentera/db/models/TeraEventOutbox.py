@@ -0,0 +1,34 @@
+from opentera.db.Base import db, BaseModel
+
+
+class TeraEventOutbox(db.Model, BaseModel):
+    """
+        Database events messages (serialized TeraEvent) written in the transaction that changed the objects, and
+        deleted once published. Messages still in the outbox after a while were not published (Redis error, server
+        stopped before the end of the commit) and are published again, so that events are delivered at least once.
+    """
+    __tablename__ = 't_events_outbox'
+    id_event_outbox = db.Column(db.Integer, db.Sequence('id_event_outbox_sequence'), primary_key=True,
+                                autoincrement=True)
+    event_outbox_topic = db.Column(db.String, nullable=False)
+    event_outbox_message = db.Column(db.LargeBinary, nullable=False)
+    event_outbox_datetime = db.Column(db.TIMESTAMP(timezone=True), nullable=False, index=True)
+
+    @staticmethod
+    def add_message(session, topic: str, message: bytes, message_datetime) -> int:
+        # Core insert in the current transaction of the database session (no flush). Returns the message id.
+        result = session.execute(TeraEventOutbox.__table__.insert().values(event_outbox_topic=topic,
+                                                                           event_outbox_message=message,
+                                                                           event_outbox_datetime=message_datetime))
+        return result.inserted_primary_key[0]
+
+    @staticmethod
+    def get_messages_before(max_datetime, limit: int = 1000) -> list:
+        return TeraEventOutbox.query.filter(TeraEventOutbox.event_outbox_datetime <= max_datetime)\
+            .order_by(TeraEventOutbox.id_event_outbox).limit(limit).all()
+
+    @staticmethod
+    def delete_messages(connection, messages_ids: list):
+        if messages_ids:
+            connection.execute(TeraEventOutbox.__table__.delete().where(
+                TeraEventOutbox.id_event_outbox.in_(messages_ids)))
@@ -8,12 +8,10 @@ import datetime
 from passlib.hash import bcrypt
 
 
-# Generator for jti
+# Generator for jti, unique between processes since tokens are disabled by jti
 def infinite_jti_sequence():
-    num = 0
     while True:
-        yield num
-        num += 1
+        yield str(uuid.uuid4())
 
 
 # Initialize generator, call next(participant_jti_generator) to get next sequence number
@@ -34,9 +32,10 @@ class TeraParticipant(db.Model, BaseModel):
     participant_enabled = db.Column(db.Boolean, nullable=False, default=True)
     participant_login_enabled = db.Column(db.Boolean, nullable=False, default=False)
     id_participant_group = db.Column(db.Integer, db.ForeignKey('t_participants_groups.id_participant_group',
-                                                               ondelete='cascade'), nullable=True)
+                                                               ondelete='cascade'), nullable=True, index=True)
 
-    id_project = db.Column(db.Integer, db.ForeignKey('t_projects.id_project', ondelete='cascade'), nullable=False)
+    id_project = db.Column(db.Integer, db.ForeignKey('t_projects.id_project', ondelete='cascade'), nullable=False,
+                           index=True)
 
     participant_devices = db.relationship("TeraDevice", secondary="t_devices_participants",
                                           back_populates="device_participants", viewonly=True)
@@ -137,20 +136,22 @@ class TeraParticipant(db.Model, BaseModel):
         return self.participant_uuid
 
     def get_first_session(self):
-        sessions = sorted(self.participant_sessions, key=lambda session: session.session_start_datetime)
-        if sessions:
-            return sessions[0]
-        return None
+        from opentera.db.models.TeraSession import TeraSession
+        return TeraSession.query.join(TeraSession.session_participants)\
+            .filter(TeraParticipant.id_participant == self.id_participant)\
+            .order_by(TeraSession.session_start_datetime.asc()).first()
 
     def get_last_session(self):
-        from opentera.db.models.TeraSession import TeraSessionStatus
-        sessions = [session for session in self.participant_sessions
-                    if session.session_status == TeraSessionStatus.STATUS_COMPLETED.value or
-                    session.session_status == TeraSessionStatus.STATUS_TERMINATED.value]
-        sessions = sorted(sessions, key=lambda session: session.session_start_datetime)
-        if sessions:
-            return sessions[-1]
-        return None
+        from opentera.db.models.TeraSession import TeraSession, TeraSessionStatus
+        return TeraSession.query.join(TeraSession.session_participants)\
+            .filter(TeraParticipant.id_participant == self.id_participant)\
+            .filter(TeraSession.session_status.in_([TeraSessionStatus.STATUS_COMPLETED.value,
+                                                    TeraSessionStatus.STATUS_TERMINATED.value]))\
+            .order_by(TeraSession.session_start_datetime.desc()).first()
+
+    def get_sessions_summary(self):
+        from opentera.db.models.TeraParticipantSessionsSummary import TeraParticipantSessionsSummary
+        return TeraParticipantSessionsSummary.get_summary_for_participant(self.id_participant)
 
     @staticmethod
     def encrypt_password(password):
@@ -224,6 +225,10 @@ class TeraParticipant(db.Model, BaseModel):
     def get_participant_by_id(part_id: int):
         return TeraParticipant.query.filter_by(id_participant=part_id).first()
 
+    @staticmethod
+    def get_pagination_sort_keys() -> list:
+        return [(TeraParticipant.participant_name, False), (TeraParticipant.id_participant, False)]
+
     @staticmethod
     def is_participant_username_available(username: str) -> bool:
         # No username = always available
@@ -0,0 +1,144 @@
+from opentera.db.Base import db, BaseModel
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+
+class TeraParticipantSessionsSummary(db.Model, BaseModel):
+    """
+        Summary of the sessions of a participant, kept up to date when sessions are changed so that the first / last
+        session and sessions counts of a participant are one lookup instead of browsing all of its sessions.
+
+        Participants of the sessions changed in a transaction are collected on flush, and their summaries are computed
+        again just before the transaction is committed. Participants without any session have no summary.
+    """
+    __tablename__ = 't_participants_sessions_summaries'
+    id_participant = db.Column(db.Integer, db.ForeignKey('t_participants.id_participant', ondelete='cascade'),
+                               primary_key=True, autoincrement=False)
+
+    summary_sessions_count = db.Column(db.Integer, nullable=False, default=0)
+    summary_sessions_duration = db.Column(db.BigInteger, nullable=False, default=0)
+    # Start of the first session, whatever its status
+    summary_first_session_datetime = db.Column(db.TIMESTAMP(timezone=True), nullable=True)
+    # Start of the last completed (or terminated) session
+    summary_last_session_datetime = db.Column(db.TIMESTAMP(timezone=True), nullable=True)
+    summary_sessions_notstarted_count = db.Column(db.Integer, nullable=False, default=0)
+    summary_sessions_inprogress_count = db.Column(db.Integer, nullable=False, default=0)
+    summary_sessions_completed_count = db.Column(db.Integer, nullable=False, default=0)
+    summary_sessions_cancelled_count = db.Column(db.Integer, nullable=False, default=0)
+    summary_sessions_terminated_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Number of participants updated with each aggregate query
+    update_chunk_size = 500
+
+    @staticmethod
+    def get_status_count_name(status: int) -> str:
+        from opentera.db.models.TeraSession import TeraSessionStatus
+        return 'summary_sessions_' + TeraSessionStatus(status).name[len('STATUS_'):].lower() + '_count'
+
+    def get_status_count(self, status: int) -> int:
+        return getattr(self, TeraParticipantSessionsSummary.get_status_count_name(status))
+
+    def set_sessions_stats(self, sessions_stats: dict):
+        # Sessions stats as returned by TeraSession.get_participants_sessions_stats
+        self.summary_sessions_count = sessions_stats['sessions_count']
+        self.summary_sessions_duration = sessions_stats['sessions_duration']
+        self.summary_first_session_datetime = sessions_stats['first_session_datetime']
+        self.summary_last_session_datetime = sessions_stats['last_session_datetime']
+        for status, count in sessions_stats['status_count'].items():
+            setattr(self, TeraParticipantSessionsSummary.get_status_count_name(status), count)
+
+    @staticmethod
+    def get_summary_for_participant(part_id: int):
+        return TeraParticipantSessionsSummary.query.filter_by(id_participant=part_id).first()
+
+    @staticmethod
+    def get_summaries_for_participants(participants_ids: list) -> dict:
+        if not participants_ids:
+            return dict()
+        summaries = TeraParticipantSessionsSummary.query.filter(
+            TeraParticipantSessionsSummary.id_participant.in_(participants_ids)).all()
+        return {summary.id_participant: summary for summary in summaries}
+
+    @staticmethod
+    def update_for_participants(participants_ids: list):
+        # Compute the summaries of the participants again. Changes are not committed.
+        from opentera.db.models.TeraParticipant import TeraParticipant
+        from opentera.db.models.TeraSession import TeraSession
+        participants_ids = list(participants_ids)
+        for index in range(0, len(participants_ids), TeraParticipantSessionsSummary.update_chunk_size):
+            chunk_ids = participants_ids[index:index + TeraParticipantSessionsSummary.update_chunk_size]
+            # Deleted participants summaries are deleted with them
+            existing_ids = [part_id for part_id, in db.session.query(TeraParticipant.id_participant)
+                            .filter(TeraParticipant.id_participant.in_(chunk_ids))]
+            sessions_stats = TeraSession.get_participants_sessions_stats(existing_ids)
+            summaries = TeraParticipantSessionsSummary.get_summaries_for_participants(existing_ids)
+            for part_id in existing_ids:
+                summary = summaries.get(part_id)
+                if part_id not in sessions_stats:
+                    if summary:
+                        db.session.delete(summary)
+                    continue
+                if not summary:
+                    summary = TeraParticipantSessionsSummary()
+                    summary.id_participant = part_id
+                    db.session.add(summary)
+                summary.set_sessions_stats(sessions_stats[part_id])
+
+    @staticmethod
+    def rebuild() -> int:
+        # Maintenance: compute the summaries of all the participants again. Returns the number of summaries.
+        from opentera.db.models.TeraParticipant import TeraParticipant
+        TeraParticipantSessionsSummary.query.delete()
+        participants_ids = [part_id for part_id, in db.session.query(TeraParticipant.id_participant)]
+        TeraParticipantSessionsSummary.update_for_participants(participants_ids)
+        db.session.commit()
+        return TeraParticipantSessionsSummary.get_count()
+
+    @staticmethod
+    def sessions_changed(session: Session, participants: list):
+        # Participants (ids or objects, which may not have an id yet) of sessions changed in the database session
+        session.info.setdefault('sessions_summary_participants', []).extend(participants)
+
+
+# Session attributes that change the summary
+summary_session_attributes = ['session_participants', 'session_start_datetime', 'session_duration',
+                              'session_status']
+
+
+@event.listens_for(Session, 'before_flush')
+def sessions_summary_before_flush(session, flush_context, instances):
+    from opentera.db.models.TeraSession import TeraSession
+    participants = []
+    for target in session.new:
+        if isinstance(target, TeraSession):
+            participants.extend(target.session_participants)
+    for target in session.dirty:
+        if isinstance(target, TeraSession):
+            state = inspect(target)
+            if any([state.attrs[name].history.has_changes() for name in summary_session_attributes]):
+                history = state.attrs['session_participants'].history
+                participants.extend(target.session_participants)
+                participants.extend(history.deleted or [])
+    for target in session.deleted:
+        if isinstance(target, TeraSession):
+            participants.extend(target.session_participants)
+
+    if participants:
+        TeraParticipantSessionsSummary.sessions_changed(session, participants)
+
+
+@event.listens_for(Session, 'before_commit')
+def sessions_summary_before_commit(session):
+    # Pending changes are flushed first, so their participants are collected and have an id
+    session.flush()
+    participants = session.info.pop('sessions_summary_participants', [])
+    if participants:
+        participants_ids = set([participant if isinstance(participant, int) else participant.id_participant
+                                for participant in participants])
+        participants_ids.discard(None)
+        TeraParticipantSessionsSummary.update_for_participants(participants_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def sessions_summary_rollbacked(session):
+    session.info.pop('sessions_summary_participants', None)
@@ -1,8 +1,9 @@
 from opentera.db.Base import db, BaseModel
+from opentera.db.KeysetPagination import KeysetPagination
 
 from enum import Enum
 import random
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time
 import uuid
 import json
 
@@ -17,18 +18,23 @@ class TeraSessionStatus(Enum):
 
 class TeraSession(db.Model, BaseModel):
     __tablename__ = 't_sessions'
+    # Sessions cleanup (status, date), and date ranges of all sessions
+    __table_args__ = (db.Index('ix_t_sessions_session_status_session_start_datetime', 'session_status',
+                               'session_start_datetime'),)
     id_session = db.Column(db.Integer, db.Sequence('id_session_sequence'), primary_key=True, autoincrement=True)
     session_uuid = db.Column(db.String(36), nullable=False, unique=True)
 
-    id_session_type = db.Column(db.Integer, db.ForeignKey('t_sessions_types.id_session_type'), nullable=False)
-    id_creator_user = db.Column(db.Integer, db.ForeignKey('t_users.id_user'), nullable=True)
-    id_creator_device = db.Column(db.Integer, db.ForeignKey('t_devices.id_device'), nullable=True)
-    id_creator_participant = db.Column(db.Integer, db.ForeignKey('t_participants.id_participant'), nullable=True)
+    id_session_type = db.Column(db.Integer, db.ForeignKey('t_sessions_types.id_session_type'), nullable=False,
+                                index=True)
+    id_creator_user = db.Column(db.Integer, db.ForeignKey('t_users.id_user'), nullable=True, index=True)
+    id_creator_device = db.Column(db.Integer, db.ForeignKey('t_devices.id_device'), nullable=True, index=True)
+    id_creator_participant = db.Column(db.Integer, db.ForeignKey('t_participants.id_participant'), nullable=True,
+                                       index=True)
     id_creator_service = db.Column(db.Integer, db.ForeignKey('t_services.id_service', ondelete='set null'),
-                                   nullable=True)
+                                   nullable=True, index=True)
 
     session_name = db.Column(db.String, nullable=False)
-    session_start_datetime = db.Column(db.TIMESTAMP(timezone=True), nullable=False)
+    session_start_datetime = db.Column(db.TIMESTAMP(timezone=True), nullable=False, index=True)
     session_duration = db.Column(db.Integer, nullable=False, default=0)
     session_status = db.Column(db.Integer, nullable=False)
     session_comments = db.Column(db.String, nullable=True)
@@ -50,7 +56,7 @@ class TeraSession(db.Model, BaseModel):
     session_assets = db.relationship('TeraAsset', cascade='delete', back_populates='asset_session')
     session_tests = db.relationship('TeraTest', cascade='delete', back_populates='test_session')
 
-    def to_json(self, ignore_fields=None, minimal=False):
+    def to_json(self, ignore_fields=None, minimal=False, assets_count: int = None, tests_count: int = None):
         if ignore_fields is None:
             ignore_fields = []
 
@@ -108,17 +114,99 @@ class TeraSession(db.Model, BaseModel):
         # Append session stats
         from opentera.db.models.TeraAsset import TeraAsset
         from opentera.db.models.TeraTest import TeraTest
-        rval['session_assets_count'] = TeraAsset.get_count({'id_session': self.id_session})
-        rval['session_tests_count'] = TeraTest.get_count({'id_session': self.id_session})
+        if assets_count is None:
+            assets_count = TeraAsset.get_count({'id_session': self.id_session})
+        if tests_count is None:
+            tests_count = TeraTest.get_count({'id_session': self.id_session})
+        rval['session_assets_count'] = assets_count
+        rval['session_tests_count'] = tests_count
         # rval['session_has_device_data'] = len(TeraDeviceData.get_data_for_session(self.id_session)) > 0
         return rval
 
+    @staticmethod
+    def to_json_list(sessions: list, minimal=False) -> list:
+        # Serialize many sessions at once: related objects and stats are loaded in bulk for all the sessions instead
+        # of one session at a time
+        if not sessions:
+            return []
+
+        from opentera.db.models.TeraParticipant import TeraParticipant
+        sessions_ids = [session.id_session for session in sessions]
+
+        # Load relationships of all sessions (already loaded sessions are populated with the results)
+        options = [db.joinedload(TeraSession.session_creator_user), db.joinedload(TeraSession.session_creator_device),
+                   db.joinedload(TeraSession.session_creator_participant),
+                   db.joinedload(TeraSession.session_creator_service)]
+        if not minimal:
+            options.extend([db.selectinload(TeraSession.session_participants)
+                           .joinedload(TeraParticipant.participant_project),
+                            db.selectinload(TeraSession.session_users), db.selectinload(TeraSession.session_devices)])
+        TeraSession.query.filter(TeraSession.id_session.in_(sessions_ids)).options(*options).all()
+
+        assets_count, tests_count = TeraSession.get_sessions_stats(sessions_ids)
+        return [session.to_json(minimal=minimal, assets_count=assets_count.get(session.id_session, 0),
+                                tests_count=tests_count.get(session.id_session, 0))
+                for session in sessions]
+
+    @staticmethod
+    def get_sessions_stats(sessions_ids: list) -> tuple:
+        # Assets and tests counts of each session, with one grouped query each
+        from opentera.db.models.TeraAsset import TeraAsset
+        from opentera.db.models.TeraTest import TeraTest
+        assets_count = dict(db.session.query(TeraAsset.id_session, db.func.count(TeraAsset.id_asset))
+                            .filter(TeraAsset.id_session.in_(sessions_ids)).group_by(TeraAsset.id_session).all())
+        tests_count = dict(db.session.query(TeraTest.id_session, db.func.count(TeraTest.id_test))
+                           .filter(TeraTest.id_session.in_(sessions_ids)).group_by(TeraTest.id_session).all())
+        return assets_count, tests_count
+
+    @staticmethod
+    def get_participants_sessions_stats(participants_ids: list) -> dict:
+        # Sessions stats of each participant, with one grouped query: sessions count, count by status, total duration,
+        # first session start and last completed (or terminated) session start. Participants without sessions are not
+        # in the result.
+        from opentera.db.models.TeraSessionParticipants import TeraSessionParticipants
+        if not participants_ids:
+            return dict()
+
+        ended_status = [TeraSessionStatus.STATUS_COMPLETED.value, TeraSessionStatus.STATUS_TERMINATED.value]
+        columns = [TeraSessionParticipants.id_participant, db.func.count(TeraSession.id_session),
+                   db.func.coalesce(db.func.sum(TeraSession.session_duration), 0),
+                   db.func.min(TeraSession.session_start_datetime),
+                   db.func.max(db.case((TeraSession.session_status.in_(ended_status),
+                                        TeraSession.session_start_datetime)))]
+        columns.extend([db.func.count(db.case((TeraSession.session_status == status.value, TeraSession.id_session)))
+                        for status in TeraSessionStatus])
+
+        query = db.session.query(*columns).join(TeraSession,
+                                                TeraSession.id_session == TeraSessionParticipants.id_session)\
+            .filter(TeraSessionParticipants.id_participant.in_(participants_ids))\
+            .group_by(TeraSessionParticipants.id_participant)
+
+        stats = dict()
+        for id_participant, count, duration, first_session, last_session, *status_counts in query.all():
+            stats[id_participant] = {'sessions_count': count,
+                                     'sessions_duration': duration,
+                                     'first_session_datetime': first_session,
+                                     'last_session_datetime': last_session,
+                                     'status_count': {status.value: status_count for status, status_count
+                                                      in zip(TeraSessionStatus, status_counts)}}
+        return stats
+
     def to_json_create_event(self):
         return self.to_json(minimal=True)
 
     def to_json_update_event(self):
         return self.to_json(minimal=True)
 
+    @classmethod
+    def to_json_create_events(cls, targets: list) -> list:
+        # Stats of all the sessions are counted at once
+        return TeraSession.to_json_list(targets, minimal=True)
+
+    @classmethod
+    def to_json_update_events(cls, targets: list) -> list:
+        return TeraSession.to_json_list(targets, minimal=True)
+
     def to_json_delete_event(self):
         # Minimal information, delete can not be filtered
         return {'id_session': self.id_session, 'session_uuid': self.session_uuid}
@@ -243,15 +331,26 @@ class TeraSession(db.Model, BaseModel):
     def get_session_by_name(name: str):
         return TeraSession.query.filter_by(session_name=name).first()
 
+    @staticmethod
+    def get_pagination_sort_keys() -> list:
+        # Sort keys of the paginated sessions lists: most recent first
+        return [(TeraSession.session_start_datetime, True), (TeraSession.id_session, True)]
+
     @staticmethod
     def _set_query_parameters(query, status: int = None, limit: int = None, offset: int = None,
-                              start_date: datetime.date = None, end_date: datetime.date = None):
+                              start_date: datetime.date = None, end_date: datetime.date = None,
+                              filters: dict = None):
         if status is not None:
             query = query.filter(TeraSession.session_status == status)
+        # Dates are compared as a half-open range of timestamps [start_date, end_date + 1 day[, so that the index
+        # on the start datetime can be used
         if start_date:
-            query = query.filter(db.func.date(TeraSession.session_start_datetime) >= start_date)
+            query = query.filter(TeraSession.session_start_datetime >= datetime.combine(start_date, time.min))
         if end_date:
-            query = query.filter(db.func.date(TeraSession.session_start_datetime) <= end_date)
+            query = query.filter(TeraSession.session_start_datetime <
+                                 datetime.combine(end_date + timedelta(days=1), time.min))
+        if filters:
+            query = query.filter_by(**filters)
         if limit:
             query = query.limit(limit)
         if offset:
@@ -262,7 +361,7 @@ class TeraSession(db.Model, BaseModel):
     @staticmethod
     def get_sessions_for_participant(part_id: int, status: int = None, limit: int = None, offset: int = None,
                                      start_date: datetime.date = None, end_date: datetime.date = None,
-                                     filters: dict = None):
+                                     filters: dict = None, pagination: KeysetPagination = None):
         from opentera.db.models.TeraParticipant import TeraParticipant
         query = TeraSession.query.join(TeraSession.session_participants).filter(TeraParticipant.id_participant ==
                                                                                 part_id)
@@ -270,42 +369,35 @@ class TeraSession(db.Model, BaseModel):
         query = query.order_by(TeraSession.session_start_datetime.desc())
 
         query = TeraSession._set_query_parameters(query=query, status=status, limit=limit, offset=offset,
-                                                  start_date=start_date, end_date=end_date)
-
-        if filters:
-            query = query.filter_by(**filters)
+                                                  start_date=start_date, end_date=end_date, filters=filters)
 
-        return query.all()
+        return KeysetPagination.query_all(query, pagination)
 
     @staticmethod
     def get_sessions_for_user(user_id: int, status: int = None, limit: int = None, offset: int = None,
-                              start_date: datetime.date = None, end_date: datetime.date = None, filters: dict = None):
+                              start_date: datetime.date = None, end_date: datetime.date = None, filters: dict = None,
+                              pagination: KeysetPagination = None):
         from opentera.db.models.TeraUser import TeraUser
         query = TeraSession.query.join(TeraSession.session_users).filter(TeraUser.id_user == user_id)
         query = query.order_by(TeraSession.session_start_datetime.desc())
 
         query = TeraSession._set_query_parameters(query=query, status=status, limit=limit, offset=offset,
-                                                  start_date=start_date, end_date=end_date)
+                                                  start_date=start_date, end_date=end_date, filters=filters)
 
-        if filters:
-            query = query.filter_by(**filters)
-
-        return query.all()
+        return KeysetPagination.query_all(query, pagination)
 
     @staticmethod
     def get_sessions_for_device(device_id: int, status: int = None, limit: int = None, offset: int = None,
-                                start_date: datetime.date = None, end_date: datetime.date = None, filters:dict = None):
+                                start_date: datetime.date = None, end_date: datetime.date = None, filters:dict = None,
+                                pagination: KeysetPagination = None):
         from opentera.db.models.TeraDevice import TeraDevice
         query = TeraSession.query.join(TeraSession.session_devices).filter(TeraDevice.id_device == device_id)
         query = query.order_by(TeraSession.session_start_datetime.desc())
 
         query = TeraSession._set_query_parameters(query=query, status=status, limit=limit, offset=offset,
-                                                  start_date=start_date, end_date=end_date)
-
-        if filters:
-            query = query.filter_by(**filters)
+                                                  start_date=start_date, end_date=end_date, filters=filters)
 
-        return query.all()
+        return KeysetPagination.query_all(query, pagination)
 
     @staticmethod
     def get_sessions_for_type(session_type_id: int):
@@ -364,21 +456,33 @@ class TeraSession(db.Model, BaseModel):
     @staticmethod
     def cancel_past_not_started_sessions():
         # Set sessions in the "NOT STARTED" state in the past to the "CANCELLED" state
-        TeraSession.query.filter(TeraSession.session_status == TeraSessionStatus.STATUS_NOTSTARTED.value,
-                                 TeraSession.session_start_datetime <= datetime.now()).\
-            update({'session_status': TeraSessionStatus.STATUS_CANCELLED.value})
+        query = TeraSession.query.filter(TeraSession.session_status == TeraSessionStatus.STATUS_NOTSTARTED.value,
+                                         TeraSession.session_start_datetime <= datetime.now())
+        TeraSession.bulk_sessions_changed(query)
+        query.update({'session_status': TeraSessionStatus.STATUS_CANCELLED.value})
 
         db.session.commit()
 
     @staticmethod
     def terminate_past_inprogress_sessions():
         # Set sessions "IN PROGRESS" which are in the past to the "TERMINATED" state
-        TeraSession.query.filter(TeraSession.session_status == TeraSessionStatus.STATUS_INPROGRESS.value,
-                                 TeraSession.session_start_datetime <= datetime.now()). \
-            update({'session_status': TeraSessionStatus.STATUS_TERMINATED.value})
+        query = TeraSession.query.filter(TeraSession.session_status == TeraSessionStatus.STATUS_INPROGRESS.value,
+                                         TeraSession.session_start_datetime <= datetime.now())
+        TeraSession.bulk_sessions_changed(query)
+        query.update({'session_status': TeraSessionStatus.STATUS_TERMINATED.value})
 
         db.session.commit()
 
+    @staticmethod
+    def bulk_sessions_changed(query):
+        # Bulk updates are not flushed: participants summaries of the sessions of the query must be updated explicitly
+        from opentera.db.models.TeraSessionParticipants import TeraSessionParticipants
+        from opentera.db.models.TeraParticipantSessionsSummary import TeraParticipantSessionsSummary
+        sessions_ids = query.with_entities(TeraSession.id_session)
+        participants_ids = [part_id for part_id, in db.session.query(TeraSessionParticipants.id_participant)
+                            .filter(TeraSessionParticipants.id_session.in_(sessions_ids)).distinct()]
+        TeraParticipantSessionsSummary.sessions_changed(db.session(), participants_ids)
+
     # THIS SHOULD NOT BE USED ANYMORE, AS DELETES CAN'T OCCUR IF THERE'S STILL ASSOCIATED SESSIONS
     # @staticmethod
     # def delete_orphaned_sessions(commit_changes=True):
@@ -3,8 +3,10 @@ from opentera.db.Base import db, BaseModel
 
 class TeraSessionDevices(db.Model, BaseModel):
     __tablename__ = 't_sessions_devices'
+    # Sessions of a device
+    __table_args__ = (db.Index('ix_t_sessions_devices_id_device_id_session', 'id_device', 'id_session'),)
     id_session_device = db.Column(db.Integer, db.Sequence('id_session_device'), primary_key=True, autoincrement=True)
-    id_session = db.Column(db.Integer, db.ForeignKey('t_sessions.id_session', ondelete='cascade'))
+    id_session = db.Column(db.Integer, db.ForeignKey('t_sessions.id_session', ondelete='cascade'), index=True)
     id_device = db.Column(db.Integer, db.ForeignKey('t_devices.id_device'))
 
     session_device_session = db.relationship('TeraSession', viewonly=True)
@@ -39,7 +39,8 @@ class TeraSessionEvent(db.Model, BaseModel):
     __tablename__ = 't_sessions_events'
     id_session_event = db.Column(db.Integer, db.Sequence('id_session_events_sequence'), primary_key=True,
                                  autoincrement=True)
-    id_session = db.Column(db.Integer, db.ForeignKey('t_sessions.id_session', ondelete='cascade'), nullable=False)
+    id_session = db.Column(db.Integer, db.ForeignKey('t_sessions.id_session', ondelete='cascade'), nullable=False,
+                           index=True)
     id_session_event_type = db.Column(db.Integer, nullable=False)
     session_event_datetime = db.Column(db.TIMESTAMP(timezone=True), nullable=False)
     session_event_text = db.Column(db.String, nullable=True)
@@ -85,3 +86,13 @@ class TeraSessionEvent(db.Model, BaseModel):
         from .TeraSession import TeraSession
         return db.session.query(TeraSessionEvent).join(TeraSessionEvent.session_event_session)\
             .filter(TeraSession.id_session == id_session).order_by(asc(TeraSessionEvent.session_event_datetime)).all()
+
+    @staticmethod
+    def get_events_for_sessions(sessions_ids: list) -> dict:
+        # Events of many sessions with a single query, grouped by session id
+        events = TeraSessionEvent.query.filter(TeraSessionEvent.id_session.in_(sessions_ids))\
+            .order_by(asc(TeraSessionEvent.session_event_datetime)).all()
+        sessions_events = {id_session: [] for id_session in sessions_ids}
+        for event in events:
+            sessions_events[event.id_session].append(event)
+        return sessions_events
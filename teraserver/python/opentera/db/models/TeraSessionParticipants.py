@@ -3,9 +3,12 @@ from opentera.db.Base import db, BaseModel
 
 class TeraSessionParticipants(db.Model, BaseModel):
     __tablename__ = 't_sessions_participants'
+    # Sessions of a participant. The index covers the join, so the association rows don't have to be read.
+    __table_args__ = (db.Index('ix_t_sessions_participants_id_participant_id_session', 'id_participant',
+                               'id_session'),)
     id_session_participant = db.Column(db.Integer, db.Sequence('id_session_participant'), primary_key=True,
                                        autoincrement=True)
-    id_session = db.Column(db.Integer, db.ForeignKey('t_sessions.id_session'))
+    id_session = db.Column(db.Integer, db.ForeignKey('t_sessions.id_session'), index=True)
     id_participant = db.Column(db.Integer, db.ForeignKey('t_participants.id_participant'))
 
     session_participant_session = db.relationship('TeraSession', viewonly=True)
@@ -14,3 +17,9 @@ class TeraSessionParticipants(db.Model, BaseModel):
     @staticmethod
     def get_session_count_for_participant(id_participant: int) -> int:
         return TeraSessionParticipants.count_with_filters({'id_participant': id_participant})
+
+    @staticmethod
+    def get_session_count_for_participants(participants_ids: list) -> int:
+        # Sum of the sessions count of each participant (a session with many of the participants is counted many times)
+        return TeraSessionParticipants.query.filter(TeraSessionParticipants.id_participant.in_(participants_ids))\
+            .count()
@@ -3,8 +3,10 @@ from opentera.db.Base import db, BaseModel
 
 class TeraSessionUsers(db.Model, BaseModel):
     __tablename__ = 't_sessions_users'
+    # Sessions of a user
+    __table_args__ = (db.Index('ix_t_sessions_users_id_user_id_session', 'id_user', 'id_session'),)
     id_session_user = db.Column(db.Integer, db.Sequence('id_session_user'), primary_key=True, autoincrement=True)
-    id_session = db.Column(db.Integer, db.ForeignKey('t_sessions.id_session', ondelete='cascade'))
+    id_session = db.Column(db.Integer, db.ForeignKey('t_sessions.id_session', ondelete='cascade'), index=True)
     id_user = db.Column(db.Integer, db.ForeignKey('t_users.id_user'))
 
     session_user_session = db.relationship('TeraSession', viewonly=True)
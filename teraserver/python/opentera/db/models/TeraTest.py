@@ -14,7 +14,8 @@ class TeraTest(db.Model, BaseModel):
     __tablename__ = 't_tests'
     id_test = db.Column(db.Integer, db.Sequence('id_test_sequence'), primary_key=True, autoincrement=True)
     id_test_type = db.Column(db.Integer, db.ForeignKey('t_tests_types.id_test_type'), nullable=False)
-    id_session = db.Column(db.Integer, db.ForeignKey('t_sessions.id_session', ondelete='cascade'), nullable=False)
+    id_session = db.Column(db.Integer, db.ForeignKey('t_sessions.id_session', ondelete='cascade'), nullable=False,
+                           index=True)
 
     # Item to which that test is associated. At least one of it should be selected, but multiple can also be specified
     # Of course, that item needs to be in the associated session for data integrity
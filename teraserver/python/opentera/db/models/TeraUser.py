@@ -8,12 +8,10 @@ import datetime
 import json
 
 
-# Generator for jti
+# Generator for jti, unique between processes since tokens are disabled by jti
 def infinite_jti_sequence():
-    num = 0
     while True:
-        yield num
-        num += 1
+        yield str(uuid.uuid4())
 
 
 # Initialize generator, call next(user_jti_generator) to get next sequence number
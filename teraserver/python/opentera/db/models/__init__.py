@@ -4,8 +4,10 @@ from .TeraDeviceParticipant import TeraDeviceParticipant
 from .TeraDeviceProject import TeraDeviceProject
 from .TeraDeviceSubType import TeraDeviceSubType
 from .TeraDeviceType import TeraDeviceType
+from .TeraEventOutbox import TeraEventOutbox
 from .TeraParticipant import TeraParticipant
 from .TeraParticipantGroup import TeraParticipantGroup
+from .TeraParticipantSessionsSummary import TeraParticipantSessionsSummary
 from .TeraProject import TeraProject
 from .TeraServerSettings import TeraServerSettings
 from .TeraService import TeraService
@@ -58,8 +60,10 @@ __all__ = ['TeraAsset',
            'TeraDeviceProject',
            'TeraDeviceSubType',
            'TeraDeviceType',
+           'TeraEventOutbox',
            'TeraParticipant',
            'TeraParticipantGroup',
+           'TeraParticipantSessionsSummary',
            'TeraProject',
            'TeraServerSettings',
            'TeraService',
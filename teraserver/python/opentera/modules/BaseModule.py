@@ -58,11 +58,14 @@ class BaseModule(RedisClient):
         return 'module.' + self.module_name + '.events'
 
     def send_event_message(self, event, topic: str):
+        # Called from the reactor thread (module messages handlers), must not block
         message = self.create_event_message(topic)
         any_message = messages.Any()
         any_message.Pack(event)
         message.events.extend([any_message])
-        self.publish(message.header.topic, message.SerializeToString())
+        d = self.publishAsync(message.header.topic, message.SerializeToString())
+        d.addErrback(lambda failure: print('BaseModule - Error sending event', self.module_name, topic, failure))
+        return d
 
     def redisConnectionMade(self):
         print('*************************** BaseModule.connectionMade', self.module_name)
@@ -135,7 +138,7 @@ class BaseModule(RedisClient):
                 json_data = json.dumps(my_dict)
 
                 # Return result (a json string)
-                self.publish(rpc_message.reply_to, json_data)
+                self.publishAsync(rpc_message.reply_to, json_data)
 
         except:
             import sys
@@ -149,7 +152,7 @@ class BaseModule(RedisClient):
             json_data = json.dumps(my_dict)
 
             # Return result (a json string)
-            self.publish(rpc_message.reply_to, json_data)
+            self.publishAsync(rpc_message.reply_to, json_data)
 
     def create_tera_message(self, dest='', seq=0):
         tera_message = messages.TeraModuleMessage()
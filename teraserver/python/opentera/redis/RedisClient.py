@@ -13,9 +13,13 @@ import redis
 
 class RedisClient:
 
+    # Number of connections of the async (non subscriber) connection pool
+    async_pool_size = 1
+
     def __init__(self, config=None):
         print('Init RedisClient', self, config)
         self.protocol = None
+        self.async_redis = None
         self.callbacks_dict = dict()
 
         # Fill config
@@ -91,6 +95,32 @@ class RedisClient:
     def redisDelete(self, key):
         return self.redis.delete(key)
 
+    def redisAsyncPool(self):
+        # Redis client (async) for commands, created when first needed. The subscriber protocol can't be used for
+        # commands once it has subscribed to a pattern.
+        if self.async_redis is None:
+            self.async_redis = txredis.lazyConnectionPool(host=self.redisConfig['hostname'],
+                                                          port=self.redisConfig['port'],
+                                                          dbid=self.redisConfig['db'],
+                                                          password=self.redisConfig['password'] or None,
+                                                          poolsize=self.async_pool_size,
+                                                          charset=None)
+        return self.async_redis
+
+    # Async (non-blocking) versions, returning Deferreds, to be used from the reactor thread only. Sync versions above
+    # should only be used from other threads (WSGI, ...).
+    def publishAsync(self, topic, message):
+        return self.redisAsyncPool().publish(topic, message)
+
+    def redisGetAsync(self, key):
+        return self.redisAsyncPool().get(key)
+
+    def redisSetAsync(self, key, value, ex=None):
+        return self.redisAsyncPool().set(key, value, expire=ex)
+
+    def redisDeleteAsync(self, key):
+        return self.redisAsyncPool().delete(key)
+
     def subscribe_pattern_with_callback(self, pattern, function):
         # print(self, 'subscribe_pattern_with_callback', pattern, function)
         self.callbacks_dict[pattern] = function
@@ -116,6 +146,10 @@ class RedisClient:
             # Disconnect socket
             self.conn.disconnect()
 
+        if self.async_redis:
+            self.async_redis.disconnect()
+            self.async_redis = None
+
         if self.redis:
             # Close sync client (will terminate conn.)
             self.redis.close()
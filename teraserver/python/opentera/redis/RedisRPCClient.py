@@ -3,10 +3,21 @@ from opentera.messages.python.RPCMessage_pb2 import RPCMessage, Value
 from datetime import datetime
 import json
 import uuid
+import threading
 from opentera.redis.RedisVars import RedisVars
 
 
 class RedisRPCClient:
+    """
+        RPC client over redis. Replies of all calls are received on a single subscription (reply channel) and matched
+        to their call with the message id, so calls from many threads can be in flight at the same time.
+
+        Clients are meant to be long-lived: use get_instance to get the client shared in the process.
+    """
+    # Shared clients, by redis configuration
+    instances = dict()
+    instances_lock = threading.Lock()
+
     def __init__(self, config: dict, timeout=10):
         self.config = config
         self.timeout = timeout
@@ -20,18 +31,66 @@ class RedisRPCClient:
                                   password=self.config['password'],
                                   client_name=self.pattern)
 
+        # Calls waiting for a reply, by message id: [event, reply]
+        self.pending_calls = dict()
+        self.lock = threading.Lock()
+        self.pubsub = None
+        self.pubsub_thread = None
+
     # def __del__(self):
     #     print('****- Deleting RedisRPCClient')
 
-    def _internal_rpc_call(self, topic: str, function_name: str, *args):
-        # Pub/Sub client
-        p = self.client.pubsub()
+    @classmethod
+    def get_instance(cls, config: dict):
+        key = (config['hostname'], config['port'], config['db'])
+        with cls.instances_lock:
+            if key not in cls.instances:
+                cls.instances[key] = RedisRPCClient(config)
+            return cls.instances[key]
+
+    def _start_reply_subscription(self):
+        # Must be called with lock
+        if self.pubsub_thread and self.pubsub_thread.is_alive():
+            return
+        if self.pubsub:
+            self.pubsub.close()
+
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(**{self.pattern: self._reply_received})
+        # Wait for the subscription to be effective before any call is published
+        self.pubsub.get_message(timeout=self.timeout)
+        self.pubsub_thread = self.pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def _reply_received(self, message):
+        try:
+            result = json.loads(message['data'])
+        except (TypeError, ValueError):
+            print('RedisRPCClient - Invalid reply', message)
+            return
+
+        with self.lock:
+            pending_call = self.pending_calls.get(result.get('id'))
+        if pending_call:
+            pending_call[1] = result
+            pending_call[0].set()
+
+    def close(self):
+        with self.lock:
+            if self.pubsub_thread:
+                self.pubsub_thread.stop()
+                self.pubsub_thread = None
+            if self.pubsub:
+                self.pubsub.close()
+                self.pubsub = None
+        self.client.close()
+
+    def _internal_rpc_call(self, topic: str, function_name: str, *args, timeout=None):
+        if timeout is None:
+            timeout = self.timeout
 
         message = RPCMessage()
         message.method = function_name
         message.timestamp = datetime.now().timestamp()
-        message.id = self.msg_id
-        self.msg_id = self.msg_id + 1
         message.reply_to = self.pattern
 
         # Iterate through args
@@ -63,31 +122,31 @@ class RedisRPCClient:
         # Set args
         message.args.extend(rpc_args)
 
-        # Will answer on the replay_to field
-        p.subscribe(message.reply_to)
-        # First message is for subscribe result
-        message1 = p.get_message(timeout=self.timeout)
-
-        # Publish request
-        self.client.publish(topic, message.SerializeToString())
-
-        # Second message is data received
-        message2 = p.get_message(timeout=self.timeout)
-
-        # Unsubscribe to message
-        # p.unsubscribe(message.reply_to)
-        # Closing (will automatically unsubscribe)
-        p.close()
-
-        if message2:
-            result = json.loads(message2['data'])
-            return result['return_value']
+        # Will answer on the reply_to field, register call before publishing
+        pending_call = [threading.Event(), None]
+        with self.lock:
+            self._start_reply_subscription()
+            message.id = self.msg_id
+            self.msg_id = self.msg_id + 1
+            self.pending_calls[message.id] = pending_call
+
+        try:
+            # Publish request
+            self.client.publish(topic, message.SerializeToString())
+
+            # Wait for the reply
+            if pending_call[0].wait(timeout) and pending_call[1]:
+                return pending_call[1]['return_value']
+        finally:
+            with self.lock:
+                del self.pending_calls[message.id]
 
         return None
 
-    def call(self, module_name: str, function_name: str, *args):
-        return self._internal_rpc_call('module.' + module_name + '.rpc', function_name, *args)
+    def call(self, module_name: str, function_name: str, *args, timeout=None):
+        return self._internal_rpc_call('module.' + module_name + '.rpc', function_name, *args, timeout=timeout)
 
-    def call_service(self, service_key: str, function_name: str, *args):
-        return self._internal_rpc_call(RedisVars.build_service_rpc_topic(service_key), function_name, *args)
+    def call_service(self, service_key: str, function_name: str, *args, timeout=None):
+        return self._internal_rpc_call(RedisVars.build_service_rpc_topic(service_key), function_name, *args,
+                                       timeout=timeout)
 
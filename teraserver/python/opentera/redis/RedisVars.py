@@ -28,6 +28,22 @@ class RedisVars:
     # Participant login attempt counter prefix
     RedisVar_ParticipantLoginAttemptKey = "ParticipantLoginAttempts."
 
+    # Access cache entries prefix. Entries are stored as "AccessCache.<owner>.<name>"
+    RedisVar_AccessCachePrefixKey = "AccessCache."
+
+    # Access cache generations, incremented to invalidate all the access cache entries
+    RedisVar_AccessCacheGenerationKey = "AccessCacheGeneration"
+    RedisVar_AccessCacheSessionsGenerationKey = "AccessCacheSessionsGeneration"
+
+    # Disabled (revoked) tokens prefix. Entries are stored as "DisabledToken.<user|participant>.<jti>"
+    RedisVar_DisabledTokenPrefixKey = "DisabledToken."
+
+    # Topic on which disabled tokens are published, as "<user|participant>.<jti>"
+    RedisVar_DisabledTokenTopic = "DisabledTokens"
+
+    # Topic on which tokens keys changes are notified
+    RedisVar_TokenKeysTopic = "TokenKeys"
+
     @classmethod
     def build_service_rpc_topic(cls, service_key) -> str:
         return cls.RedisVar_ServicePrefixKey + service_key + '.rpc'
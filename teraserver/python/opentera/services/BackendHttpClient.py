@@ -0,0 +1,108 @@
+from requests import Session, Response
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+
+import threading
+import time
+
+
+class BackendHttpClient:
+    """
+        HTTP client for the requests of a service to the OpenTera backend.
+
+        Connections are pooled and kept alive between requests, so that the TLS handshake is done once for each
+        connection instead of once for each request. A client is thread safe: use get_instance to get the client shared
+        in the process. Latency of the requests is recorded for each endpoint (method and path), see get_metrics.
+
+        Optional fields of the backend configuration:
+            pool_size: maximum number of connections kept alive for each host (default 10)
+            connect_timeout: seconds to wait for a connection (default 5)
+            read_timeout: seconds to wait for the response of GET and DELETE requests (default 60)
+            upload_read_timeout: seconds to wait for the response of POST requests (uploads) and between the data of
+                streamed responses (default none: wait until the backend answers)
+            metrics_log_interval: seconds between the logs of the requests metrics (default 3600, 0 to disable)
+    """
+    # Shared clients, by backend configuration
+    instances = dict()
+    instances_lock = threading.Lock()
+
+    default_pool_size = 10
+    default_connect_timeout = 5
+    default_read_timeout = 60
+    default_upload_read_timeout = None
+    default_metrics_log_interval = 3600
+
+    def __init__(self, pool_size: int = default_pool_size, connect_timeout: float = default_connect_timeout,
+                 read_timeout: float = default_read_timeout, upload_read_timeout: float = default_upload_read_timeout):
+        self.timeout = (connect_timeout, read_timeout)
+        self.upload_timeout = (connect_timeout, upload_read_timeout)
+        self.session = Session()
+        # TODO: remove verify=False and check certificate
+        self.session.verify = False
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Latency by endpoint: [count, errors, total seconds, max seconds]
+        self.metrics = dict()
+        self.metrics_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, backend_config: dict):
+        pool_size = int(backend_config.get('pool_size', cls.default_pool_size))
+        connect_timeout = float(backend_config.get('connect_timeout', cls.default_connect_timeout))
+        read_timeout = float(backend_config.get('read_timeout', cls.default_read_timeout))
+        upload_read_timeout = backend_config.get('upload_read_timeout', cls.default_upload_read_timeout)
+        if upload_read_timeout is not None:
+            upload_read_timeout = float(upload_read_timeout)
+        key = (pool_size, connect_timeout, read_timeout, upload_read_timeout)
+        with cls.instances_lock:
+            if key not in cls.instances:
+                cls.instances[key] = BackendHttpClient(pool_size, connect_timeout, read_timeout, upload_read_timeout)
+            return cls.instances[key]
+
+    def request(self, method: str, url: str, token: str, **kwargs) -> Response:
+        headers = kwargs.pop('headers', {})
+        headers['Authorization'] = 'OpenTera ' + token
+        if method == 'POST' or kwargs.get('stream'):
+            kwargs.setdefault('timeout', self.upload_timeout)
+        else:
+            kwargs.setdefault('timeout', self.timeout)
+
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = self.session.request(method, url, headers=headers, **kwargs)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            self.record_latency(method + ' ' + urlsplit(url).path, time.perf_counter() - start, failed)
+
+    def get(self, url: str, token: str, params: dict = None, **kwargs) -> Response:
+        return self.request('GET', url, token, params=params, **kwargs)
+
+    def post(self, url: str, token: str, json_data: dict = None, **kwargs) -> Response:
+        return self.request('POST', url, token, json=json_data, **kwargs)
+
+    def delete(self, url: str, token: str, params: dict = None, **kwargs) -> Response:
+        return self.request('DELETE', url, token, params=params, **kwargs)
+
+    def record_latency(self, endpoint: str, duration: float, failed: bool):
+        with self.metrics_lock:
+            metrics = self.metrics.setdefault(endpoint, [0, 0, 0., 0.])
+            metrics[0] += 1
+            if failed:
+                metrics[1] += 1
+            metrics[2] += duration
+            metrics[3] = max(metrics[3], duration)
+
+    def get_metrics(self, reset: bool = False) -> dict:
+        # Requests count, errors count (no response or server error), average and max latency (ms) of each endpoint,
+        # since the last reset
+        with self.metrics_lock:
+            metrics = {endpoint: {'count': count, 'errors': errors, 'average_ms': round(total * 1000. / count, 3),
+                                  'max_ms': round(maximum * 1000., 3)}
+                       for endpoint, (count, errors, total, maximum) in self.metrics.items()}
+            if reset:
+                self.metrics.clear()
+        return metrics
@@ -4,8 +4,12 @@ from flask import _request_ctx_stack, request
 from flask_restx import reqparse
 
 from enum import Enum
+from collections import OrderedDict
 
+import hashlib
 import jwt
+import threading
+import time
 
 from opentera.services.TeraUserClient import TeraUserClient
 from opentera.services.TeraDeviceClient import TeraDeviceClient
@@ -41,6 +45,24 @@ class ServiceAccessManager:
     token_cookie_name = 'OpenTera'
     config_man = None
 
+    # Key (attribute name) of each token type
+    token_types_keys = {'user': 'api_user_token_key',
+                        'device': 'api_device_token_key',
+                        'device_static': 'api_device_static_token_key',
+                        'participant': 'api_participant_token_key',
+                        'participant_static': 'api_participant_static_token_key',
+                        'service': 'api_service_token_key'}
+
+    # Recently validated tokens (LRU): (keys fingerprint, token) -> (expiration, token type, token claims). A token is
+    # only reused with the keys that verified it, for at most validated_tokens_ttl seconds.
+    validated_tokens = OrderedDict()
+    validated_tokens_max = 1024
+    validated_tokens_ttl = 300
+    validated_tokens_lock = threading.Lock()
+
+    # Current keys and their fingerprint
+    keys_fingerprint = (None, None)
+
     @staticmethod
     def token_required(allow_dynamic_tokens=True, allow_static_tokens=False):
         def wrap(f):
@@ -79,21 +101,9 @@ class ServiceAccessManager:
                         token = request.cookies[ServiceAccessManager.token_cookie_name]
 
                 #########################
-                # Verify token from redis
-                # USER TOKEN MANAGEMENT
-                if allow_dynamic_tokens: # User only use dynamic tokens, don't validate otherwise
-                    if ServiceAccessManager.validate_user_token(token=token):
-                        return f(*args, **kwargs)
-
-                # DEVICE TOKEN MANAGEMENT
-                if ServiceAccessManager.validate_device_token(token=token, allow_dynamic_tokens=allow_dynamic_tokens,
-                                                              allow_static_tokens=allow_static_tokens):
-                    return f(*args, **kwargs)
-
-                # PARTICIPANT TOKEN MANAGEMENT
-                if ServiceAccessManager.validate_participant_token(token=token,
-                                                                   allow_dynamic_tokens=allow_dynamic_tokens,
-                                                                   allow_static_tokens=allow_static_tokens):
+                # Verify token (user, device or participant) from redis keys
+                if ServiceAccessManager.validate_token(token, ServiceAccessManager.get_allowed_token_types(
+                        allow_dynamic_tokens=allow_dynamic_tokens, allow_static_tokens=allow_static_tokens)):
                     return f(*args, **kwargs)
 
                 return 'Forbidden', 403
@@ -172,21 +182,9 @@ class ServiceAccessManager:
                         token = request.cookies[ServiceAccessManager.token_cookie_name]
 
                 #########################
-                # Verify token from redis
-                # USER TOKEN MANAGEMENT
-                if allow_dynamic_tokens:  # User only use dynamic tokens, don't validate otherwise
-                    if ServiceAccessManager.validate_user_token(token=token):
-                        return f(*args, **kwargs)
-
-                # DEVICE TOKEN MANAGEMENT
-                if ServiceAccessManager.validate_device_token(token=token, allow_dynamic_tokens=allow_dynamic_tokens,
-                                                              allow_static_tokens=allow_static_tokens):
-                    return f(*args, **kwargs)
-
-                # PARTICIPANT TOKEN MANAGEMENT
-                if ServiceAccessManager.validate_participant_token(token=token,
-                                                                   allow_dynamic_tokens=allow_dynamic_tokens,
-                                                                   allow_static_tokens=allow_static_tokens):
+                # Verify token (user, device or participant) from redis keys
+                if ServiceAccessManager.validate_token(token, ServiceAccessManager.get_allowed_token_types(
+                        allow_dynamic_tokens=allow_dynamic_tokens, allow_static_tokens=allow_static_tokens)):
                     return f(*args, **kwargs)
 
                 return 'Forbidden', 403
@@ -196,93 +194,126 @@ class ServiceAccessManager:
         return wrap
 
     @staticmethod
-    def validate_user_token(token: str) -> bool:
-        try:
-            token_dict = jwt.decode(token, ServiceAccessManager.api_user_token_key, algorithms='HS256')
-        except jwt.PyJWTError as e:
-            # Not a user, or invalid token, will continue...
-            pass
-        else:
-            # User token
-            _request_ctx_stack.top.current_user_client = \
-                TeraUserClient(token_dict, token, ServiceAccessManager.config_man)
-            _request_ctx_stack.top.current_login_type = LoginType.USER_LOGIN
-            return True
+    def get_allowed_token_types(allow_dynamic_tokens: bool, allow_static_tokens: bool) -> list:
+        token_types = []
+        if allow_dynamic_tokens:
+            # User only use dynamic tokens
+            token_types.extend(['user', 'device', 'participant'])
+        if allow_static_tokens:
+            token_types.extend(['device_static', 'participant_static'])
+        return token_types
 
     @staticmethod
-    def validate_device_token(token: str, allow_dynamic_tokens:bool, allow_static_tokens:bool) -> bool:
-        if allow_dynamic_tokens:  # Check for dynamic device token
-            try:
-                token_dict = jwt.decode(token, ServiceAccessManager.api_device_token_key, algorithms='HS256')
-            except jwt.PyJWTError as e:
-                # Not a device, or invalid token, will continue...
-                pass
-            else:
-                # Device token
-                _request_ctx_stack.top.current_device_client = \
-                    TeraDeviceClient(token_dict, token, ServiceAccessManager.config_man)
-                _request_ctx_stack.top.current_login_type = LoginType.DEVICE_LOGIN
-                return True
-
-        if allow_static_tokens:  # Check for static device token
-            try:
-                token_dict = jwt.decode(token, ServiceAccessManager.api_device_static_token_key, algorithms='HS256')
-            except jwt.PyJWTError as e:
-                # Not a device, or invalid token, will continue...
-                pass
-            else:
-                # Device token
-                _request_ctx_stack.top.current_device_client = \
-                    TeraDeviceClient(token_dict, token, ServiceAccessManager.config_man)
-                _request_ctx_stack.top.current_login_type = LoginType.DEVICE_LOGIN
-                return True
-
-        return False
+    def get_token_candidate_types(claims: dict) -> list:
+        # Token types that can match the (not yet verified) claims, most probable first
+        if 'user_uuid' in claims:
+            return ['user']
+        if 'device_uuid' in claims:
+            return ['device', 'device_static']
+        if 'participant_uuid' in claims:
+            # Only dynamic tokens expire
+            if 'exp' in claims:
+                return ['participant', 'participant_static']
+            return ['participant_static', 'participant']
+        if 'service_uuid' in claims:
+            return ['service']
+        return []
 
     @staticmethod
-    def validate_participant_token(token: str, allow_dynamic_tokens: bool, allow_static_tokens: bool) -> bool:
-        if allow_dynamic_tokens:  # Check for dynamic participant token
-            try:
-                token_dict = jwt.decode(token, ServiceAccessManager.api_participant_token_key, algorithms='HS256')
-            except jwt.PyJWTError as e:
-                # Not a participant, or invalid token, will continue...
-                pass
-            else:
-                # Participant token
-                _request_ctx_stack.top.current_participant_client = \
-                    TeraParticipantClient(token_dict, token, ServiceAccessManager.config_man)
-                _request_ctx_stack.top.current_login_type = LoginType.PARTICIPANT_LOGIN
-                return True
-
-        if allow_static_tokens:  # Check for static participant token
-            try:
-                token_dict = jwt.decode(token, ServiceAccessManager.api_participant_static_token_key,
-                                        algorithms='HS256')
-            except jwt.PyJWTError as e:
-                # Not a participant, or invalid token, will continue...
-                pass
-            else:
-                # Participant token
-                _request_ctx_stack.top.current_participant_client = \
-                    TeraParticipantClient(token_dict, token, ServiceAccessManager.config_man)
-                _request_ctx_stack.top.current_login_type = LoginType.PARTICIPANT_LOGIN
-                return True
-
-        return False
+    def get_keys_fingerprint() -> str:
+        # Changes when any token key is changed
+        keys = tuple([getattr(ServiceAccessManager, name) for name in ServiceAccessManager.token_types_keys.values()])
+        if keys != ServiceAccessManager.keys_fingerprint[0]:
+            digest = hashlib.sha256('\0'.join([str(key) for key in keys]).encode('utf-8')).hexdigest()
+            ServiceAccessManager.keys_fingerprint = (keys, digest)
+        return ServiceAccessManager.keys_fingerprint[1]
 
     @staticmethod
-    def validate_service_token(token:str) -> bool:
+    def decode_token(token: str, token_types: list):
+        """
+            Returns the type and claims of the token if valid for one of the token types, (None, None) otherwise.
+
+            The claims (not yet verified) tell which key the token should be signed with, so the signature is usually
+            verified only once instead of trying each key.
+        """
+        if not token:
+            return None, None
+
+        cache_key = (ServiceAccessManager.get_keys_fingerprint(), token)
+        with ServiceAccessManager.validated_tokens_lock:
+            validated = ServiceAccessManager.validated_tokens.get(cache_key)
+            if validated:
+                ServiceAccessManager.validated_tokens.move_to_end(cache_key)
+        if validated and validated[0] > time.time() and validated[1] in token_types:
+            return validated[1], validated[2]
+
         try:
-            token_dict = jwt.decode(token, ServiceAccessManager.api_service_token_key, algorithms='HS256')
-        except jwt.PyJWTError as e:
-            # Not a device, or invalid token, will continue...
-            pass
+            claims = jwt.decode(token, options={'verify_signature': False})
+        except jwt.PyJWTError:
+            return None, None
+
+        verified_keys = []
+        for token_type in ServiceAccessManager.get_token_candidate_types(claims):
+            key = getattr(ServiceAccessManager, ServiceAccessManager.token_types_keys[token_type])
+            if token_type not in token_types or key is None or key in verified_keys:
+                continue
+            verified_keys.append(key)
+            try:
+                token_dict = jwt.decode(token, key, algorithms='HS256')
+            except jwt.PyJWTError:
+                continue
+
+            expiration = time.time() + ServiceAccessManager.validated_tokens_ttl
+            if 'exp' in token_dict:
+                expiration = min(expiration, token_dict['exp'])
+            with ServiceAccessManager.validated_tokens_lock:
+                ServiceAccessManager.validated_tokens[cache_key] = (expiration, token_type, token_dict)
+                if len(ServiceAccessManager.validated_tokens) > ServiceAccessManager.validated_tokens_max:
+                    ServiceAccessManager.validated_tokens.popitem(last=False)
+            return token_type, token_dict
+
+        return None, None
+
+    @staticmethod
+    def validate_token(token: str, token_types: list) -> bool:
+        token_type, token_dict = ServiceAccessManager.decode_token(token, token_types)
+        if token_type is None:
+            return False
+
+        if token_type == 'user':
+            _request_ctx_stack.top.current_user_client = \
+                TeraUserClient(token_dict, token, ServiceAccessManager.config_man)
+            _request_ctx_stack.top.current_login_type = LoginType.USER_LOGIN
+        elif token_type in ['device', 'device_static']:
+            _request_ctx_stack.top.current_device_client = \
+                TeraDeviceClient(token_dict, token, ServiceAccessManager.config_man)
+            _request_ctx_stack.top.current_login_type = LoginType.DEVICE_LOGIN
+        elif token_type in ['participant', 'participant_static']:
+            _request_ctx_stack.top.current_participant_client = \
+                TeraParticipantClient(token_dict, token, ServiceAccessManager.config_man)
+            _request_ctx_stack.top.current_login_type = LoginType.PARTICIPANT_LOGIN
         else:
-            # Service token
             _request_ctx_stack.top.current_service_client = \
                 TeraServiceClient(token_dict, token, ServiceAccessManager.config_man)
             _request_ctx_stack.top.current_login_type = LoginType.SERVICE_LOGIN
-            return True
+        return True
 
-        return False
+    @staticmethod
+    def validate_user_token(token: str) -> bool:
+        return ServiceAccessManager.validate_token(token, ['user'])
+
+    @staticmethod
+    def validate_device_token(token: str, allow_dynamic_tokens: bool, allow_static_tokens: bool) -> bool:
+        token_types = ServiceAccessManager.get_allowed_token_types(allow_dynamic_tokens, allow_static_tokens)
+        return ServiceAccessManager.validate_token(token, [token_type for token_type in token_types
+                                                           if token_type.startswith('device')])
 
+    @staticmethod
+    def validate_participant_token(token: str, allow_dynamic_tokens: bool, allow_static_tokens: bool) -> bool:
+        token_types = ServiceAccessManager.get_allowed_token_types(allow_dynamic_tokens, allow_static_tokens)
+        return ServiceAccessManager.validate_token(token, [token_type for token_type in token_types
+                                                           if token_type.startswith('participant')])
+
+    @staticmethod
+    def validate_service_token(token: str) -> bool:
+        return ServiceAccessManager.validate_token(token, ['service'])
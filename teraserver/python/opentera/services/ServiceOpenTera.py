@@ -3,13 +3,14 @@ import json
 import time
 from opentera.redis.RedisVars import RedisVars
 from opentera.redis.RedisClient import RedisClient
-from requests import get, post, Response, delete
+from requests import Response
 from opentera.services.ServiceConfigManager import ServiceConfigManager
 import opentera.messages.python as messages
-from twisted.internet import defer
+from twisted.internet import defer, task
 import datetime
 from opentera.logging.LoggingClient import LoggingClient
 from opentera.services.ServiceAccessManager import ServiceAccessManager
+from opentera.services.BackendHttpClient import BackendHttpClient
 
 
 class ServiceOpenTera(RedisClient):
@@ -36,6 +37,14 @@ class ServiceOpenTera(RedisClient):
         self.backend_port = config_man.backend_config['port']
         self.service_uuid = config_man.service_config['ServiceUUID']
 
+        # Pooled connections to the backend, requests metrics logged periodically
+        self.backend_client = BackendHttpClient.get_instance(config_man.backend_config)
+        self.backend_metrics_loop = task.LoopingCall(self.log_backend_metrics)
+        metrics_log_interval = float(config_man.backend_config.get('metrics_log_interval',
+                                                                   BackendHttpClient.default_metrics_log_interval))
+        if metrics_log_interval > 0:
+            self.backend_metrics_loop.start(metrics_log_interval, now=False)
+
         # Create service token for service api requests
         self.service_token = self.service_generate_token()
 
@@ -159,20 +168,22 @@ class ServiceOpenTera(RedisClient):
     def post_to_opentera(self, api_url: str, json_data: dict) -> Response:
         # Synchronous call to OpenTera backend
         url = "https://" + self.backend_hostname + ':' + str(self.backend_port) + api_url
-        request_headers = {'Authorization': 'OpenTera ' + self.service_token}
-        return post(url=url, verify=False, headers=request_headers, json=json_data)
+        return self.backend_client.post(url, self.service_token, json_data=json_data)
 
     def get_from_opentera(self, api_url: str, params: dict) -> Response:
         # Synchronous call to OpenTera backend
         url = "https://" + self.backend_hostname + ':' + str(self.backend_port) + api_url
-        request_headers = {'Authorization': 'OpenTera ' + self.service_token}
-        return get(url=url, verify=False, headers=request_headers, params=params)
+        return self.backend_client.get(url, self.service_token, params=params)
 
     def delete_from_opentera(self, api_url: str, params: dict) -> Response:
         # Synchronous call to OpenTera backend
         url = "https://" + self.backend_hostname + ':' + str(self.backend_port) + api_url
-        request_headers = {'Authorization': 'OpenTera ' + self.service_token}
-        return delete(url=url, verify=False, headers=request_headers, params=params)
+        return self.backend_client.delete(url, self.service_token, params=params)
+
+    def log_backend_metrics(self):
+        metrics = self.backend_client.get_metrics(reset=True)
+        if metrics:
+            self.logger.log_info(self.config['name'], 'Backend requests metrics', json.dumps(metrics))
 
     def send_event_message(self, event, topic: str):
         message = self.create_event_message(topic)
@@ -1,6 +1,7 @@
 import uuid
 
 from requests import Response
+from opentera.services.BackendHttpClient import BackendHttpClient
 from flask import request
 
 
@@ -22,6 +23,7 @@ class TeraDeviceClient:
             backend_port = request.headers['X-Externalport']
 
         self.__backend_url = 'https://' + backend_hostname + ':' + backend_port
+        self.__backend_client = BackendHttpClient.get_instance(config_man.backend_config)
 
 
     @property
@@ -49,11 +51,7 @@ class TeraDeviceClient:
         self.__device_token = token
 
     def do_get_request_to_backend(self, path: str) -> Response:
-        from requests import get
-        request_headers = {'Authorization': 'OpenTera ' + self.__device_token}
-        # TODO: remove verify=False and check certificate
-        backend_response = get(url=self.__backend_url + path, headers=request_headers, verify=False)
-        return backend_response
+        return self.__backend_client.get(self.__backend_url + path, self.__device_token)
 
     def can_access_session(self, id_session: int) -> bool:
         response = self.do_get_request_to_backend('/api/device/sessions?id_session=' + str(id_session))
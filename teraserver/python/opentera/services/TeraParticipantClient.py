@@ -1,6 +1,7 @@
 import uuid
 
 from requests import Response
+from opentera.services.BackendHttpClient import BackendHttpClient
 from flask import request
 from opentera.redis.RedisRPCClient import RedisRPCClient
 
@@ -23,8 +24,9 @@ class TeraParticipantClient:
             backend_port = request.headers['X-Externalport']
 
         self.__backend_url = 'https://' + backend_hostname + ':' + backend_port
+        self.__backend_client = BackendHttpClient.get_instance(config_man.backend_config)
         self.__config_man = config_man
-        self.__rpc_client = RedisRPCClient(config_man.redis_config)
+        self.__rpc_client = RedisRPCClient.get_instance(config_man.redis_config)
 
     @property
     def participant_uuid(self):
@@ -62,11 +64,7 @@ class TeraParticipantClient:
         return {}
 
     def do_get_request_to_backend(self, path: str) -> Response:
-        from requests import get
-        request_headers = {'Authorization': 'OpenTera ' + self.__participant_token}
-        # TODO: remove verify=False and check certificate
-        backend_response = get(url=self.__backend_url + path, headers=request_headers, verify=False)
-        return backend_response
+        return self.__backend_client.get(self.__backend_url + path, self.__participant_token)
 
     def __repr__(self):
         return '<TeraParticipantClient - UUID: ' + self.__participant_uuid \
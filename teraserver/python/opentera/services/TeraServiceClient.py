@@ -1,6 +1,7 @@
 import uuid
 
 from requests import Response
+from opentera.services.BackendHttpClient import BackendHttpClient
 from flask import request
 
 
@@ -21,6 +22,7 @@ class TeraServiceClient:
             backend_port = request.headers['X-Externalport']
 
         self.__backend_url = 'https://' + backend_hostname + ':' + backend_port
+        self.__backend_client = BackendHttpClient.get_instance(config_man.backend_config)
 
     @property
     def service_uuid(self):
@@ -39,11 +41,7 @@ class TeraServiceClient:
         self.__service_token = token
 
     def do_get_request_to_backend(self, path: str) -> Response:
-        from requests import get
-        request_headers = {'Authorization': 'OpenTera ' + self.__service_token}
-        # TODO: remove verify=False and check certificate
-        backend_response = get(url=self.__backend_url + path, headers=request_headers, verify=False)
-        return backend_response
+        return self.__backend_client.get(self.__backend_url + path, self.__service_token)
 
     def get_service_infos(self) -> dict:
         response = self.do_get_request_to_backend('/api/service/services?uuid_service=' + self.__service_uuid)
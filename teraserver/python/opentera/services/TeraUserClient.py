@@ -1,9 +1,24 @@
 import uuid
 from flask import request
 from requests import Response
+from opentera.services.BackendHttpClient import BackendHttpClient
+from opentera.redis.RedisVars import RedisVars
+
+import redis
+import threading
+import time
 
 
 class TeraUserClient:
+    # Roles of the users in their sites and projects, by user uuid: (access generation, expiration, roles). Shared by
+    # all the clients of the process. Entries are outdated once the server access generation changes (users groups,
+    # access, sites or projects changes).
+    roles_cache = dict()
+    roles_cache_lock = threading.Lock()
+    roles_cache_ttl = 600
+
+    # Redis client used to get the access generation
+    redis_client = None
 
     def __init__(self, token_dict: dict, token: str, config_man):
         self.__user_uuid = token_dict['user_uuid']
@@ -23,6 +38,8 @@ class TeraUserClient:
             backend_port = request.headers['X-Externalport']
 
         self.__backend_url = 'https://' + backend_hostname + ':' + backend_port
+        self.__backend_client = BackendHttpClient.get_instance(config_man.backend_config)
+        self.__config_man = config_man
 
     @property
     def user_uuid(self):
@@ -65,41 +82,43 @@ class TeraUserClient:
         self.__user_superadmin = superadmin
 
     def do_get_request_to_backend(self, path: str) -> Response:
-        from requests import get
-        request_headers = {'Authorization': 'OpenTera ' + self.__user_token}
-        # TODO: remove verify=False and check certificate
-        backend_response = get(url=self.__backend_url + path, headers=request_headers, verify=False)
-        return backend_response
+        return self.__backend_client.get(self.__backend_url + path, self.__user_token)
+
+    def get_access_generation(self) -> int:
+        if TeraUserClient.redis_client is None:
+            redis_config = self.__config_man.redis_config
+            TeraUserClient.redis_client = redis.Redis(host=redis_config['hostname'], port=redis_config['port'],
+                                                      db=redis_config['db'], username=redis_config['username'],
+                                                      password=redis_config['password'])
+        generation = TeraUserClient.redis_client.get(RedisVars.RedisVar_AccessCacheGenerationKey)
+        return int(generation) if generation else 0
+
+    def get_roles(self) -> dict:
+        # Roles in all the accessible sites and projects, fetched with a single request and cached
+        generation = self.get_access_generation()
+        with TeraUserClient.roles_cache_lock:
+            entry = TeraUserClient.roles_cache.get(self.__user_uuid)
+        if entry and entry[0] == generation and entry[1] > time.monotonic():
+            return entry[2]
+
+        response = self.do_get_request_to_backend('/api/user/users?self=true')
+        if response.status_code != 200:
+            return {'sites': {}, 'projects': {}}
+
+        user_info = response.json()[0]
+        roles = {'sites': {site['id_site']: site['site_role'] for site in user_info.get('sites', [])},
+                 'projects': {project['id_project']: project['project_role']
+                              for project in user_info.get('projects', [])}}
+        expiration = time.monotonic() + TeraUserClient.roles_cache_ttl
+        with TeraUserClient.roles_cache_lock:
+            TeraUserClient.roles_cache[self.__user_uuid] = (generation, expiration, roles)
+        return roles
 
     def get_role_for_site(self, id_site: int):
-        response = self.do_get_request_to_backend('/api/user/sites?user_uuid=' + self.__user_uuid)
-
-        if response.status_code == 200:
-            # Parse JSON reply
-            import json
-            sites = json.loads(response.text)
-
-            # Find correct site in reply
-            for site in sites:
-                if site['id_site'] == id_site:
-                    return site['site_role']
-
-        return 'Undefined'
+        return self.get_roles()['sites'].get(id_site, 'Undefined')
 
     def get_role_for_project(self, id_project: int):
-        response = self.do_get_request_to_backend('/api/user/projects?user_uuid=' + self.__user_uuid)
-
-        if response.status_code == 200:
-            # Parse JSON reply
-            import json
-            projects = json.loads(response.text)
-
-            # Find correct site in reply
-            for project in projects:
-                if project['id_project'] == id_project:
-                    return project['project_role']
-
-        return 'Undefined'
+        return self.get_roles()['projects'].get(id_project, 'Undefined')
 
     def get_user_info(self):
         response = self.do_get_request_to_backend('/api/user/users?user_uuid=' + self.__user_uuid)
@@ -0,0 +1,38 @@
+import hashlib
+import math
+import threading
+
+
+class BloomFilter:
+    """
+        Probabilistic set of strings. A string that was added is always found, a string that was never added is found
+        with a probability of about error_rate when capacity strings were added. Strings can't be removed.
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def positions(self, item: str):
+        # Double hashing: k positions from two 64 bits hashes
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        hash1 = int.from_bytes(digest[:8], 'little')
+        hash2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(hash1 + i * hash2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str):
+        positions = self.positions(item)
+        with self.lock:
+            for position in positions:
+                self.bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
@@ -1,4 +1,6 @@
 import os
+import hashlib
+import mimetypes
 from datetime import datetime
 
 import json
@@ -36,8 +38,11 @@ class QueryAssetFile(Resource):
     @api.expect(get_parser, validate=True)
     @api.doc(description='Download asset',
              responses={200: 'Success - start download!',
+                        206: 'Success - requested range of the file',
+                        304: 'File not modified (If-None-Match)',
                         400: 'Bad request',
-                        403: 'Access denied to the requested asset'})
+                        403: 'Access denied to the requested asset',
+                        404: 'Asset file not found'})
     @ServiceAccessManager.service_or_others_token_required(allow_dynamic_tokens=True, allow_static_tokens=False)
     def get(self):
         args = get_parser.parse_args()
@@ -47,11 +52,32 @@ class QueryAssetFile(Resource):
 
         # Ok, all is fine, we can provide the requested file
         asset = AssetFileData.get_asset_for_uuid(uuid_asset=args['asset_uuid'])
-
-        src_dir = flask_app.config['UPLOAD_FOLDER']
-
-        filename = asset.asset_original_filename
-        return send_file(src_dir + '/' + str(asset.asset_uuid), as_attachment=True, attachment_filename=filename)
+        if not asset:
+            return gettext('Unknown asset'), 404
+
+        filename = os.path.abspath(os.path.join(flask_app.config['UPLOAD_FOLDER'], asset.asset_uuid))
+        if not os.path.isfile(filename):
+            return gettext('Unknown asset'), 404
+
+        if not asset.asset_file_hash:
+            # File uploaded before hashes were stored
+            asset.asset_file_hash = AssetFileData.get_file_hash(filename)
+            AssetFileData.commit()
+
+        if flask_app.config['DOWNLOAD_X_ACCEL_LOCATION']:
+            # File sent by the front web server (nginx), including ranges
+            mime = mimetypes.guess_type(asset.asset_original_filename)[0]
+            response = flask_app.response_class(mimetype=mime if mime else 'application/octet-stream')
+            location = flask_app.config['DOWNLOAD_X_ACCEL_LOCATION'].rstrip('/')
+            response.headers['X-Accel-Redirect'] = location + '/' + asset.asset_uuid
+            response.headers.set('Content-Disposition', 'attachment', filename=asset.asset_original_filename)
+            response.set_etag(asset.asset_file_hash)
+            return response.make_conditional(request)
+
+        # Conditional response: ranges (206) and If-None-Match / If-Range on the content hash (304). With USE_X_SENDFILE,
+        # the file is sent by the front web server.
+        return send_file(filename, as_attachment=True, download_name=asset.asset_original_filename,
+                         conditional=True, etag=asset.asset_file_hash)
 
     @api.doc(description='Upload a new file asset to the service',
              responses={200: 'Success - Return informations about file assets',
@@ -79,6 +105,32 @@ class QueryAssetFile(Resource):
         except json.JSONDecodeError as err:
             return gettext('Invalid file_asset format'), 400
 
+        original_filename = secure_filename(file.filename)
+        error = QueryAssetFile.prepare_asset(asset_json, original_filename)
+        if error:
+            return error
+
+        file_size = file.content_length
+        if file_size == 0:
+            # No specified content length - find the file size manually
+            file_size = file.seek(0, os.SEEK_END)
+            file.seek(0)
+
+        def save_file(filename: str) -> str:
+            # File is hashed while being saved
+            file_hash = hashlib.sha256()
+            with open(filename, 'wb') as saved_file:
+                for block in iter(lambda: file.stream.read(1024 * 1024), b''):
+                    file_hash.update(block)
+                    saved_file.write(block)
+            return file_hash.hexdigest()
+
+        return QueryAssetFile.create_asset(self.module, asset_json, original_filename, file_size, save_file)
+
+    @staticmethod
+    def prepare_asset(asset_json: dict, original_filename: str):
+        # Check that the asset can be created by the current requester and complete its descriptor. Returns an error
+        # reply, or None if the asset can be created.
         if 'id_session' not in asset_json or 'asset_name' not in asset_json:
             return gettext('Missing required field(s) in asset descriptor'), 400
 
@@ -147,10 +199,8 @@ class QueryAssetFile(Resource):
         asset_json['asset_service_uuid'] = Globals.service.service_info['service_uuid']
 
         # Set asset type if missing
-        original_filename = secure_filename(file.filename)
         if 'asset_type' not in asset_json:
             # Set the asset type based on the filename
-            import mimetypes
             mime = mimetypes.guess_type(original_filename)[0]
             if mime:
                 asset_json['asset_type'] = mime
@@ -161,7 +211,12 @@ class QueryAssetFile(Resource):
         if 'asset_datetime' not in asset_json:
             asset_json['asset_datetime'] = datetime.now().isoformat()
 
-        # OK, all set! Do the asset creation request...
+        return None
+
+    @staticmethod
+    def create_asset(module, asset_json: dict, original_filename: str, file_size: int, save_file):
+        # Create the asset on the server, then locally. save_file(filename) saves the file of the asset and returns its
+        # hash. Returns the reply with the asset informations.
         asset_json['id_asset'] = 0  # New asset creation
         response = Globals.service.post_to_opentera('/api/service/assets', {'asset': asset_json})
         if response.status_code != 200:
@@ -173,21 +228,14 @@ class QueryAssetFile(Resource):
 
         filename = os.path.join(flask_app.config['UPLOAD_FOLDER'], asset_uuid)
 
-        file_size = file.content_length
-        if file_size == 0:
-            # No specified content length - find the file size manually
-            file_size = file.seek(0, os.SEEK_END)
-            file.seek(0)
-
+        # Save the file itself, then its informations
         asset_file = AssetFileData()
         asset_file.asset_uuid = asset_uuid
         asset_file.asset_original_filename = original_filename
         asset_file.asset_file_size = file_size
+        asset_file.asset_file_hash = save_file(filename)
         AssetFileData.insert(asset_file)
 
-        # Finally... save the file itself!
-        file.save(filename)
-
         # All done here - return asset info, including AssetFileData
         full_json = {**new_asset_json, **asset_file.to_json()}
 
@@ -195,18 +243,18 @@ class QueryAssetFile(Resource):
         if 'X_EXTERNALSERVER' in request.headers:
             servername = request.headers['X_EXTERNALSERVER']
         else:
-            servername = self.module.config.service_config['hostname']
+            servername = module.config.service_config['hostname']
 
         if 'X_EXTERNALPORT' in request.headers:
             port = request.headers['X_EXTERNALPORT']
         else:
-            port = self.module.config.service_config['port']
+            port = module.config.service_config['port']
 
         endpoint = Globals.service.service_info['service_clientendpoint']
         # Access token
         from opentera.redis.RedisVars import RedisVars
         from opentera.db.models.TeraAsset import TeraAsset
-        token_key = self.module.redisGet(RedisVars.RedisVar_ServiceTokenAPIKey)
+        token_key = module.redisGet(RedisVars.RedisVar_ServiceTokenAPIKey)
         access_token = TeraAsset.get_access_token(asset_uuids=[asset_uuid], token_key=token_key,
                                                   requester_uuid=Globals.service.get_current_requester_uuid(),
                                                   expiration=1800)
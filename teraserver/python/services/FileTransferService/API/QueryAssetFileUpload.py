@@ -0,0 +1,198 @@
+import os
+
+from werkzeug.utils import secure_filename
+from flask import request
+from flask_babel import gettext
+from flask_restx import Resource, reqparse, inputs
+from services.FileTransferService.FlaskModule import file_api_ns as api
+from opentera.services.ServiceAccessManager import ServiceAccessManager
+from services.FileTransferService.FlaskModule import flask_app
+from services.FileTransferService.libfiletransferservice.db.models.AssetFileData import AssetFileData
+from services.FileTransferService.libfiletransferservice.db.models.AssetFileUpload import AssetFileUpload
+from API.QueryAssetFile import QueryAssetFile
+
+import json
+import services.FileTransferService.Globals as Globals
+
+# Parser definition(s)
+get_parser = api.parser()
+get_parser.add_argument('upload_uuid', type=str, required=True, help='UUID of the upload to query')
+
+post_schema = api.schema_model('upload', {'properties': {
+                                                            'file_asset': {
+                                                                'type': 'object',
+                                                                'location': 'json'},
+                                                            'filename': {
+                                                                'type': 'string',
+                                                                'location': 'json'},
+                                                            'file_size': {
+                                                                'type': 'integer',
+                                                                'location': 'json'}
+                                                            }
+                                          }
+                               )
+
+put_parser = api.parser()
+# Query string only: the body is the chunk
+put_parser.add_argument('upload_uuid', type=str, required=True, location='args', help='UUID of the upload')
+put_parser.add_argument('offset', type=int, required=True, location='args',
+                        help='Offset of the chunk (in the body) in the file. Must be the number of bytes already '
+                             'received.')
+put_parser.add_argument('finalize', type=inputs.boolean, location='args',
+                        help='Last chunk: create the asset once the chunk is written')
+put_parser.add_argument('sha256', type=str, location='args',
+                        help='SHA-256 (hexadecimal) of the whole file, required to finalize')
+
+delete_parser = api.parser()
+delete_parser.add_argument('upload_uuid', type=str, required=True, help='UUID of the upload to cancel')
+
+
+class QueryAssetFileUpload(Resource):
+    """
+        Resumable uploads: the upload is started with the asset descriptor (POST), then the file is sent in chunks, each
+        one at the offset of the bytes already received (PUT). If a chunk is lost, the upload is resumed from the
+        current offset (GET). The last chunk finalizes the upload, which creates the asset once the file checksum is
+        verified.
+    """
+
+    def __init__(self, _api, *args, **kwargs):
+        Resource.__init__(self, _api, *args, **kwargs)
+        self.module = kwargs.get('flaskModule', None)
+        self.parser = reqparse.RequestParser()
+
+    @staticmethod
+    def get_requester_upload(upload_uuid: str):
+        # Upload, if it was started by the current requester
+        upload = AssetFileUpload.get_upload_for_uuid(upload_uuid)
+        if not upload or upload.upload_requester_uuid != Globals.service.get_current_requester_uuid():
+            return None
+        return upload
+
+    @api.expect(get_parser, validate=True)
+    @api.doc(description='Query the state of an upload, to know from which offset it must be resumed',
+             responses={200: 'Success - Return the upload state',
+                        400: 'Bad request',
+                        403: 'Access denied to the requested upload'})
+    @ServiceAccessManager.service_or_others_token_required(allow_dynamic_tokens=True, allow_static_tokens=False)
+    def get(self):
+        args = get_parser.parse_args()
+
+        upload = QueryAssetFileUpload.get_requester_upload(args['upload_uuid'])
+        if not upload:
+            return gettext('Access denied to upload'), 403
+
+        file_folder = flask_app.config['UPLOAD_FOLDER']
+        if upload.is_partial_file_lost(file_folder):
+            upload.restart(file_folder)
+
+        return upload.to_json()
+
+    @api.expect(post_schema)
+    @api.doc(description='Start an upload. The asset descriptor (file_asset) is the same as for a single request '
+                         'upload.',
+             responses={200: 'Success - Return the upload state',
+                        400: 'Required parameter is missing',
+                        403: 'Access denied to the requested session'})
+    @ServiceAccessManager.service_or_others_token_required(allow_dynamic_tokens=True, allow_static_tokens=False)
+    def post(self):
+        upload_json = request.get_json(silent=True)
+        if not upload_json or 'file_asset' not in upload_json or not isinstance(upload_json['file_asset'], dict):
+            return gettext('Missing file asset information'), 400
+
+        if not upload_json.get('filename'):
+            return gettext('Missing filename'), 400
+
+        file_size = upload_json.get('file_size')
+        if file_size is not None and (not isinstance(file_size, int) or file_size < 0):
+            return gettext('Invalid file size'), 400
+
+        asset_json = upload_json['file_asset']
+        original_filename = secure_filename(upload_json['filename'])
+        error = QueryAssetFile.prepare_asset(asset_json, original_filename)
+        if error:
+            return error
+
+        upload = AssetFileUpload()
+        upload.upload_requester_uuid = Globals.service.get_current_requester_uuid()
+        upload.upload_original_filename = original_filename
+        upload.upload_asset_json = json.dumps(asset_json)
+        upload.upload_file_size = file_size
+        AssetFileUpload.insert(upload)
+
+        return upload.to_json()
+
+    @api.expect(put_parser)
+    @api.doc(description='Send a chunk (request body) of the file, and optionally finalize the upload',
+             responses={200: 'Success - Return the upload state, or informations about the asset if finalized',
+                        400: 'Bad request',
+                        403: 'Access denied to the requested upload',
+                        409: 'Offset is not the number of bytes already received - Return the upload state',
+                        416: 'Bytes already received were lost, upload must be restarted from offset 0 - Return the '
+                             'upload state'})
+    @ServiceAccessManager.service_or_others_token_required(allow_dynamic_tokens=True, allow_static_tokens=False)
+    def put(self):
+        args = put_parser.parse_args()
+
+        upload = QueryAssetFileUpload.get_requester_upload(args['upload_uuid'])
+        if not upload:
+            return gettext('Access denied to upload'), 403
+
+        if args['finalize'] and not args['sha256']:
+            return gettext('Missing file checksum'), 400
+
+        if upload.upload_file_size is not None and request.content_length and \
+                args['offset'] + request.content_length > upload.upload_file_size:
+            return gettext('Chunk exceeds file size'), 400
+
+        file_folder = flask_app.config['UPLOAD_FOLDER']
+        if upload.is_partial_file_lost(file_folder):
+            upload.restart(file_folder)
+            return upload.to_json(), 416
+
+        if not upload.append_chunk(file_folder, args['offset'], request.stream):
+            return upload.to_json(), 409
+
+        if not args['finalize']:
+            return upload.to_json()
+
+        if upload.upload_file_size is not None and upload.upload_offset != upload.upload_file_size:
+            return gettext('Missing file chunk(s)'), 400
+
+        partial_filename = upload.get_partial_filename(file_folder)
+        if not os.path.exists(partial_filename) or upload.is_partial_file_lost(file_folder):
+            upload.restart(file_folder)
+            return upload.to_json(), 416
+
+        if AssetFileData.get_file_hash(partial_filename) != args['sha256'].lower():
+            # File can't be trusted, upload starts over
+            upload.restart(file_folder)
+            return gettext('Invalid file checksum'), 400
+
+        def save_file(filename: str) -> str:
+            os.replace(partial_filename, filename)
+            return args['sha256'].lower()
+
+        reply = QueryAssetFile.create_asset(self.module, json.loads(upload.upload_asset_json),
+                                            upload.upload_original_filename, upload.upload_offset, save_file)
+        if isinstance(reply, dict):
+            # Asset created, partial file moved to the asset file
+            upload.delete_upload(file_folder)
+        return reply
+
+    @api.expect(delete_parser, validate=True)
+    @api.doc(description='Cancel an upload',
+             responses={200: 'Success - upload deleted',
+                        400: 'Bad request',
+                        403: 'Access denied to the requested upload'})
+    @ServiceAccessManager.service_or_others_token_required(allow_dynamic_tokens=True, allow_static_tokens=False)
+    def delete(self):
+        args = delete_parser.parse_args()
+
+        upload = QueryAssetFileUpload.get_requester_upload(args['upload_uuid'])
+        if not upload:
+            return gettext('Access denied to upload'), 403
+
+        if not upload.delete_upload(flask_app.config['UPLOAD_FOLDER']):
+            return gettext('Error occured when deleting upload'), 500
+
+        return '', 200
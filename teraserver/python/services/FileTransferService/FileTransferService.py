@@ -6,10 +6,11 @@ from opentera.services.ServiceAccessManager import ServiceAccessManager
 from opentera.redis.RedisVars import RedisVars
 
 # Twisted
-from twisted.internet import reactor, defer
+from twisted.internet import reactor, defer, task
 from twisted.python import log
 import sys
 import os
+import datetime
 
 from opentera.services.ServiceOpenTeraWithAssets import ServiceOpenTeraWithAssets
 from sqlalchemy.exc import OperationalError
@@ -29,6 +30,12 @@ class FileTransferService(ServiceOpenTeraWithAssets):
         # Create twisted service
         self.flaskModuleService = self.flaskModule.create_service()
 
+        # Uploads not resumed for that long are removed, checked every hour
+        self.upload_expiration = datetime.timedelta(
+            hours=config_man.filetransfer_config.get('upload_expiration_hours', 24))
+        self.uploads_cleanup_loop = task.LoopingCall(self.remove_expired_uploads)
+        self.uploads_cleanup_loop.start(3600, now=False)
+
         # self.application = service.Application(self.config['name'])
 
     def verify_file_upload_directory(self, config: ConfigManager, create=True):
@@ -42,6 +49,12 @@ class FileTransferService(ServiceOpenTeraWithAssets):
                 return None
         return file_upload_path
 
+    def remove_expired_uploads(self):
+        from services.FileTransferService.libfiletransferservice.db.models.AssetFileUpload import AssetFileUpload
+        with flask_app.app_context():
+            for upload in AssetFileUpload.get_expired_uploads(self.upload_expiration):
+                upload.delete_upload(flask_app.config['UPLOAD_FOLDER'])
+
     def notify_service_messages(self, pattern, channel, message):
         pass
 
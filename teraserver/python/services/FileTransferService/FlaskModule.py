@@ -171,6 +171,14 @@ class FlaskModule(BaseModule):
         # TODO set upload folder in config
         flask_app.config.update({'UPLOAD_FOLDER': config.filetransfer_config['files_directory']})
 
+        # Downloads can be sent by the front web server: 'x-sendfile' (apache, lighttpd, ...) or 'x-accel-redirect'
+        # (nginx, with download_x_accel_location as the internal location of the files directory)
+        download_offload = config.filetransfer_config.get('download_offload', '')
+        flask_app.config.update({'USE_X_SENDFILE': download_offload == 'x-sendfile'})
+        flask_app.config.update({'DOWNLOAD_X_ACCEL_LOCATION':
+                                 config.filetransfer_config.get('download_x_accel_location', '/files')
+                                 if download_offload == 'x-accel-redirect' else None})
+
         # Not sure.
         # flask_app.config.update({'BABEL_DEFAULT_TIMEZONE': 'UTC'})
         # self.session = Session(flask_app)
@@ -228,9 +236,11 @@ class FlaskModule(BaseModule):
         kwargs = {'flaskModule': self}
         from API.QueryAssetFileInfos import QueryAssetFileInfos
         from API.QueryAssetFile import QueryAssetFile
+        from API.QueryAssetFileUpload import QueryAssetFileUpload
 
         file_api_ns.add_resource(QueryAssetFileInfos, '/assets/infos', resource_class_kwargs=kwargs)
         file_api_ns.add_resource(QueryAssetFile,      '/assets', resource_class_kwargs=kwargs)
+        file_api_ns.add_resource(QueryAssetFileUpload, '/assets/uploads', resource_class_kwargs=kwargs)
 
     def init_views(self):
         # Default arguments
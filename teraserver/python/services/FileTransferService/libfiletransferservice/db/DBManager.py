@@ -72,7 +72,15 @@ class DBManager:
 
     def upgrade_db(self):
         # TODO ALEMBIC UPGRADES...
-        pass
+        from services.FileTransferService.libfiletransferservice.db.models.AssetFileData import AssetFileData
+        from sqlalchemy import inspect
+
+        # Columns added after the table was created
+        columns = [column['name'] for column in inspect(db.engine).get_columns(AssetFileData.__tablename__)]
+        if 'asset_file_hash' not in columns:
+            with db.engine.begin() as connection:
+                connection.execute(db.text('ALTER TABLE %s ADD COLUMN asset_file_hash VARCHAR(64)'
+                                           % AssetFileData.__tablename__))
 
     def stamp_db(self):
         # TODO ALEMBIC UPGRADES
@@ -1,6 +1,7 @@
 from services.FileTransferService.libfiletransferservice.db.Base import db
 from opentera.db.Base import BaseModel
 from sqlalchemy import exc
+import hashlib
 import os
 
 
@@ -12,7 +13,8 @@ class AssetFileData(db.Model, BaseModel):
     asset_uuid = db.Column(db.String(36), nullable=False, unique=True)
     asset_original_filename = db.Column(db.String, nullable=False)
     asset_file_size = db.Column(db.BigInteger, nullable=False)
-    # asset_md5 = db.Column(db.String, nullable=False)  # Not used now
+    # SHA-256 of the file content (hexadecimal), used as the download ETag
+    asset_file_hash = db.Column(db.String(64), nullable=True)
 
     @staticmethod
     def get_asset_for_uuid(uuid_asset: str):
@@ -22,6 +24,25 @@ class AssetFileData(db.Model, BaseModel):
     def get_assets_for_uuids(uuids_asset: list):
         return AssetFileData.query.filter(AssetFileData.asset_uuid.in_(uuids_asset)).all()
 
+    @classmethod
+    def commit(cls):
+        # Session of this service database
+        db.session.commit()
+
+    @classmethod
+    def insert(cls, asset):
+        db.session.add(asset)
+        cls.commit()
+
+    @staticmethod
+    def get_file_hash(filename: str, block_size: int = 1024 * 1024) -> str:
+        # SHA-256 (hexadecimal) of the content of a file
+        file_hash = hashlib.sha256()
+        with open(filename, 'rb') as file:
+            for block in iter(lambda: file.read(block_size), b''):
+                file_hash.update(block)
+        return file_hash.hexdigest()
+
     # Delete this asset. file_folder is required to delete the file too.
     def delete_file_asset(self, file_folder: str) -> bool:
         # Delete related file from system
@@ -0,0 +1,122 @@
+from services.FileTransferService.libfiletransferservice.db.Base import db
+from opentera.db.Base import BaseModel
+from sqlalchemy import exc
+from datetime import datetime, timedelta, timezone
+import os
+import uuid
+
+
+class AssetFileUpload(db.Model, BaseModel):
+    """
+        State of a resumable (chunked) upload. Chunks are written in the upload folder, in a partial file named after
+        the upload uuid. The asset is only created (on the server and as an AssetFileData) once the upload is finalized.
+    """
+    __tablename__ = "t_asset_file_upload"
+    id_asset_file_upload = db.Column(db.Integer, db.Sequence('id_asset_file_upload_sequence'),
+                                     primary_key=True, autoincrement=True)
+
+    upload_uuid = db.Column(db.String(36), nullable=False, unique=True)
+    # Uuid of the user, participant, device or service doing the upload
+    upload_requester_uuid = db.Column(db.String(36), nullable=False)
+    upload_original_filename = db.Column(db.String, nullable=False)
+    # Asset descriptor (json), as validated when the upload was started
+    upload_asset_json = db.Column(db.String, nullable=False)
+    # Expected file size, if known when the upload was started
+    upload_file_size = db.Column(db.BigInteger, nullable=True)
+    # Number of bytes received so far
+    upload_offset = db.Column(db.BigInteger, nullable=False, default=0)
+    upload_last_update = db.Column(db.TIMESTAMP(timezone=True), nullable=False)
+
+    def to_json(self, ignore_fields=None):
+        if ignore_fields is None:
+            ignore_fields = []
+
+        ignore_fields.extend(['id_asset_file_upload', 'upload_requester_uuid', 'upload_asset_json'])
+        return super().to_json(ignore_fields=ignore_fields)
+
+    def get_partial_filename(self, file_folder: str) -> str:
+        return os.path.join(file_folder, self.upload_uuid + '.part')
+
+    @staticmethod
+    def get_upload_for_uuid(uuid_upload: str):
+        return AssetFileUpload.query.filter_by(upload_uuid=uuid_upload).first()
+
+    @staticmethod
+    def get_expired_uploads(expiration: timedelta) -> list:
+        return AssetFileUpload.query.filter(AssetFileUpload.upload_last_update <
+                                            datetime.now(timezone.utc) - expiration).all()
+
+    @classmethod
+    def commit(cls):
+        # Session of this service database
+        db.session.commit()
+
+    @classmethod
+    def insert(cls, upload):
+        # Generate UUID
+        upload.upload_uuid = str(uuid.uuid4())
+        upload.upload_offset = 0
+        upload.upload_last_update = datetime.now(timezone.utc)
+        db.session.add(upload)
+        cls.commit()
+
+    def is_partial_file_lost(self, file_folder: str) -> bool:
+        # Bytes already received are no longer in the partial file (file removed or truncated)
+        if self.upload_offset == 0:
+            return False
+        file_name = self.get_partial_filename(file_folder)
+        return not os.path.exists(file_name) or os.path.getsize(file_name) < self.upload_offset
+
+    def restart(self, file_folder: str):
+        # Upload starts over, from the first byte
+        file_name = self.get_partial_filename(file_folder)
+        if os.path.exists(file_name):
+            os.remove(file_name)
+        self.upload_offset = 0
+        self.upload_last_update = datetime.now(timezone.utc)
+        self.commit()
+
+    def append_chunk(self, file_folder: str, offset: int, stream, chunk_size: int = 1024 * 1024) -> bool:
+        # Write a chunk received at offset in the partial file. Returns False if offset is not the current upload
+        # offset (chunk already received, or upload resumed from another offset in the meantime), or if the partial
+        # file was removed in the meantime.
+        if offset != self.upload_offset:
+            return False
+
+        try:
+            partial_file = open(self.get_partial_filename(file_folder), 'r+b' if offset > 0 else 'wb')
+        except FileNotFoundError:
+            return False
+
+        with partial_file:
+            # Bytes past the offset are from an interrupted chunk
+            partial_file.truncate(offset)
+            partial_file.seek(offset)
+            while True:
+                data = stream.read(chunk_size)
+                if not data:
+                    break
+                partial_file.write(data)
+            new_offset = partial_file.tell()
+
+        # Offset is only moved if no other chunk was written at the same offset at the same time
+        updated = AssetFileUpload.query.filter_by(id_asset_file_upload=self.id_asset_file_upload,
+                                                  upload_offset=offset)\
+            .update({'upload_offset': new_offset, 'upload_last_update': datetime.now(timezone.utc)},
+                    synchronize_session='fetch')
+        self.commit()
+        return updated == 1
+
+    # Delete this upload and its partial file
+    def delete_upload(self, file_folder: str) -> bool:
+        file_name = self.get_partial_filename(file_folder)
+        if os.path.exists(file_name):
+            os.remove(file_name)
+
+        try:
+            db.session.delete(self)
+            self.commit()
+        except exc.SQLAlchemyError:
+            return False
+
+        return True
@@ -1,3 +1,4 @@
 # All exported symbols
 from .AssetFileData import AssetFileData
-__all__ = ['AssetFileData']
+from .AssetFileUpload import AssetFileUpload
+__all__ = ['AssetFileData', 'AssetFileUpload']
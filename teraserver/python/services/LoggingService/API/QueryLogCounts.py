@@ -0,0 +1,42 @@
+from flask_restx import Resource, reqparse, inputs
+from sqlalchemy.exc import InvalidRequestError
+from services.LoggingService.FlaskModule import logging_api_ns as api
+from opentera.services.ServiceAccessManager import ServiceAccessManager, current_user_client
+from services.LoggingService.libloggingservice.db.models.LogHourlyCount import LogHourlyCount
+
+# Parser definition(s)
+get_parser = api.parser()
+get_parser.add_argument('log_level', type=int, help='Limit to counts of that log level')
+get_parser.add_argument('sender', type=str, help='Limit to counts of that sender')
+get_parser.add_argument('start_date', type=inputs.datetime_from_iso8601,
+                        help='Start date, hours before that date will be ignored')
+get_parser.add_argument('end_date', type=inputs.datetime_from_iso8601,
+                        help='End date (excluded), hours on or after that date will be ignored')
+
+
+class QueryLogCounts(Resource):
+
+    def __init__(self, _api, *args, **kwargs):
+        Resource.__init__(self, _api, *args, **kwargs)
+        self.module = kwargs.get('flaskModule', None)
+        self.parser = reqparse.RequestParser()
+
+    @api.expect(get_parser)
+    @api.doc(description='Get the number of log entries of each hour, by sender and log level.',
+             responses={200: 'Success - returns list of hourly counts',
+                        500: 'Required parameter is missing',
+                        403: 'Logged user doesn\'t have permission to access the requested data'})
+    @ServiceAccessManager.token_required
+    def get(self):
+        args = get_parser.parse_args()
+
+        if current_user_client and current_user_client.user_superadmin:
+            try:
+                counts = LogHourlyCount.get_counts(start_date=args['start_date'], end_date=args['end_date'],
+                                                   sender=args['sender'], log_level=args['log_level'])
+                return [count.to_json(minimal=False) for count in counts]
+
+            except InvalidRequestError:
+                return '', 500
+
+        return 'Unauthorized', 403
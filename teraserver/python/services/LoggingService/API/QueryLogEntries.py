@@ -1,4 +1,4 @@
-from flask_restx import Resource, reqparse
+from flask_restx import Resource, reqparse, inputs
 from sqlalchemy.exc import InvalidRequestError
 from services.LoggingService.FlaskModule import logging_api_ns as api
 from opentera.services.ServiceAccessManager import ServiceAccessManager, current_user_client
@@ -6,6 +6,24 @@ from services.LoggingService.libloggingservice.db.models.LogEntry import LogEntr
 
 # Parser definition(s)
 get_parser = api.parser()
+get_parser.add_argument('log_level', type=int, help='Limit to entries of that log level')
+get_parser.add_argument('sender', type=str, help='Limit to entries of that sender')
+get_parser.add_argument('message', type=str, help='Limit to entries which message contains that text (case '
+                                                  'insensitive)')
+get_parser.add_argument('start_date', type=inputs.datetime_from_iso8601,
+                        help='Start date, entries before that date will be ignored')
+get_parser.add_argument('end_date', type=inputs.datetime_from_iso8601,
+                        help='End date (excluded), entries on or after that date will be ignored')
+get_parser.add_argument('limit', type=int, help='Maximum number of results to return (default and maximum: '
+                                                '1000)')
+get_parser.add_argument('before_timestamp', type=inputs.datetime_from_iso8601,
+                        help='Only return entries older than that timestamp (timestamp of the last entry of the '
+                             'previous page)')
+get_parser.add_argument('before_id', type=int, help='With before_timestamp, id of the last entry of the previous '
+                                                    'page')
+
+# Maximum number of entries returned by a query
+max_entries = 1000
 
 
 class QueryLogEntries(Resource):
@@ -16,19 +34,28 @@ class QueryLogEntries(Resource):
         self.parser = reqparse.RequestParser()
 
     @api.expect(get_parser)
-    @api.doc(description='To be documented '
-                         'To be documented',
-             responses={200: 'Success - To be documented',
+    @api.doc(description='Get log entries, newest first. Next page is queried with before_timestamp and before_id '
+                         'of the last entry returned.',
+             responses={200: 'Success - returns list of log entries',
                         500: 'Required parameter is missing',
                         501: 'Not implemented.',
                         403: 'Logged user doesn\'t have permission to access the requested data'})
     @ServiceAccessManager.token_required
     def get(self):
+        args = get_parser.parse_args()
 
         # TODO Only allow superadmins to query logs?
         if current_user_client and current_user_client.user_superadmin:
             try:
-                all_entries = LogEntry.query.all()
+                limit = max_entries
+                if args['limit'] is not None and 0 < args['limit'] < max_entries:
+                    limit = args['limit']
+
+                all_entries = LogEntry.query_entries(log_level=args['log_level'], sender=args['sender'],
+                                                     message=args['message'], start_date=args['start_date'],
+                                                     end_date=args['end_date'],
+                                                     before_timestamp=args['before_timestamp'],
+                                                     before_id=args['before_id'], limit=limit)
                 results = []
                 for entry in all_entries:
                     results.append(entry.to_json(minimal=False))
@@ -230,6 +230,9 @@ class FlaskModule(BaseModule):
         from services.LoggingService.API.QueryLogEntries import QueryLogEntries
         logging_api_ns.add_resource(QueryLogEntries, '/log_entries', resource_class_kwargs=kwargs)
 
+        from services.LoggingService.API.QueryLogCounts import QueryLogCounts
+        logging_api_ns.add_resource(QueryLogCounts, '/log_counts', resource_class_kwargs=kwargs)
+
 
     def init_views(self):
         # Default arguments
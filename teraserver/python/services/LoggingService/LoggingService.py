@@ -19,6 +19,15 @@ from services.LoggingService.FlaskModule import FlaskModule
 
 
 class LoggingService(ServiceOpenTera):
+    # Log queues, one for each level
+    log_queues = ['log.trace', 'log.debug', 'log.info', 'log.warning', 'log.critical', 'log.error', 'log.fatal']
+
+    # Maximum number of entries read from each queue in a single redis round trip
+    queue_batch_size = 500
+
+    # Interval, in seconds, of the log storage maintenance (partitions and retention)
+    storage_maintenance_interval = 3600
+
     def __init__(self, config_man: ConfigManager, this_service_info):
         ServiceOpenTera.__init__(self, config_man, this_service_info)
 
@@ -34,15 +43,39 @@ class LoggingService(ServiceOpenTera):
         # TODO will log everything for now
         self.loglevel = messages.LogEvent.LOGLEVEL_TRACE
 
+        # Next batch of read_queues, when queues were not emptied by the last batch
+        self.read_queues_call = None
+
     def notify_service_messages(self, pattern, channel, message):
         pass
 
-    def read_queues(self, queue_name: str):
-        # print('read_queues', queue_name)
-        # Reading queue
-        while self.redis.llen(queue_name) > 0:
-            message = self.redis.lpop(queue_name)
-            self.log_event_received(queue_name, queue_name, message)
+    def read_queues(self):
+        # Read one batch of up to queue_batch_size entries of each queue, stored with a single insert. If a queue still
+        # has entries, the next batch is read on the next reactor iteration, so that a burst of logs doesn't keep the
+        # reactor busy until all queues are empty.
+        if self.read_queues_call and self.read_queues_call.active():
+            # Next batch already scheduled
+            return
+        self.read_queues_call = None
+
+        pipe = self.redis.pipeline()
+        for queue_name in self.log_queues:
+            pipe.lrange(queue_name, 0, self.queue_batch_size - 1)
+            pipe.ltrim(queue_name, self.queue_batch_size, -1)
+        results = pipe.execute()
+
+        # Results of lrange, ltrim for each queue
+        queues_messages = results[0::2]
+        log_events = []
+        for queue_name, queue_messages in zip(self.log_queues, queues_messages):
+            for message in queue_messages:
+                log_events.extend(self.decode_log_events(queue_name, queue_name, message))
+
+        if log_events:
+            Globals.db_man.store_log_events(log_events)
+
+        if any(len(queue_messages) >= self.queue_batch_size for queue_messages in queues_messages):
+            self.read_queues_call = reactor.callLater(0, self.read_queues)
 
     def cbLoopDone(self, result):
         """
@@ -62,20 +95,40 @@ class LoggingService(ServiceOpenTera):
         ret1 = yield self.subscribe_pattern_with_callback('log.*', self.log_event_received)
         print(ret1)
 
-        log_levels = ['log.trace', 'log.debug', 'log.info', 'log.warning', 'log.critical', 'log.error', 'log.fatal']
+        loop = task.LoopingCall(self.read_queues)
+
+        # Start looping every 1 second.
+        d = loop.start(1.0)
 
-        for level in log_levels:
-            loop = task.LoopingCall(self.read_queues, level)
+        # Add callbacks for stop and failure.
+        d.addCallback(self.cbLoopDone)
+        d.addErrback(self.ebLoopFailed)
 
-            # Start looping every 1 second.
-            d = loop.start(1.0)
+        # Storage maintenance, now and then every storage_maintenance_interval
+        maintenance_loop = task.LoopingCall(self.maintain_storage)
+        d = maintenance_loop.start(self.storage_maintenance_interval)
+        d.addCallback(self.cbLoopDone)
+        d.addErrback(self.ebLoopFailed)
 
-            # Add callbacks for stop and failure.
-            d.addCallback(self.cbLoopDone)
-            d.addErrback(self.ebLoopFailed)
+    def maintain_storage(self):
+        # Errors are only logged, otherwise the maintenance loop would stop for good
+        try:
+            dropped = Globals.db_man.maintain_storage()
+        except Exception as e:
+            print('LoggingService - Log storage maintenance failed: ', e)
+            return
+        if dropped:
+            print('LoggingService - Dropped expired log partitions: ', dropped)
 
     def log_event_received(self, pattern, channel, message):
         # print('LoggingService - user_manager_event_received', pattern, channel, message)
+        log_events = self.decode_log_events(pattern, channel, message)
+        if log_events:
+            Globals.db_man.store_log_events(log_events)
+
+    def decode_log_events(self, pattern, channel, message) -> list:
+        # Log events to store from a TeraEvent message
+        log_events = []
         try:
             tera_event = messages.TeraEvent()
             if isinstance(message, str):
@@ -83,14 +136,12 @@ class LoggingService(ServiceOpenTera):
             elif isinstance(message, bytes):
                 ret = tera_event.ParseFromString(message)
 
-            log_event = messages.LogEvent()
-
-            # Look for UserEvent, ParticipantEvent, DeviceEvent
             for any_msg in tera_event.events:
+                log_event = messages.LogEvent()
                 if any_msg.Unpack(log_event):
                     # Check current log level, store db if lower than current log level
                     if log_event.level <= self.loglevel:
-                        Globals.db_man.store_log_event(log_event)
+                        log_events.append(log_event)
                     else:
                         print(log_event)
 
@@ -99,6 +150,8 @@ class LoggingService(ServiceOpenTera):
         except ParseError as e:
             print('LoggingService - Failure in redisMessageReceived', e)
 
+        return log_events
+
     def setup_rpc_interface(self):
         # TODO Update rpc interface
         self.rpc_api['set_loglevel'] = {'args': ['str:loglevel'],
@@ -167,6 +220,9 @@ if __name__ == '__main__':
         'port': Globals.config_man.db_config['port']
     }
 
+    # Partitions and retention settings
+    Globals.db_man.partitions.load_config(Globals.config_man.logging_config)
+
     try:
         Globals.db_man.open(POSTGRES, Globals.config_man.service_config['debug_mode'])
     except OperationalError as e:
@@ -4,10 +4,13 @@ from services.LoggingService.libloggingservice.db.Base import db
 # Must include all Database objects here to be properly initialized and created if needed
 # All at once to make sure all files are registered.
 from services.LoggingService.libloggingservice.db.models.LogEntry import LogEntry
+from services.LoggingService.libloggingservice.db.models.LogHourlyCount import LogHourlyCount
+from services.LoggingService.libloggingservice.db.LogPartitionManager import LogPartitionManager
 
 from services.LoggingService.ConfigManager import ConfigManager
 from services.LoggingService.FlaskModule import flask_app
 from opentera.messages.python.LogEvent_pb2 import LogEvent
+from sqlalchemy.dialects import postgresql, sqlite
 import datetime
 
 # Alembic
@@ -27,6 +30,7 @@ class DBManager:
 
     def __init__(self):
         self.db_uri = None
+        self.partitions = LogPartitionManager()
 
     def create_defaults(self, config: ConfigManager):
         if LogEntry.get_count() == 0:
@@ -79,17 +83,46 @@ class DBManager:
 
     def upgrade_db(self):
         # TODO ALEMBIC UPGRADES...
-        pass
+        # Until then, partition the log entries and create the indexes added after the tables were created
+        self.partitions.setup()
+        for index in LogEntry.__table__.indexes:
+            index.create(bind=db.engine, checkfirst=True)
 
     def stamp_db(self):
         # TODO ALEMBIC UPGRADES
         pass
 
     def store_log_event(self, event: LogEvent):
-        entry = LogEntry()
-        entry.log_level = event.level
-        entry.sender = event.sender
-        entry.timestamp = datetime.datetime.fromtimestamp(event.timestamp)
-        entry.message = event.message
-        db.session.add(entry)
+        self.store_log_events([event])
+
+    def store_log_events(self, events: list):
+        # Store many events with a single insert
+        if not events:
+            return
+        db.session.execute(LogEntry.__table__.insert(),
+                           [{'log_level': event.level,
+                             'sender': event.sender,
+                             'timestamp': datetime.datetime.fromtimestamp(event.timestamp),
+                             'message': event.message} for event in events])
+        self.update_hourly_counts(events)
         db.session.commit()
+
+    def update_hourly_counts(self, events: list):
+        # Add the events to the hourly counts of their sender and level, in the current transaction
+        counts = dict()
+        for event in events:
+            hour = datetime.datetime.fromtimestamp(event.timestamp).replace(minute=0, second=0, microsecond=0)
+            key = (hour, event.sender, event.level)
+            counts[key] = counts.get(key, 0) + 1
+
+        dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+        insert = dialect.insert(LogHourlyCount.__table__)
+        insert = insert.on_conflict_do_update(index_elements=['hour', 'sender', 'log_level'],
+                                              set_={'count': LogHourlyCount.__table__.c.count +
+                                                    insert.excluded.count})
+        db.session.execute(insert, [{'hour': hour, 'sender': sender, 'log_level': level, 'count': count}
+                                    for (hour, sender, level), count in counts.items()])
+
+    def maintain_storage(self):
+        # Create the next partitions and remove the entries out of their retention window
+        return self.partitions.maintain()
@@ -0,0 +1,224 @@
+from services.LoggingService.libloggingservice.db.Base import db
+from services.LoggingService.libloggingservice.db.models.LogEntry import LogEntry
+from services.LoggingService.libloggingservice.db.models.LogHourlyCount import LogHourlyCount
+from opentera.messages.python.LogEvent_pb2 import LogEvent
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+import datetime
+import time
+
+
+class LogPartitionManager:
+    """
+        Storage of the log entries in time partitions, with a retention window for each log level.
+
+        On PostgreSQL, t_log_entry is partitioned by level (t_log_entry_<level>), then each level by time range (one
+        table t_log_entry_<level>_<d|w><start date> for each day or week). Entries older than the retention of their
+        level are removed by dropping whole partitions. Other databases (sqlite, for local use) keep a single table and
+        remove the old entries with a single delete for each level.
+    """
+    # Partitions periods: prefix in partitions names and length in days
+    periods = {'day': ('d', 1), 'week': ('w', 7)}
+
+    # Log levels by name (trace, debug, ...)
+    levels = {name.replace('LOGLEVEL_', '').lower(): value for name, value in LogEvent.LogLevel.items()
+              if value != LogEvent.LogLevel.LOGLEVEL_UNKNOWN}
+
+    # Default retention, in days, of each level
+    default_retention_days = {'trace': 7, 'debug': 14, 'info': 90, 'warning': 180, 'critical': 365, 'error': 365,
+                              'fatal': 365}
+
+    # Number of partitions created in advance, after the current one
+    partitions_ahead = 2
+
+    def __init__(self):
+        self.period = 'day'
+        self.retention_days = dict(self.default_retention_days)
+        self.rollups_retention_days = 730
+
+    def load_config(self, logging_config: dict):
+        if logging_config.get('partition_period') in self.periods:
+            self.period = logging_config['partition_period']
+        self.retention_days.update({level: int(days) for level, days in
+                                    logging_config.get('retention_days', {}).items() if level in self.levels})
+        if 'rollups_retention_days' in logging_config:
+            self.rollups_retention_days = int(logging_config['rollups_retention_days'])
+
+    @staticmethod
+    def is_postgresql() -> bool:
+        return db.engine.dialect.name == 'postgresql'
+
+    @staticmethod
+    def level_table(level_name: str) -> str:
+        return LogEntry.__tablename__ + '_' + level_name
+
+    def period_start(self, date: datetime.date) -> datetime.date:
+        if self.period == 'week':
+            return date - datetime.timedelta(days=date.weekday())
+        return date
+
+    def partition_name(self, level_name: str, start: datetime.date) -> str:
+        return self.level_table(level_name) + '_' + self.periods[self.period][0] + start.strftime('%Y%m%d')
+
+    def partition_end(self, partition_name: str):
+        # End date of a partition from its name, None if it is not a time range partition (default partition)
+        suffix = partition_name.rsplit('_', 1)[-1]
+        for prefix, days in self.periods.values():
+            if suffix.startswith(prefix) and suffix[len(prefix):].isdigit():
+                start = datetime.datetime.strptime(suffix[len(prefix):], '%Y%m%d').date()
+                return start + datetime.timedelta(days=days)
+        return None
+
+    def cutoff(self, level_name: str, now: datetime.datetime) -> datetime.datetime:
+        return now - datetime.timedelta(days=self.retention_days[level_name])
+
+    def is_partitioned(self, connection) -> bool:
+        return connection.execute(text("SELECT relkind FROM pg_class WHERE relname = :name AND relkind = 'p'"),
+                                  {'name': LogEntry.__tablename__}).first() is not None
+
+    def setup(self, now: datetime.datetime = None):
+        # Convert the log entries table to a partitioned table, if not already done, and create the partitions needed
+        if not self.is_postgresql():
+            return
+        if now is None:
+            now = datetime.datetime.now()
+
+        with db.engine.begin() as connection:
+            if not self.is_partitioned(connection):
+                self.convert_table(connection, now)
+            self.create_partitions(connection, now.date())
+
+    def convert_table(self, connection, now: datetime.datetime):
+        table = LogEntry.__tablename__
+        legacy_table = table + '_legacy'
+
+        # Existing table (and its indexes, recreated later on the partitioned table) is kept aside until copied
+        connection.execute(text('ALTER TABLE %s RENAME TO %s' % (table, legacy_table)))
+        connection.execute(text('ALTER INDEX IF EXISTS %s_pkey RENAME TO %s_pkey' % (table, legacy_table)))
+        for index in LogEntry.__table__.indexes:
+            connection.execute(text('DROP INDEX IF EXISTS %s' % index.name))
+
+        # Primary key of a partitioned table must include the partitions keys
+        connection.execute(text("CREATE SEQUENCE IF NOT EXISTS id_log_entry_sequence"))
+        connection.execute(text(
+            'CREATE TABLE %s (version_id BIGINT NOT NULL, '
+            'id_log_entry INTEGER NOT NULL DEFAULT nextval(\'id_log_entry_sequence\'), '
+            'log_level INTEGER NOT NULL, sender VARCHAR NOT NULL, message VARCHAR NOT NULL, '
+            '"timestamp" TIMESTAMP WITH TIME ZONE NOT NULL, PRIMARY KEY (id_log_entry, log_level, "timestamp")) '
+            'PARTITION BY LIST (log_level)' % table))
+        for level_name, level in self.levels.items():
+            connection.execute(text('CREATE TABLE %s PARTITION OF %s FOR VALUES IN (%d) PARTITION BY RANGE '
+                                    '("timestamp")' % (self.level_table(level_name), table, level)))
+            connection.execute(text('CREATE TABLE %s_default PARTITION OF %s DEFAULT'
+                                    % (self.level_table(level_name), self.level_table(level_name))))
+        connection.execute(text('CREATE TABLE %s_other PARTITION OF %s DEFAULT' % (table, table)))
+
+        # Partitions of the entries still in their retention window
+        for level_name, level in self.levels.items():
+            first_timestamp = connection.execute(
+                text('SELECT MIN("timestamp") FROM %s WHERE log_level = :level AND "timestamp" >= :cutoff'
+                     % legacy_table), {'level': level, 'cutoff': self.cutoff(level_name, now)}).scalar()
+            if first_timestamp:
+                self.create_level_partitions(connection, level_name, first_timestamp.date(), now.date())
+
+        # Hourly counts of all the entries, then entries in their retention window. Version of the models is only a
+        # Python default, so it is given explicitly.
+        connection.execute(text(
+            'INSERT INTO %s (version_id, id_log_hourly_count, hour, sender, log_level, count) '
+            'SELECT :version_id, nextval(\'id_log_hourly_count_sequence\'), hour, sender, log_level, count FROM '
+            '(SELECT date_trunc(\'hour\', "timestamp") AS hour, sender, log_level, COUNT(*) AS count FROM %s '
+            'GROUP BY 1, 2, 3) AS counts ON CONFLICT ON CONSTRAINT uq_log_hourly_count DO NOTHING'
+            % (LogHourlyCount.__tablename__, legacy_table)), {'version_id': int(time.time() * 1000)})
+        kept_levels = ' OR '.join(['(log_level = %d AND "timestamp" >= :cutoff_%s)' % (level, level_name)
+                                   for level_name, level in self.levels.items()])
+        columns = 'version_id, id_log_entry, log_level, sender, message, "timestamp"'
+        connection.execute(text('INSERT INTO %s (%s) SELECT %s FROM %s WHERE %s OR log_level NOT IN (%s)'
+                                % (table, columns, columns, legacy_table, kept_levels,
+                                   ', '.join([str(level) for level in self.levels.values()]))),
+                           {'cutoff_' + level_name: self.cutoff(level_name, now) for level_name in self.levels})
+        connection.execute(text('DROP TABLE %s' % legacy_table))
+
+    def create_level_partitions(self, connection, level_name: str, first_date: datetime.date,
+                                last_date: datetime.date):
+        # Create missing partitions from the one of the first date to partitions_ahead after the one of the last date.
+        # Each partition is created in its own savepoint: a partition that can't be created is skipped, without
+        # cancelling the others, and is created again by the next maintenance.
+        days = self.periods[self.period][1]
+        start = self.period_start(first_date)
+        end = self.period_start(last_date) + datetime.timedelta(days=days * (self.partitions_ahead + 1))
+        partitions = self.get_partitions(connection, level_name)
+        while start < end:
+            next_start = start + datetime.timedelta(days=days)
+            partition = self.partition_name(level_name, start)
+            if partition not in partitions:
+                try:
+                    with connection.begin_nested():
+                        self.create_partition(connection, level_name, partition, start, next_start)
+                except SQLAlchemyError as e:
+                    print('LogPartitionManager - unable to create partition ' + partition + ': ' + str(e))
+            start = next_start
+
+    def create_partition(self, connection, level_name: str, partition: str, start: datetime.date,
+                         end: datetime.date):
+        # Entries of the range may already be in the default partition of the level (timestamps ahead of the created
+        # partitions), which prevents creating a partition for that range. They are moved to the new table before it
+        # is attached.
+        level_table = self.level_table(level_name)
+        connection.execute(text('CREATE TABLE %s (LIKE %s)' % (partition, level_table)))
+        connection.execute(text('WITH moved AS (DELETE FROM %s_default WHERE "timestamp" >= :start AND "timestamp" < '
+                                ':end RETURNING *) INSERT INTO %s SELECT * FROM moved' % (level_table, partition)),
+                           {'start': start.isoformat(), 'end': end.isoformat()})
+        connection.execute(text('ALTER TABLE %s ATTACH PARTITION %s FOR VALUES FROM (\'%s\') TO (\'%s\')'
+                                % (level_table, partition, start.isoformat(), end.isoformat())))
+
+    def create_partitions(self, connection, date: datetime.date):
+        for level_name in self.levels:
+            self.create_level_partitions(connection, level_name, date, date)
+
+    def get_partitions(self, connection, level_name: str) -> list:
+        return connection.execute(text('SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+                                       'JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :parent'),
+                                  {'parent': self.level_table(level_name)}).scalars().all()
+
+    def apply_retention(self, now: datetime.datetime = None) -> int:
+        # Remove the entries older than the retention of their level and the expired hourly counts. Returns the number
+        # of partitions dropped.
+        if now is None:
+            now = datetime.datetime.now()
+        dropped = 0
+
+        with db.engine.begin() as connection:
+            if self.is_postgresql():
+                for level_name, level in self.levels.items():
+                    cutoff = self.cutoff(level_name, now)
+                    for partition in self.get_partitions(connection, level_name):
+                        end = self.partition_end(partition)
+                        if end is None:
+                            # Default partition, only entries outside of all ranges
+                            connection.execute(text('DELETE FROM %s WHERE "timestamp" < :cutoff' % partition),
+                                               {'cutoff': cutoff})
+                        elif end <= cutoff.date():
+                            connection.execute(text('DROP TABLE %s' % partition))
+                            dropped += 1
+
+                # Entries of unknown levels are kept as long as the longest retention
+                connection.execute(text('DELETE FROM %s_other WHERE "timestamp" < :cutoff' % LogEntry.__tablename__),
+                                   {'cutoff': now - datetime.timedelta(days=max(self.retention_days.values()))})
+            else:
+                for level_name, level in self.levels.items():
+                    connection.execute(LogEntry.__table__.delete().where(
+                        LogEntry.log_level == level, LogEntry.timestamp < self.cutoff(level_name, now)))
+
+            connection.execute(LogHourlyCount.__table__.delete().where(
+                LogHourlyCount.hour < now - datetime.timedelta(days=self.rollups_retention_days)))
+
+        return dropped
+
+    def maintain(self, now: datetime.datetime = None):
+        # Periodic maintenance: partitions for the next periods, then retention
+        if now is None:
+            now = datetime.datetime.now()
+        if self.is_postgresql():
+            with db.engine.begin() as connection:
+                self.create_partitions(connection, now.date())
+        return self.apply_retention(now)
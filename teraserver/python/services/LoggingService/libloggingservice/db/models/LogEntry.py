@@ -1,5 +1,6 @@
 from services.LoggingService.libloggingservice.db.Base import db
 from opentera.db.Base import BaseModel
+import datetime
 
 
 class LogEntry(db.Model, BaseModel):
@@ -10,9 +11,44 @@ class LogEntry(db.Model, BaseModel):
     message = db.Column(db.String(), nullable=False)
     timestamp = db.Column(db.TIMESTAMP(timezone=True), nullable=False)
 
+    # Indexes matching the queries filters, all ending with the pagination order (timestamp, id_log_entry)
+    __table_args__ = (
+        db.Index('idx_log_entry_timestamp', 'timestamp', 'id_log_entry'),
+        db.Index('idx_log_entry_level_timestamp', 'log_level', 'timestamp', 'id_log_entry'),
+        db.Index('idx_log_entry_sender_timestamp', 'sender', 'timestamp', 'id_log_entry'),
+    )
+
     def to_json(self, ignore_fields=None, minimal=False):
         if ignore_fields is None:
             ignore_fields = []
         return super().to_json(ignore_fields=ignore_fields)
 
+    @staticmethod
+    def query_entries(log_level: int = None, sender: str = None, message: str = None,
+                      start_date: datetime.datetime = None, end_date: datetime.datetime = None,
+                      before_timestamp: datetime.datetime = None, before_id: int = None, limit: int = None) -> list:
+        # Newest entries first. Pages are continued with the (timestamp, id) of the last entry of the previous page
+        # (keyset pagination), so deep pages cost the same as the first one.
+        query = LogEntry.query
+        if log_level is not None:
+            query = query.filter(LogEntry.log_level == log_level)
+        if sender:
+            query = query.filter(LogEntry.sender == sender)
+        if message:
+            query = query.filter(db.func.lower(LogEntry.message).contains(message.lower(), autoescape=True))
+        if start_date:
+            query = query.filter(LogEntry.timestamp >= start_date)
+        if end_date:
+            query = query.filter(LogEntry.timestamp < end_date)
+        if before_timestamp:
+            if before_id is not None:
+                query = query.filter(db.or_(LogEntry.timestamp < before_timestamp,
+                                            db.and_(LogEntry.timestamp == before_timestamp,
+                                                    LogEntry.id_log_entry < before_id)))
+            else:
+                query = query.filter(LogEntry.timestamp < before_timestamp)
 
+        query = query.order_by(LogEntry.timestamp.desc(), LogEntry.id_log_entry.desc())
+        if limit:
+            query = query.limit(limit)
+        return query.all()
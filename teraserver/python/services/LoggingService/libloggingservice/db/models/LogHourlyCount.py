@@ -0,0 +1,37 @@
+from services.LoggingService.libloggingservice.db.Base import db
+from opentera.db.Base import BaseModel
+import datetime
+
+
+class LogHourlyCount(db.Model, BaseModel):
+    __tablename__ = "t_log_hourly_count"
+    id_log_hourly_count = db.Column(db.Integer, db.Sequence('id_log_hourly_count_sequence'), primary_key=True,
+                                    autoincrement=True)
+    hour = db.Column(db.TIMESTAMP(timezone=True), nullable=False)
+    sender = db.Column(db.String(), nullable=False)
+    log_level = db.Column(db.Integer, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Counts are updated (upsert) on that key when entries are stored
+    __table_args__ = (
+        db.UniqueConstraint('hour', 'sender', 'log_level', name='uq_log_hourly_count'),
+    )
+
+    def to_json(self, ignore_fields=None, minimal=False):
+        if ignore_fields is None:
+            ignore_fields = []
+        return super().to_json(ignore_fields=ignore_fields)
+
+    @staticmethod
+    def get_counts(start_date: datetime.datetime = None, end_date: datetime.datetime = None, sender: str = None,
+                   log_level: int = None) -> list:
+        query = LogHourlyCount.query
+        if start_date:
+            query = query.filter(LogHourlyCount.hour >= start_date)
+        if end_date:
+            query = query.filter(LogHourlyCount.hour < end_date)
+        if sender:
+            query = query.filter(LogHourlyCount.sender == sender)
+        if log_level is not None:
+            query = query.filter(LogHourlyCount.log_level == log_level)
+        return query.order_by(LogHourlyCount.hour, LogHourlyCount.sender, LogHourlyCount.log_level).all()
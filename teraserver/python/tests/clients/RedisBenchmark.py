@@ -9,7 +9,7 @@ if __name__ == '__main__':
     config.load_config('../../config/TeraServerConfig.ini')
 
     start_time = datetime.now()
-    rpc = RedisRPCClient(config.redis_config)
+    rpc = RedisRPCClient.get_instance(config.redis_config)
 
     count = 10000
     for i in range(count):
@@ -88,6 +88,36 @@ class ServiceQueryAssetsTest(BaseServiceAPITest):
         for data_item in response.json:
             self._checkJson(json_data=data_item)
 
+    def test_get_endpoint_query_session_assets_streamed(self):
+        params = {'id_session': 2, 'with_urls': True}
+        response = self._get_with_service_token_auth(client=self.test_client, token=self.service_token,
+                                                     params=params, endpoint=self.test_endpoint)
+        self.assertEqual(response.status_code, 200)
+
+        params['stream'] = True
+        streamed_response = self._get_with_service_token_auth(client=self.test_client, token=self.service_token,
+                                                              params=params, endpoint=self.test_endpoint)
+        self.assertEqual(streamed_response.status_code, 200)
+        self.assertEqual(len(response.json), len(streamed_response.json))
+        for data_item, streamed_item in zip(response.json, streamed_response.json):
+            self.assertEqual(data_item['asset_uuid'], streamed_item['asset_uuid'])
+            self.assertEqual(data_item['asset_url'], streamed_item['asset_url'])
+            self._checkJson(json_data=streamed_item)
+
+    def test_get_endpoint_query_session_assets_services_tokens(self):
+        params = {'id_session': 2, 'with_urls': True, 'with_services_tokens': True}
+        for stream in [False, True]:
+            params['stream'] = stream
+            response = self._get_with_service_token_auth(client=self.test_client, token=self.service_token,
+                                                         params=params, endpoint=self.test_endpoint)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json['assets']), 3)
+            services_uuids = set([data_item['asset_service_uuid'] for data_item in response.json['assets']])
+            self.assertEqual(services_uuids, set(response.json['access_tokens'].keys()))
+            for data_item in response.json['assets']:
+                self.assertFalse(data_item.__contains__('access_token'))
+                self.assertTrue(data_item.__contains__('asset_url'))
+
     def test_get_endpoint_query_device_assets_no_access(self):
         params = {'id_device': 4, 'with_urls': True}
         response = self._get_with_service_token_auth(client=self.test_client, token=self.service_token,
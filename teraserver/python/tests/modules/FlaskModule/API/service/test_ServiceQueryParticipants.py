@@ -52,6 +52,40 @@ class ServiceQueryParticipantsTest(BaseServiceAPITest):
             participant_json = participant.to_json()
             self.assertEqual(participant_json, response.json)
 
+    def test_get_endpoint_with_token_auth_with_id_project(self):
+        params = {'id_project': 1}
+        response = self._get_with_service_token_auth(client=self.test_client, token=self.service_token,
+                                                     params=params, endpoint=self.test_endpoint)
+        self.assertEqual(200, response.status_code)
+        participants = TeraParticipant.query.filter_by(id_project=1).all()
+        self.assertEqual(len(participants), len(response.json))
+        for participant_json in response.json:
+            self.assertEqual(1, participant_json['id_project'])
+
+    def test_get_endpoint_with_token_auth_with_id_project_and_pagination(self):
+        participants_ids = [participant.id_participant for participant in
+                            TeraParticipant.query.filter_by(id_project=1).all()]
+        self.assertGreater(len(participants_ids), 1)
+        params = {'id_project': 1, 'page_size': 1}
+        pages_participants_ids = []
+        while True:
+            response = self._get_with_service_token_auth(client=self.test_client, token=self.service_token,
+                                                         params=params, endpoint=self.test_endpoint)
+            self.assertEqual(200, response.status_code)
+            self.assertLessEqual(len(response.json['items']), 1)
+            pages_participants_ids.extend([participant_json['id_participant']
+                                           for participant_json in response.json['items']])
+            if not response.json['next']:
+                break
+            params['cursor'] = response.json['next']
+        self.assertEqual(sorted(participants_ids), sorted(pages_participants_ids))
+
+    def test_get_endpoint_with_token_auth_with_forbidden_id_project(self):
+        params = {'id_project': 1000}
+        response = self._get_with_service_token_auth(client=self.test_client, token=self.service_token,
+                                                     params=params, endpoint=self.test_endpoint)
+        self.assertEqual(403, response.status_code)
+
     def test_post_endpoint_without_token_auth(self):
         response = self.test_client.post(self.test_endpoint, json={})
         self.assertEqual(400, response.status_code)
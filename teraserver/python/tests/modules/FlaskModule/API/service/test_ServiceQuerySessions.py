@@ -109,6 +109,37 @@ class ServiceQuerySessionsTest(BaseServiceAPITest):
         self.assertEqual(response.headers['Content-Type'], 'application/json')
         self.assertEqual(1, len(response.json))
 
+    def test_get_endpoint_query_for_participant_with_pagination(self):
+        params = {'id_participant': 1, 'list': 1}
+        response = self._get_with_service_token_auth(client=self.test_client, token=self.service_token,
+                                                     params=params, endpoint=self.test_endpoint)
+        self.assertEqual(200, response.status_code)
+        sessions_ids = [data_item['id_session'] for data_item in response.json]
+        self.assertGreater(len(sessions_ids), 5)
+
+        # Pages follow each other until the last one, without missing or repeated sessions
+        params = {'id_participant': 1, 'list': 1, 'page_size': 5}
+        pages_sessions_ids = []
+        while True:
+            response = self._get_with_service_token_auth(client=self.test_client, token=self.service_token,
+                                                         params=params, endpoint=self.test_endpoint)
+            self.assertEqual(200, response.status_code)
+            self.assertLessEqual(len(response.json['items']), 5)
+            for data_item in response.json['items']:
+                self._checkJson(json_data=data_item, minimal=True)
+            pages_sessions_ids.extend([data_item['id_session'] for data_item in response.json['items']])
+            if not response.json['next']:
+                break
+            params['cursor'] = response.json['next']
+        self.assertEqual(sorted(sessions_ids), sorted(pages_sessions_ids))
+        self.assertEqual(len(pages_sessions_ids), len(set(pages_sessions_ids)))
+
+    def test_get_endpoint_query_for_participant_with_invalid_pagination(self):
+        for params in [{'id_participant': 1, 'cursor': 'invalid'}, {'id_participant': 1, 'page_size': 0}]:
+            response = self._get_with_service_token_auth(client=self.test_client, token=self.service_token,
+                                                         params=params, endpoint=self.test_endpoint)
+            self.assertEqual(400, response.status_code)
+
     def test_get_endpoint_query_for_participant_with_status(self):
         params = {'id_participant': 1, 'status': 0}
         response = self._get_with_service_token_auth(client=self.test_client, token=self.service_token,
@@ -139,7 +170,7 @@ class ServiceQuerySessionsTest(BaseServiceAPITest):
                                                      params=params, endpoint=self.test_endpoint)
         self.assertEqual(200, response.status_code)
         self.assertEqual(response.headers['Content-Type'], 'application/json')
-        self.assertEqual(6, len(response.json))
+        self.assertEqual(9, len(response.json))
 
     def test_get_endpoint_query_for_participant_with_start_date(self):
         start_date = (datetime.now() - timedelta(days=3)).date().strftime("%Y-%m-%d")
@@ -148,7 +179,7 @@ class ServiceQuerySessionsTest(BaseServiceAPITest):
                                                      params=params, endpoint=self.test_endpoint)
         self.assertEqual(200, response.status_code)
         self.assertEqual(response.headers['Content-Type'], 'application/json')
-        self.assertEqual(12, len(response.json))
+        self.assertEqual(16, len(response.json))
 
     def test_get_endpoint_query_for_participant_with_end_date(self):
         end_date = (datetime.now() - timedelta(days=5)).date().strftime("%Y-%m-%d")
@@ -248,7 +279,7 @@ class ServiceQuerySessionsTest(BaseServiceAPITest):
                                                      params=params, endpoint=self.test_endpoint)
         self.assertEqual(200, response.status_code)
         self.assertEqual(response.headers['Content-Type'], 'application/json')
-        self.assertEqual(2, len(response.json))
+        self.assertEqual(3, len(response.json))
 
     def test_get_endpoint_query_for_user_with_start_date(self):
         start_date = (datetime.now() - timedelta(days=6)).date().strftime("%Y-%m-%d")
@@ -258,7 +289,7 @@ class ServiceQuerySessionsTest(BaseServiceAPITest):
                                                      params=params, endpoint=self.test_endpoint)
         self.assertEqual(200, response.status_code)
         self.assertEqual(response.headers['Content-Type'], 'application/json')
-        self.assertEqual(3, len(response.json))
+        self.assertEqual(4, len(response.json))
 
     def test_get_endpoint_query_for_user_with_end_date(self):
         end_date = (datetime.now() - timedelta(days=4)).date().strftime("%Y-%m-%d")
@@ -351,7 +382,7 @@ class ServiceQuerySessionsTest(BaseServiceAPITest):
                                                      params=params, endpoint=self.test_endpoint)
         self.assertEqual(200, response.status_code)
         self.assertEqual(response.headers['Content-Type'], 'application/json')
-        self.assertEqual(2, len(response.json))
+        self.assertEqual(3, len(response.json))
 
     def test_get_endpoint_query_for_device_with_start_date(self):
         start_date = (datetime.now() - timedelta(days=3)).date().strftime("%Y-%m-%d")
@@ -360,7 +391,7 @@ class ServiceQuerySessionsTest(BaseServiceAPITest):
                                                      params=params, endpoint=self.test_endpoint)
         self.assertEqual(200, response.status_code)
         self.assertEqual(response.headers['Content-Type'], 'application/json')
-        self.assertEqual(3, len(response.json))
+        self.assertEqual(4, len(response.json))
 
     def test_get_endpoint_query_for_device_with_end_date(self):
         end_date = (datetime.now() - timedelta(days=3)).date().strftime("%Y-%m-%d")
@@ -0,0 +1,169 @@
+import time
+import unittest
+import uuid
+
+import jwt
+import redis
+
+from modules.LoginModule.LoginModule import DisabledTokenStorage, LoginModule
+from opentera.redis.RedisVars import RedisVars
+
+
+class DisabledTokenStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        # Storages of two processes, sharing a local redis
+        self.redis = redis.Redis()
+        self.storage = DisabledTokenStorage('test_user')
+        self.storage.redis = self.redis
+        self.other_storage = DisabledTokenStorage('test_user')
+        self.other_storage.redis = self.redis
+        self.storage.clear_all_disabled_tokens()
+        self.other_storage.load_filter()
+
+        self.pubsub = self.redis.pubsub()
+        self.pubsub.subscribe(RedisVars.RedisVar_DisabledTokenTopic)
+        # Subscription confirmation
+        self.pubsub.get_message(timeout=1)
+
+    def tearDown(self):
+        self.storage.clear_all_disabled_tokens()
+        self.pubsub.close()
+        self.redis.close()
+
+    @staticmethod
+    def create_token(expiration: int = 3600, jti: bool = True) -> str:
+        claims = {'user_uuid': str(uuid.uuid4())}
+        if expiration is not None:
+            claims['exp'] = int(time.time()) + expiration
+        if jti:
+            claims['jti'] = str(uuid.uuid4())
+        return jwt.encode(claims, 'test_key', algorithm='HS256')
+
+    def received_messages(self) -> list:
+        rval = []
+        message = self.pubsub.get_message(timeout=1)
+        while message:
+            rval.append(message['data'].decode('utf-8'))
+            message = self.pubsub.get_message(timeout=0.1)
+        return rval
+
+    def notify(self, storage: DisabledTokenStorage, notifications: list):
+        # Same as LoginModule.disabled_token_received
+        for notification in notifications:
+            name, jti = notification.split('.', 1)
+            if storage.name == name:
+                storage.disabled_token_notified(jti)
+
+    def test_push_disabled_token(self):
+        token = self.create_token()
+        jti = DisabledTokenStorage.get_token_claims(token)['jti']
+        self.assertFalse(self.storage.is_disabled_token(token))
+
+        self.storage.push_disabled_token(token)
+        self.assertTrue(self.storage.is_disabled_token(token))
+        self.assertTrue(self.storage.is_disabled_jti(jti))
+        self.assertIn(jti, self.storage.filter)
+
+        # Token stored until it expires
+        time_to_live = self.redis.ttl(self.storage.get_key(jti))
+        self.assertGreater(time_to_live, 3500)
+        self.assertLessEqual(time_to_live, 3600)
+
+        self.assertFalse(self.storage.is_disabled_token(self.create_token()))
+
+    def test_propagation(self):
+        token = self.create_token()
+        jti = DisabledTokenStorage.get_token_claims(token)['jti']
+        self.storage.push_disabled_token(token)
+
+        notifications = self.received_messages()
+        self.assertEqual(['test_user.' + jti], notifications)
+
+        # Not notified yet, the filter of the other process says the token is not disabled
+        self.assertNotIn(jti, self.other_storage.filter)
+        self.assertFalse(self.other_storage.is_disabled_token(token))
+
+        self.notify(self.other_storage, notifications)
+        self.assertTrue(self.other_storage.is_disabled_token(token))
+
+        # Notifications of other storages are ignored
+        other_name_storage = DisabledTokenStorage('test_participant')
+        other_name_storage.redis = self.redis
+        other_name_storage.load_filter()
+        self.notify(other_name_storage, notifications)
+        self.assertNotIn(jti, other_name_storage.filter)
+
+    def test_filter_not_loaded(self):
+        # Every check is done in redis until the filter is loaded
+        token = self.create_token()
+        self.storage.push_disabled_token(token)
+        storage = DisabledTokenStorage('test_user')
+        storage.redis = self.redis
+        self.assertTrue(storage.is_disabled_token(token))
+
+        storage.load_filter()
+        self.assertTrue(storage.filter_loaded)
+        self.assertIn(DisabledTokenStorage.get_token_claims(token)['jti'], storage.filter)
+        self.assertTrue(storage.is_disabled_token(token))
+
+    def test_expired_token(self):
+        token = self.create_token(expiration=-10)
+        self.storage.push_disabled_token(token)
+        self.assertEqual([], self.received_messages())
+        self.assertFalse(self.storage.is_disabled_token(token))
+
+    def test_token_expiration(self):
+        token = self.create_token(expiration=2)
+        self.storage.push_disabled_token(token)
+        self.assertTrue(self.storage.is_disabled_token(token))
+        time.sleep(3)
+        # Removed from redis, the filter alone doesn't disable the token
+        self.assertFalse(self.storage.is_disabled_token(token))
+
+    def test_token_without_expiration(self):
+        token = self.create_token(expiration=None)
+        self.storage.push_disabled_token(token)
+        jti = DisabledTokenStorage.get_token_claims(token)['jti']
+        self.assertEqual(-1, self.redis.ttl(self.storage.get_key(jti)))
+        self.assertTrue(self.storage.is_disabled_token(token))
+
+    def test_token_without_jti(self):
+        token = self.create_token(jti=False)
+        self.storage.push_disabled_token(token)
+        self.assertEqual([], self.received_messages())
+        self.assertFalse(self.storage.is_disabled_token(token))
+        self.assertFalse(self.storage.is_disabled_token('invalid token'))
+
+    def test_remove_disabled_token(self):
+        token = self.create_token()
+        self.storage.push_disabled_token(token)
+        self.storage.remove_disabled_token(token)
+        self.assertFalse(self.storage.is_disabled_token(token))
+
+    def test_filter_rebuilt_when_full(self):
+        tokens = [self.create_token() for _ in range(3)]
+        self.storage.push_disabled_token(tokens[0])
+        self.other_storage.filter_capacity = 3
+        self.other_storage.load_filter()
+        self.received_messages()
+
+        for token in tokens[1:]:
+            self.storage.push_disabled_token(token)
+            self.storage.remove_disabled_token(token)
+        self.notify(self.other_storage, self.received_messages())
+        # Rebuilt with the tokens still disabled in redis
+        self.assertEqual(1, self.other_storage.filter.count)
+        self.assertTrue(self.other_storage.is_disabled_token(tokens[0]))
+        self.assertFalse(self.other_storage.is_disabled_token(tokens[1]))
+
+    def test_login_module_notification(self):
+        # Notifications are dispatched to the storage of the same name
+        token = self.create_token()
+        jti = DisabledTokenStorage.get_token_claims(token)['jti']
+        user_storage = LoginModule._LoginModule__user_disabled_token_storage
+        participant_storage = LoginModule._LoginModule__participant_disabled_token_storage
+        LoginModule.disabled_token_received(None, RedisVars.RedisVar_DisabledTokenTopic,
+                                            RedisVars.RedisVar_DisabledTokenTopic, ('user.' + jti).encode('utf-8'))
+        self.assertIn(jti, user_storage.filter)
+        self.assertNotIn(jti, participant_storage.filter)
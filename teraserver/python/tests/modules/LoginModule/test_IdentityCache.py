@@ -0,0 +1,191 @@
+from unittest import mock
+
+from modules.FlaskModule.FlaskModule import flask_app
+from modules.LoginModule.IdentityCache import IdentityCache
+from modules.LoginModule.LoginModule import LoginModule, current_device
+from opentera.db.Base import db
+from opentera.db.models.TeraDevice import TeraDevice
+from opentera.db.models.TeraServerSettings import TeraServerSettings
+from tests.opentera.db.models.BaseModelsTest import BaseModelsTest
+import opentera.messages.python as messages
+import json
+
+
+class IdentityCacheTest(BaseModelsTest):
+
+    @classmethod
+    def setUpClass(cls):
+        # Requests end by removing the database session: start with a session of the new database, not a session
+        # left by the previous tests
+        db.session.remove()
+        super().setUpClass()
+        # This is needed for Logins
+        cls._login_module = LoginModule(cls._config)
+        flask_app.secret_key = TeraServerSettings.get_server_setting_value(TeraServerSettings.ServerUUID)
+
+    @classmethod
+    def tearDownClass(cls):
+        LoginModule.redis_client = None
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.cache = IdentityCache()
+        LoginModule.identity_cache.clear()
+
+    def tearDown(self):
+        LoginModule.identity_cache.clear()
+        super().tearDown()
+
+    @staticmethod
+    def get_enabled_device() -> TeraDevice:
+        return TeraDevice.query.filter_by(device_enabled=True).first()
+
+    @staticmethod
+    def update_device(id_device: int, **values) -> TeraDevice:
+        device = TeraDevice.get_device_by_id(id_device)
+        for name, value in values.items():
+            setattr(device, name, value)
+        db.session.commit()
+        return device
+
+    @staticmethod
+    def notify_device_event(device: TeraDevice, event_type: int):
+        # Database event, as received by the LoginModule
+        database_event = messages.DatabaseEvent()
+        database_event.type = event_type
+        database_event.object_type = TeraDevice.get_model_name()
+        database_event.object_value = json.dumps(device.to_json_update_event())
+        any_message = messages.Any()
+        any_message.Pack(database_event)
+        event_message = messages.TeraEvent()
+        event_message.events.append(any_message)
+        LoginModule.identity_event_received(None, 'pattern', 'channel', event_message.SerializeToString())
+
+    def test_get_set(self):
+        device = self.get_enabled_device()
+        device.authenticated = True
+        self.assertIsNone(self.cache.get('device.' + device.device_uuid))
+        self.assertFalse(self.cache.has('device.' + device.device_uuid))
+
+        self.cache.set('device.' + device.device_uuid, device.device_uuid, device)
+        self.assertTrue(self.cache.has('device.' + device.device_uuid))
+        db.session.expunge(device)
+
+        with mock.patch.object(db.session, 'execute', side_effect=AssertionError('Query done')):
+            cached_device = self.cache.get('device.' + device.device_uuid)
+        self.assertIsNot(device, cached_device)
+        self.assertEqual(device.id_device, cached_device.id_device)
+        self.assertEqual(device.device_uuid, cached_device.device_uuid)
+        self.assertEqual(device.device_token, cached_device.device_token)
+        self.assertTrue(cached_device.authenticated)
+        self.assertIn(cached_device, db.session)
+        # Relationships are loaded from the database
+        self.assertEqual(cached_device.id_device_type, cached_device.device_type.id_device_type)
+
+    def test_expiration(self):
+        device = self.get_enabled_device()
+        self.cache.set('device.' + device.device_uuid, device.device_uuid, device)
+        with mock.patch('modules.LoginModule.IdentityCache.time.monotonic',
+                        return_value=self.cache.entries['device.' + device.device_uuid][0] + 1):
+            self.assertIsNone(self.cache.get('device.' + device.device_uuid))
+            self.assertFalse(self.cache.has('device.' + device.device_uuid))
+            self.cache.remove_expired()
+        self.assertEqual({}, self.cache.entries)
+        self.assertEqual({}, self.cache.uuids_keys)
+
+    def test_invalidate(self):
+        device = self.get_enabled_device()
+        other_device = TeraDevice.query.filter(TeraDevice.id_device != device.id_device).first()
+        # All the keys of an identity are removed
+        self.cache.set('device.' + device.device_uuid, device.device_uuid, device)
+        self.cache.set('device_token.' + device.device_token, device.device_uuid, device)
+        self.cache.set('device.' + other_device.device_uuid, other_device.device_uuid, other_device)
+
+        self.cache.invalidate(device.device_uuid)
+        self.assertFalse(self.cache.has('device.' + device.device_uuid))
+        self.assertFalse(self.cache.has('device_token.' + device.device_token))
+        self.assertTrue(self.cache.has('device.' + other_device.device_uuid))
+
+        self.cache.clear()
+        self.assertFalse(self.cache.has('device.' + other_device.device_uuid))
+
+    def test_max_entries(self):
+        self.cache.max_entries = 2
+        devices = TeraDevice.query.limit(3).all()
+        for device in devices:
+            self.cache.set('device.' + device.device_uuid, device.device_uuid, device)
+        # Full, without any expired entry
+        self.assertEqual(1, len(self.cache.entries))
+        self.assertTrue(self.cache.has('device.' + devices[2].device_uuid))
+
+    def test_get_identity(self):
+        device = self.get_enabled_device()
+        load = mock.Mock(return_value=device)
+        self.assertEqual(device.id_device, LoginModule.get_identity('device.' + device.device_uuid, load).id_device)
+        self.assertEqual(device.id_device, LoginModule.get_identity('device.' + device.device_uuid, load).id_device)
+        load.assert_called_once()
+
+        # Not found identities are not cached
+        load = mock.Mock(return_value=None)
+        self.assertIsNone(LoginModule.get_identity('device.unknown', load))
+        self.assertIsNone(LoginModule.get_identity('device.unknown', load))
+        self.assertEqual(2, load.call_count)
+
+    def test_device_disabled(self):
+        device = self.get_enabled_device()
+        key = 'device.' + device.device_uuid
+        LoginModule.get_identity(key, lambda: TeraDevice.get_device_by_uuid(device.device_uuid))
+        self.assertTrue(LoginModule.identity_cache.has(key))
+
+        device = self.update_device(device.id_device, device_enabled=False)
+        self.notify_device_event(device, messages.DatabaseEvent.DB_UPDATE)
+        self.assertFalse(LoginModule.identity_cache.has(key))
+        self.assertFalse(LoginModule.get_identity(
+            key, lambda: TeraDevice.get_device_by_uuid(device.device_uuid)).device_enabled)
+
+        self.update_device(device.id_device, device_enabled=True)
+
+    def test_device_token_changed(self):
+        device = self.get_enabled_device()
+        old_token = device.device_token
+        self.assertIsNotNone(LoginModule.get_identity('device_token.' + old_token,
+                                                      lambda: TeraDevice.get_device_by_token(old_token)))
+
+        self.update_device(device.id_device, device_token=old_token)
+
+        device = self.update_device(device.id_device, device_token='New device token')
+        self.notify_device_event(device, messages.DatabaseEvent.DB_UPDATE)
+        self.assertFalse(LoginModule.identity_cache.has('device_token.' + old_token))
+        self.assertIsNone(LoginModule.get_identity('device_token.' + old_token,
+                                                   lambda: TeraDevice.get_device_by_token(old_token)))
+
+        self.update_device(device.id_device, device_token=old_token)
+
+    def test_device_deleted(self):
+        device = self.get_enabled_device()
+        key = 'device.' + device.device_uuid
+        LoginModule.get_identity(key, lambda: TeraDevice.get_device_by_uuid(device.device_uuid))
+        self.notify_device_event(device, messages.DatabaseEvent.DB_DELETE)
+        self.assertFalse(LoginModule.identity_cache.has(key))
+
+    def test_device_token_in_params(self):
+        device = self.get_enabled_device()
+        function = mock.Mock(return_value='OK')
+        decorated = LoginModule.device_token_or_certificate_required(function)
+
+        with flask_app.test_request_context('/api/device/devices'):
+            self.assertEqual(401, decorated()[1])
+        with flask_app.test_request_context('/api/device/devices?token='):
+            self.assertEqual(401, decorated()[1])
+        with flask_app.test_request_context('/api/device/devices?token=invalid'):
+            self.assertEqual(401, decorated()[1])
+        function.assert_not_called()
+
+        with flask_app.test_request_context('/api/device/devices?token=' + device.device_token):
+            self.assertEqual('OK', decorated())
+            self.assertEqual(device.id_device, current_device.id_device)
+        # Second request, authenticated with the cached device
+        with flask_app.test_request_context('/api/device/devices?token=' + device.device_token):
+            self.assertEqual('OK', decorated())
+        self.assertEqual(2, function.call_count)
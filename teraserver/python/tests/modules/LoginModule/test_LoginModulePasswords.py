@@ -0,0 +1,122 @@
+from unittest import mock
+
+from modules.FlaskModule.FlaskModule import flask_app
+from modules.LoginModule.LoginModule import LoginModule
+from opentera.db.Base import db
+from opentera.db.models.TeraParticipant import TeraParticipant
+from opentera.db.models.TeraServerSettings import TeraServerSettings
+from opentera.db.models.TeraUser import TeraUser
+from opentera.redis.RedisVars import RedisVars
+from tests.opentera.db.models.BaseModelsTest import BaseModelsTest
+
+
+class LoginModulePasswordsTest(BaseModelsTest):
+
+    @classmethod
+    def setUpClass(cls):
+        # Requests end by removing the database session: start with a session of the new database, not a session
+        # left by the previous tests
+        db.session.remove()
+        super().setUpClass()
+        # This is needed for Logins
+        cls._login_module = LoginModule(cls._config)
+        flask_app.secret_key = TeraServerSettings.get_server_setting_value(TeraServerSettings.ServerUUID)
+
+    @classmethod
+    def tearDownClass(cls):
+        LoginModule.redis_client = None
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        LoginModule.identity_cache.clear()
+        self.user = TeraUser.get_user_by_username('user')
+        self.participant = TeraParticipant.get_participant_by_username('participant1')
+        self.attempts_keys = [RedisVars.RedisVar_UserLoginAttemptKey + self.user.user_uuid,
+                              RedisVars.RedisVar_ParticipantLoginAttemptKey + self.participant.participant_uuid]
+        self._login_module.redis.delete(*self.attempts_keys)
+
+    def tearDown(self):
+        self._login_module.redis.delete(*self.attempts_keys)
+        LoginModule.identity_cache.clear()
+        super().tearDown()
+
+    @staticmethod
+    def update_user(**values):
+        # Objects loaded before a request are detached when its context ends
+        user = TeraUser.get_user_by_username('user')
+        for name, value in values.items():
+            setattr(user, name, value)
+        db.session.commit()
+        # Same identity cache, database events are not published in tests
+        LoginModule.identity_cache.invalidate(user.user_uuid)
+
+    def user_verify_password(self, username: str, password: str) -> bool:
+        with flask_app.test_request_context('/api/user/login'):
+            return self._login_module.user_verify_password(username, password)
+
+    def participant_verify_password(self, username: str, password: str) -> bool:
+        with flask_app.test_request_context('/api/participant/login'):
+            return self._login_module.participant_verify_password(username, password)
+
+    def test_user_cached_verification(self):
+        with mock.patch.object(TeraUser, 'verify_password', wraps=TeraUser.verify_password) as verify_password:
+            self.assertTrue(self.user_verify_password('user', 'user'))
+            self.assertTrue(self.user_verify_password('user', 'user'))
+            # Verified (bcrypt) once
+            self.assertEqual(1, verify_password.call_count)
+
+            # Other passwords are always verified
+            self.assertFalse(self.user_verify_password('user', 'wrong'))
+            self.assertFalse(self.user_verify_password('user', 'wrong'))
+            self.assertEqual(3, verify_password.call_count)
+
+    def test_user_password_changed(self):
+        self.assertTrue(self.user_verify_password('user', 'user'))
+
+        # Cached verification is for the old password hash
+        self.update_user(user_password=TeraUser.encrypt_password('new password'))
+        self.assertFalse(self.user_verify_password('user', 'user'))
+        self.assertTrue(self.user_verify_password('user', 'new password'))
+
+        self.update_user(user_password=TeraUser.encrypt_password('user'))
+
+    def test_user_disabled(self):
+        self.assertTrue(self.user_verify_password('user', 'user'))
+        self.update_user(user_enabled=False)
+        self.assertFalse(self.user_verify_password('user', 'user'))
+
+        self.update_user(user_enabled=True)
+
+    def test_user_lockout(self):
+        # Cached verification
+        self.assertTrue(self.user_verify_password('user', 'user'))
+        for _ in range(5):
+            self.assertFalse(self.user_verify_password('user', 'wrong'))
+        self.assertEqual(b'5', self._login_module.redis.get(self.attempts_keys[0]))
+
+        # Locked, even with the cached verification
+        with mock.patch.object(TeraUser, 'verify_password') as verify_password:
+            self.assertFalse(self.user_verify_password('user', 'user'))
+            verify_password.assert_not_called()
+
+        self._login_module.redis.delete(self.attempts_keys[0])
+        self.assertTrue(self.user_verify_password('user', 'user'))
+
+    def test_participant_cached_verification(self):
+        with mock.patch.object(TeraParticipant, 'verify_password',
+                               wraps=TeraParticipant.verify_password) as verify_password:
+            self.assertTrue(self.participant_verify_password('participant1', 'opentera'))
+            self.assertTrue(self.participant_verify_password('participant1', 'opentera'))
+            self.assertEqual(1, verify_password.call_count)
+
+    def test_participant_lockout(self):
+        self.assertTrue(self.participant_verify_password('participant1', 'opentera'))
+        for _ in range(5):
+            self.assertFalse(self.participant_verify_password('participant1', 'wrong'))
+
+        # Locked, even with the cached verification
+        self.assertFalse(self.participant_verify_password('participant1', 'opentera'))
+
+        self._login_module.redis.delete(self.attempts_keys[1])
+        self.assertTrue(self.participant_verify_password('participant1', 'opentera'))
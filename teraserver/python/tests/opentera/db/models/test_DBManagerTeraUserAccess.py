@@ -25,3 +25,85 @@ class DBManagerTeraUserAccessTest(BaseModelsTest):
     def test_admin_accessible_sites(self):
         sites = DBManager.userAccess(self.test_user).get_accessible_sites()
         self.assertEqual(len(sites), 1)
+
+    def test_roles_same_as_user_roles(self):
+        for user in TeraUser.query.all():
+            user_access = DBManager.userAccess(user)
+            self.assertEqual(user_access.get_sites_roles(), user.get_sites_roles())
+            self.assertEqual(user_access.get_projects_roles(), user.get_projects_roles())
+
+    def test_accessible_lists_are_memoized(self):
+        user_access = DBManager.userAccess(self.test_user)
+        participants = user_access.get_accessible_participants()
+        participants.clear()
+        self.assertEqual(len(user_access.get_accessible_participants()), 3)
+        self.assertIs(user_access.get_accessible_participants()[0], user_access.get_accessible_participants()[0])
+
+    def test_memoized_lists_cleared_on_commit(self):
+        from opentera.db.models.TeraParticipant import TeraParticipant
+        user_access = DBManager.userAccess(self.test_user)
+        participants_count = len(user_access.get_accessible_participants_ids())
+        participant = TeraParticipant()
+        participant.participant_name = 'Memoized Participant'
+        participant.id_project = user_access.get_accessible_projects_ids()[0]
+        TeraParticipant.insert(participant)
+        self.assertEqual(len(user_access.get_accessible_participants_ids()), participants_count + 1)
+        TeraParticipant.delete(participant.id_participant)
+        self.assertEqual(len(user_access.get_accessible_participants_ids()), participants_count)
+
+    def test_shared_access_cache_invalidated_on_commit(self):
+        from opentera.db.models.TeraParticipant import TeraParticipant
+        participants_count = len(DBManager.userAccess(self.test_user).get_accessible_participants_ids())
+        # Cached value is used by a new access object (as another request or process would)
+        self.assertEqual(len(DBManager.userAccess(self.test_user).get_accessible_participants_ids()),
+                         participants_count)
+        participant = TeraParticipant()
+        participant.participant_name = 'Shared Cache Participant'
+        participant.id_project = DBManager.userAccess(self.test_user).get_accessible_projects_ids()[0]
+        TeraParticipant.insert(participant)
+        self.assertEqual(len(DBManager.userAccess(self.test_user).get_accessible_participants_ids()),
+                         participants_count + 1)
+        TeraParticipant.delete(participant.id_participant)
+        self.assertEqual(len(DBManager.userAccess(self.test_user).get_accessible_participants_ids()),
+                         participants_count)
+
+    def test_shared_access_cache_not_invalidated_on_rollback(self):
+        from opentera.db.models.TeraParticipant import TeraParticipant
+        from opentera.db.Base import db
+        participants_ids = DBManager.userAccess(self.test_user).get_accessible_participants_ids()
+        participant = TeraParticipant()
+        participant.participant_name = 'Rollbacked Participant'
+        participant.id_project = DBManager.userAccess(self.test_user).get_accessible_projects_ids()[0]
+        participant.participant_uuid = 'rollbacked'
+        db.session.add(participant)
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(DBManager.userAccess(self.test_user).get_accessible_participants_ids(), participants_ids)
+
+    def test_shared_access_cache_invalidated_on_user_groups_change(self):
+        from opentera.db.Base import db
+        projects_ids = DBManager.userAccess(self.test_user).get_accessible_projects_ids()
+        self.assertGreater(len(projects_ids), 0)
+        # Memberships are only written in the association table, by the user groups relationship
+        user_groups = list(self.test_user.user_user_groups)
+        self.test_user.user_user_groups = []
+        db.session.commit()
+        self.assertEqual(DBManager.userAccess(self.test_user).get_accessible_projects_ids(), [])
+
+        self.test_user.user_user_groups = user_groups
+        db.session.commit()
+        self.assertEqual(DBManager.userAccess(self.test_user).get_accessible_projects_ids(), projects_ids)
+
+    def test_shared_access_cache_invalidated_on_device_sites_change(self):
+        from opentera.db.Base import db
+        devices_ids = DBManager.userAccess(self.test_user).get_accessible_devices_ids()
+        self.assertGreater(len(devices_ids), 0)
+        device = DBManager.userAccess(self.test_user).get_accessible_devices()[0]
+        device_sites = list(device.device_sites)
+        device.device_sites = []
+        db.session.commit()
+        self.assertNotIn(device.id_device, DBManager.userAccess(self.test_user).get_accessible_devices_ids())
+
+        device.device_sites = device_sites
+        db.session.commit()
+        self.assertEqual(sorted(DBManager.userAccess(self.test_user).get_accessible_devices_ids()), sorted(devices_ids))
@@ -1,4 +1,5 @@
 from opentera.db.models.TeraAsset import TeraAsset
+import jwt
 from tests.opentera.db.models.BaseModelsTest import BaseModelsTest
 
 
@@ -29,6 +30,12 @@ class TeraAssetTest(BaseModelsTest):
             self.assertEqual(new_asset.id_device, asset.id_device)
             self.assertEqual(new_asset.id_session, asset.id_session)
 
-
-
-
+    def test_get_services_access_tokens(self):
+        assets = TeraAsset.query.all()
+        tokens = TeraAsset.get_services_access_tokens(assets, token_key='key', requester_uuid='requester')
+        self.assertEqual(set(tokens.keys()), set([asset.asset_service_uuid for asset in assets]))
+        for service_uuid, token in tokens.items():
+            access = jwt.decode(token, 'key', algorithms='HS256')
+            self.assertEqual(access['requester_uuid'], 'requester')
+            self.assertEqual(sorted(access['asset_uuids']),
+                             sorted([asset.asset_uuid for asset in assets if asset.asset_service_uuid == service_uuid]))
@@ -0,0 +1,114 @@
+from opentera.db.Base import db
+from opentera.db.models.TeraEventOutbox import TeraEventOutbox
+from opentera.db.models.TeraSession import TeraSession
+from opentera.db.models.TeraSite import TeraSite
+from modules.DatabaseModule.DBManagerEvents import DBManagerEvents
+from tests.opentera.db.models.BaseModelsTest import BaseModelsTest
+import opentera.messages.python as messages
+import datetime
+import json
+
+
+class RecordingPublisher:
+    # Keeps the published messages instead of sending them to Redis
+    def __init__(self, publisher, fail: bool = False):
+        self.publisher = publisher
+        self.fail = fail
+        self.published = []
+
+    def create_event_message(self, topic):
+        return self.publisher.create_event_message(topic)
+
+    def publish(self, topic, message):
+        if self.fail:
+            raise ConnectionError('Redis is not available')
+        event_message = messages.TeraEvent()
+        event_message.ParseFromString(message)
+        database_events = []
+        for any_message in event_message.events:
+            database_event = messages.DatabaseEvent()
+            any_message.Unpack(database_event)
+            database_events.append(database_event)
+        self.published.append((topic, database_events))
+
+
+class TeraEventOutboxTest(BaseModelsTest):
+
+    def setUp(self):
+        super().setUp()
+        self._publisher = DBManagerEvents.publisher
+        self._recorder = RecordingPublisher(self._publisher)
+        DBManagerEvents.publisher = self._recorder
+
+    def tearDown(self):
+        DBManagerEvents.publisher = self._publisher
+        DBManagerEvents.outbox_enabled = False
+        super().tearDown()
+
+    def new_site(self, name: str) -> TeraSite:
+        site = TeraSite()
+        site.site_name = name
+        db.session.add(site)
+        return site
+
+    def test_one_message_per_topic_after_commit(self):
+        self.new_site('Events site 1')
+        self.new_site('Events site 2')
+        db.session.flush()
+        session = TeraSession.get_session_by_id(1)
+        session.session_comments = 'Events test'
+        db.session.flush()
+        self.assertEqual([], self._recorder.published)
+
+        db.session.commit()
+        topics = [topic for topic, _ in self._recorder.published]
+        self.assertEqual(2, len(topics))
+        self.assertEqual(len(topics), len(set(topics)))
+        for topic, database_events in self._recorder.published:
+            if topic.endswith(TeraSite.get_model_name()):
+                self.assertEqual(2, len(database_events))
+                self.assertTrue(all([database_event.type == messages.DatabaseEvent.DB_CREATE
+                                     for database_event in database_events]))
+            else:
+                self.assertEqual(1, len(database_events))
+                self.assertEqual(messages.DatabaseEvent.DB_UPDATE, database_events[0].type)
+                session_json = json.loads(database_events[0].object_value)
+                self.assertEqual(1, session_json['id_session'])
+                self.assertIn('session_assets_count', session_json)
+
+        for site in TeraSite.query.filter(TeraSite.site_name.like('Events site%')).all():
+            db.session.delete(site)
+        db.session.commit()
+        topic, database_events = self._recorder.published[-1]
+        self.assertEqual(2, len(database_events))
+        self.assertEqual(messages.DatabaseEvent.DB_DELETE, database_events[0].type)
+
+    def test_rollbacked_events(self):
+        self.new_site('Events rollbacked site')
+        db.session.flush()
+        db.session.rollback()
+        db.session.commit()
+        self.assertEqual([], self._recorder.published)
+
+    def test_outbox(self):
+        DBManagerEvents.outbox_enabled = True
+        site = self.new_site('Events outbox site')
+        db.session.commit()
+        self.assertEqual(1, len(self._recorder.published))
+        self.assertEqual(0, TeraEventOutbox.get_count())
+
+        # Messages which can't be published are kept in the outbox, then published again
+        self._recorder.fail = True
+        db.session.delete(site)
+        db.session.commit()
+        self.assertEqual(1, TeraEventOutbox.get_count())
+
+        self._recorder.fail = False
+        self.assertEqual(0, DBManagerEvents.relay_outbox())
+        outbox_message = TeraEventOutbox.query.first()
+        outbox_message.event_outbox_datetime = datetime.datetime.now() - datetime.timedelta(minutes=5)
+        db.session.commit()
+        self.assertEqual(1, DBManagerEvents.relay_outbox())
+        self.assertEqual(0, TeraEventOutbox.get_count())
+        topic, database_events = self._recorder.published[-1]
+        self.assertEqual(messages.DatabaseEvent.DB_DELETE, database_events[0].type)
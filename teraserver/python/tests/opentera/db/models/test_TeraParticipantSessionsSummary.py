@@ -0,0 +1,97 @@
+from opentera.db.Base import db
+from opentera.db.models.TeraParticipant import TeraParticipant
+from opentera.db.models.TeraParticipantSessionsSummary import TeraParticipantSessionsSummary
+from opentera.db.models.TeraSession import TeraSession, TeraSessionStatus
+from tests.opentera.db.models.BaseModelsTest import BaseModelsTest
+from datetime import datetime, timedelta
+
+
+class TeraParticipantSessionsSummaryTest(BaseModelsTest):
+
+    def assert_summaries_up_to_date(self):
+        participants_ids = [participant.id_participant for participant in TeraParticipant.query.all()]
+        sessions_stats = TeraSession.get_participants_sessions_stats(participants_ids)
+        summaries = TeraParticipantSessionsSummary.get_summaries_for_participants(participants_ids)
+        self.assertEqual(set(sessions_stats.keys()), set(summaries.keys()))
+        for id_participant, stats in sessions_stats.items():
+            summary = summaries[id_participant]
+            self.assertEqual(stats['sessions_count'], summary.summary_sessions_count)
+            self.assertEqual(stats['sessions_duration'], summary.summary_sessions_duration)
+            self.assertEqual(stats['first_session_datetime'], summary.summary_first_session_datetime)
+            self.assertEqual(stats['last_session_datetime'], summary.summary_last_session_datetime)
+            for status in TeraSessionStatus:
+                self.assertEqual(stats['status_count'][status.value], summary.get_status_count(status.value))
+
+    def test_defaults(self):
+        self.assertGreater(TeraParticipantSessionsSummary.get_count(), 0)
+        self.assert_summaries_up_to_date()
+
+    def test_get_summary_for_participant(self):
+        participant = TeraParticipant.get_participant_by_id(1)
+        summary = participant.get_sessions_summary()
+        self.assertIsNotNone(summary)
+        self.assertEqual(len(participant.participant_sessions), summary.summary_sessions_count)
+        self.assertEqual(participant.get_first_session().session_start_datetime,
+                         summary.summary_first_session_datetime)
+        self.assertEqual(participant.get_last_session().session_start_datetime, summary.summary_last_session_datetime)
+
+    def test_session_changes(self):
+        participant = TeraParticipant.get_participant_by_id(2)
+        count = participant.get_sessions_summary().summary_sessions_count
+
+        # Insert
+        session = TeraSession()
+        session.session_name = 'Summary test'
+        session.id_session_type = 1
+        session.id_creator_participant = participant.id_participant
+        session.session_participants = [participant]
+        session.session_start_datetime = datetime.now() + timedelta(days=1)
+        session.session_status = TeraSessionStatus.STATUS_COMPLETED.value
+        session.session_duration = 100
+        TeraSession.insert(session)
+        self.assertEqual(count + 1, participant.get_sessions_summary().summary_sessions_count)
+        self.assertEqual(session.session_start_datetime,
+                         participant.get_sessions_summary().summary_last_session_datetime)
+        self.assert_summaries_up_to_date()
+
+        # Update
+        TeraSession.update(session.id_session, {'session_status': TeraSessionStatus.STATUS_CANCELLED.value})
+        self.assertNotEqual(session.session_start_datetime,
+                            participant.get_sessions_summary().summary_last_session_datetime)
+        self.assert_summaries_up_to_date()
+
+        # Participants changes
+        other_participant = TeraParticipant.get_participant_by_id(1)
+        session.session_participants = [other_participant]
+        db.session.commit()
+        self.assertEqual(count, participant.get_sessions_summary().summary_sessions_count)
+        self.assert_summaries_up_to_date()
+
+        # Rollbacked changes
+        session.session_duration = 200
+        db.session.rollback()
+        self.assert_summaries_up_to_date()
+
+        # Delete
+        TeraSession.delete(session.id_session)
+        self.assert_summaries_up_to_date()
+
+    def test_bulk_sessions_changes(self):
+        session = TeraSession.query.filter(TeraSession.session_participants.any()).first()
+        session.session_status = TeraSessionStatus.STATUS_NOTSTARTED.value
+        session.session_start_datetime = datetime.now() - timedelta(days=1)
+        db.session.commit()
+
+        TeraSession.cancel_past_not_started_sessions()
+        self.assertEqual(TeraSessionStatus.STATUS_CANCELLED.value, TeraSession.get_session_by_id(
+            session.id_session).session_status)
+        self.assert_summaries_up_to_date()
+
+    def test_rebuild(self):
+        summary = TeraParticipantSessionsSummary.get_summary_for_participant(1)
+        summary.summary_sessions_count = 0
+        db.session.commit()
+
+        self.assertEqual(TeraParticipantSessionsSummary.get_count(), TeraParticipantSessionsSummary.rebuild())
+        self.assertGreater(TeraParticipantSessionsSummary.get_summary_for_participant(1).summary_sessions_count, 0)
+        self.assert_summaries_up_to_date()
@@ -46,3 +46,64 @@ class TeraSessionTest(BaseModelsTest):
         #                        'session_name': 'TEST',
         #                        'session_status': 0,
         #                        'session_start_datetime': str(datetime.now())}}
+
+    def test_to_json_datetime(self):
+        session = TeraSession.get_session_by_id(1)
+        session_json = session.to_json(minimal=True)
+        self.assertEqual(session.session_start_datetime.isoformat(), session_json['session_start_datetime'])
+        self.assertFalse('session_participants' in session_json)
+
+    def test_to_json_list(self):
+        sessions = TeraSession.get_sessions_for_participant(part_id=1)
+        self.assertGreater(len(sessions), 0)
+        for minimal in [False, True]:
+            sessions_json = TeraSession.to_json_list(sessions, minimal=minimal)
+            self.assertEqual(len(sessions), len(sessions_json))
+            for session, session_json in zip(sessions, sessions_json):
+                self.assertEqual(session.to_json(minimal=minimal), session_json)
+        self.assertEqual([], TeraSession.to_json_list([]))
+
+    def test_get_sessions_stats(self):
+        from opentera.db.models.TeraAsset import TeraAsset
+        from opentera.db.models.TeraTest import TeraTest
+        sessions_ids = [session.id_session for session in TeraSession.query.all()]
+        assets_count, tests_count = TeraSession.get_sessions_stats(sessions_ids)
+        for id_session in sessions_ids:
+            self.assertEqual(TeraAsset.get_count({'id_session': id_session}), assets_count.get(id_session, 0))
+            self.assertEqual(TeraTest.get_count({'id_session': id_session}), tests_count.get(id_session, 0))
+
+    def test_get_participants_sessions_stats(self):
+        participants_ids = [participant.id_participant for participant in TeraParticipant.query.all()]
+        sessions_stats = TeraSession.get_participants_sessions_stats(participants_ids)
+        self.assertEqual(dict(), TeraSession.get_participants_sessions_stats([]))
+        for id_participant in participants_ids:
+            participant = TeraParticipant.get_participant_by_id(id_participant)
+            sessions = participant.participant_sessions
+            if not sessions:
+                self.assertFalse(id_participant in sessions_stats)
+                continue
+            stats = sessions_stats[id_participant]
+            self.assertEqual(len(sessions), stats['sessions_count'])
+            self.assertEqual(sum([session.session_duration for session in sessions]), stats['sessions_duration'])
+            for status in TeraSessionStatus:
+                self.assertEqual(len([session for session in sessions if session.session_status == status.value]),
+                                 stats['status_count'][status.value])
+            self.assertEqual(participant.get_first_session().session_start_datetime,
+                             stats['first_session_datetime'])
+            last_session = participant.get_last_session()
+            self.assertEqual(last_session.session_start_datetime if last_session else None,
+                             stats['last_session_datetime'])
+
+    def test_get_sessions_for_participant_dates(self):
+        from datetime import timedelta
+        sessions = TeraSession.get_sessions_for_participant(part_id=1)
+        self.assertGreater(len(sessions), 0)
+        for session in sessions:
+            session_date = session.session_start_datetime.date()
+            # Range includes the whole start and end days
+            self.assertTrue(session in TeraSession.get_sessions_for_participant(part_id=1, start_date=session_date,
+                                                                               end_date=session_date))
+            self.assertFalse(session in TeraSession.get_sessions_for_participant(
+                part_id=1, start_date=session_date + timedelta(days=1)))
+            self.assertFalse(session in TeraSession.get_sessions_for_participant(
+                part_id=1, end_date=session_date - timedelta(days=1)))
@@ -1,3 +1,4 @@
+from opentera.db.models.TeraSessionDevices import TeraSessionDevices
 from tests.opentera.db.models.BaseModelsTest import BaseModelsTest
 
 
@@ -5,3 +6,13 @@ class TeraSessionDevicesTest(BaseModelsTest):
 
     def test_defaults(self):
         pass
+
+    def test_to_json_skips_relationships(self):
+        session_device = TeraSessionDevices.query.first()
+        self.assertIsNotNone(session_device)
+        session_device_json = session_device.to_json()
+        self.assertEqual(session_device.id_session, session_device_json['id_session'])
+        self.assertEqual(session_device.id_device, session_device_json['id_device'])
+        self.assertFalse('session_device_device' in session_device_json)
+        self.assertFalse('session_device_session' in session_device_json)
+        self.assertFalse('version_id' in session_device_json)
@@ -1,3 +1,5 @@
+from opentera.db.models.TeraSession import TeraSession
+from opentera.db.models.TeraSessionEvent import TeraSessionEvent
 from tests.opentera.db.models.BaseModelsTest import BaseModelsTest
 
 
@@ -5,3 +7,10 @@ class TeraSessionEventTest(BaseModelsTest):
 
     def test_defaults(self):
         pass
+
+    def test_get_events_for_sessions(self):
+        sessions_ids = [session.id_session for session in TeraSession.query.all()]
+        sessions_events = TeraSessionEvent.get_events_for_sessions(sessions_ids)
+        self.assertEqual(len(sessions_ids), len(sessions_events))
+        for id_session in sessions_ids:
+            self.assertEqual(TeraSessionEvent.get_events_for_session(id_session), sessions_events[id_session])
@@ -0,0 +1,117 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+
+from opentera.services.BackendHttpClient import BackendHttpClient
+
+
+class BackendRequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive connections
+    protocol_version = 'HTTP/1.1'
+
+    def do_request(self):
+        self.server.connections.add(self.client_address)
+        self.server.authorizations.append(self.headers.get('Authorization'))
+        length = int(self.headers.get('Content-Length', 0))
+        if length:
+            self.rfile.read(length)
+        if self.path.startswith('/slow'):
+            time.sleep(0.5)
+        status = 500 if self.path.startswith('/error') else 200
+        body = b'[]'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_request
+    do_POST = do_request
+    do_DELETE = do_request
+
+    def log_message(self, *args):
+        pass
+
+
+class BackendHttpClientTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), BackendRequestHandler)
+        cls.server.daemon_threads = True
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.url = 'http://127.0.0.1:' + str(cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.connections = set()
+        self.server.authorizations = []
+
+    def test_get_instance(self):
+        client = BackendHttpClient.get_instance({'hostname': '127.0.0.1', 'port': 40075})
+        self.assertIs(client, BackendHttpClient.get_instance({'hostname': '127.0.0.1', 'port': 40075}))
+        self.assertEqual((BackendHttpClient.default_connect_timeout, BackendHttpClient.default_read_timeout),
+                         client.timeout)
+        self.assertEqual((BackendHttpClient.default_connect_timeout, None), client.upload_timeout)
+
+        other_client = BackendHttpClient.get_instance({'read_timeout': '30', 'upload_read_timeout': 300})
+        self.assertIsNot(client, other_client)
+        self.assertEqual((5, 30), other_client.timeout)
+        self.assertEqual((5, 300), other_client.upload_timeout)
+
+    def test_connections_reused(self):
+        client = BackendHttpClient(pool_size=2)
+        for _ in range(5):
+            self.assertEqual(200, client.get(self.url + '/api/test', 'token').status_code)
+        self.assertEqual(200, client.post(self.url + '/api/test', 'token', json_data={'test': 1}).status_code)
+        self.assertEqual(200, client.delete(self.url + '/api/test', 'token', params={'id': 1}).status_code)
+        # One connection for all the requests
+        self.assertEqual(1, len(self.server.connections))
+        self.assertEqual(['OpenTera token'] * 7, self.server.authorizations)
+
+    def test_timeouts(self):
+        client = BackendHttpClient(connect_timeout=1, read_timeout=2, upload_read_timeout=3)
+        with mock.patch.object(client.session, 'request') as request:
+            request.return_value.status_code = 200
+            client.get(self.url, 'token')
+            self.assertEqual((1, 2), request.call_args[1]['timeout'])
+            client.delete(self.url, 'token')
+            self.assertEqual((1, 2), request.call_args[1]['timeout'])
+            client.post(self.url, 'token', json_data={})
+            self.assertEqual((1, 3), request.call_args[1]['timeout'])
+            client.get(self.url, 'token', stream=True)
+            self.assertEqual((1, 3), request.call_args[1]['timeout'])
+            client.get(self.url, 'token', timeout=10)
+            self.assertEqual(10, request.call_args[1]['timeout'])
+
+    def test_read_timeout(self):
+        client = BackendHttpClient(read_timeout=0.2)
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            client.get(self.url + '/slow', 'token')
+        # No read timeout for uploads
+        self.assertEqual(200, client.post(self.url + '/slow', 'token', json_data={}).status_code)
+        metrics = client.get_metrics()
+        self.assertEqual(1, metrics['GET /slow']['errors'])
+        self.assertEqual(0, metrics['POST /slow']['errors'])
+
+    def test_metrics(self):
+        client = BackendHttpClient()
+        client.get(self.url + '/api/test', 'token', params={'id': 1})
+        client.get(self.url + '/api/test', 'token', params={'id': 2})
+        client.get(self.url + '/error', 'token')
+        metrics = client.get_metrics(reset=True)
+        self.assertEqual({'GET /api/test', 'GET /error'}, set(metrics.keys()))
+        self.assertEqual(2, metrics['GET /api/test']['count'])
+        self.assertEqual(0, metrics['GET /api/test']['errors'])
+        self.assertEqual(1, metrics['GET /error']['errors'])
+        self.assertGreaterEqual(metrics['GET /api/test']['max_ms'], metrics['GET /api/test']['average_ms'])
+        self.assertEqual({}, client.get_metrics())
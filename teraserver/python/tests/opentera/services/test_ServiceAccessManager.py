@@ -0,0 +1,114 @@
+import time
+import unittest
+import uuid
+from unittest import mock
+
+import jwt
+
+from opentera.services.ServiceAccessManager import ServiceAccessManager
+
+
+class ServiceAccessManagerDecodeTokenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.keys = {name: getattr(ServiceAccessManager, name)
+                     for name in ServiceAccessManager.token_types_keys.values()}
+        for name in self.keys:
+            setattr(ServiceAccessManager, name, name + '_test_key')
+        ServiceAccessManager.validated_tokens.clear()
+
+    def tearDown(self):
+        for name, key in self.keys.items():
+            setattr(ServiceAccessManager, name, key)
+        ServiceAccessManager.validated_tokens.clear()
+
+    @staticmethod
+    def create_token(claims: dict, key_name: str) -> str:
+        return jwt.encode(claims, getattr(ServiceAccessManager, key_name), algorithm='HS256')
+
+    def create_user_token(self, expiration: int = 3600) -> str:
+        return self.create_token({'user_uuid': str(uuid.uuid4()), 'exp': int(time.time()) + expiration},
+                                 'api_user_token_key')
+
+    def create_participant_static_token(self) -> str:
+        return self.create_token({'participant_uuid': str(uuid.uuid4())}, 'api_participant_static_token_key')
+
+    def test_decode_token(self):
+        token = self.create_user_token()
+        token_type, token_dict = ServiceAccessManager.decode_token(token, ['user'])
+        self.assertEqual('user', token_type)
+        self.assertEqual(jwt.decode(token, options={'verify_signature': False}), token_dict)
+
+        token = self.create_participant_static_token()
+        self.assertEqual('participant_static', ServiceAccessManager.decode_token(token, ['participant',
+                                                                                        'participant_static'])[0])
+        # Not allowed token type
+        self.assertEqual((None, None), ServiceAccessManager.decode_token(token, ['participant']))
+
+        # Invalid tokens
+        self.assertEqual((None, None), ServiceAccessManager.decode_token(None, ['user']))
+        self.assertEqual((None, None), ServiceAccessManager.decode_token('invalid', ['user']))
+        self.assertEqual((None, None), ServiceAccessManager.decode_token(self.create_user_token(-10), ['user']))
+        token = self.create_token({'user_uuid': str(uuid.uuid4())}, 'api_device_token_key')
+        self.assertEqual((None, None), ServiceAccessManager.decode_token(token, ['user', 'device']))
+
+    def test_validated_token_reused(self):
+        token = self.create_user_token()
+        expected = ServiceAccessManager.decode_token(token, ['user'])
+        self.assertEqual(1, len(ServiceAccessManager.validated_tokens))
+        with mock.patch('opentera.services.ServiceAccessManager.jwt.decode') as decode:
+            self.assertEqual(expected, ServiceAccessManager.decode_token(token, ['user']))
+            decode.assert_not_called()
+            # Type still verified
+            self.assertEqual((None, None), ServiceAccessManager.decode_token(token, ['device']))
+
+    def test_validated_token_expiration(self):
+        # Validated until the token expiration
+        token = self.create_user_token(60)
+        ServiceAccessManager.decode_token(token, ['user'])
+        self.assertAlmostEqual(time.time() + 60, ServiceAccessManager.validated_tokens[
+            (ServiceAccessManager.get_keys_fingerprint(), token)][0], delta=1)
+        with mock.patch('opentera.services.ServiceAccessManager.jwt.decode', return_value={}) as decode, \
+                mock.patch('opentera.services.ServiceAccessManager.time.time', return_value=time.time() + 61):
+            self.assertEqual((None, None), ServiceAccessManager.decode_token(token, ['user']))
+            decode.assert_called_once()
+
+        # Tokens without expiration are verified again after the time to live
+        token = self.create_participant_static_token()
+        ServiceAccessManager.decode_token(token, ['participant_static'])
+        with mock.patch('opentera.services.ServiceAccessManager.jwt.decode', wraps=jwt.decode) as decode:
+            self.assertEqual('participant_static',
+                             ServiceAccessManager.decode_token(token, ['participant_static'])[0])
+            decode.assert_not_called()
+            with mock.patch('opentera.services.ServiceAccessManager.time.time',
+                            return_value=time.time() + ServiceAccessManager.validated_tokens_ttl + 1):
+                self.assertEqual('participant_static',
+                                 ServiceAccessManager.decode_token(token, ['participant_static'])[0])
+            self.assertEqual(2, decode.call_count)
+
+    def test_key_changed(self):
+        token = self.create_participant_static_token()
+        self.assertEqual('participant_static', ServiceAccessManager.decode_token(token, ['participant_static'])[0])
+
+        # Validated with the previous key only
+        ServiceAccessManager.api_participant_static_token_key = 'new_test_key'
+        self.assertEqual((None, None), ServiceAccessManager.decode_token(token, ['participant_static']))
+
+        # Same keys, same fingerprint
+        ServiceAccessManager.api_participant_static_token_key = 'api_participant_static_token_key_test_key'
+        fingerprint = ServiceAccessManager.get_keys_fingerprint()
+        self.assertEqual(fingerprint, ServiceAccessManager.get_keys_fingerprint())
+        self.assertEqual('participant_static', ServiceAccessManager.decode_token(token, ['participant_static'])[0])
+        ServiceAccessManager.api_user_token_key = 'new_test_key'
+        self.assertNotEqual(fingerprint, ServiceAccessManager.get_keys_fingerprint())
+
+    def test_max_validated_tokens(self):
+        with mock.patch.object(ServiceAccessManager, 'validated_tokens_max', 2):
+            tokens = [self.create_user_token() for _ in range(3)]
+            for token in tokens:
+                ServiceAccessManager.decode_token(token, ['user'])
+            ServiceAccessManager.decode_token(tokens[1], ['user'])
+            ServiceAccessManager.decode_token(self.create_user_token(), ['user'])
+            # Least recently used tokens removed
+            self.assertEqual([tokens[1]], [token for _, token in ServiceAccessManager.validated_tokens.keys()][:1])
+            self.assertEqual(2, len(ServiceAccessManager.validated_tokens))
@@ -0,0 +1,165 @@
+import unittest
+import uuid
+from unittest import mock
+
+from flask import Flask
+
+from modules.DatabaseModule.DBManager import DBManager
+from opentera.db.Base import db
+from opentera.db.models.TeraUser import TeraUser
+from opentera.services.BackendHttpClient import BackendHttpClient
+from opentera.services.ServiceConfigManager import ServiceConfigManager
+from opentera.services.TeraUserClient import TeraUserClient
+from tests.opentera.db.models.BaseModelsTest import BaseModelsTest
+
+
+class TeraUserClientRolesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = ServiceConfigManager()
+        self.config.backend_config = {'hostname': '127.0.0.1', 'port': 40075}
+        self.app = Flask(__name__)
+        self.user_uuid = str(uuid.uuid4())
+        self.token_dict = {'user_uuid': self.user_uuid, 'id_user': 2, 'user_fullname': 'Test user',
+                           'user_superadmin': False}
+
+        # Server access generation, without redis
+        self.generation = 1
+        self.redis_client = mock.Mock()
+        self.redis_client.get.side_effect = lambda key: str(self.generation).encode('utf-8')
+        self.patches = [mock.patch.object(TeraUserClient, 'redis_client', self.redis_client),
+                        mock.patch.object(TeraUserClient, 'roles_cache', dict())]
+        for patch in self.patches:
+            patch.start()
+
+        self.user_info = {'sites': [{'id_site': 1, 'site_role': 'admin'}],
+                          'projects': [{'id_project': 1, 'project_role': 'user'},
+                                       {'id_project': 2, 'project_role': 'admin'}]}
+        self.response = mock.Mock(status_code=200)
+        self.response.json.side_effect = lambda: [self.user_info]
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def create_client(self) -> TeraUserClient:
+        with self.app.test_request_context('/'):
+            return TeraUserClient(self.token_dict, 'token', self.config)
+
+    def test_roles_cached(self):
+        client = self.create_client()
+        with mock.patch.object(BackendHttpClient, 'get', return_value=self.response) as get:
+            self.assertEqual('admin', client.get_role_for_site(1))
+            self.assertEqual('user', client.get_role_for_project(1))
+            self.assertEqual('admin', client.get_role_for_project(2))
+            self.assertEqual('Undefined', client.get_role_for_project(3))
+            self.assertEqual('Undefined', client.get_role_for_site(2))
+            # Same generation: roles are fetched once, for all the clients of the user
+            self.assertEqual('admin', self.create_client().get_role_for_site(1))
+            get.assert_called_once()
+            self.assertEqual('https://127.0.0.1:40075/api/user/users?self=true', get.call_args[0][0])
+
+    def test_generation_changed(self):
+        client = self.create_client()
+        with mock.patch.object(BackendHttpClient, 'get', return_value=self.response) as get:
+            self.assertEqual('user', client.get_role_for_project(1))
+
+            # Access changed on the server
+            self.user_info['projects'][0]['project_role'] = 'admin'
+            self.generation += 1
+            self.assertEqual('admin', client.get_role_for_project(1))
+            self.assertEqual('admin', client.get_role_for_project(1))
+            self.assertEqual(2, get.call_count)
+
+    def test_roles_expiration(self):
+        client = self.create_client()
+        with mock.patch.object(BackendHttpClient, 'get', return_value=self.response) as get:
+            client.get_roles()
+            expiration = TeraUserClient.roles_cache[self.user_uuid][1]
+            with mock.patch('opentera.services.TeraUserClient.time.monotonic', return_value=expiration + 1):
+                client.get_roles()
+            self.assertEqual(2, get.call_count)
+
+    def test_roles_not_cached_on_error(self):
+        client = self.create_client()
+        self.response.status_code = 500
+        with mock.patch.object(BackendHttpClient, 'get', return_value=self.response) as get:
+            self.assertEqual({'sites': {}, 'projects': {}}, client.get_roles())
+            self.response.status_code = 200
+            self.assertEqual('admin', client.get_role_for_site(1))
+            self.assertEqual(2, get.call_count)
+
+    def test_users_roles(self):
+        # Roles are cached by user
+        with mock.patch.object(BackendHttpClient, 'get', return_value=self.response) as get:
+            self.create_client().get_roles()
+            self.token_dict['user_uuid'] = str(uuid.uuid4())
+            self.create_client().get_roles()
+            self.assertEqual(2, get.call_count)
+            self.assertEqual(2, len(TeraUserClient.roles_cache))
+
+
+class TeraUserClientAccessChangesTest(BaseModelsTest):
+
+    @classmethod
+    def setUpClass(cls):
+        # Start with a session of the new database, not a session left by the previous tests
+        db.session.remove()
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        self.config = ServiceConfigManager()
+        self.config.backend_config = {'hostname': '127.0.0.1', 'port': 40075}
+        self.app = Flask(__name__)
+        self.user = TeraUser.get_user_by_username('user')
+
+        # Generation is read from the server redis, as the services do
+        self.patches = [mock.patch.object(TeraUserClient, 'redis_client', self._db_man.redis),
+                        mock.patch.object(TeraUserClient, 'roles_cache', dict())]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        super().tearDown()
+
+    def get_self_response(self):
+        # Roles, as returned by the server users API for the "self" user
+        user_access = DBManager.userAccess(self.user)
+        user_info = {'sites': [{'id_site': site.id_site, 'site_role': user_access.get_site_role(site.id_site)}
+                               for site in user_access.get_accessible_sites()],
+                     'projects': [{'id_project': project.id_project,
+                                   'project_role': user_access.get_project_role(project.id_project)}
+                                  for project in user_access.get_accessible_projects()]}
+        return mock.Mock(status_code=200, json=mock.Mock(return_value=[user_info]))
+
+    def create_client(self) -> TeraUserClient:
+        token_dict = {'user_uuid': self.user.user_uuid, 'id_user': self.user.id_user,
+                      'user_fullname': self.user.get_fullname(), 'user_superadmin': False}
+        with self.app.test_request_context('/'):
+            return TeraUserClient(token_dict, 'token', self.config)
+
+    def test_user_groups_changed(self):
+        client = self.create_client()
+        with mock.patch.object(BackendHttpClient, 'get', side_effect=lambda *args, **kwargs:
+                               self.get_self_response()) as get:
+            roles = client.get_roles()
+            self.assertGreater(len(roles['projects']), 0)
+            self.assertEqual(roles, client.get_roles())
+            get.assert_called_once()
+
+            # User removed from all its groups: roles are fetched again by the next request
+            user_groups = list(self.user.user_user_groups)
+            self.user.user_user_groups = []
+            db.session.commit()
+            self.assertEqual({'sites': {}, 'projects': {}}, client.get_roles())
+            for id_project in roles['projects']:
+                self.assertEqual('Undefined', client.get_role_for_project(id_project))
+            self.assertEqual(2, get.call_count)
+
+            self.user.user_user_groups = user_groups
+            db.session.commit()
+            self.assertEqual(roles, client.get_roles())
+            self.assertEqual(3, get.call_count)
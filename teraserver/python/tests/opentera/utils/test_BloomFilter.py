@@ -0,0 +1,59 @@
+import unittest
+import uuid
+
+from opentera.utils.BloomFilter import BloomFilter
+
+
+class BloomFilterTest(unittest.TestCase):
+
+    def test_sizing(self):
+        bloom_filter = BloomFilter(1000, 0.01)
+        # About 9.6 bits and 7 hashes per item for a 1% error rate
+        self.assertEqual(9586, bloom_filter.size)
+        self.assertEqual(7, bloom_filter.hash_count)
+        self.assertEqual((bloom_filter.size + 7) // 8, len(bloom_filter.bits))
+
+        # Lower error rate, bigger filter
+        self.assertGreater(BloomFilter(1000, 0.001).size, bloom_filter.size)
+
+        # Minimal size
+        bloom_filter = BloomFilter(1, 0.5)
+        self.assertEqual(8, bloom_filter.size)
+        self.assertGreaterEqual(bloom_filter.hash_count, 1)
+
+    def test_positions(self):
+        bloom_filter = BloomFilter(100)
+        positions = bloom_filter.positions('item')
+        self.assertEqual(bloom_filter.hash_count, len(positions))
+        self.assertTrue(all(0 <= position < bloom_filter.size for position in positions))
+        self.assertEqual(positions, bloom_filter.positions('item'))
+
+    def test_no_false_negatives(self):
+        bloom_filter = BloomFilter(5000)
+        items = [str(uuid.uuid4()) for _ in range(5000)]
+        for item in items:
+            bloom_filter.add(item)
+        self.assertTrue(all(item in bloom_filter for item in items))
+        self.assertEqual(5000, bloom_filter.count)
+
+    def test_false_positives_rate(self):
+        bloom_filter = BloomFilter(5000, 0.01)
+        for _ in range(5000):
+            bloom_filter.add(str(uuid.uuid4()))
+        false_positives = sum([str(uuid.uuid4()) in bloom_filter for _ in range(20000)])
+        # Expected about 200 (1%), with a wide margin
+        self.assertLess(false_positives, 20000 * 0.02)
+
+    def test_empty(self):
+        bloom_filter = BloomFilter(100)
+        self.assertNotIn('item', bloom_filter)
+        self.assertNotIn('', bloom_filter)
+        self.assertFalse(bloom_filter.is_full())
+
+    def test_is_full(self):
+        bloom_filter = BloomFilter(3)
+        for item in ['a', 'b']:
+            bloom_filter.add(item)
+        self.assertFalse(bloom_filter.is_full())
+        bloom_filter.add('c')
+        self.assertTrue(bloom_filter.is_full())
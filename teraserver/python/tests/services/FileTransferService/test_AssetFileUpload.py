@@ -0,0 +1,86 @@
+import io
+import os
+import tempfile
+import unittest
+
+from services.FileTransferService.libfiletransferservice.db.Base import db
+from services.FileTransferService.libfiletransferservice.db.DBManager import DBManager
+from services.FileTransferService.libfiletransferservice.db.models.AssetFileUpload import AssetFileUpload
+
+
+class AssetFileUploadTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Service database in RAM
+        cls._db_man = DBManager()
+        cls._db_man.open_local({})
+
+    @classmethod
+    def tearDownClass(cls):
+        db.session.remove()
+
+    def setUp(self):
+        self.file_folder = tempfile.mkdtemp()
+        self.upload = AssetFileUpload()
+        self.upload.upload_requester_uuid = '00000000-0000-0000-0000-000000000001'
+        self.upload.upload_original_filename = 'testfile'
+        self.upload.upload_asset_json = '{}'
+        AssetFileUpload.insert(self.upload)
+
+    def tearDown(self):
+        self.upload.delete_upload(self.file_folder)
+        os.rmdir(self.file_folder)
+
+    def read_partial_file(self) -> bytes:
+        with open(self.upload.get_partial_filename(self.file_folder), 'rb') as partial_file:
+            return partial_file.read()
+
+    def test_append_chunks(self):
+        self.assertTrue(self.upload.append_chunk(self.file_folder, 0, io.BytesIO(b'0123'), chunk_size=3))
+        self.assertEqual(4, self.upload.upload_offset)
+        self.assertTrue(self.upload.append_chunk(self.file_folder, 4, io.BytesIO(b'4567')))
+        self.assertEqual(8, self.upload.upload_offset)
+        self.assertEqual(b'01234567', self.read_partial_file())
+
+        # Chunk already received
+        self.assertFalse(self.upload.append_chunk(self.file_folder, 4, io.BytesIO(b'4567')))
+        self.assertEqual(8, self.upload.upload_offset)
+        self.assertFalse(self.upload.is_partial_file_lost(self.file_folder))
+
+    def test_interrupted_chunk(self):
+        self.upload.append_chunk(self.file_folder, 0, io.BytesIO(b'0123'))
+        # Bytes of a chunk interrupted before the offset was updated
+        with open(self.upload.get_partial_filename(self.file_folder), 'ab') as partial_file:
+            partial_file.write(b'45')
+        self.assertFalse(self.upload.is_partial_file_lost(self.file_folder))
+
+        self.assertTrue(self.upload.append_chunk(self.file_folder, 4, io.BytesIO(b'X')))
+        self.assertEqual(b'0123X', self.read_partial_file())
+
+    def test_partial_file_removed(self):
+        self.upload.append_chunk(self.file_folder, 0, io.BytesIO(b'0123'))
+        os.remove(self.upload.get_partial_filename(self.file_folder))
+
+        self.assertTrue(self.upload.is_partial_file_lost(self.file_folder))
+        self.assertFalse(self.upload.append_chunk(self.file_folder, 4, io.BytesIO(b'4567')))
+        self.assertEqual(4, self.upload.upload_offset)
+
+        self.upload.restart(self.file_folder)
+        self.assertEqual(0, AssetFileUpload.get_upload_for_uuid(self.upload.upload_uuid).upload_offset)
+        self.assertFalse(self.upload.is_partial_file_lost(self.file_folder))
+        self.assertTrue(self.upload.append_chunk(self.file_folder, 0, io.BytesIO(b'0123')))
+
+    def test_partial_file_truncated(self):
+        self.upload.append_chunk(self.file_folder, 0, io.BytesIO(b'0123'))
+        with open(self.upload.get_partial_filename(self.file_folder), 'r+b') as partial_file:
+            partial_file.truncate(2)
+        self.assertTrue(self.upload.is_partial_file_lost(self.file_folder))
+
+        self.upload.restart(self.file_folder)
+        self.assertFalse(os.path.exists(self.upload.get_partial_filename(self.file_folder)))
+        self.assertEqual(0, self.upload.upload_offset)
+
+    def test_new_upload(self):
+        # Nothing received yet
+        self.assertFalse(self.upload.is_partial_file_lost(self.file_folder))
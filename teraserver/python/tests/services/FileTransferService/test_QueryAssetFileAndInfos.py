@@ -572,3 +572,84 @@ class FileTransferAssetFileAndInfosTest(BaseAPITest):
                                                                                     'access_token':
                                                                                         asset['access_token']})
             self.assertEqual(response.status_code, 200, 'Delete OK')
+
+    def test_resumable_upload_as_user(self):
+        from requests import put
+        import hashlib
+        uploads_url = self._make_url(self.host, self.port, self.test_endpoint + '/uploads')
+        request_headers = {'Authorization': 'OpenTera ' + self.user_token}
+
+        file_asset = {'id_session': 1, 'asset_name': 'Test Asset', 'asset_type': 'application/octet-stream'}
+        response = self._post_with_token(token=self.user_token, endpoint=self.test_endpoint + '/uploads',
+                                         payload={'file_asset': file_asset, 'filename': 'testfile',
+                                                  'file_size': self.test_file_size})
+        self.assertEqual(response.status_code, 200, 'Upload started')
+        upload_uuid = response.json()['upload_uuid']
+        self.assertEqual(response.json()['upload_offset'], 0)
+
+        with open('testfile', 'rb') as f:
+            data = f.read()
+        chunk_size = 1024 * 1024 * 16
+        for offset in range(0, self.test_file_size - chunk_size, chunk_size):
+            response = put(url=uploads_url, verify=False, headers=request_headers,
+                           params={'upload_uuid': upload_uuid, 'offset': offset},
+                           data=data[offset:offset + chunk_size])
+            self.assertEqual(response.status_code, 200, 'Chunk received')
+            self.assertEqual(response.json()['upload_offset'], offset + chunk_size)
+
+        # Same chunk sent twice
+        response = put(url=uploads_url, verify=False, headers=request_headers,
+                       params={'upload_uuid': upload_uuid, 'offset': 0}, data=data[:chunk_size])
+        self.assertEqual(response.status_code, 409, 'Wrong offset')
+        offset = response.json()['upload_offset']
+
+        response = self._request_with_token_auth(token=self.user_token, endpoint=self.test_endpoint + '/uploads',
+                                                 payload={'upload_uuid': upload_uuid})
+        self.assertEqual(response.status_code, 200, 'Upload state')
+        self.assertEqual(response.json()['upload_offset'], offset)
+
+        response = put(url=uploads_url, verify=False, headers=request_headers,
+                       params={'upload_uuid': upload_uuid, 'offset': offset, 'finalize': True,
+                               'sha256': hashlib.sha256(data).hexdigest()},
+                       data=data[offset:])
+        self.assertEqual(response.status_code, 200, 'Upload finalized')
+        json_data = response.json()
+        self.assertEqual(json_data['asset_file_size'], self.test_file_size)
+
+        response = self._delete_with_token_plus(token=self.user_token,
+                                                payload={'uuid': json_data['asset_uuid'],
+                                                         'access_token': json_data['access_token']})
+        self.assertEqual(response.status_code, 200, 'Delete OK')
+
+    def test_conditional_and_range_download_as_user(self):
+        import hashlib
+        file_asset = {'id_session': 1, 'asset_name': 'Test Asset', 'asset_type': 'application/octet-stream'}
+        with open('testfile', 'rb') as f:
+            files = {'file': ('testfile', f, 'application/octet-stream',
+                              {'Content-Length': self.test_file_size}),
+                     'file_asset': (None, json.dumps(file_asset), 'application/json')}
+            response = self._post_file_with_token(self.user_token, files=files)
+            self.assertEqual(response.status_code, 200, 'Asset post OK')
+            json_data = response.json()
+
+        with open('testfile', 'rb') as f:
+            data = f.read()
+        self.assertEqual(json_data['asset_file_hash'], hashlib.sha256(data).hexdigest())
+
+        asset_url = json_data['asset_url'] + '?asset_uuid=' + json_data['asset_uuid'] + '&access_token=' + \
+            json_data['access_token']
+        request_headers = {'Authorization': 'OpenTera ' + self.user_token, 'Range': 'bytes=1000-1999'}
+        response = get(url=asset_url, headers=request_headers, verify=False)
+        self.assertEqual(response.status_code, 206, 'Partial content')
+        self.assertEqual(response.content, data[1000:2000])
+        self.assertEqual(response.headers['ETag'], '"' + json_data['asset_file_hash'] + '"')
+
+        request_headers = {'Authorization': 'OpenTera ' + self.user_token,
+                           'If-None-Match': response.headers['ETag']}
+        response = get(url=asset_url, headers=request_headers, verify=False)
+        self.assertEqual(response.status_code, 304, 'Not modified')
+
+        response = self._delete_with_token_plus(token=self.user_token,
+                                                payload={'uuid': json_data['asset_uuid'],
+                                                         'access_token': json_data['access_token']})
+        self.assertEqual(response.status_code, 200, 'Delete OK')
@@ -0,0 +1,28 @@
+import unittest
+
+from services.LoggingService.libloggingservice.db.Base import db
+from services.LoggingService.libloggingservice.db.DBManager import DBManager
+from services.LoggingService.libloggingservice.db.models.LogEntry import LogEntry
+from services.LoggingService.libloggingservice.db.models.LogHourlyCount import LogHourlyCount
+
+
+class BaseLoggingDBTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._db_man = DBManager()
+        # Setup DB in RAM
+        cls._db_man.open_local({'filename': ':memory:'}, echo=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        db.session.remove()
+
+    def setUp(self):
+        LogEntry.query.delete()
+        LogHourlyCount.query.delete()
+        db.session.commit()
+
+    def tearDown(self):
+        # Make sure pending queries are rollbacked.
+        db.session.rollback()
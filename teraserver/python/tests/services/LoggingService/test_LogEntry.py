@@ -0,0 +1,75 @@
+from services.LoggingService.libloggingservice.db.Base import db
+from services.LoggingService.libloggingservice.db.models.LogEntry import LogEntry
+from opentera.messages.python.LogEvent_pb2 import LogEvent
+from tests.services.LoggingService.BaseLoggingDBTest import BaseLoggingDBTest
+import datetime
+
+
+class LogEntryTest(BaseLoggingDBTest):
+
+    def setUp(self):
+        super().setUp()
+        # Entries one minute apart, from the oldest (index 0) to the newest
+        self.start = datetime.datetime(2022, 11, 1, 8, 0, 0)
+        levels = [LogEvent.LogLevel.LOGLEVEL_INFO, LogEvent.LogLevel.LOGLEVEL_ERROR, LogEvent.LogLevel.LOGLEVEL_DEBUG]
+        for index in range(12):
+            entry = LogEntry()
+            entry.log_level = levels[index % 3]
+            entry.sender = 'sender' + str(index % 2)
+            entry.message = 'Message #' + str(index) + (' Connection lost' if index % 4 == 0 else '')
+            entry.timestamp = self.start + datetime.timedelta(minutes=index)
+            db.session.add(entry)
+        # Same timestamp as the newest entry, ordered by id
+        entry = LogEntry()
+        entry.log_level = LogEvent.LogLevel.LOGLEVEL_INFO
+        entry.sender = 'sender1'
+        entry.message = 'Message #12'
+        entry.timestamp = self.start + datetime.timedelta(minutes=11)
+        db.session.add(entry)
+        db.session.commit()
+
+    @staticmethod
+    def get_messages(entries: list) -> list:
+        return [int(entry.message.split('#')[1].split(' ')[0]) for entry in entries]
+
+    def test_query_all_newest_first(self):
+        entries = LogEntry.query_entries()
+        self.assertEqual([12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1, 0], self.get_messages(entries))
+
+    def test_query_filters(self):
+        self.assertEqual([12, 9, 6, 3, 0], self.get_messages(LogEntry.query_entries(
+            log_level=LogEvent.LogLevel.LOGLEVEL_INFO)))
+        self.assertEqual([6, 0], self.get_messages(LogEntry.query_entries(log_level=LogEvent.LogLevel.LOGLEVEL_INFO,
+                                                                          sender='sender0')))
+        self.assertEqual([12, 11, 9, 7, 5, 3, 1], self.get_messages(LogEntry.query_entries(sender='sender1')))
+        # Message filter is case insensitive
+        self.assertEqual([8, 4, 0], self.get_messages(LogEntry.query_entries(message='connection LOST')))
+        self.assertEqual([], LogEntry.query_entries(message='%'))
+
+    def test_query_dates(self):
+        # Start date is included, end date is excluded
+        entries = LogEntry.query_entries(start_date=self.start + datetime.timedelta(minutes=3),
+                                         end_date=self.start + datetime.timedelta(minutes=6))
+        self.assertEqual([5, 4, 3], self.get_messages(entries))
+
+    def test_query_pages(self):
+        # Pages continue after the (timestamp, id) of the last entry, entries with the same timestamp are not skipped
+        first_page = LogEntry.query_entries(limit=5)
+        self.assertEqual([12, 11, 10, 9, 8], self.get_messages(first_page))
+        second_page = LogEntry.query_entries(before_timestamp=first_page[-1].timestamp,
+                                             before_id=first_page[-1].id_log_entry, limit=5)
+        self.assertEqual([7, 6, 5, 4, 3], self.get_messages(second_page))
+
+        page = LogEntry.query_entries(before_timestamp=first_page[0].timestamp, before_id=first_page[0].id_log_entry,
+                                      limit=2)
+        self.assertEqual([11, 10], self.get_messages(page))
+
+        # Without id, all the entries of the timestamp are skipped
+        page = LogEntry.query_entries(before_timestamp=first_page[0].timestamp, limit=2)
+        self.assertEqual([10, 9], self.get_messages(page))
+
+    def test_indexes(self):
+        indexes = {index['name']: index['column_names'] for index in db.inspect(db.engine).get_indexes('t_log_entry')}
+        self.assertEqual(['timestamp', 'id_log_entry'], indexes['idx_log_entry_timestamp'])
+        self.assertEqual(['log_level', 'timestamp', 'id_log_entry'], indexes['idx_log_entry_level_timestamp'])
+        self.assertEqual(['sender', 'timestamp', 'id_log_entry'], indexes['idx_log_entry_sender_timestamp'])
@@ -0,0 +1,96 @@
+import unittest
+from unittest import mock
+
+import redis
+from twisted.internet.task import Clock, LoopingCall
+
+import opentera.messages.python as messages
+import services.LoggingService.Globals as Globals
+from services.LoggingService.LoggingService import LoggingService
+
+
+class LoggingServiceReadQueuesTest(unittest.TestCase):
+
+    def setUp(self):
+        # Service without its redis / database setup: only the queues reading is tested, with a local redis
+        self.service = LoggingService.__new__(LoggingService)
+        self.service.redis = redis.Redis()
+        self.service.loglevel = messages.LogEvent.LOGLEVEL_TRACE
+        self.service.read_queues_call = None
+        self.service.log_queues = ['test.log.info', 'test.log.error']
+        self.service.queue_batch_size = 10
+        self.service.redis.delete(*self.service.log_queues)
+
+        self.clock = Clock()
+        self.stored = []
+        self.patches = [mock.patch('services.LoggingService.LoggingService.reactor', self.clock),
+                        mock.patch.object(Globals.db_man, 'store_log_events', self.stored.append)]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.service.redis.delete(*self.service.log_queues)
+        self.service.redis.close()
+
+    def push_logs(self, queue_name: str, count: int):
+        for index in range(count):
+            log_event = messages.LogEvent()
+            log_event.level = messages.LogEvent.LOGLEVEL_INFO
+            log_event.sender = 'test'
+            log_event.message = 'Log #' + str(index)
+            tera_event = messages.TeraEvent()
+            any_message = messages.Any()
+            any_message.Pack(log_event)
+            tera_event.events.extend([any_message])
+            self.service.redis.rpush(queue_name, tera_event.SerializeToString())
+
+    def test_read_queues_single_batch(self):
+        self.push_logs('test.log.info', 5)
+        self.push_logs('test.log.error', 3)
+        self.service.read_queues()
+        self.assertEqual(1, len(self.stored))
+        self.assertEqual(8, len(self.stored[0]))
+        self.assertIsNone(self.service.read_queues_call)
+        self.assertEqual([], self.clock.getDelayedCalls())
+
+    def test_read_queues_burst_batches(self):
+        self.push_logs('test.log.info', 25)
+        self.push_logs('test.log.error', 4)
+
+        # One batch per call, the next one is scheduled instead of read right away
+        self.service.read_queues()
+        self.assertEqual(1, len(self.stored))
+        self.assertEqual(14, len(self.stored[0]))
+        self.assertEqual(1, len(self.clock.getDelayedCalls()))
+
+        # Looping call while the next batch is scheduled: nothing is read
+        self.service.read_queues()
+        self.assertEqual(1, len(self.stored))
+
+        # Next batches, each one in its own reactor call
+        self.clock.advance(0)
+        self.assertEqual([14, 10, 5], [len(log_events) for log_events in self.stored])
+        self.assertEqual([], self.clock.getDelayedCalls())
+        self.assertIsNone(self.service.read_queues_call)
+        self.assertEqual(0, self.service.redis.llen('test.log.info'))
+
+
+class LoggingServiceStorageMaintenanceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = LoggingService.__new__(LoggingService)
+
+    def test_maintenance_error(self):
+        # Errors don't stop the maintenance looping call
+        with mock.patch.object(Globals.db_man, 'maintain_storage', side_effect=RuntimeError('Database error')) as \
+                maintain_storage:
+            clock = Clock()
+            loop = LoopingCall(self.service.maintain_storage)
+            loop.clock = clock
+            loop.start(60)
+            clock.advance(60)
+            self.assertTrue(loop.running)
+            self.assertEqual(2, maintain_storage.call_count)
+            loop.stop()
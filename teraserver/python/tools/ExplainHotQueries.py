@@ -0,0 +1,202 @@
+"""
+    Check that the hot queries of the server (sessions lists and stats, last sessions, assets) are served by indexes.
+
+    The queries are captured while running the models methods, then their plan is read with EXPLAIN. Full scans of the
+    large tables are reported, and the exit code is 1 if there is any. To get the plans of a large database, the
+    database can first be seeded with participants and sessions: only use --seed_participants on a test database!
+
+    From the teraserver/python folder:
+        python tools/ExplainHotQueries.py --local --seed_participants 2000 --seed_sessions 50
+        python tools/ExplainHotQueries.py --config config/TeraServerConfig.ini
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sqlalchemy import event
+
+from opentera.config.ConfigManager import ConfigManager
+from opentera.db.Base import db
+
+# Tables that should never be fully scanned by a hot query
+large_tables = ['t_sessions', 't_sessions_participants', 't_sessions_users', 't_sessions_devices',
+                't_sessions_events', 't_participants', 't_participants_sessions_summaries', 't_assets', 't_tests']
+
+
+def seed(participants_count: int, sessions_count: int):
+    from opentera.db.models.TeraParticipant import TeraParticipant
+    from opentera.db.models.TeraParticipantSessionsSummary import TeraParticipantSessionsSummary
+    from opentera.db.models.TeraProject import TeraProject
+    from opentera.db.models.TeraSession import TeraSession, TeraSessionStatus
+    from opentera.db.models.TeraSessionParticipants import TeraSessionParticipants
+    from opentera.db.models.TeraSessionType import TeraSessionType
+    from opentera.db.models.TeraSessionUsers import TeraSessionUsers
+    from opentera.db.models.TeraUser import TeraUser
+
+    projects_ids = [project.id_project for project in TeraProject.query.all()]
+    session_type_id = TeraSessionType.query.first().id_session_type
+    users_ids = [user.id_user for user in TeraUser.query.all()]
+    version_id = int(time.time() * 1000)
+    now = datetime.datetime.now()
+
+    # Participants, then their sessions, one participant at a time (core inserts, no ORM objects)
+    for index in range(participants_count):
+        participant_uuid = str(uuid.uuid4())
+        db.session.execute(TeraParticipant.__table__.insert().values(
+            version_id=version_id, participant_uuid=participant_uuid, participant_name='Seed #' + str(index),
+            participant_token_enabled=False, participant_enabled=True, participant_login_enabled=False,
+            id_project=random.choice(projects_ids)))
+        part_id = TeraParticipant.get_participant_by_uuid(participant_uuid).id_participant
+
+        sessions = [{'version_id': version_id, 'session_uuid': str(uuid.uuid4()), 'id_session_type': session_type_id,
+                     'id_creator_user': random.choice(users_ids), 'session_name': 'Seed session',
+                     'session_start_datetime': now - datetime.timedelta(minutes=random.randint(0, 3 * 365 * 24 * 60)),
+                     'session_duration': random.randint(0, 3600),
+                     'session_status': random.choice([status.value for status in TeraSessionStatus])}
+                    for _ in range(sessions_count)]
+        if sessions:
+            db.session.execute(TeraSession.__table__.insert(), sessions)
+            sessions_ids = [session_id for session_id, in db.session.query(TeraSession.id_session).filter(
+                TeraSession.session_uuid.in_([session['session_uuid'] for session in sessions]))]
+            db.session.execute(TeraSessionParticipants.__table__.insert(),
+                               [{'version_id': version_id, 'id_session': session_id, 'id_participant': part_id}
+                                for session_id in sessions_ids])
+            db.session.execute(TeraSessionUsers.__table__.insert(),
+                               [{'version_id': version_id, 'id_session': session_id,
+                                 'id_user': random.choice(users_ids)} for session_id in sessions_ids])
+        if index % 100 == 99:
+            db.session.commit()
+            print('Seeded', index + 1, 'participants')
+    db.session.commit()
+
+    TeraParticipantSessionsSummary.rebuild()
+
+    # Planner statistics of the new rows
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+
+def get_hot_queries() -> list:
+    from opentera.db.models.TeraAsset import TeraAsset
+    from opentera.db.models.TeraParticipant import TeraParticipant
+    from opentera.db.models.TeraParticipantSessionsSummary import TeraParticipantSessionsSummary
+    from opentera.db.models.TeraSession import TeraSession, TeraSessionStatus
+    from opentera.db.models.TeraSessionDevices import TeraSessionDevices
+    from opentera.db.models.TeraSessionParticipants import TeraSessionParticipants
+    from opentera.db.models.TeraSessionUsers import TeraSessionUsers
+
+    # Participant with the most sessions, and any user, device and session
+    part_id = db.session.query(TeraSessionParticipants.id_participant)\
+        .group_by(TeraSessionParticipants.id_participant)\
+        .order_by(db.func.count(TeraSessionParticipants.id_session).desc()).first()[0]
+    participant = TeraParticipant.get_participant_by_id(part_id)
+    user_id = TeraSessionUsers.query.first().id_user
+    device_id = TeraSessionDevices.query.first().id_device
+    session_id = TeraSessionParticipants.query.filter_by(id_participant=part_id).first().id_session
+    today = datetime.date.today()
+
+    return [('Sessions of a participant (page)',
+             lambda: TeraSession.get_sessions_for_participant(part_id, limit=20)),
+            ('Sessions of a participant (last year)',
+             lambda: TeraSession.get_sessions_for_participant(part_id, start_date=today - datetime.timedelta(days=365),
+                                                              end_date=today)),
+            ('Sessions of a user (page)', lambda: TeraSession.get_sessions_for_user(user_id, limit=20)),
+            ('Sessions of a device (page)', lambda: TeraSession.get_sessions_for_device(device_id, limit=20)),
+            ('First session of a participant', lambda: participant.get_first_session()),
+            ('Last session of a participant', lambda: participant.get_last_session()),
+            ('Sessions stats of a participant', lambda: TeraSession.get_participants_sessions_stats([part_id])),
+            ('Sessions summary of a participant',
+             lambda: TeraParticipantSessionsSummary.get_summaries_for_participants([part_id])),
+            ('Assets of a session', lambda: TeraAsset.get_assets_for_session(session_id)),
+            ('Past sessions not started',
+             lambda: TeraSession.query.filter(
+                 TeraSession.session_status == TeraSessionStatus.STATUS_NOTSTARTED.value,
+                 TeraSession.session_start_datetime <= datetime.datetime.now()).count())]
+
+
+def capture_statements(function) -> list:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        function()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    db.session.rollback()
+    return statements
+
+
+def get_full_scans(statement: str, parameters) -> tuple:
+    # Plan (text) of the statement and the large tables fully scanned by it
+    with db.engine.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            plan = connection.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + statement, parameters).scalar()[0]['Plan']
+            scans = []
+            lines = []
+            nodes = [(plan, 0)]
+            while nodes:
+                node, depth = nodes.pop()
+                lines.append('  ' * depth + node['Node Type'] + ' ' + node.get('Relation Name', '') + ' ' +
+                             node.get('Index Name', ''))
+                if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in large_tables:
+                    scans.append(node['Relation Name'])
+                nodes.extend([(child, depth + 1) for child in reversed(node.get('Plans', []))])
+            return '\n'.join(lines), scans
+
+        # SQLite: "SCAN table" is a full scan, "SEARCH table USING INDEX" is an index lookup
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+        details = [row[-1] for row in rows]
+        scans = [detail.split()[1] for detail in details if detail.startswith('SCAN ') and
+                 detail.split()[1] in large_tables and 'COVERING INDEX' not in detail]
+        return '\n'.join(details), scans
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='EXPLAIN of the hot database queries')
+    parser.add_argument('--config', help='Server configuration file (database)',
+                        default=os.path.join('config', 'TeraServerConfig.ini'))
+    parser.add_argument('--local', help='Use a new SQLite database in RAM, with the test values',
+                        action='store_true')
+    parser.add_argument('--seed_participants', help='Participants to add to the database first', type=int,
+                        default=0)
+    parser.add_argument('--seed_sessions', help='Sessions to add for each seeded participant', type=int, default=20)
+    parser.add_argument('--verbose', help='Print the plans of all the queries', action='store_true')
+    args = parser.parse_args()
+
+    config_man = ConfigManager()
+    from modules.DatabaseModule.DBManager import DBManager
+    if args.local:
+        config_man.create_defaults()
+        db_man = DBManager(config_man)
+        db_man.open_local({}, echo=False, ram=True)
+        db_man.create_defaults(config_man, test=True)
+    else:
+        config_man.load_config(args.config)
+        db_man = DBManager(config_man)
+        db_man.open(echo=False)
+
+    if args.seed_participants > 0:
+        seed(args.seed_participants, args.seed_sessions)
+
+    full_scans_count = 0
+    for name, function in get_hot_queries():
+        for statement, parameters in capture_statements(function):
+            plan, scans = get_full_scans(statement, parameters)
+            if scans or args.verbose:
+                print('--- ' + name + (' - Full scan of ' + ', '.join(scans) if scans else ''))
+                print(statement)
+                print(plan)
+            full_scans_count += len(scans)
+
+    print(full_scans_count, 'full scan(s) of large tables')
+    sys.exit(1 if full_scans_count else 0)